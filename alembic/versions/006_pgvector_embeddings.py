@@ -0,0 +1,52 @@
+"""Add pgvector embedding column with HNSW index
+
+Revision ID: 006_pgvector_embeddings
+Revises: 005_processing_results_table
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '006_pgvector_embeddings'
+down_revision: Union[str, None] = '005_processing_results_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+def upgrade() -> None:
+    """Upgrade database schema.
+    
+    Добавляет колонку materials.embedding_vector (pgvector) с HNSW индексом по
+    косинусному расстоянию и переносит в нее эмбеддинги из ARRAY(REAL) колонки
+    embedding. Индекс строится после переноса данных - так быстрее, чем
+    обновлять граф на каждой вставке.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(f"ALTER TABLE materials ADD COLUMN IF NOT EXISTS embedding_vector vector({EMBEDDING_DIMENSIONS})")
+    
+    # Эмбеддинги другой размерности (старые модели) не переносятся
+    op.execute(f"""
+        UPDATE materials
+        SET embedding_vector = embedding::vector
+        WHERE embedding IS NOT NULL AND array_length(embedding, 1) = {EMBEDDING_DIMENSIONS}
+    """)
+    
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_materials_embedding_hnsw
+        ON materials USING hnsw (embedding_vector vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade database schema.
+    
+    Удаляет HNSW индекс и колонку embedding_vector (эмбеддинги остаются в embedding).
+    """
+    op.execute("DROP INDEX IF EXISTS idx_materials_embedding_hnsw")
+    op.execute("ALTER TABLE materials DROP COLUMN IF EXISTS embedding_vector")
@@ -0,0 +1,56 @@
+"""Add unique upsert keys for bulk loads of materials and raw products
+
+Revision ID: 007_bulk_upsert_keys
+Revises: 006_pgvector_embeddings
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '007_bulk_upsert_keys'
+down_revision: Union[str, None] = '006_pgvector_embeddings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (индекс, таблица, выражения ключа, предикат)
+UPSERT_KEYS = (
+    ('uq_materials_name_unit', 'materials', "name, unit", "sku IS NULL"),
+    ('uq_raw_products_pricelist_sku', 'raw_products', "supplier_id, pricelistid, sku", "sku IS NOT NULL"),
+    ('uq_raw_products_pricelist_name_unit', 'raw_products',
+     "supplier_id, pricelistid, name, COALESCE(calc_unit, '')", "sku IS NULL"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade database schema.
+
+    Создает частичные уникальные индексы, на которые опирается
+    INSERT ... ON CONFLICT массовой загрузки (PostgreSQLAdapter.bulk_upsert_*).
+    Уникальность materials.sku уже обеспечена ограничением колонки.
+    Дубли ключей не удаляются автоматически: миграция останавливается со
+    списком ключей, которые нужно разобрать вручную.
+    """
+    connection = op.get_bind()
+    for name, table, key, predicate in UPSERT_KEYS:
+        duplicates = connection.execute(sa.text(
+            f"SELECT {key}, count(*) FROM {table} WHERE {predicate} "
+            f"GROUP BY {key} HAVING count(*) > 1 LIMIT 10"
+        )).fetchall()
+        if duplicates:
+            raise RuntimeError(
+                f"Cannot create {name}: duplicate ({key}) rows in {table}, e.g. {duplicates}"
+            )
+        op.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({key}) WHERE {predicate}")
+
+
+def downgrade() -> None:
+    """Downgrade database schema.
+
+    Удаляет уникальные индексы ключей upsert.
+    """
+    for name, _, _, _ in UPSERT_KEYS:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
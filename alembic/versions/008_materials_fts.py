@@ -0,0 +1,75 @@
+"""Replace materials.search_vector text column with a generated tsvector
+
+Revision ID: 008_materials_fts
+Revises: 007_bulk_upsert_keys
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '008_materials_fts'
+down_revision: Union[str, None] = '007_bulk_upsert_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Совпадает с SEARCH_VECTOR_EXPRESSION в postgresql_adapter
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(use_category, '') || ' ' || coalesce(color, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade database schema.
+    
+    Заменяет текстовую колонку search_vector (заполнялась триггером через
+    приведение к text) генерируемой колонкой tsvector: русская морфология +
+    конфигурация simple для артикулов и марок, веса название > категория > описание.
+    GIN индекс строится после заполнения колонки.
+    """
+    op.execute("DROP TRIGGER IF EXISTS update_materials_search_vector ON materials")
+    op.execute("DROP FUNCTION IF EXISTS update_material_search_vector()")
+    op.execute("DROP INDEX IF EXISTS idx_materials_search_vector")
+    op.execute("ALTER TABLE materials DROP COLUMN IF EXISTS search_vector")
+    op.execute(f"""
+        ALTER TABLE materials
+        ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_EXPRESSION}) STORED
+    """)
+    op.execute("CREATE INDEX idx_materials_search_vector ON materials USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade database schema.
+    
+    Возвращает текстовую колонку search_vector с триггером из миграции 002.
+    """
+    op.execute("DROP INDEX IF EXISTS idx_materials_search_vector")
+    op.execute("ALTER TABLE materials DROP COLUMN IF EXISTS search_vector")
+    op.execute("ALTER TABLE materials ADD COLUMN search_vector text")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION update_material_search_vector()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.search_vector = to_tsvector('russian', 
+                COALESCE(NEW.name, '') || ' ' || 
+                COALESCE(NEW.description, '') || ' ' ||
+                COALESCE(NEW.use_category, '') || ' ' ||
+                COALESCE(NEW.sku, '') || ' ' ||
+                COALESCE(NEW.color, '') || ' ' ||
+                COALESCE(NEW.normalized_color, '')
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER update_materials_search_vector
+        BEFORE INSERT OR UPDATE ON materials
+        FOR EACH ROW
+        EXECUTE FUNCTION update_material_search_vector();
+    """)
@@ -3,10 +3,13 @@ API endpoints for batch processing materials.
 This stage 8.5: API endpoints for asynchronous material processing.
 """
 
+import asyncio
+import json
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Union
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, status
-from fastapi.responses import JSONResponse
+from typing import AsyncIterator, List, Dict, Any, Optional, Union
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import ValidationError
 
 from core.schemas.processing_models import (
@@ -21,7 +24,11 @@ from core.schemas.processing_models import (
     ProcessingStatistics,
     BatchResponse
 )
-from services.batch_processing_service import get_batch_processing_service
+from services.batch_processing_service import get_batch_processing_service, BATCH_PROCESSING_JOB
+from core.background.job_queue import JobPriority
+from core.background.task_manager import get_task_manager
+from core.background.progress import get_result_feed
+from core.background.progress_counters import get_progress_counters
 from core.logging import get_logger
 
 # Создаем router
@@ -45,7 +52,8 @@ logger = get_logger(__name__)
 )
 async def process_materials_batch(
     request: BatchMaterialsRequest,
-    background_tasks: BackgroundTasks,
+    priority: JobPriority = Query(JobPriority.NORMAL, description="Queue priority lane"),
+    x_tenant_id: Optional[str] = Header(None, description="Tenant for fair scheduling between clients"),
     batch_service = Depends(get_batch_processing_service)
 ) -> BatchProcessingResponse:
     """
@@ -67,7 +75,10 @@ async def process_materials_batch(
     - **Maximum**: 10,000 materials per request
     - **Batch size**: 100 materials (configurable)
     - **Timeout**: 30 minutes for entire batch
-    - **Concurrent batches**: maximum 5 simultaneous
+    - **Concurrent batches**: bursts are queued, not rejected; workers process
+      `JOB_WORKER_CONCURRENCY` batches at a time per worker
+    - **Priority**: `?priority=high|normal|low`; tenants (`X-Tenant-ID` header)
+      are served round-robin within a priority lane
     
     **Request Body Example:**
     ```json
@@ -129,7 +140,6 @@ async def process_materials_batch(
     **Response Status Codes:**
     - **202 Accepted**: Batch accepted for processing
     - **400 Bad Request**: Data validation error
-    - **429 Too Many Requests**: Concurrent batch limit exceeded
     - **500 Internal Server Error**: Processing initialization error
     
     **Use Cases:**
@@ -141,7 +151,8 @@ async def process_materials_batch(
     
     Args:
         request: BatchMaterialsRequest with materials and processing options
-        background_tasks: FastAPI background tasks for asynchronous execution
+        priority: Queue priority lane
+        x_tenant_id: Tenant identifier (X-Tenant-ID header)
         batch_service: Batch processing service (injected)
         
     Returns:
@@ -156,8 +167,6 @@ async def process_materials_batch(
         logger.info(f"Received batch processing request {request.request_id} with {len(request.materials)} materials")
         
         # Проверяем лимиты
-        service_stats = batch_service.get_service_stats()
-        
         if len(request.materials) > batch_service.config.max_materials_per_request:
             error_response = BatchValidationError(
                 errors=[f"Too many materials: {len(request.materials)} > {batch_service.config.max_materials_per_request}"],
@@ -165,24 +174,20 @@ async def process_materials_batch(
             )
             return error_response
         
-        # Проверяем активные задачи
-        if service_stats['active_jobs'] >= batch_service.config.max_concurrent_batches:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Too many active jobs: {service_stats['active_jobs']} >= {batch_service.config.max_concurrent_batches}"
-            )
-        
-        # Создаем background task для асинхронной обработки
-        async def process_batch_wrapper():
-            try:
-                logger.info(f"Background task started for request {request.request_id}")
-                await batch_service._process_materials_batch(request.request_id, request.materials)
-                logger.info(f"Background task completed for request {request.request_id}")
-            except Exception as e:
-                logger.error(f"Background task failed for request {request.request_id}: {str(e)}")
-                # Можно добавить уведомление об ошибке или retry логику
+        # Лента результатов открывается до постановки в очередь: стрим, открытый
+        # сразу после ответа, ждет строки задачи из любого воркера
+        await batch_service.start_result_feed(request.request_id)
         
-        background_tasks.add_task(process_batch_wrapper)
+        # Ставим задачу в очередь: при нагрузке она ждет воркера, а не отклоняется
+        job_id = await get_task_manager().submit_job(
+            BATCH_PROCESSING_JOB,
+            {
+                "request_id": request.request_id,
+                "materials": [material.model_dump() for material in request.materials]
+            },
+            tenant=x_tenant_id,
+            priority=priority
+        )
         
         # Вычисляем предполагаемое время завершения
         estimated_completion = datetime.utcnow() + timedelta(
@@ -197,7 +202,7 @@ async def process_materials_batch(
             estimated_completion=estimated_completion
         )
         
-        logger.info(f"Started batch processing job {request.request_id}")
+        logger.info(f"Queued batch processing job {job_id} for request {request.request_id}")
         return response
         
     except ValidationError as e:
@@ -703,7 +708,7 @@ async def get_processing_statistics(
             # Приводим к Pydantic-модели, заполняя обязательные поля (fallback для Qdrant-only)
             stats = ProcessingStatistics(
                 total_requests=stats.get('total_batches', 0),
-                active_requests=0,
+                active_requests=stats.get('active_batches', 0),
                 completed_requests=stats.get('status_counts', {}).get('completed', 0),
                 failed_requests=stats.get('status_counts', {}).get('failed', 0),
                 total_materials_processed=stats.get('total_records', 0),
@@ -968,6 +973,148 @@ async def cleanup_old_records(
         return JSONResponse(status_code=503, content={"detail": "All databases are unavailable. Please try again later.", "error": str(e)})
 
 
+# === PUSH PROGRESS STREAMS ===
+
+SSE_HEARTBEAT_SECONDS = 15.0
+STORE_POLL_INTERVAL_SECONDS = 2.0
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# request_id -> (timestamp, progress): одно чтение хранилища на интервал для всех подписчиков
+_store_progress_cache: Dict[str, tuple] = {}
+
+
+async def _shared_store_progress(batch_service, request_id: str) -> Dict[str, Any]:
+    """Progress of a request not running in this process, shared by all subscribers."""
+    cached = _store_progress_cache.get(request_id)
+    if cached and time.monotonic() - cached[0] < STORE_POLL_INTERVAL_SECONDS:
+        return cached[1]
+    progress = dict(await batch_service.get_processing_progress(request_id))
+    if len(_store_progress_cache) > 1000:
+        _store_progress_cache.clear()
+    _store_progress_cache[request_id] = (time.monotonic(), progress)
+    return progress
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _progress_events(batch_service, request_id: str) -> AsyncIterator[str]:
+    # Изменения счетчиков приходят подписчикам любого воркера (Redis pub/sub)
+    snapshot = None
+    try:
+        async for update in get_progress_counters().subscribe(request_id, heartbeat=SSE_HEARTBEAT_SECONDS):
+            if update is None:
+                yield ": keep-alive\n\n"
+                continue
+            snapshot = update
+            yield _sse("progress", snapshot, snapshot["version"])
+    except Exception as e:
+        logger.warning(f"Progress counters feed failed for {request_id}, polling the store: {e}")
+    if snapshot is not None and snapshot["finished"]:
+        yield _sse("done", snapshot, snapshot["version"])
+        return
+
+    # Запрос неизвестен счетчикам (создан до их включения) - общий опрос хранилища
+    while True:
+        progress = await _shared_store_progress(batch_service, request_id)
+        if not progress.get("total"):
+            yield _sse("error", {"request_id": request_id, "detail": "Request not found"})
+            return
+        yield _sse("progress", {"request_id": request_id, **progress})
+        if progress.get("pending", 0) == 0:
+            yield _sse("done", {"request_id": request_id, **progress})
+            return
+        await asyncio.sleep(STORE_POLL_INTERVAL_SECONDS)
+
+
+@router.get(
+    "/events/{request_id}",
+    summary="📡 Processing Events – Push Progress Feed (SSE)",
+    response_description="text/event-stream of progress snapshots"
+)
+async def stream_processing_events(
+    request_id: str,
+    batch_service = Depends(get_batch_processing_service)
+) -> StreamingResponse:
+    """
+    📡 **Processing Events** - Server-Sent Events progress feed for a batch request
+    
+    Replaces polling of `/status/{request_id}`: the server pushes a `progress`
+    event whenever counters change and a final `done` event when the request
+    finishes. Counters are maintained incrementally as materials change status
+    and changes are published over Redis pub/sub (with the redis counters
+    backend), so any worker can serve the feed and any number of subscribers
+    costs no extra reads of the processing store.
+    Comment lines (`: keep-alive`) are sent every 15 seconds without changes.
+    
+    **Events:**
+    - `progress`: `{"total", "completed", "failed", "pending", "processing", "progress_percentage", "finished", "version"}`
+    - `done`: last snapshot, the stream closes after it
+    - `error`: request not found
+    
+    **Example:**
+    ```
+    curl -N http://localhost:8000/api/v1/process-enhanced/events/batch_20250116_164629_abc123
+    ```
+    """
+    return StreamingResponse(
+        _progress_events(batch_service, request_id),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS
+    )
+
+
+async def _result_lines(batch_service, request_id: str, offset: int) -> AsyncIterator[str]:
+    feed = get_result_feed()
+    if not await feed.exists(request_id):
+        # Лента не открыта или уже истекла - один проход по сохраненным результатам;
+        # offset считается по завершенным материалам, как строки стрима
+        finished = [
+            record for record in await batch_service.get_processing_results(request_id)
+            if record.get("status") in ("completed", "failed")
+        ]
+        for record in finished[offset:]:
+            yield json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        return
+
+    async for row in feed.follow(request_id, offset=offset, heartbeat=SSE_HEARTBEAT_SECONDS):
+        if row is not None:
+            yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+@router.get(
+    "/results/{request_id}/stream",
+    summary="📦 Processing Results Stream – NDJSON While Running",
+    response_description="application/x-ndjson, one completed material per line"
+)
+async def stream_processing_results(
+    request_id: str,
+    offset: int = Query(0, ge=0, description="Skip this many already received results"),
+    batch_service = Depends(get_batch_processing_service)
+) -> StreamingResponse:
+    """
+    📦 **Processing Results Stream** - Completed materials as NDJSON while the job runs
+    
+    Each line is one finished material (`completed` or `failed`) with `material_id`,
+    `status`, `sku`, `similarity_score`, `normalized_color`, `normalized_unit`,
+    `unit_coefficient` and `error_message`. The response ends when the request
+    finishes. Reconnect with `offset` = number of lines already received.
+    
+    The feed opens when the batch is submitted, so a stream opened right after
+    the POST waits for the first results. With the redis progress backend rows
+    are published over Redis pub/sub and any worker can serve the stream of a
+    job running in another process; finished requests are kept for 10 minutes,
+    older ones are read once from the processing store.
+    """
+    return StreamingResponse(
+        _result_lines(batch_service, request_id, offset),
+        media_type="application/x-ndjson",
+        headers=STREAM_HEADERS
+    )
+
+
 # Health check endpoint
 @router.get(
     "/health",
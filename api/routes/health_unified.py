@@ -208,6 +208,25 @@ async def full_health():
     # Vector database status
     health_report["vector_database"] = await _vector_db_health()
 
+    # Event loop responsiveness and CPU offload pool
+    from core.background.process_pool import get_cpu_executor
+    from core.monitoring.loop_lag import get_loop_lag_monitor
+    from services.fuzzy_index import get_fuzzy_index
+    from services.facet_index import get_facet_index
+    from core.background.embedding_worker import get_local_embedding_worker_stats
+    from core.background.progress import get_result_feed
+    from core.background.progress_counters import get_progress_counters
+
+    health_report["event_loop"] = get_loop_lag_monitor().get_stats()
+    health_report["cpu_pool"] = get_cpu_executor().get_stats()
+    health_report["fuzzy_index"] = get_fuzzy_index().get_stats()
+    health_report["facet_index"] = get_facet_index().get_stats()
+    embedding_worker = get_local_embedding_worker_stats()
+    if embedding_worker is not None:
+        health_report["embedding_worker"] = embedding_worker
+    health_report["result_streams"] = get_result_feed().get_stats()
+    health_report["progress_counters"] = get_progress_counters().get_stats()
+
     # Future: add cache / relational DB / AI providers health here
 
     return health_report 
\ No newline at end of file
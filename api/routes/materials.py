@@ -17,7 +17,7 @@ from core.schemas.response_models import ERROR_RESPONSES
 from core.database.interfaces import IVectorDatabase
 from core.dependencies.database import get_vector_db_dependency, get_ai_client_dependency
 from core.database.exceptions import DatabaseError
-from services.materials import MaterialsService
+from services.materials import MaterialsService, dump_materials, parse_material_fields
 
 
 logger = get_logger(__name__)
@@ -242,6 +242,8 @@ async def create_material(
 )
 async def get_material(
     material_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated material fields to return (id is always included)"),
+    with_vectors: bool = Query(False, description="Read the stored embedding"),
     service: MaterialsService = Depends(get_materials_service)
 ):
     """
@@ -253,6 +255,10 @@ async def get_material(
     **Path Parameters:**
     - `material_id`: Material UUID in UUID4 format
     
+    **Query Parameters:**
+    - `fields`: Comma-separated fields to return, e.g. `name,unit,sku` (default: all)
+    - `with_vectors`: Read the embedding from the vector DB (default: false, not fetched)
+    
     **Response Example:**
     ```json
     {
@@ -279,12 +285,18 @@ async def get_material(
     - Analyzing embedding for search debugging
     - Checking material existence
     """
+    try:
+        projection = parse_material_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         logger.debug(f"Getting material: {material_id}")
-        material = await service.get_material(material_id)
+        material = await service.get_material(material_id, fields=projection, with_vectors=with_vectors)
         if not material:
             logger.warning(f"Material not found: {material_id}")
             raise HTTPException(status_code=404, detail="Material not found")
+        if projection:
+            return JSONResponse(content=dump_materials([material], projection)[0])
         return material
     except HTTPException:
         raise  # Re-raise HTTP exceptions
@@ -311,6 +323,8 @@ async def get_materials(
     skip: int = 0, 
     limit: int = 10, 
     category: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated material fields to return (id is always included)"),
+    with_vectors: bool = Query(False, description="Read stored embeddings"),
     service: MaterialsService = Depends(get_materials_service)
 ):
     """
@@ -323,6 +337,8 @@ async def get_materials(
     - `skip`: Number of records to skip (offset) - default: 0
     - `limit`: Maximum number of records - default: 10, max: 100
     - `category`: Filter by usage category (optional)
+    - `fields`: Comma-separated fields to return, e.g. `name,unit` (default: all)
+    - `with_vectors`: Read embeddings from the vector DB (default: false, not fetched)
     
     **Response Example:**
     ```json
@@ -357,10 +373,18 @@ async def get_materials(
     - Data export
     - Report generation
     """
+    try:
+        projection = parse_material_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     try:
         logger.debug(f"Getting materials: skip={skip}, limit={limit}, category={category}")
-        results = await service.get_materials(skip=skip, limit=limit, category=category)
+        results = await service.get_materials(
+            skip=skip, limit=limit, category=category, fields=projection, with_vectors=with_vectors
+        )
         logger.info(f"Retrieved {len(results)} materials")
+        if projection:
+            return JSONResponse(content=dump_materials(results, projection))
         return results
     except DatabaseError as e:
         logger.error(f"Database error getting materials: {e}")
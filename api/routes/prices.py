@@ -5,14 +5,13 @@ API for managing supplier price lists with support for various data formats.
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form, Query, BackgroundTasks
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import tempfile
 import os
 from uuid import UUID
 from core.logging import get_logger
 from core.config import get_settings
 from core.schemas.materials import PriceUploadResponse, PriceProcessingStatus
-from services.price_processor import PriceProcessor
 import traceback
 import time
 from datetime import datetime
@@ -20,6 +19,10 @@ from core.schemas.response_models import ERROR_RESPONSES
 from core.database.factories import get_vector_database # Import the correct function
 from fastapi.responses import JSONResponse
 
+if TYPE_CHECKING:
+    # PriceProcessor тянет pandas: импортируется при первом запросе к прайс-листам
+    from services.price_processor import PriceProcessor
+
 router = APIRouter(
     prefix="",
     tags=["prices"],
@@ -34,6 +37,8 @@ async def get_qdrant_client():
 
 async def get_price_processor():
     """Get price processor instance"""
+    from services.price_processor import PriceProcessor
+
     return PriceProcessor()
 
 @router.post("/process", 
@@ -43,7 +48,7 @@ async def process_price_list(
     file: UploadFile = File(..., description="CSV or Excel file with price list"),
     supplier_id: str = Form(..., description="Unique supplier identifier"),
     pricelistid: int = Form(None, description="Price list ID (optional, will be auto-generated)"),
-    price_processor: PriceProcessor = Depends(get_price_processor)
+    price_processor: "PriceProcessor" = Depends(get_price_processor)
 ):
     """
     📂 **Process Price List** - Supplier price list processing and upload
@@ -151,7 +156,7 @@ async def process_price_list(
 )
 async def get_latest_price_list(
     supplier_id: str,
-    price_processor: PriceProcessor = Depends(get_price_processor)
+    price_processor: "PriceProcessor" = Depends(get_price_processor)
 ):
     """
     📋 **Get Latest Price List** - Retrieve current supplier price list
@@ -243,7 +248,7 @@ async def get_latest_price_list(
 )
 async def get_all_price_lists(
     supplier_id: str,
-    price_processor: PriceProcessor = Depends(get_price_processor)
+    price_processor: "PriceProcessor" = Depends(get_price_processor)
 ):
     """
     📚 **Get All Price Lists** – Retrieve all price lists for a supplier
@@ -321,7 +326,7 @@ async def get_all_price_lists(
 )
 async def delete_supplier_price_list(
     supplier_id: str,
-    price_processor: PriceProcessor = Depends(get_price_processor)
+    price_processor: "PriceProcessor" = Depends(get_price_processor)
 ):
     """
     🗑️ **Delete Supplier Price Lists** – Remove all price lists for a supplier
@@ -404,7 +409,7 @@ async def delete_supplier_price_list(
 async def get_raw_products_by_pricelist(
     supplier_id: str,
     pricelistid: int,
-    price_processor: PriceProcessor = Depends(get_price_processor)
+    price_processor: "PriceProcessor" = Depends(get_price_processor)
 ):
     """
     📋 **Get Products by Price List ID** – Retrieve products by specific price list ID
@@ -506,7 +511,7 @@ async def get_raw_products_by_pricelist(
 async def mark_product_as_processed(
     supplier_id: str,
     product_id: str,
-    price_processor: PriceProcessor = Depends(get_price_processor)
+    price_processor: "PriceProcessor" = Depends(get_price_processor)
 ):
     """
     ✅ **Mark Product as Processed** – Mark a specific product as processed
@@ -1,16 +1,18 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from fastapi.responses import JSONResponse
 
 from core.schemas.materials import (
     Material, AdvancedSearchQuery, SearchResponse as CoreSearchResponse,
-    SearchSuggestion, MaterialFilterOptions, PaginationOptions, SortOption
+    SearchSuggestion, MaterialFilterOptions, PaginationOptions, SortOption, FacetField
 )
+from core.config import get_settings
 from core.schemas.response_models import ERROR_RESPONSES
-from services.materials import MaterialsService
+from services.materials import MaterialsService, dump_materials, parse_material_fields
+from services.facet_index import build_facet_index, get_facet_index
 from core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -69,6 +71,16 @@ class BasicSearchRequest(BaseModel):
         description="Similarity threshold for fuzzy matching (0.0-1.0)",
         example=0.8
     )
+    fields: Optional[List[str]] = Field(
+        None,
+        description="Material fields to return in results (id is always included; default: all)",
+        example=["name", "unit", "sku"]
+    )
+    facets: Optional[List[FacetField]] = Field(
+        None,
+        description="Facet fields to count over the results (use_category, unit, normalized_color, supplier_id)",
+        example=["use_category", "unit"]
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -78,11 +90,18 @@ class BasicSearchRequest(BaseModel):
                 "limit": 20,
                 "categories": ["Waterproofing", "Membranes"],
                 "units": ["m²", "roll"],
-                "fuzzy_threshold": 0.8
+                "fuzzy_threshold": 0.8,
+                "fields": ["name", "unit", "sku"],
+                "facets": ["use_category", "unit"]
             }
         }
     )
 
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+        return parse_material_fields(value)
+
 
 class BasicSearchResponse(BaseModel):
     """Simplified search response for basic search endpoint.
@@ -114,6 +133,10 @@ class BasicSearchResponse(BaseModel):
         ..., 
         description="Search algorithm used for this query"
     )
+    facets: Optional[Dict[str, Dict[str, int]]] = Field(
+        None,
+        description="Value counts per requested facet field over the results"
+    )
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -147,6 +170,18 @@ class BasicSearchResponse(BaseModel):
     )
 
 
+def _wants_facets(fields: Optional[List[str]]) -> bool:
+    """Facets are requested and the facet index is built."""
+    return bool(fields) and get_facet_index().ready
+
+
+def _result_facets(candidates: List[Material], fields: Optional[List[str]]) -> Optional[Dict[str, Dict[str, int]]]:
+    """Facet counts over the candidate IDs (None if not requested or the facet index is not built yet)."""
+    if not _wants_facets(fields):
+        return None
+    return get_facet_index().count_ids((material.id for material in candidates), fields)
+
+
 # ----------------------------
 # Endpoints
 # ----------------------------
@@ -227,6 +262,8 @@ async def advanced_search(request: BasicSearchRequest):
     - `categories`: Filter by material categories (optional)
     - `units`: Filter by measurement units (optional)
     - `fuzzy_threshold`: Threshold for fuzzy search (0.0-1.0)
+    - `fields`: Material fields to return, e.g. `["name", "unit"]` (default: all)
+    - `facets`: Facet fields to count over the results, e.g. `["use_category", "unit"]`
     
     **Response Status Codes:**
     - **200 OK**: Search completed successfully (may return empty list)
@@ -248,19 +285,31 @@ async def advanced_search(request: BasicSearchRequest):
     - Creating specifications and estimates
     """
 
+    filters = None
+    if request.categories or request.units:
+        filters = MaterialFilterOptions(categories=request.categories, units=request.units)
+    return await _basic_search(request, filters)
+
+
+async def _basic_search(request: BasicSearchRequest, filters: Optional[MaterialFilterOptions],
+                        oversampling: Optional[float] = None, rescore: Optional[bool] = None):
+    """Search with the filters compiled into the vector database query (no Python post-filtering).
+
+    ``oversampling``/``rescore`` override the quantized collection profile (None - profile defaults).
+    """
     start_time = datetime.utcnow()
 
     try:
         service = MaterialsService()
 
-        # Basic routing based on requested search_type – here kept simple.
-        results = await service.search_materials(query=request.query, limit=request.limit)
-
-        # Optional post-filtering.
-        if request.categories:
-            results = [r for r in results if r.use_category in request.categories]
-        if request.units:
-            results = [r for r in results if r.unit in request.units]
+        # Фасеты считаются по кандидатам поиска, а не только по странице результатов
+        limit = request.limit
+        if _wants_facets(request.facets):
+            limit = max(limit, get_settings().FACET_SEARCH_CANDIDATES)
+        candidates = await service.search_materials(
+            query=request.query, limit=limit, filters=filters, oversampling=oversampling, rescore=rescore
+        )
+        results = candidates[:request.limit]
 
         elapsed = (datetime.utcnow() - start_time).total_seconds() * 1000
 
@@ -277,14 +326,21 @@ async def advanced_search(request: BasicSearchRequest):
                 ),
             ]
 
-        return BasicSearchResponse(
+        response = BasicSearchResponse(
             results=results,
             total_count=len(results),
             search_time_ms=elapsed,
             suggestions=suggestions,
             query_used=request.query,
             search_type_used=request.search_type,
+            facets=_result_facets(candidates, request.facets),
         )
+        if request.fields:
+            # Проекция: в ответ попадают только запрошенные поля материалов
+            content = response.model_dump(mode="json", exclude={"results"})
+            content["results"] = dump_materials(response.results, request.fields)
+            return JSONResponse(content=content)
+        return response
 
     except Exception as exc:
         logger.error(f"Unified search failed: {exc}", exc_info=True)
@@ -357,11 +413,14 @@ async def professional_search(request: AdvancedSearchQuery):
             limit=request.pagination.page_size if request.pagination else 20,
             categories=request.filters.categories if request.filters else None,
             units=request.filters.units if request.filters else None,
-            fuzzy_threshold=request.fuzzy_threshold
+            fuzzy_threshold=request.fuzzy_threshold,
+            facets=request.facets
         )
         
-        # Call basic search
-        basic_response = await advanced_search(basic_request)
+        # Call basic search: all filters (SKU pattern, date ranges, min_similarity) go to the vector database
+        basic_response = await _basic_search(
+            basic_request, request.filters, oversampling=request.oversampling, rescore=request.rescore
+        )
         
         # Convert to advanced response format
         # This is a simplified conversion - in production, you'd use AdvancedSearchService
@@ -384,8 +443,9 @@ async def professional_search(request: AdvancedSearchQuery):
             total_pages=(basic_response.total_count + (request.pagination.page_size if request.pagination else 20) - 1) // (request.pagination.page_size if request.pagination else 20),
             search_time_ms=basic_response.search_time_ms,
             suggestions=basic_response.suggestions,
-            filters_applied={"categories": request.filters.categories} if request.filters and request.filters.categories else None,
-            next_cursor=None
+            filters_applied=(request.filters.model_dump(mode="json", exclude_none=True) or None) if request.filters else None,
+            next_cursor=None,
+            facets=basic_response.facets
         )
         
     except Exception as exc:
@@ -512,6 +572,10 @@ async def list_categories():
     - Search refinement options
     """
     try:
+        # Категории, которые есть у материалов, - из счетчиков фасетов без чтения коллекции
+        facet_index = get_facet_index()
+        if facet_index.ready:
+            return list(facet_index.counts(["use_category"])["use_category"])
         service = MaterialsService()
         categories = await service.get_categories()
         return [cat.name for cat in categories]
@@ -570,9 +634,64 @@ async def list_units():
     - Unit conversion reference
     """
     try:
+        # Единицы, которые есть у материалов, - из счетчиков фасетов без чтения коллекции
+        facet_index = get_facet_index()
+        if facet_index.ready:
+            return list(facet_index.counts(["unit"])["unit"])
         service = MaterialsService()
         units = await service.get_units()
         return [unit.name for unit in units]
     except Exception as exc:
         logger.error(f"Units fetch failed: {exc}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(exc)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(exc))
+
+
+@router.get(
+    "/facets",
+    response_model=Dict[str, Dict[str, int]],
+    summary="📊 Facet Counts – Filter Panel Values",
+    response_description="Material counts per value of category, unit, color and supplier"
+)
+async def get_facets(
+    fields: Optional[List[FacetField]] = Query(None, description="Facet fields (default: all)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum values per field, most frequent first"),
+):
+    """
+    📊 **Facet Counts** - Values for filter panels with material counts
+
+    Counts are kept in memory and updated on material writes, so the response
+    does not aggregate over the collection. Counts for a particular result set
+    are returned by the search endpoints via the `facets` request field.
+
+    **Response Example:**
+    ```json
+    {
+        "use_category": {"Cement": 120, "Concrete": 85},
+        "unit": {"bag": 140, "m³": 65}
+    }
+    ```
+
+    **Response Status Codes:**
+    - **200 OK**: Counts returned
+    - **503 Service Unavailable**: Facet index is still being built
+    """
+    facet_index = get_facet_index()
+    if not facet_index.ready:
+        raise HTTPException(status_code=503, detail="Facet index is not built yet")
+    return facet_index.counts(fields, limit)
+
+
+@router.post(
+    "/facets/rebuild",
+    summary="🔄 Rebuild Facet Counts",
+    response_description="Number of materials indexed"
+)
+async def rebuild_facets():
+    """
+    🔄 **Rebuild Facet Counts** - Reload facet counts from the materials collection
+
+    Needed only after writes that bypass the service (direct imports into the
+    vector database); regular material writes update the counts incrementally.
+    """
+    documents = await build_facet_index()
+    return {"documents": documents, "ready": get_facet_index().ready}
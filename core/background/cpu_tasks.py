@@ -0,0 +1,206 @@
+"""
+CPU-bound task functions for the process pool.
+
+Чистые функции, выполняемые в процессах пула CPUTaskExecutor. Модуль не
+импортирует сервисы и настройки: дочерний процесс загружает только его,
+аргументы и результаты - строки, кортежи и числа (дешевый pickle).
+"""
+
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+# === FUZZY MATCHING ===
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """Calculate Levenshtein distance."""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    if len(s2) == 0:
+        return len(s1)
+
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+
+    return previous_row[-1]
+
+
+def levenshtein_similarity(s1: str, s2: str) -> float:
+    """Calculate Levenshtein similarity."""
+    if not s1 or not s2:
+        return 0.0
+    return 1.0 - (levenshtein_distance(s1, s2) / max(len(s1), len(s2)))
+
+
+def sequence_matcher_similarity(s1: str, s2: str) -> float:
+    """Calculate similarity using SequenceMatcher."""
+    if not s1 or not s2:
+        return 0.0
+    return SequenceMatcher(None, s1, s2).ratio()
+
+
+def jaro_winkler_similarity(s1: str, s2: str) -> float:
+    """Jaro-Winkler similarity (approximated with SequenceMatcher)."""
+    if not s1 or not s2:
+        return 0.0
+    if s1 == s2:
+        return 1.0
+    return SequenceMatcher(None, s1, s2).ratio()
+
+
+SIMILARITY_FUNCTIONS = {
+    "levenshtein": levenshtein_similarity,
+    "jaro_winkler": jaro_winkler_similarity,
+    "sequence_matcher": sequence_matcher_similarity,
+}
+
+
+def score_texts(texts: Sequence[str], query: str, algorithm: str = "sequence_matcher") -> List[float]:
+    """
+    Score a chunk of texts against the query.
+
+    Args:
+        texts: Texts to score (one chunk of a larger list)
+        query: Query text
+        algorithm: Key of SIMILARITY_FUNCTIONS
+    """
+    similarity = SIMILARITY_FUNCTIONS[algorithm]
+    query = query.lower()
+    return [similarity(query, text.lower()) for text in texts]
+
+
+def best_alias_match(
+    text: str, candidates: Sequence[Tuple[str, str]], suggestions_limit: int = 5
+) -> Tuple[Optional[str], float, List[str]]:
+    """
+    Find the canonical name whose alias is most similar to the text.
+
+    Args:
+        text: Normalized input text
+        candidates: (canonical name, alias) pairs
+        suggestions_limit: Number of suggested canonical names
+
+    Returns:
+        Best canonical name, its score and suggestions ordered by score
+    """
+    best_match, best_score = None, 0.0
+    all_matches = []
+    for name, alias in candidates:
+        score = SequenceMatcher(None, text, alias.lower()).ratio()
+        if score > best_score:
+            best_match, best_score = name, score
+        all_matches.append((name, score))
+
+    all_matches.sort(key=lambda match: match[1], reverse=True)
+    suggestions = []
+    for name, _ in all_matches:
+        if name not in suggestions:
+            suggestions.append(name)
+            if len(suggestions) >= suggestions_limit:
+                break
+
+    return best_match, best_score, suggestions
+
+
+# === PRICE FILES ===
+
+RAW_PRODUCT_INDICATORS = ("unit_price", "calc_unit", "sku")
+LEGACY_FORMAT_INDICATORS = ("price", "category")
+
+
+def read_price_file(file_path: str):
+    """Read price file (CSV or Excel) and return DataFrame."""
+    import pandas as pd
+
+    if file_path.lower().endswith('.csv'):
+        # Try different encodings for CSV
+        for encoding in ('utf-8', 'cp1251', 'latin1'):
+            try:
+                return pd.read_csv(file_path, encoding=encoding)
+            except UnicodeDecodeError:
+                continue
+        raise ValueError("Could not read CSV file with any encoding")
+    if file_path.lower().endswith(('.xlsx', '.xls')):
+        return pd.read_excel(file_path)
+    raise ValueError("Unsupported file format")
+
+
+def clean_raw_product_data(df, optional_columns: Dict[str, Any]):
+    """Clean and validate raw product data."""
+    import pandas as pd
+
+    # Remove rows with empty names
+    df = df.dropna(subset=['name'])
+
+    # Clean unit_price column (main price field)
+    if 'unit_price' in df.columns:
+        df['unit_price'] = pd.to_numeric(df['unit_price'], errors='coerce')
+        df = df.dropna(subset=['unit_price'])
+        df = df[df['unit_price'] >= 0]
+
+    # Clean other numeric price columns
+    for col in ('unit_calc_price', 'buy_price', 'sale_price'):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df.loc[df[col] < 0, col] = None
+
+    # Clean count column
+    if 'count' in df.columns:
+        df['count'] = pd.to_numeric(df['count'], errors='coerce')
+        df['count'] = df['count'].fillna(1)
+        df.loc[df['count'] < 0, 'count'] = 1
+
+    # Fill missing optional columns with defaults
+    for col, default_value in optional_columns.items():
+        if col not in df.columns:
+            df[col] = default_value
+        elif col.endswith('_currency'):
+            df[col] = df[col].fillna('RUB')
+        elif col == 'use_category':
+            df[col] = df[col].fillna('Общая категория')
+        elif col == 'count':
+            df[col] = df[col].fillna(1)
+
+    # Clean text columns
+    for col in ('name', 'sku', 'use_category', 'calc_unit'):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+            # Replace 'nan' strings with None for optional fields
+            if col != 'name':  # name is required
+                df.loc[df[col] == 'nan', col] = None
+
+    # Handle date_price_change
+    if 'date_price_change' in df.columns:
+        df['date_price_change'] = pd.to_datetime(df['date_price_change'], errors='coerce')
+
+    return df
+
+
+def load_raw_price_file(
+    file_path: str, required_columns: Sequence[str], optional_columns: Dict[str, Any]
+) -> Tuple[Any, bool, List[str]]:
+    """
+    Read, validate and clean a raw product price file in one task.
+
+    Returns:
+        Cleaned DataFrame (None if not cleaned), raw format flag, missing required columns
+    """
+    df = read_price_file(file_path)
+
+    is_raw_product = (
+        any(col in df.columns for col in RAW_PRODUCT_INDICATORS)
+        and not any(col in df.columns for col in LEGACY_FORMAT_INDICATORS)
+    )
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if not is_raw_product or missing_columns:
+        return None, is_raw_product, missing_columns
+
+    return clean_raw_product_data(df, optional_columns), True, []
@@ -0,0 +1,269 @@
+"""
+Local embedding worker with dynamic batching.
+
+Воркер локальных эмбеддингов (AI_PROVIDER=huggingface):
+
+1. ``SentenceTransformer.encode`` выполняется в отдельном потоке воркера, а не
+   в event loop (torch отпускает GIL на время вычислений).
+2. Одновременные запросы со всех роутов собираются в общую очередь; окно сбора
+   закрывается по ``max_batch_size`` или через ``max_latency_ms`` после первого
+   запроса.
+3. Тексты окна раскладываются по корзинам длины и кодируются отдельным батчем на
+   корзину: короткие тексты не дополняются паддингом до длины самого длинного.
+
+Размеры батчей, задержка в очереди и время кодирования публикуются
+гистограммами ``embedding_worker.*`` в общий metrics collector.
+"""
+
+import asyncio
+import time
+from bisect import bisect_right
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Границы корзин длины текста в символах
+DEFAULT_LENGTH_BUCKETS = (64, 256, 1024)
+# Окно, по которому считается batches_per_sec
+RATE_WINDOW_SECONDS = 10.0
+
+
+@dataclass
+class _EmbeddingRequest:
+    text: str
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class LocalEmbeddingWorker:
+    """Dynamic batching of encode calls of a local embedding model."""
+
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
+        length_buckets: Sequence[int] = DEFAULT_LENGTH_BUCKETS,
+        window: int = 1000,
+        publish: bool = True
+    ):
+        """
+        Args:
+            model: Model with SentenceTransformer-compatible ``encode``
+            max_batch_size: Максимум текстов в одном окне сбора
+            max_latency_ms: Сколько ждать добора батча после первого запроса
+            length_buckets: Границы корзин длины текста (символы)
+            window: Сколько последних замеров хранить для перцентилей
+            publish: Публиковать замеры в metrics collector
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.length_buckets = tuple(sorted(length_buckets))
+        self.publish = publish
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0}
+        self.batch_sizes: Deque[int] = deque(maxlen=window)
+        self.queue_delays_ms: Deque[float] = deque(maxlen=window)
+        self.encode_ms: Deque[float] = deque(maxlen=window)
+        self._batch_times: Deque[float] = deque(maxlen=window)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-worker")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started_at = time.perf_counter()
+
+    async def embed(self, text: str) -> List[float]:
+        """Embedding of one text."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embeddings of texts, in input order.
+
+        Тексты попадают в общую очередь и кодируются вместе с текстами других
+        запросов.
+        """
+        if not texts:
+            return []
+
+        queue = self._ensure_running()
+        loop = asyncio.get_running_loop()
+        enqueued_at = time.perf_counter()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            queue.put_nowait(_EmbeddingRequest(text, future, enqueued_at))
+            futures.append(future)
+
+        self.stats["requests"] += 1
+        return [vector.tolist() for vector in await asyncio.gather(*futures)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Throughput, batch sizes and queue delay over the recent window."""
+        now = time.perf_counter()
+        elapsed = min(RATE_WINDOW_SECONDS, max(now - self._started_at, 1e-9))
+        recent_batches = sum(1 for finished in self._batch_times if now - finished <= elapsed)
+        delays = sorted(self.queue_delays_ms)
+        encode_ms = sorted(self.encode_ms)
+
+        def percentile(values: List[float], p: float) -> float:
+            return values[min(int(len(values) * p), len(values) - 1)] if values else 0.0
+
+        return {
+            **self.stats,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "batches_per_sec": recent_batches / elapsed,
+            "avg_batch_size": sum(self.batch_sizes) / len(self.batch_sizes) if self.batch_sizes else 0.0,
+            "queue_delay_p50_ms": percentile(delays, 0.50),
+            "queue_delay_p95_ms": percentile(delays, 0.95),
+            "encode_p50_ms": percentile(encode_ms, 0.50),
+        }
+
+    async def close(self) -> None:
+        """Stop batching; pending requests are cancelled."""
+        if self._task is not None and self._loop is asyncio.get_running_loop():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait().future.cancel()
+        self._task = self._queue = self._loop = None
+        self._executor.shutdown(wait=False)
+
+    def _ensure_running(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._started_at = time.perf_counter()
+            self._task = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            for group in self._bucket(batch):
+                await self._encode(group)
+
+    def _bucket(self, batch: List[_EmbeddingRequest]) -> List[List[_EmbeddingRequest]]:
+        groups: Dict[int, List[_EmbeddingRequest]] = defaultdict(list)
+        for request in batch:
+            # Запросы, отмененные клиентом, не кодируются
+            if not request.future.done():
+                groups[bisect_right(self.length_buckets, len(request.text))].append(request)
+        return [groups[bucket] for bucket in sorted(groups)]
+
+    async def _encode(self, group: List[_EmbeddingRequest]) -> None:
+        started = time.perf_counter()
+        delays = [(started - request.enqueued_at) * 1000 for request in group]
+        texts = [request.text for request in group]
+        try:
+            vectors = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode_sync, texts)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Local embedding batch of {len(texts)} texts failed: {e}")
+            for request in group:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, vector in zip(group, vectors):
+            if not request.future.done():
+                request.future.set_result(vector)
+
+        finished = time.perf_counter()
+        encode_ms = (finished - started) * 1000
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(texts)
+        self.batch_sizes.append(len(texts))
+        self.queue_delays_ms.extend(delays)
+        self.encode_ms.append(encode_ms)
+        self._batch_times.append(finished)
+        if self.publish:
+            self._publish(len(texts), max(delays), encode_ms)
+
+    def _encode_sync(self, texts: List[str]) -> Any:
+        return self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+
+    def _publish(self, batch_size: int, queue_delay_ms: float, encode_ms: float) -> None:
+        try:
+            from core.monitoring.metrics import get_metrics_collector
+
+            collector = get_metrics_collector()
+            collector.increment_counter("embedding_worker.batches")
+            collector.record_histogram("embedding_worker.batch_size", batch_size)
+            collector.record_histogram("embedding_worker.queue_delay_ms", queue_delay_ms)
+            collector.record_histogram("embedding_worker.encode_ms", encode_ms)
+        except Exception as e:
+            logger.debug(f"Failed to publish embedding worker metrics: {e}")
+
+
+# Singleton instance
+_local_embedding_worker: Optional[LocalEmbeddingWorker] = None
+
+
+def get_local_embedding_worker(config: Optional[Dict[str, Any]] = None) -> LocalEmbeddingWorker:
+    """
+    Получить общий воркер локальных эмбеддингов.
+
+    Модель загружается при первом вызове; все клиенты AI_PROVIDER=huggingface
+    делят одну модель и одну очередь батчей.
+
+    Args:
+        config: HuggingFace config (default: settings.get_ai_config())
+    """
+    global _local_embedding_worker
+
+    if _local_embedding_worker is None:
+        from sentence_transformers import SentenceTransformer
+
+        if config is None:
+            from core.config import get_settings
+
+            config = get_settings().get_ai_config()
+
+        model = SentenceTransformer(config["model"], device=config.get("device", "cpu"))
+        _local_embedding_worker = LocalEmbeddingWorker(
+            model,
+            max_batch_size=config.get("max_batch_size", 64),
+            max_latency_ms=config.get("max_latency_ms", 5.0)
+        )
+        logger.info(f"Local embedding worker started for model '{config['model']}'")
+
+    return _local_embedding_worker
+
+
+def get_local_embedding_worker_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the local embedding worker, None if it was not started."""
+    return _local_embedding_worker.get_stats() if _local_embedding_worker is not None else None
+
+
+async def shutdown_local_embedding_worker() -> None:
+    """Остановить воркер локальных эмбеддингов."""
+    global _local_embedding_worker
+
+    if _local_embedding_worker is not None:
+        await _local_embedding_worker.close()
+        _local_embedding_worker = None
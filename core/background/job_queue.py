@@ -0,0 +1,591 @@
+"""
+Durable job queue for background processing.
+
+Очередь фоновых задач с приоритетами и справедливым распределением между
+тенантами. Задачи не отклоняются при нагрузке, а ждут в очереди; воркеры
+(в процессе API или отдельные через ``python -m core.background.worker``)
+забирают их по одной.
+
+Backends:
+    * ``InMemoryJobQueue`` - очередь в памяти процесса (разработка, тесты)
+    * ``RedisStreamsJobQueue`` - Redis Streams с consumer group: задачи
+      переживают рестарт, незавершенные задачи упавшего воркера забираются
+      другими после visibility timeout (XAUTOCLAIM), после ``max_attempts``
+      попыток задача уходит в dead-letter stream.
+
+Scheduling:
+    Приоритетные полосы (high/normal/low) выбираются взвешенным round-robin
+    (4:2:1), поэтому low не голодает при постоянном потоке high. Внутри полосы
+    тенанты обслуживаются по кругу - большой импорт одного тенанта не блокирует
+    остальных.
+"""
+
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TENANT = "default"
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobPriority(str, Enum):
+    """Приоритетная полоса задачи."""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+# Доля выборок каждой полосы при конкуренции: high 4/7, normal 2/7, low 1/7
+LANE_WEIGHTS: Dict[JobPriority, int] = {
+    JobPriority.HIGH: 4,
+    JobPriority.NORMAL: 2,
+    JobPriority.LOW: 1,
+}
+
+
+def _build_lane_schedule(weights: Dict[JobPriority, int]) -> List[JobPriority]:
+    """Smooth weighted round-robin: high, normal, high, low, high, normal, high."""
+    current = {lane: 0 for lane in weights}
+    total = sum(weights.values())
+    schedule = []
+    for _ in range(total):
+        for lane, weight in weights.items():
+            current[lane] += weight
+        selected = max(current, key=current.get)
+        current[selected] -= total
+        schedule.append(selected)
+    return schedule
+
+
+@dataclass
+class Job:
+    """Задача очереди."""
+    name: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    tenant: str = DEFAULT_TENANT
+    priority: JobPriority = JobPriority.NORMAL
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    last_error: Optional[str] = None
+    # Backend-specific delivery handle (stream key and message ID for Redis)
+    stream: Optional[str] = None
+    message_id: Optional[str] = None
+
+    def to_fields(self) -> Dict[str, str]:
+        """Serialize job to flat string fields."""
+        fields = {
+            "id": self.id,
+            "name": self.name,
+            "payload": json.dumps(self.payload, ensure_ascii=False, default=str),
+            "tenant": self.tenant,
+            "priority": self.priority.value,
+            "attempts": str(self.attempts),
+            "enqueued_at": repr(self.enqueued_at),
+        }
+        if self.last_error:
+            fields["last_error"] = self.last_error
+        return fields
+
+    @classmethod
+    def from_fields(cls, fields: Dict[Any, Any], stream: Optional[str] = None,
+                    message_id: Optional[str] = None) -> "Job":
+        """Restore job from stream entry fields."""
+        data = {_decode(key): _decode(value) for key, value in fields.items()}
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            payload=json.loads(data["payload"]),
+            tenant=data.get("tenant", DEFAULT_TENANT),
+            priority=JobPriority(data.get("priority", JobPriority.NORMAL.value)),
+            attempts=int(data.get("attempts", 0)),
+            enqueued_at=float(data.get("enqueued_at", time.time())),
+            last_error=data.get("last_error"),
+            stream=stream,
+            message_id=message_id,
+        )
+
+
+def _decode(value: Any) -> Any:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+# === HANDLER REGISTRY ===
+
+_JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def register_job_handler(name: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Декоратор регистрации обработчика задач.
+
+    Обработчик получает payload задачи; исключение означает неуспешную попытку.
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        _JOB_HANDLERS[name] = handler
+        return handler
+    return decorator
+
+
+def get_job_handler(name: str) -> Optional[JobHandler]:
+    """Получить обработчик задачи по имени."""
+    return _JOB_HANDLERS.get(name)
+
+
+# === QUEUES ===
+
+class JobQueue(ABC):
+    """Базовая очередь задач с приоритетными полосами и round-robin по тенантам."""
+
+    def __init__(self, visibility_timeout: float = 300.0, max_attempts: int = 3):
+        """
+        Args:
+            visibility_timeout: Через сколько секунд без heartbeat задача считается потерянной
+            max_attempts: Число попыток до отправки в dead-letter
+        """
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._schedule = _build_lane_schedule(LANE_WEIGHTS)
+        self._schedule_position = 0
+        self.stats = {
+            "enqueued": 0,
+            "dequeued": 0,
+            "acked": 0,
+            "retried": 0,
+            "released": 0,
+            "reclaimed": 0,
+            "dead_lettered": 0,
+        }
+
+    @abstractmethod
+    async def enqueue(self, job: Job) -> str:
+        """Поставить задачу в очередь, вернуть ID задачи."""
+
+    @abstractmethod
+    async def dequeue(self, consumer: str) -> Optional[Job]:
+        """Забрать следующую задачу (без ожидания), None если очередь пуста."""
+
+    @abstractmethod
+    async def ack(self, job: Job) -> None:
+        """Подтвердить успешное выполнение задачи."""
+
+    @abstractmethod
+    async def retry(self, job: Job, error: str) -> bool:
+        """
+        Вернуть задачу после ошибки.
+
+        Returns:
+            True если задача поставлена повторно, False если ушла в dead-letter
+        """
+
+    @abstractmethod
+    async def release(self, job: Job) -> None:
+        """Вернуть невыполненную задачу без учета попытки (остановка воркера)."""
+
+    @abstractmethod
+    async def extend(self, job: Job, consumer: str) -> None:
+        """Продлить видимость задачи (heartbeat долгой задачи)."""
+
+    async def resume(self, consumer: str) -> int:
+        """Подготовить к выдаче задачи упавших воркеров (вызывается при старте воркера)."""
+        return 0
+
+    async def depth(self) -> Dict[str, int]:
+        """Число ожидающих задач по полосам."""
+        return {}
+
+    async def close(self) -> None:
+        """Освободить ресурсы backend."""
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Статистика очереди."""
+        return {
+            **self.stats,
+            "backend": self.backend_name,
+            "depth": await self.depth(),
+            "visibility_timeout": self.visibility_timeout,
+            "max_attempts": self.max_attempts,
+        }
+
+    @property
+    def backend_name(self) -> str:
+        return type(self).__name__
+
+    def _lane_order(self) -> List[JobPriority]:
+        """Полосы в порядке опроса: выбранная по расписанию, затем остальные по приоритету."""
+        lane = self._schedule[self._schedule_position]
+        self._schedule_position = (self._schedule_position + 1) % len(self._schedule)
+        return [lane] + [other for other in JobPriority if other != lane]
+
+
+class InMemoryJobQueue(JobQueue):
+    """
+    Очередь задач в памяти процесса.
+
+    Не переживает рестарт; подходит для разработки и одного инстанса API.
+    """
+
+    def __init__(self, visibility_timeout: float = 300.0, max_attempts: int = 3):
+        super().__init__(visibility_timeout, max_attempts)
+        self._lanes: Dict[JobPriority, "OrderedDict[str, Deque[Job]]"] = {
+            lane: OrderedDict() for lane in JobPriority
+        }
+        # job_id -> (job, deadline)
+        self._in_flight: Dict[str, Tuple[Job, float]] = {}
+        self.dead_letters: List[Job] = []
+
+    async def enqueue(self, job: Job) -> str:
+        self._push(job)
+        self.stats["enqueued"] += 1
+        return job.id
+
+    async def dequeue(self, consumer: str) -> Optional[Job]:
+        self._reclaim_expired()
+
+        for lane in self._lane_order():
+            tenants = self._lanes[lane]
+            if not tenants:
+                continue
+            # Тенанты в порядке обслуживания: обслуженный уходит в конец
+            tenant, jobs = next(iter(tenants.items()))
+            job = jobs.popleft()
+            if jobs:
+                tenants.move_to_end(tenant)
+            else:
+                del tenants[tenant]
+            self._in_flight[job.id] = (job, time.monotonic() + self.visibility_timeout)
+            self.stats["dequeued"] += 1
+            return job
+        return None
+
+    async def ack(self, job: Job) -> None:
+        self._in_flight.pop(job.id, None)
+        self.stats["acked"] += 1
+
+    async def retry(self, job: Job, error: str) -> bool:
+        self._in_flight.pop(job.id, None)
+        job.attempts += 1
+        job.last_error = error
+        if job.attempts >= self.max_attempts:
+            self._dead_letter(job)
+            return False
+        self._push(job)
+        self.stats["retried"] += 1
+        return True
+
+    async def release(self, job: Job) -> None:
+        self._in_flight.pop(job.id, None)
+        self._push(job, front=True)
+        self.stats["released"] += 1
+
+    async def extend(self, job: Job, consumer: str) -> None:
+        if job.id in self._in_flight:
+            self._in_flight[job.id] = (job, time.monotonic() + self.visibility_timeout)
+
+    async def depth(self) -> Dict[str, int]:
+        return {
+            lane.value: sum(len(jobs) for jobs in tenants.values())
+            for lane, tenants in self._lanes.items()
+        }
+
+    def _push(self, job: Job, front: bool = False) -> None:
+        jobs = self._lanes[job.priority].setdefault(job.tenant, deque())
+        if front:
+            jobs.appendleft(job)
+        else:
+            jobs.append(job)
+
+    def _reclaim_expired(self) -> None:
+        now = time.monotonic()
+        expired = [job for job, deadline in self._in_flight.values() if deadline <= now]
+        for job in expired:
+            del self._in_flight[job.id]
+            job.attempts += 1
+            job.last_error = "visibility timeout expired"
+            self.stats["reclaimed"] += 1
+            if job.attempts >= self.max_attempts:
+                self._dead_letter(job)
+            else:
+                self._push(job, front=True)
+
+    def _dead_letter(self, job: Job) -> None:
+        self.dead_letters.append(job)
+        self.stats["dead_lettered"] += 1
+        logger.error(f"Job {job.id} ({job.name}) moved to dead-letter after {job.attempts} attempts: {job.last_error}")
+
+
+class RedisStreamsJobQueue(JobQueue):
+    """
+    Durable очередь на Redis Streams.
+
+    Каждая пара (полоса, тенант) - отдельный stream ``{prefix}:{lane}:{tenant}``
+    с общей consumer group; список тенантов полосы хранится в set
+    ``{prefix}:{lane}:tenants``. Выданные, но не подтвержденные задачи остаются
+    в PEL группы: после visibility timeout их забирает любой воркер (XAUTOCLAIM
+    в ``dequeue`` и при старте в ``resume``).
+    """
+
+    GROUP = "workers"
+
+    def __init__(
+        self,
+        redis_client: Any,
+        prefix: str = "jobs",
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        reclaim_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            redis_client: Клиент redis.asyncio
+            prefix: Префикс ключей очереди
+            visibility_timeout: Через сколько секунд без heartbeat задача забирается другим воркером
+            max_attempts: Число попыток до отправки в dead-letter
+            reclaim_interval: Как часто искать потерянные задачи (по умолчанию visibility_timeout / 2)
+        """
+        super().__init__(visibility_timeout, max_attempts)
+        self.redis = redis_client
+        self.prefix = prefix
+        self.reclaim_interval = reclaim_interval if reclaim_interval is not None else visibility_timeout / 2
+        self.dead_letter_stream = f"{prefix}:dead"
+        self._groups_ready: set = set()
+        self._local: Deque[Job] = deque()
+        self._last_reclaim = 0.0
+        self._tenant_cursor: Dict[JobPriority, int] = {lane: 0 for lane in JobPriority}
+
+    async def enqueue(self, job: Job) -> str:
+        stream = self._stream_key(job.priority, job.tenant)
+        await self._ensure_group(stream)
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.sadd(self._tenants_key(job.priority), job.tenant)
+        pipe.xadd(stream, job.to_fields())
+        await pipe.execute()
+
+        self.stats["enqueued"] += 1
+        return job.id
+
+    async def dequeue(self, consumer: str) -> Optional[Job]:
+        if not self._local and time.monotonic() - self._last_reclaim >= self.reclaim_interval:
+            await self._reclaim(consumer)
+
+        if self._local:
+            self.stats["dequeued"] += 1
+            return self._local.popleft()
+
+        for lane in self._lane_order():
+            tenants = sorted(_decode(tenant) for tenant in await self.redis.smembers(self._tenants_key(lane)))
+            for tenant in self._rotate_tenants(lane, tenants):
+                stream = self._stream_key(lane, tenant)
+                await self._ensure_group(stream)
+                response = await self.redis.xreadgroup(self.GROUP, consumer, {stream: ">"}, count=1)
+                jobs = self._jobs_from_response(response)
+                if jobs:
+                    self._advance_tenant(lane, tenants, tenant)
+                    self.stats["dequeued"] += 1
+                    return jobs[0]
+        return None
+
+    async def ack(self, job: Job) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xack(job.stream, self.GROUP, job.message_id)
+        pipe.xdel(job.stream, job.message_id)
+        await pipe.execute()
+        self.stats["acked"] += 1
+
+    async def retry(self, job: Job, error: str) -> bool:
+        job.attempts += 1
+        job.last_error = error
+        if job.attempts >= self.max_attempts:
+            await self._dead_letter(job)
+            return False
+
+        await self._requeue(job)
+        self.stats["retried"] += 1
+        return True
+
+    async def release(self, job: Job) -> None:
+        await self._requeue(job)
+        self.stats["released"] += 1
+
+    async def extend(self, job: Job, consumer: str) -> None:
+        # XCLAIM с нулевым min-idle сбрасывает idle time сообщения
+        await self.redis.xclaim(job.stream, self.GROUP, consumer, 0, [job.message_id], justid=True)
+
+    async def resume(self, consumer: str) -> int:
+        """
+        Забрать задачи упавших воркеров сразу при старте.
+
+        PEL группы общий для всех воркеров, поэтому задачи забираются через
+        XAUTOCLAIM по min-idle (visibility timeout), а не чтением PEL с "0":
+        задачи живых воркеров продлеваются heartbeat и не простаивают.
+        """
+        resumed = await self._reclaim(consumer)
+        if resumed:
+            logger.info(f"Consumer {consumer} resumed {resumed} unfinished jobs")
+        return resumed
+
+    async def depth(self) -> Dict[str, int]:
+        depth = {}
+        for lane in JobPriority:
+            tenants = await self.redis.smembers(self._tenants_key(lane))
+            lengths = [await self.redis.xlen(self._stream_key(lane, _decode(tenant))) for tenant in tenants]
+            depth[lane.value] = sum(lengths)
+        return depth
+
+    async def dead_letter_count(self) -> int:
+        """Число задач в dead-letter stream."""
+        return await self.redis.xlen(self.dead_letter_stream)
+
+    async def close(self) -> None:
+        close = getattr(self.redis, "aclose", None) or getattr(self.redis, "close", None)
+        if close is not None:
+            await close()
+
+    async def _reclaim(self, consumer: str) -> int:
+        """Забрать задачи, не подтвержденные дольше visibility timeout."""
+        self._last_reclaim = time.monotonic()
+        min_idle_ms = int(self.visibility_timeout * 1000)
+        reclaimed = 0
+
+        for stream in await self._all_streams():
+            await self._ensure_group(stream)
+            response = await self.redis.xautoclaim(stream, self.GROUP, consumer, min_idle_ms, start_id="0-0", count=100)
+            messages = response[1] if response else []
+            for message_id, fields in messages:
+                if not fields:
+                    continue
+                job = Job.from_fields(fields, stream=stream, message_id=_decode(message_id))
+                pending = await self.redis.xpending_range(
+                    stream, self.GROUP, min=job.message_id, max=job.message_id, count=1
+                )
+                deliveries = pending[0]["times_delivered"] if pending else 1
+                # Каждая истекшая выдача - неуспешная попытка
+                job.attempts += max(deliveries - 1, 1)
+                job.last_error = "visibility timeout expired"
+                self.stats["reclaimed"] += 1
+
+                if job.attempts >= self.max_attempts:
+                    await self._dead_letter(job)
+                else:
+                    self._local.append(job)
+                    reclaimed += 1
+            await self._prune_consumers(stream, min_idle_ms)
+        return reclaimed
+
+    async def _prune_consumers(self, stream: str, min_idle_ms: int) -> None:
+        """
+        Удалить из группы consumer без задач, простаивающие дольше visibility timeout.
+
+        Имя consumer уникально для процесса, поэтому после рестартов в группе
+        копятся имена завершившихся воркеров. Живой воркер при следующем
+        XREADGROUP создается заново.
+        """
+        for info in await self.redis.xinfo_consumers(stream, self.GROUP):
+            if info["pending"] == 0 and info["idle"] >= min_idle_ms:
+                await self.redis.xgroup_delconsumer(stream, self.GROUP, info["name"])
+
+    def _rotate_tenants(self, lane: JobPriority, tenants: List[str]) -> List[str]:
+        """Тенанты полосы начиная с курсора round-robin."""
+        if not tenants:
+            return tenants
+        start = self._tenant_cursor[lane] % len(tenants)
+        return tenants[start:] + tenants[:start]
+
+    def _advance_tenant(self, lane: JobPriority, tenants: List[str], tenant: str) -> None:
+        self._tenant_cursor[lane] = tenants.index(tenant) + 1
+
+    async def _requeue(self, job: Job) -> None:
+        """Добавить копию задачи в конец stream и подтвердить старую выдачу атомарно."""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xadd(job.stream, job.to_fields())
+        pipe.xack(job.stream, self.GROUP, job.message_id)
+        pipe.xdel(job.stream, job.message_id)
+        await pipe.execute()
+
+    async def _dead_letter(self, job: Job) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.xadd(self.dead_letter_stream, {**job.to_fields(), "stream": job.stream})
+        pipe.xack(job.stream, self.GROUP, job.message_id)
+        pipe.xdel(job.stream, job.message_id)
+        await pipe.execute()
+        self.stats["dead_lettered"] += 1
+        logger.error(f"Job {job.id} ({job.name}) moved to dead-letter after {job.attempts} attempts: {job.last_error}")
+
+    async def _ensure_group(self, stream: str) -> None:
+        if stream in self._groups_ready:
+            return
+        try:
+            await self.redis.xgroup_create(stream, self.GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._groups_ready.add(stream)
+
+    async def _all_streams(self) -> List[str]:
+        streams = []
+        for lane in JobPriority:
+            tenants = await self.redis.smembers(self._tenants_key(lane))
+            streams.extend(self._stream_key(lane, _decode(tenant)) for tenant in sorted(tenants))
+        return streams
+
+    def _jobs_from_response(self, response: Any) -> List[Job]:
+        jobs = []
+        for stream, messages in response or []:
+            for message_id, fields in messages:
+                if fields:
+                    jobs.append(Job.from_fields(fields, stream=_decode(stream), message_id=_decode(message_id)))
+        return jobs
+
+    def _stream_key(self, lane: JobPriority, tenant: str) -> str:
+        return f"{self.prefix}:{lane.value}:{tenant}"
+
+    def _tenants_key(self, lane: JobPriority) -> str:
+        return f"{self.prefix}:{lane.value}:tenants"
+
+
+def create_job_queue(settings: Optional[Any] = None) -> JobQueue:
+    """
+    Создать очередь задач по настройкам (JOB_QUEUE_BACKEND).
+
+    Args:
+        settings: Настройки приложения (по умолчанию get_settings())
+    """
+    if settings is None:
+        from core.config import get_settings
+        settings = get_settings()
+
+    backend = settings.JOB_QUEUE_BACKEND
+    if backend == "redis":
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        return RedisStreamsJobQueue(
+            client,
+            prefix=settings.JOB_QUEUE_PREFIX,
+            visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+
+    if backend != "memory":
+        raise ValueError(f"Unsupported JOB_QUEUE_BACKEND: {backend}")
+
+    return InMemoryJobQueue(
+        visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
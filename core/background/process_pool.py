@@ -0,0 +1,165 @@
+"""
+Shared process pool for CPU-bound work.
+
+Общий пул процессов для CPU-нагрузки (fuzzy matching, разбор прайс-листов),
+чтобы она не блокировала event loop. Функции задач должны быть объявлены на
+уровне модуля (см. ``core.background.cpu_tasks``), аргументы - простые типы.
+
+Без пула (CPU_POOL_WORKERS=0) или после его падения задачи выполняются в
+потоке через asyncio.to_thread.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CPUTaskExecutor:
+    """Async API поверх ProcessPoolExecutor с разбиением работы на чанки."""
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 512):
+        """
+        Args:
+            max_workers: Число процессов (None - по числу ядер, 0 - без пула, в потоке)
+            chunk_size: Размер чанка для map_chunks
+        """
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "tasks": 0,
+            "chunks": 0,
+            "thread_fallbacks": 0,
+            "pool_restarts": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполнить функцию в пуле процессов.
+
+        Args:
+            fn: Функция уровня модуля
+            *args: Аргументы (должны сериализоваться pickle)
+        """
+        self.stats["tasks"] += 1
+        pool = self._get_pool()
+        if pool is None:
+            self.stats["thread_fallbacks"] += 1
+            return await asyncio.to_thread(fn, *args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Process pool is broken, restarting and running task in a thread")
+            self._reset_pool()
+            self.stats["thread_fallbacks"] += 1
+            return await asyncio.to_thread(fn, *args)
+
+    async def map_chunks(
+        self,
+        fn: Callable[..., List[Any]],
+        items: Sequence[Any],
+        *args: Any,
+        chunk_size: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Обработать последовательность чанками параллельно на всех процессах.
+
+        Args:
+            fn: Функция уровня модуля fn(chunk, *args) -> list с результатом на каждый элемент
+            items: Элементы для обработки
+            *args: Общие аргументы для каждого чанка
+            chunk_size: Размер чанка (по умолчанию self.chunk_size)
+
+        Returns:
+            Результаты в порядке элементов
+        """
+        if not items:
+            return []
+
+        size = self._chunk_size_for(len(items), chunk_size)
+        chunks = [list(items[i:i + size]) for i in range(0, len(items), size)]
+        self.stats["chunks"] += len(chunks)
+
+        results = await asyncio.gather(*[self.run(fn, chunk, *args) for chunk in chunks])
+        return [result for chunk_result in results for result in chunk_result]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Остановить процессы пула."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика пула."""
+        return {
+            **self.stats,
+            "max_workers": self.max_workers,
+            "chunk_size": self.chunk_size,
+            "started": self._pool is not None,
+        }
+
+    def _chunk_size_for(self, total: int, chunk_size: Optional[int]) -> int:
+        size = chunk_size or self.chunk_size
+        # Не меньше одного чанка на процесс, если элементов достаточно
+        if self.enabled and total > self.max_workers:
+            size = min(size, -(-total // self.max_workers))
+        return max(size, 1)
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if not self.enabled:
+            return None
+        if self._pool is None:
+            # forkserver/spawn: дочерние процессы не наследуют потоки и event loop родителя
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            logger.info(f"Started CPU process pool with {self.max_workers} workers")
+        return self._pool
+
+    def _reset_pool(self) -> None:
+        self.stats["pool_restarts"] += 1
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+_cpu_executor: Optional[CPUTaskExecutor] = None
+
+
+def get_cpu_executor() -> CPUTaskExecutor:
+    """Получить общий CPUTaskExecutor (настройки CPU_POOL_WORKERS, CPU_POOL_CHUNK_SIZE)."""
+    global _cpu_executor
+
+    if _cpu_executor is None:
+        from core.config import get_settings
+
+        settings = get_settings()
+        _cpu_executor = CPUTaskExecutor(
+            max_workers=settings.CPU_POOL_WORKERS,
+            chunk_size=settings.CPU_POOL_CHUNK_SIZE
+        )
+
+    return _cpu_executor
+
+
+def shutdown_cpu_executor() -> None:
+    """Остановить общий пул процессов."""
+    global _cpu_executor
+
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown()
+        _cpu_executor = None
@@ -0,0 +1,375 @@
+"""
+Finished material results of batch requests.
+
+Лента результатов для NDJSON-стрима: строки завершенных материалов (completed /
+failed) добавляются в порядке завершения, подписчики ждут новые строки вместо
+опроса хранилища. Счетчики прогресса и SSE-лента - в ``progress_counters``;
+здесь только сами результаты.
+
+Лента запроса открывается при постановке задачи (``start``), поэтому стрим,
+открытый сразу после POST, ждет первые строки, а не читает хранилище.
+Завершенные запросы хранятся ``retention`` секунд.
+
+Backends:
+    * ``InMemoryResultFeed`` - строки в памяти процесса; подписчики видят только
+      задачи своего процесса, ждут asyncio.Event
+    * ``RedisResultFeed`` - Redis list строк на запрос, новые строки и завершение
+      публикуются в канал запроса (Redis pub/sub), поэтому стрим может отдавать
+      любой uvicorn worker, а задачу выполнять любой воркер очереди
+"""
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+FINAL_STATUSES = ("completed", "failed")
+
+RUNNING = "running"
+FINISHED = "finished"
+
+
+@dataclass
+class RequestResults:
+    """Completed results of one batch request."""
+    request_id: str
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    finished: bool = False
+    finished_at: Optional[float] = None
+
+
+class ResultFeed(ABC):
+    """Base class: storage primitives in backends, following here."""
+
+    def __init__(self, retention: float = 600.0, max_results: int = 100_000):
+        """
+        Args:
+            retention: Сколько секунд хранить завершенные запросы
+            max_results: Максимум результатов, хранимых для NDJSON на запрос
+        """
+        self.retention = retention
+        self.max_results = max_results
+        self.stats = {"started": 0, "appended": 0, "finished": 0}
+
+    @abstractmethod
+    async def start(self, request_id: str) -> None:
+        """
+        Open the feed of a request (at submit time).
+
+        Повторный вызов (retry задачи) сохраняет уже добавленные строки и
+        снова помечает запрос выполняющимся.
+        """
+
+    @abstractmethod
+    async def extend(self, request_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Add rows (``material_id``, ``status``, ...) of materials that reached a final status."""
+
+    @abstractmethod
+    async def finish(self, request_id: str) -> None:
+        """Mark request as finished and wake up all subscribers."""
+
+    @abstractmethod
+    async def exists(self, request_id: str) -> bool:
+        """Whether the feed of the request is open or retained."""
+
+    @abstractmethod
+    async def _read(self, request_id: str, offset: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """State (None - unknown, RUNNING, FINISHED) and rows starting at offset."""
+
+    @abstractmethod
+    def _listen(self, request_id: str) -> Any:
+        """
+        Async context manager yielding ``wait(timeout) -> bool``.
+
+        Подписка оформляется до чтения строк, поэтому строка, добавленная
+        между чтением и ожиданием, не теряется.
+        """
+
+    async def append(
+        self,
+        request_id: str,
+        material_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Add the result of a material that reached a final status."""
+        await self.extend(request_id, [{"material_id": material_id, "status": status, **(result or {})}])
+
+    async def follow(
+        self, request_id: str, offset: int = 0, heartbeat: float = 15.0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield completed results starting at offset, then new ones as they arrive (None - keep-alive)."""
+        async with self._listen(request_id) as wait:
+            while True:
+                state, rows = await self._read(request_id, offset)
+                if state is None:
+                    return
+                for row in rows:
+                    yield row
+                offset += len(rows)
+                if state == FINISHED:
+                    return
+                if not await wait(heartbeat):
+                    yield None
+
+    async def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, **self.stats}
+
+    @staticmethod
+    def _final_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [row for row in rows if row.get("status") in FINAL_STATUSES]
+
+
+class InMemoryResultFeed(ResultFeed):
+    """Results in process memory; only requests submitted to this process are known."""
+
+    def __init__(self, retention: float = 600.0, max_results: int = 100_000):
+        super().__init__(retention, max_results)
+        self._requests: Dict[str, RequestResults] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    async def start(self, request_id: str) -> None:
+        self._prune()
+        feed = self._requests.setdefault(request_id, RequestResults(request_id=request_id))
+        feed.finished = False
+        feed.finished_at = None
+        self.stats["started"] += 1
+        self._notify(request_id)
+
+    async def extend(self, request_id: str, rows: List[Dict[str, Any]]) -> None:
+        feed = self._requests.get(request_id)
+        rows = self._final_rows(rows)
+        if feed is None or not rows:
+            return
+        rows = rows[:max(0, self.max_results - len(feed.results))]
+        feed.results.extend(rows)
+        self.stats["appended"] += len(rows)
+        self._notify(request_id)
+
+    async def finish(self, request_id: str) -> None:
+        feed = self._requests.get(request_id)
+        if feed is not None and not feed.finished:
+            feed.finished = True
+            feed.finished_at = time.time()
+            self.stats["finished"] += 1
+            self._notify(request_id)
+
+    async def exists(self, request_id: str) -> bool:
+        return request_id in self._requests
+
+    def get(self, request_id: str) -> Optional[RequestResults]:
+        return self._requests.get(request_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "requests": len(self._requests),
+            "active_requests": sum(1 for feed in self._requests.values() if not feed.finished),
+        }
+
+    async def _read(self, request_id: str, offset: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        feed = self._requests.get(request_id)
+        if feed is None:
+            return None, []
+        return (FINISHED if feed.finished else RUNNING), feed.results[offset:]
+
+    @asynccontextmanager
+    async def _listen(self, request_id: str) -> AsyncIterator[Callable[[float], Awaitable[bool]]]:
+        changed = self._changed.setdefault(request_id, asyncio.Event())
+
+        async def wait(timeout: float) -> bool:
+            nonlocal changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                changed = self._changed.setdefault(request_id, asyncio.Event())
+
+        try:
+            yield wait
+        finally:
+            if request_id not in self._requests:
+                self._changed.pop(request_id, None)
+
+    def _notify(self, request_id: str) -> None:
+        # Разбудить всех ожидающих и начать новое ожидание
+        changed = self._changed.pop(request_id, None)
+        if changed is not None:
+            changed.set()
+
+    def _prune(self) -> None:
+        expired_before = time.time() - self.retention
+        for request_id in [
+            request_id for request_id, feed in self._requests.items()
+            if feed.finished_at is not None and feed.finished_at < expired_before
+        ]:
+            del self._requests[request_id]
+            self._changed.pop(request_id, None)
+
+
+class RedisResultFeed(ResultFeed):
+    """
+    Shared results in Redis.
+
+    Keys:
+        ``{prefix}:state:{request_id}`` - RUNNING / FINISHED
+        ``{prefix}:rows:{request_id}`` - list of JSON rows
+        ``{prefix}:events:{request_id}`` - pub/sub канал изменений запроса
+    """
+
+    def __init__(self, redis_client: Any, prefix: str = "progress:results", ttl: int = 604800,
+                 retention: float = 600.0, max_results: int = 100_000):
+        """
+        Args:
+            redis_client: Клиент redis.asyncio
+            prefix: Префикс ключей
+            ttl: Время жизни ленты выполняющегося запроса (сек)
+            retention: Сколько секунд хранить завершенные запросы
+            max_results: Максимум результатов, хранимых для NDJSON на запрос
+        """
+        super().__init__(retention, max_results)
+        self.redis = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def start(self, request_id: str) -> None:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(self._state_key(request_id), RUNNING, ex=self.ttl)
+        pipe.expire(self._rows_key(request_id), self.ttl)
+        pipe.publish(self._events_key(request_id), RUNNING)
+        await pipe.execute()
+        self.stats["started"] += 1
+
+    async def extend(self, request_id: str, rows: List[Dict[str, Any]]) -> None:
+        rows = self._final_rows(rows)
+        if not rows:
+            return
+        rows_key = self._rows_key(request_id)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.rpush(rows_key, *[json.dumps(row, ensure_ascii=False, default=str) for row in rows])
+        # Сверх max_results строки не хранятся, как и в памяти
+        pipe.ltrim(rows_key, 0, self.max_results - 1)
+        pipe.expire(rows_key, self.ttl)
+        pipe.publish(self._events_key(request_id), len(rows))
+        await pipe.execute()
+        self.stats["appended"] += len(rows)
+
+    async def finish(self, request_id: str) -> None:
+        state_key = self._state_key(request_id)
+        if await self.redis.get(state_key) != RUNNING:
+            return
+        retention = max(1, int(self.retention))
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(state_key, FINISHED, ex=retention)
+        pipe.expire(self._rows_key(request_id), retention)
+        pipe.publish(self._events_key(request_id), FINISHED)
+        await pipe.execute()
+        self.stats["finished"] += 1
+
+    async def exists(self, request_id: str) -> bool:
+        return bool(await self.redis.exists(self._state_key(request_id)))
+
+    async def _read(self, request_id: str, offset: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        # Состояние читается до строк: FINISHED означает, что строки уже полные
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(self._state_key(request_id))
+        pipe.lrange(self._rows_key(request_id), offset, -1)
+        state, rows = await pipe.execute()
+        if state is None:
+            return None, []
+        return state, [json.loads(row) for row in rows]
+
+    @asynccontextmanager
+    async def _listen(self, request_id: str) -> AsyncIterator[Callable[[float], Awaitable[bool]]]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._events_key(request_id))
+
+        async def wait(timeout: float) -> bool:
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None:
+                    return True
+
+        try:
+            yield wait
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+    def _state_key(self, request_id: str) -> str:
+        return f"{self.prefix}:state:{request_id}"
+
+    def _rows_key(self, request_id: str) -> str:
+        return f"{self.prefix}:rows:{request_id}"
+
+    def _events_key(self, request_id: str) -> str:
+        return f"{self.prefix}:events:{request_id}"
+
+
+def create_result_feed(settings: Optional[Any] = None) -> ResultFeed:
+    """
+    Создать ленту результатов по настройкам.
+
+    Лента использует backend счетчиков прогресса (PROGRESS_COUNTERS_BACKEND):
+    при Redis строки и их публикация общие для API процессов и воркеров.
+
+    Args:
+        settings: Настройки приложения (по умолчанию get_settings())
+    """
+    if settings is None:
+        from core.config import get_settings
+        settings = get_settings()
+
+    backend = settings.PROGRESS_COUNTERS_BACKEND
+    if backend == "auto":
+        backend = "redis" if settings.REDIS_URL else "memory"
+    if backend == "redis":
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        return RedisResultFeed(
+            client, prefix=f"{settings.PROGRESS_COUNTERS_PREFIX}:results", ttl=settings.PROGRESS_COUNTERS_TTL
+        )
+
+    if backend != "memory":
+        raise ValueError(f"Unsupported PROGRESS_COUNTERS_BACKEND: {backend}")
+
+    return InMemoryResultFeed()
+
+
+# Singleton instance
+_result_feed: Optional[ResultFeed] = None
+
+
+def get_result_feed() -> ResultFeed:
+    """Получить общую ленту результатов batch обработки."""
+    global _result_feed
+
+    if _result_feed is None:
+        _result_feed = create_result_feed()
+
+    return _result_feed
@@ -0,0 +1,658 @@
+"""
+Incremental counters of batch processing progress.
+
+Счетчики статусов ведутся на каждый запрос и глобально и меняются на каждом
+переходе статуса материала (pending -> processing -> completed/failed) за O(1),
+поэтому прогресс и статистика не требуют перебора processing records.
+
+Каждое изменение счетчиков запроса увеличивает его версию и будит подписчиков
+(``subscribe``): SSE-ленты прогресса ждут изменения вместо опроса хранилища.
+
+Backends:
+    * ``InMemoryProgressCounters`` - счетчики в памяти процесса; только для
+      одного процесса (при нескольких uvicorn workers каждый видит свои),
+      подписчики ждут asyncio.Event
+    * ``RedisProgressCounters`` - Redis hash на запрос и глобальный hash
+      (HINCRBY). Предыдущий статус материала хранится отдельным ключом и
+      заменяется атомарно через ``SET ... XX GET``: повторное обновление тем
+      же статусом счетчики не меняет, общие счетчики видят все процессы.
+      Изменения публикуются в канал запроса (Redis pub/sub), поэтому ленту
+      прогресса может отдавать любой воркер, а не только выполняющий задачу.
+
+Счетчики - производные данные: ``reconcile`` периодически пересчитывает
+незавершенные запросы и глобальную статистику по хранилищу и исправляет
+расхождения (обрыв между обновлением записи и счетчика, очистка записей).
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATUSES = ("pending", "processing", "completed", "failed")
+GLOBAL_FIELDS = ("batches", "records") + STATUSES
+
+_STATUS_ALIASES = {"done": "completed", "error": "failed"}
+
+
+def normalize_status(status: Any) -> str:
+    """Map stored status (incl. legacy done/error) to one of STATUSES."""
+    status = _STATUS_ALIASES.get(status, status)
+    return status if status in STATUSES else "pending"
+
+
+def count_statuses(statuses: Iterable[Any]) -> Dict[str, int]:
+    """Per-request counters for a list of material statuses."""
+    counts = {"total": 0, **{status: 0 for status in STATUSES}}
+    for status in statuses:
+        counts["total"] += 1
+        counts[normalize_status(status)] += 1
+    return counts
+
+
+def counts_from_statistics(stats: Any) -> Optional[Dict[str, int]]:
+    """Global counters from store statistics (total_batches/total_records/status_counts)."""
+    if not isinstance(stats, dict) or "status_counts" not in stats:
+        return None
+    counts = {field: 0 for field in GLOBAL_FIELDS}
+    counts["batches"] = int(stats.get("total_batches", 0))
+    counts["records"] = int(stats.get("total_records", 0))
+    for status, count in stats["status_counts"].items():
+        counts[normalize_status(status)] += int(count)
+    return counts
+
+
+def progress_snapshot(request_id: str, counts: Dict[str, int], version: int, finished: bool) -> Dict[str, Any]:
+    """Progress feed event: counters, percentage, finished flag and version."""
+    done = counts["completed"] + counts["failed"]
+    return {
+        "request_id": request_id,
+        "total": counts["total"],
+        "completed": counts["completed"],
+        "failed": counts["failed"],
+        "pending": counts["pending"] + counts["processing"],
+        "processing": counts["processing"],
+        "progress_percentage": round(done / counts["total"] * 100, 2) if counts["total"] else 0.0,
+        "finished": finished or not _is_unfinished(counts),
+        "version": version,
+    }
+
+
+def _decode(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _is_unfinished(counts: Dict[str, int]) -> bool:
+    return counts.get("pending", 0) + counts.get("processing", 0) > 0
+
+
+class ProgressCounters(ABC):
+    """Base class: storage primitives in backends, progress views and reconciliation here."""
+
+    def __init__(self):
+        self.stats = {"transitions": 0, "untracked_updates": 0, "reconciliations": 0, "drift_repairs": 0}
+        self._reconcile_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def init_request(self, request_id: str, material_ids: List[str]) -> None:
+        """Register a new request with all materials pending."""
+
+    @abstractmethod
+    async def transition(self, request_id: str, material_id: str, status: str) -> Optional[Dict[str, int]]:
+        """
+        Apply material status change.
+
+        Returns:
+            Counters of the request or None if the material is not tracked
+        """
+
+    @abstractmethod
+    async def get_counts(self, request_id: str) -> Optional[Dict[str, int]]:
+        """Counters of the request (total + STATUSES) or None."""
+
+    @abstractmethod
+    async def get_global(self) -> Optional[Dict[str, int]]:
+        """Global counters (GLOBAL_FIELDS) or None until seeded from the store."""
+
+    @abstractmethod
+    async def rebuild_request(self, request_id: str, statuses: Dict[str, str],
+                              new: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Replace counters of the request by recounted material statuses.
+
+        Глобальные счетчики сдвигаются на разницу. Запрос, неизвестный счетчикам
+        и не новый (``new=False``), мог уже войти в статистику хранилища, которой
+        засеяны глобальные счетчики: вместо сдвига они помечаются устаревшими и
+        пересеиваются из хранилища. Returns previous counters.
+        """
+
+    @abstractmethod
+    async def set_global(self, counts: Dict[str, int]) -> Optional[Dict[str, int]]:
+        """Replace global counters, returns previous ones (None if not seeded)."""
+
+    @abstractmethod
+    async def invalidate_global(self) -> None:
+        """Mark global counters stale (reseeded by the next statistics call or reconcile)."""
+
+    @abstractmethod
+    async def active_requests(self, limit: int = 100) -> List[str]:
+        """IDs of requests with pending or processing materials (limit 0 - all)."""
+
+    @abstractmethod
+    async def active_count(self) -> int:
+        """Number of requests with pending or processing materials."""
+
+    @abstractmethod
+    async def finish(self, request_id: str) -> None:
+        """Mark request as finished (job ended, even with unprocessed materials) and wake up subscribers."""
+
+    @abstractmethod
+    async def get_snapshot(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Progress feed event of the request (``progress_snapshot``) or None."""
+
+    @abstractmethod
+    def _listen(self, request_id: str) -> Any:
+        """
+        Async context manager yielding ``wait(timeout) -> bool``.
+
+        Подписка оформляется до чтения снимка, поэтому изменение между чтением
+        и ожиданием не теряется.
+        """
+
+    async def subscribe(self, request_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield progress snapshots on change until the request finishes.
+
+        Промежуточные изменения схлопываются: медленный подписчик получает
+        последний снимок. Если за ``heartbeat`` секунд изменений не было,
+        выдается None (keep-alive). Неизвестный запрос - пустая лента.
+        """
+        async with self._listen(request_id) as wait:
+            last_version = None
+            while True:
+                snapshot = await self.get_snapshot(request_id)
+                if snapshot is None:
+                    return
+                if snapshot["version"] != last_version:
+                    last_version = snapshot["version"]
+                    yield snapshot
+                    if snapshot["finished"]:
+                        return
+                    continue
+                if not await wait(heartbeat):
+                    yield None
+
+    async def close(self) -> None:
+        await self.stop()
+
+    async def get_progress(self, request_id: str) -> Optional[Dict[str, int]]:
+        """Progress in the store format: total, completed, failed, pending (incl. processing)."""
+        counts = await self.get_counts(request_id)
+        if counts is None:
+            return None
+        return {
+            "total": counts["total"],
+            "completed": counts["completed"],
+            "failed": counts["failed"],
+            "pending": counts["pending"] + counts["processing"],
+        }
+
+    async def get_statistics(self) -> Optional[Dict[str, Any]]:
+        """Statistics in the store format or None until global counters are seeded."""
+        counts = await self.get_global()
+        if counts is None:
+            return None
+        return {
+            "total_batches": counts["batches"],
+            "total_records": counts["records"],
+            "status_counts": {status: counts[status] for status in STATUSES},
+            "active_batches": await self.active_count(),
+        }
+
+    async def repair_request(self, request_id: str, records: List[Dict[str, Any]]) -> bool:
+        """
+        Recount request from its processing records.
+
+        Returns:
+            True if stored counters differed (drift)
+        """
+        statuses = {record.get("material_id"): record.get("status") for record in records if record.get("material_id")}
+        previous = await self.rebuild_request(request_id, statuses)
+        drift = previous is not None and previous != count_statuses(statuses.values())
+        if drift:
+            self.stats["drift_repairs"] += 1
+            logger.warning(f"Progress counters of request {request_id} drifted, repaired: {previous} -> {count_statuses(statuses.values())}")
+        return drift
+
+    async def reconcile(self, store: Any, max_requests: int = 100) -> Dict[str, int]:
+        """
+        Compare counters with the store and repair drift.
+
+        Пересчитываются только незавершенные запросы (завершенные не меняются)
+        и глобальная статистика - одним запросом статистики хранилища.
+
+        Args:
+            store: Хранилище записей (DatabaseFallbackManager)
+            max_requests: Сколько незавершенных запросов проверить за проход
+        """
+        repaired = 0
+        active = await self.active_requests(limit=max_requests)
+        for request_id in active:
+            records = await store.get_processing_results(request_id)
+            current = await self.get_counts(request_id)
+            if current != count_statuses(record.get("status") for record in records if record.get("material_id")):
+                repaired += await self.repair_request(request_id, records)
+
+        global_counts = counts_from_statistics(await store.get_processing_statistics())
+        if global_counts is not None:
+            previous = await self.set_global(global_counts)
+            if previous is not None and previous != global_counts:
+                repaired += 1
+                self.stats["drift_repairs"] += 1
+                logger.warning(f"Global progress counters drifted, repaired: {previous} -> {global_counts}")
+
+        self.stats["reconciliations"] += 1
+        return {"requests_checked": len(active), "repaired": repaired}
+
+    async def start(self, interval: float, store_factory: Callable[[], Any]) -> None:
+        """Run reconcile every ``interval`` seconds in the background (0 - disabled)."""
+        if interval > 0 and self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop(interval, store_factory))
+
+    async def stop(self) -> None:
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend_name, **self.stats}
+
+    @property
+    def backend_name(self) -> str:
+        return type(self).__name__
+
+    async def _reconcile_loop(self, interval: float, store_factory: Callable[[], Any]) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile(store_factory())
+            except Exception as e:
+                logger.warning(f"Progress counters reconciliation failed: {e}")
+
+
+class InMemoryProgressCounters(ProgressCounters):
+    """Counters in process memory; request counters expire ``ttl`` seconds after the last change."""
+
+    def __init__(self, ttl: float = 604800.0):
+        super().__init__()
+        self.ttl = ttl
+        self._requests: Dict[str, Dict[str, int]] = {}
+        self._materials: Dict[str, Dict[str, str]] = {}
+        self._touched: Dict[str, float] = {}
+        self._active: set = set()
+        self._global: Dict[str, int] = {field: 0 for field in GLOBAL_FIELDS}
+        self._seeded = False
+        self._versions: Dict[str, int] = {}
+        self._finished: set = set()
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    async def init_request(self, request_id: str, material_ids: List[str]) -> None:
+        self._prune()
+        await self.rebuild_request(request_id, {material_id: "pending" for material_id in material_ids}, new=True)
+
+    async def transition(self, request_id: str, material_id: str, status: str) -> Optional[Dict[str, int]]:
+        materials = self._materials.get(request_id)
+        previous = materials.get(material_id) if materials is not None else None
+        if previous is None:
+            self.stats["untracked_updates"] += 1
+            return None
+
+        status = normalize_status(status)
+        counts = self._requests[request_id]
+        if previous != status:
+            materials[material_id] = status
+            for target in (counts, self._global):
+                target[previous] -= 1
+                target[status] += 1
+            self.stats["transitions"] += 1
+            if not _is_unfinished(counts):
+                self._active.discard(request_id)
+            self._notify(request_id)
+        self._touched[request_id] = time.time()
+        return dict(counts)
+
+    async def get_counts(self, request_id: str) -> Optional[Dict[str, int]]:
+        counts = self._requests.get(request_id)
+        return dict(counts) if counts is not None else None
+
+    async def get_global(self) -> Optional[Dict[str, int]]:
+        return dict(self._global) if self._seeded else None
+
+    async def rebuild_request(self, request_id: str, statuses: Dict[str, str],
+                              new: bool = False) -> Optional[Dict[str, int]]:
+        previous = self._requests.get(request_id)
+        counts = count_statuses(statuses.values())
+        if previous is None and not new:
+            self._seeded = False
+        else:
+            self._apply_global_delta(previous, counts)
+
+        self._requests[request_id] = counts
+        self._materials[request_id] = {material_id: normalize_status(status) for material_id, status in statuses.items()}
+        self._touched[request_id] = time.time()
+        if _is_unfinished(counts):
+            self._active.add(request_id)
+        else:
+            self._active.discard(request_id)
+        self._finished.discard(request_id)
+        self._notify(request_id)
+        return previous
+
+    async def set_global(self, counts: Dict[str, int]) -> Optional[Dict[str, int]]:
+        previous = dict(self._global) if self._seeded else None
+        self._global = {field: int(counts.get(field, 0)) for field in GLOBAL_FIELDS}
+        self._seeded = True
+        return previous
+
+    async def invalidate_global(self) -> None:
+        self._seeded = False
+
+    async def active_requests(self, limit: int = 100) -> List[str]:
+        active = list(self._active)
+        return active[:limit] if limit else active
+
+    async def active_count(self) -> int:
+        return len(self._active)
+
+    async def finish(self, request_id: str) -> None:
+        if request_id in self._requests and request_id not in self._finished:
+            self._finished.add(request_id)
+            self._notify(request_id)
+
+    async def get_snapshot(self, request_id: str) -> Optional[Dict[str, Any]]:
+        counts = self._requests.get(request_id)
+        if counts is None:
+            return None
+        return progress_snapshot(request_id, counts, self._versions.get(request_id, 0), request_id in self._finished)
+
+    @asynccontextmanager
+    async def _listen(self, request_id: str) -> AsyncIterator[Callable[[float], Awaitable[bool]]]:
+        async def wait(timeout: float) -> bool:
+            changed = self._changed.setdefault(request_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(changed.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+        yield wait
+
+    def _notify(self, request_id: str) -> None:
+        self._versions[request_id] = self._versions.get(request_id, 0) + 1
+        # Разбудить всех ожидающих и начать новое ожидание
+        changed = self._changed.pop(request_id, None)
+        if changed is not None:
+            changed.set()
+
+    def _apply_global_delta(self, previous: Optional[Dict[str, int]], counts: Dict[str, int]) -> None:
+        previous = previous or {}
+        if not previous:
+            self._global["batches"] += 1
+        self._global["records"] += counts["total"] - previous.get("total", 0)
+        for status in STATUSES:
+            self._global[status] += counts[status] - previous.get(status, 0)
+
+    def _prune(self) -> None:
+        expired_before = time.time() - self.ttl
+        for request_id in [rid for rid, touched in self._touched.items() if touched < expired_before]:
+            self._requests.pop(request_id, None)
+            self._materials.pop(request_id, None)
+            self._active.discard(request_id)
+            self._versions.pop(request_id, None)
+            self._finished.discard(request_id)
+            self._changed.pop(request_id, None)
+            del self._touched[request_id]
+
+
+class RedisProgressCounters(ProgressCounters):
+    """
+    Shared counters in Redis.
+
+    Keys:
+        ``{prefix}:req:{request_id}`` - hash total + STATUSES, ``version`` и ``finished``
+        ``{prefix}:events:{request_id}`` - pub/sub канал изменений запроса (сообщение - версия)
+        ``{prefix}:mat:{request_id}:{material_id}`` - текущий статус материала
+        ``{prefix}:global`` - hash GLOBAL_FIELDS + ``seeded``
+        ``{prefix}:active`` - set незавершенных запросов
+    """
+
+    def __init__(self, redis_client: Any, prefix: str = "progress", ttl: int = 604800):
+        """
+        Args:
+            redis_client: Клиент redis.asyncio
+            prefix: Префикс ключей
+            ttl: Время жизни счетчиков запроса после последнего изменения (сек)
+        """
+        super().__init__()
+        self.redis = redis_client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    async def init_request(self, request_id: str, material_ids: List[str]) -> None:
+        await self.rebuild_request(request_id, {material_id: "pending" for material_id in material_ids}, new=True)
+
+    async def transition(self, request_id: str, material_id: str, status: str) -> Optional[Dict[str, int]]:
+        status = normalize_status(status)
+        # Атомарная замена статуса: переход учитывается ровно один раз
+        previous = _decode(await self.redis.set(
+            self._material_key(request_id, material_id), status, xx=True, get=True, ex=self.ttl
+        ))
+        if previous is None:
+            self.stats["untracked_updates"] += 1
+            return None
+
+        request_key = self._request_key(request_id)
+        if previous == status:
+            return await self.get_counts(request_id)
+
+        pipe = self.redis.pipeline(transaction=True)
+        for key in (request_key, self._global_key):
+            pipe.hincrby(key, previous, -1)
+            pipe.hincrby(key, status, 1)
+        pipe.hincrby(request_key, "version", 1)
+        pipe.expire(request_key, self.ttl)
+        pipe.hgetall(request_key)
+        values = {_decode(key): _decode(value) for key, value in (await pipe.execute())[-1].items()}
+        counts = self._parse_counts(values)
+        await self.redis.publish(self._events_key(request_id), values.get("version", 0))
+        self.stats["transitions"] += 1
+
+        if not _is_unfinished(counts):
+            await self.redis.srem(self._active_key, request_id)
+        return counts
+
+    async def get_counts(self, request_id: str) -> Optional[Dict[str, int]]:
+        values = await self.redis.hgetall(self._request_key(request_id))
+        return self._parse_counts(values) if values else None
+
+    async def get_global(self) -> Optional[Dict[str, int]]:
+        values = {_decode(key): value for key, value in (await self.redis.hgetall(self._global_key)).items()}
+        if not values.get("seeded"):
+            return None
+        return {field: int(values.get(field, 0)) for field in GLOBAL_FIELDS}
+
+    async def rebuild_request(self, request_id: str, statuses: Dict[str, str],
+                              new: bool = False) -> Optional[Dict[str, int]]:
+        request_key = self._request_key(request_id)
+        previous = await self.get_counts(request_id)
+        counts = count_statuses(statuses.values())
+        previous_or_empty = previous or {}
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(request_key, mapping=counts)
+        pipe.hdel(request_key, "finished")
+        pipe.hincrby(request_key, "version", 1)
+        pipe.expire(request_key, self.ttl)
+        for material_id, status in statuses.items():
+            pipe.set(self._material_key(request_id, material_id), normalize_status(status), ex=self.ttl)
+        if previous is None and not new:
+            # Запрос мог уже войти в засеянную статистику - пересеять из хранилища
+            pipe.hdel(self._global_key, "seeded")
+        else:
+            if previous is None:
+                pipe.hincrby(self._global_key, "batches", 1)
+            pipe.hincrby(self._global_key, "records", counts["total"] - previous_or_empty.get("total", 0))
+            for status in STATUSES:
+                pipe.hincrby(self._global_key, status, counts[status] - previous_or_empty.get(status, 0))
+        if _is_unfinished(counts):
+            pipe.sadd(self._active_key, request_id)
+        else:
+            pipe.srem(self._active_key, request_id)
+        pipe.hget(request_key, "version")
+        version = (await pipe.execute())[-1]
+        await self.redis.publish(self._events_key(request_id), _decode(version))
+        return previous
+
+    async def set_global(self, counts: Dict[str, int]) -> Optional[Dict[str, int]]:
+        previous = await self.get_global()
+        await self.redis.hset(self._global_key, mapping={
+            **{field: int(counts.get(field, 0)) for field in GLOBAL_FIELDS},
+            "seeded": 1,
+        })
+        return previous
+
+    async def invalidate_global(self) -> None:
+        await self.redis.hdel(self._global_key, "seeded")
+
+    async def active_requests(self, limit: int = 100) -> List[str]:
+        if not limit:
+            return [_decode(request_id) for request_id in await self.redis.smembers(self._active_key)]
+        return [_decode(request_id) for request_id in await self.redis.srandmember(self._active_key, limit)]
+
+    async def active_count(self) -> int:
+        return await self.redis.scard(self._active_key)
+
+    async def finish(self, request_id: str) -> None:
+        request_key = self._request_key(request_id)
+        if not await self.redis.exists(request_key):
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(request_key, "finished", 1)
+        pipe.hincrby(request_key, "version", 1)
+        version = (await pipe.execute())[-1]
+        await self.redis.publish(self._events_key(request_id), version)
+
+    async def get_snapshot(self, request_id: str) -> Optional[Dict[str, Any]]:
+        values = {_decode(key): value for key, value in (await self.redis.hgetall(self._request_key(request_id))).items()}
+        if not values:
+            return None
+        return progress_snapshot(
+            request_id, self._parse_counts(values), int(values.get("version", 0)), bool(int(values.get("finished", 0)))
+        )
+
+    @asynccontextmanager
+    async def _listen(self, request_id: str) -> AsyncIterator[Callable[[float], Awaitable[bool]]]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self._events_key(request_id))
+
+        async def wait(timeout: float) -> bool:
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None:
+                    return True
+
+        try:
+            yield wait
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await super().close()
+        await self.redis.aclose()
+
+    @staticmethod
+    def _parse_counts(values: Dict[Any, Any]) -> Dict[str, int]:
+        values = {_decode(key): value for key, value in values.items()}
+        return {
+            "total": int(values.get("total", 0)),
+            **{status: int(values.get(status, 0)) for status in STATUSES},
+        }
+
+    def _request_key(self, request_id: str) -> str:
+        return f"{self.prefix}:req:{request_id}"
+
+    def _material_key(self, request_id: str, material_id: str) -> str:
+        return f"{self.prefix}:mat:{request_id}:{material_id}"
+
+    def _events_key(self, request_id: str) -> str:
+        return f"{self.prefix}:events:{request_id}"
+
+    @property
+    def _global_key(self) -> str:
+        return f"{self.prefix}:global"
+
+    @property
+    def _active_key(self) -> str:
+        return f"{self.prefix}:active"
+
+
+def create_progress_counters(settings: Optional[Any] = None) -> ProgressCounters:
+    """
+    Создать счетчики прогресса по настройкам (PROGRESS_COUNTERS_BACKEND).
+
+    ``auto`` выбирает Redis, если задан REDIS_URL: счетчики в памяти видны
+    только своему процессу.
+
+    Args:
+        settings: Настройки приложения (по умолчанию get_settings())
+    """
+    if settings is None:
+        from core.config import get_settings
+        settings = get_settings()
+
+    backend = settings.PROGRESS_COUNTERS_BACKEND
+    if backend == "auto":
+        backend = "redis" if settings.REDIS_URL else "memory"
+    if backend == "redis":
+        import redis.asyncio as aioredis
+
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            password=settings.REDIS_PASSWORD,
+            db=settings.REDIS_DB,
+            decode_responses=True,
+        )
+        return RedisProgressCounters(client, prefix=settings.PROGRESS_COUNTERS_PREFIX, ttl=settings.PROGRESS_COUNTERS_TTL)
+
+    if backend != "memory":
+        raise ValueError(f"Unsupported PROGRESS_COUNTERS_BACKEND: {backend}")
+
+    return InMemoryProgressCounters(ttl=settings.PROGRESS_COUNTERS_TTL)
+
+
+# Singleton instance
+_progress_counters: Optional[ProgressCounters] = None
+
+
+def get_progress_counters() -> ProgressCounters:
+    """Получить общие счетчики прогресса batch обработки."""
+    global _progress_counters
+
+    if _progress_counters is None:
+        _progress_counters = create_progress_counters()
+
+    return _progress_counters
@@ -0,0 +1,174 @@
+"""
+Staged streaming pipeline.
+
+Этапы соединены ограниченными asyncio.Queue: у каждого этапа свои
+``concurrency`` воркеров и размер micro-batch. Воркер забирает до
+``batch_size`` элементов (ожидая добор не дольше ``batch_timeout``), передает
+их обработчику одним вызовом и кладет результаты в очередь следующего этапа.
+Заполненная очередь приостанавливает предыдущий этап (backpressure), а
+результаты отдаются потребителю по мере готовности, поэтому пропускная
+способность определяется самым медленным этапом, а не суммой задержек.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_END = object()
+
+
+@dataclass
+class PipelineStage:
+    """
+    Stage definition.
+
+    Args:
+        name: Имя этапа (для статистики)
+        handler: async handler(batch) -> outputs той же длины
+        concurrency: Число параллельных воркеров этапа
+        batch_size: Максимальный размер micro-batch
+        batch_timeout: Сколько ждать добора batch после первого элемента (сек)
+        on_error: on_error(item, exc) -> output при исключении обработчика;
+            без него ошибка останавливает весь пайплайн
+    """
+    name: str
+    handler: Callable[[List[Any]], Awaitable[List[Any]]]
+    concurrency: int = 1
+    batch_size: int = 1
+    batch_timeout: float = 0.02
+    on_error: Optional[Callable[[Any, BaseException], Any]] = None
+    stats: Dict[str, float] = field(default_factory=lambda: {"items": 0, "batches": 0, "errors": 0, "busy_time": 0.0})
+
+
+class StagedPipeline:
+    """Run items through stages connected by bounded queues."""
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 100):
+        """
+        Args:
+            stages: Этапы в порядке выполнения
+            queue_size: Емкость очереди между этапами
+        """
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+
+    async def stream(self, items: Iterable[Any]) -> AsyncIterator[Any]:
+        """
+        Feed items into the pipeline and yield outputs of the last stage as they complete.
+
+        Порядок выдачи соответствует порядку завершения, а не входному.
+        """
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        tasks = [asyncio.create_task(self._feed(items, queues[0]))]
+        for index, stage in enumerate(self.stages):
+            tasks.append(asyncio.create_task(self._run_stage(stage, queues[index], queues[index + 1])))
+
+        output = queues[-1]
+        try:
+            while True:
+                get = asyncio.ensure_future(output.get())
+                running = [task for task in tasks if not task.done()]
+                await asyncio.wait([get, *running], return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    get.cancel()
+                    self._raise_failed(tasks)
+                    continue
+                item = get.result()
+                if item is _END:
+                    break
+                yield item
+            self._raise_failed(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """Collect all outputs (в порядке завершения)."""
+        return [item async for item in self.stream(items)]
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage item, batch, error counts and busy time."""
+        return {
+            stage.name: {
+                **stage.stats,
+                "avg_batch_size": stage.stats["items"] / stage.stats["batches"] if stage.stats["batches"] else 0.0,
+            }
+            for stage in self.stages
+        }
+
+    @staticmethod
+    def _raise_failed(tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+    @staticmethod
+    async def _feed(items: Iterable[Any], queue: asyncio.Queue) -> None:
+        for item in items:
+            await queue.put(item)
+        await queue.put(_END)
+
+    async def _run_stage(self, stage: PipelineStage, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        await asyncio.gather(*[
+            self._stage_worker(stage, inbox, outbox) for _ in range(max(1, stage.concurrency))
+        ])
+        await outbox.put(_END)
+
+    async def _stage_worker(self, stage: PipelineStage, inbox: asyncio.Queue, outbox: asyncio.Queue) -> None:
+        finished = False
+        while not finished:
+            batch, finished = await self._collect_batch(stage, inbox)
+            if not batch:
+                break
+
+            started = time.perf_counter()
+            try:
+                outputs = await stage.handler(batch)
+            except Exception as e:
+                if stage.on_error is None:
+                    raise
+                logger.error(f"Pipeline stage '{stage.name}' failed for batch of {len(batch)}: {e}")
+                stage.stats["errors"] += 1
+                outputs = [stage.on_error(item, e) for item in batch]
+            stage.stats["busy_time"] += time.perf_counter() - started
+            stage.stats["items"] += len(batch)
+            stage.stats["batches"] += 1
+
+            for output in outputs:
+                await outbox.put(output)
+
+        # Вернуть маркер конца для остальных воркеров этапа
+        await inbox.put(_END)
+
+    @staticmethod
+    async def _collect_batch(stage: PipelineStage, inbox: asyncio.Queue):
+        """Take up to batch_size items; returns (batch, end_reached)."""
+        first = await inbox.get()
+        if first is _END:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            try:
+                item = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(inbox.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _END:
+                return batch, True
+            batch.append(item)
+        return batch, False
@@ -12,6 +12,8 @@ from contextlib import asynccontextmanager
 
 from core.logging import get_logger
 
+from .job_queue import DEFAULT_TENANT, Job, JobPriority, JobQueue, create_job_queue
+
 logger = get_logger(__name__)
 
 
@@ -59,12 +61,29 @@ class TaskManager:
     """
     Менеджер для управления background tasks и async processing.
     Поддерживает создание, отслеживание и управление асинхронными задачами.
+
+    Локальные задачи сверх max_concurrent_tasks ждут свободного слота вместо
+    отказа. Долгие задачи ставятся в durable очередь через submit_job и
+    выполняются воркерами (в процессе или отдельными).
     """
     
-    def __init__(self, max_concurrent_tasks: int = 10):
+    def __init__(
+        self,
+        max_concurrent_tasks: int = 10,
+        max_queued_tasks: int = 1000,
+        job_queue: Optional[JobQueue] = None
+    ):
         self.max_concurrent_tasks = max_concurrent_tasks
+        self.max_queued_tasks = max_queued_tasks
         self.logger = logger
         
+        # Слоты выполнения локальных задач
+        self._slots = asyncio.Semaphore(max_concurrent_tasks)
+        
+        # Durable очередь задач и встроенный воркер
+        self.job_queue = job_queue
+        self.worker = None
+        
         # Активные задачи
         self.tasks: Dict[str, asyncio.Task] = {}
         self.task_info: Dict[str, TaskInfo] = {}
@@ -75,7 +94,9 @@ class TaskManager:
             'active_tasks': 0,
             'completed_tasks': 0,
             'failed_tasks': 0,
-            'cancelled_tasks': 0
+            'cancelled_tasks': 0,
+            'queued_tasks': 0,
+            'submitted_jobs': 0
         }
         
         # Cleanup задача
@@ -90,6 +111,9 @@ class TaskManager:
             # Запускаем cleanup задачу
             self.cleanup_task = asyncio.create_task(self._cleanup_loop())
             
+            # Запускаем встроенный воркер очереди задач
+            await self._start_in_process_worker()
+            
             self.logger.info("Task Manager started successfully")
             
         except Exception as e:
@@ -109,6 +133,13 @@ class TaskManager:
                 except asyncio.CancelledError:
                     pass
             
+            # Останавливаем воркер: незавершенные задачи возвращаются в очередь
+            if self.worker is not None:
+                await self.worker.stop()
+                self.worker = None
+            if self.job_queue is not None:
+                await self.job_queue.close()
+            
             # Отменяем все активные задачи
             await self.cancel_all_tasks()
             
@@ -134,13 +165,16 @@ class TaskManager:
             coro: Корутина для выполнения
             metadata: Дополнительные метаданные
             
+        Задача сверх max_concurrent_tasks остается в статусе PENDING до
+        освобождения слота; отказ только при переполнении max_queued_tasks.
+        
         Returns:
             True если задача создана успешно
         """
         try:
-            # Проверяем лимиты
-            if len(self.tasks) >= self.max_concurrent_tasks:
-                self.logger.warning(f"Max concurrent tasks reached: {len(self.tasks)}")
+            # Проверяем лимит очереди ожидания
+            if self.stats['queued_tasks'] >= self.max_queued_tasks:
+                self.logger.warning(f"Task queue is full: {self.stats['queued_tasks']} waiting tasks")
                 return False
             
             # Проверяем уникальность ID
@@ -168,7 +202,7 @@ class TaskManager:
             
             # Обновляем статистику
             self.stats['total_tasks'] += 1
-            self.stats['active_tasks'] += 1
+            self.stats['queued_tasks'] += 1
             
             self.logger.info(f"Created task {task_id}: {task_name}")
             return True
@@ -189,8 +223,15 @@ class TaskManager:
             Результат выполнения задачи
         """
         task_info = self.task_info[task_id]
+        slot_acquired = False
         
         try:
+            # Ждем свободного слота
+            await self._slots.acquire()
+            slot_acquired = True
+            self.stats['queued_tasks'] -= 1
+            self.stats['active_tasks'] += 1
+            
             # Обновляем статус на "running"
             task_info.status = TaskStatus.RUNNING
             task_info.started_at = datetime.utcnow()
@@ -213,11 +254,16 @@ class TaskManager:
             return result
             
         except asyncio.CancelledError:
-            # Задача отменена
+            # Задача отменена (в том числе до получения слота)
             task_info.status = TaskStatus.CANCELLED
             task_info.completed_at = datetime.utcnow()
             
-            self.stats['active_tasks'] -= 1
+            if slot_acquired:
+                self.stats['active_tasks'] -= 1
+            else:
+                self.stats['queued_tasks'] -= 1
+                if asyncio.iscoroutine(coro):
+                    coro.close()
             self.stats['cancelled_tasks'] += 1
             
             self.logger.warning(f"Task {task_id} was cancelled")
@@ -234,6 +280,65 @@ class TaskManager:
             
             self.logger.error(f"Task {task_id} failed: {str(e)}")
             raise
+        
+        finally:
+            if slot_acquired:
+                self._slots.release()
+    
+    async def submit_job(
+        self,
+        name: str,
+        payload: Dict[str, Any],
+        tenant: str = DEFAULT_TENANT,
+        priority: JobPriority = JobPriority.NORMAL
+    ) -> str:
+        """
+        Поставить задачу в durable очередь.
+        
+        Args:
+            name: Имя зарегистрированного обработчика (register_job_handler)
+            payload: JSON-сериализуемые параметры задачи
+            tenant: Тенант для справедливого распределения
+            priority: Приоритетная полоса
+            
+        Returns:
+            ID задачи
+        """
+        job = Job(name=name, payload=payload, tenant=tenant or DEFAULT_TENANT, priority=priority)
+        job_id = await self.get_job_queue().enqueue(job)
+        self.stats['submitted_jobs'] += 1
+        self.logger.info(f"Submitted job {job_id} ({name}, tenant={job.tenant}, priority={priority.value})")
+        return job_id
+    
+    def get_job_queue(self) -> JobQueue:
+        """Получить очередь задач (создается по настройкам при первом обращении)."""
+        if self.job_queue is None:
+            self.job_queue = create_job_queue()
+        return self.job_queue
+    
+    async def get_job_queue_stats(self) -> Dict[str, Any]:
+        """Статистика очереди задач и встроенного воркера."""
+        stats = await self.get_job_queue().get_stats()
+        if self.worker is not None:
+            stats['worker'] = self.worker.get_statistics()
+        return stats
+    
+    async def _start_in_process_worker(self) -> None:
+        """Запустить воркер очереди внутри процесса API (JOB_WORKERS_IN_PROCESS)."""
+        from core.config import get_settings
+        from .worker import JobWorker, default_consumer_name
+        
+        settings = get_settings()
+        if not settings.JOB_WORKERS_IN_PROCESS or self.worker is not None:
+            return
+        
+        self.worker = JobWorker(
+            self.get_job_queue(),
+            concurrency=settings.JOB_WORKER_CONCURRENCY,
+            consumer_name=default_consumer_name("api"),
+            shutdown_grace=settings.JOB_SHUTDOWN_GRACE
+        )
+        await self.worker.start()
     
     async def cancel_task(self, task_id: str) -> bool:
         """
@@ -347,7 +452,9 @@ class TaskManager:
         return {
             **self.stats,
             'active_task_ids': list(self.tasks.keys()),
-            'max_concurrent_tasks': self.max_concurrent_tasks
+            'max_concurrent_tasks': self.max_concurrent_tasks,
+            'max_queued_tasks': self.max_queued_tasks,
+            'worker': self.worker.get_statistics() if self.worker is not None else None
         }
     
     async def wait_for_task(self, task_id: str, timeout: Optional[float] = None) -> Any:
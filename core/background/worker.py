@@ -0,0 +1,233 @@
+"""
+Job worker for the durable job queue.
+
+Воркер забирает задачи из очереди и выполняет зарегистрированные обработчики
+в ``concurrency`` параллельных слотах. Запускается внутри API (TaskManager,
+JOB_WORKERS_IN_PROCESS=true) или отдельным процессом:
+
+    python -m core.background.worker --concurrency 4 --name worker-1
+
+При остановке воркер дожидается текущих задач в течение grace периода,
+невыполненные задачи возвращаются в очередь.
+"""
+
+import argparse
+import asyncio
+import importlib
+import os
+import signal
+import socket
+from typing import Any, Dict, Optional, Set
+
+from core.logging import get_logger
+
+from .job_queue import Job, JobQueue, create_job_queue, get_job_handler
+
+logger = get_logger(__name__)
+
+# Модули, регистрирующие обработчики задач при импорте
+JOB_HANDLER_MODULES = (
+    "services.batch_processing_service",
+)
+
+
+def load_job_handlers() -> None:
+    """Импортировать модули с обработчиками задач."""
+    for module_name in JOB_HANDLER_MODULES:
+        importlib.import_module(module_name)
+
+
+def default_consumer_name(role: str = "worker") -> str:
+    """
+    Имя consumer по умолчанию.
+
+    Имя должно быть уникальным среди одновременно работающих воркеров, в том
+    числе среди uvicorn workers одного хоста, поэтому в него входит pid.
+    Незавершенные задачи прошлого процесса забираются по visibility timeout
+    (XAUTOCLAIM), а не по совпадению имени.
+    """
+    return f"{socket.gethostname()}-{role}-{os.getpid()}"
+
+
+class JobWorker:
+    """Исполнитель задач очереди с ограничением параллелизма и heartbeat."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = 4,
+        consumer_name: Optional[str] = None,
+        poll_interval: float = 0.5,
+        shutdown_grace: float = 30.0,
+    ):
+        """
+        Args:
+            queue: Очередь задач
+            concurrency: Число одновременно выполняемых задач
+            consumer_name: Имя consumer в очереди
+            poll_interval: Пауза опроса пустой очереди в секундах
+            shutdown_grace: Сколько ждать текущие задачи при остановке
+        """
+        self.queue = queue
+        self.concurrency = concurrency
+        self.consumer_name = consumer_name or default_consumer_name()
+        self.poll_interval = poll_interval
+        self.shutdown_grace = shutdown_grace
+        self.heartbeat_interval = max(queue.visibility_timeout / 3, 0.01)
+
+        self._running = False
+        self._slots: Set[asyncio.Task] = set()
+        self.stats = {
+            "processed": 0,
+            "failed": 0,
+            "dead_lettered": 0,
+            "in_progress": 0,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        """Запустить слоты воркера."""
+        if self._running:
+            return
+        self._running = True
+        await self.queue.resume(self.consumer_name)
+        self._slots = {
+            asyncio.create_task(self._slot_loop(), name=f"job-worker-{self.consumer_name}-{i}")
+            for i in range(self.concurrency)
+        }
+        logger.info(f"Job worker {self.consumer_name} started with {self.concurrency} slots")
+
+    async def stop(self) -> None:
+        """Остановить воркер: дождаться текущих задач, остальные вернуть в очередь."""
+        if not self._running:
+            return
+        self._running = False
+
+        if self._slots:
+            _, pending = await asyncio.wait(self._slots, timeout=self.shutdown_grace)
+            for slot in pending:
+                slot.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._slots = set()
+        logger.info(f"Job worker {self.consumer_name} stopped")
+
+    async def run_until_stopped(self, stop_event: asyncio.Event) -> None:
+        """Работать до установки stop_event."""
+        await self.start()
+        await stop_event.wait()
+        await self.stop()
+
+    async def run_once(self) -> bool:
+        """
+        Выполнить одну задачу, если она есть.
+
+        Returns:
+            True если задача была взята из очереди
+        """
+        job = await self.queue.dequeue(self.consumer_name)
+        if job is None:
+            return False
+        await self._execute(job)
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Статистика воркера."""
+        return {
+            **self.stats,
+            "consumer": self.consumer_name,
+            "concurrency": self.concurrency,
+            "running": self._running,
+        }
+
+    async def _slot_loop(self) -> None:
+        while self._running:
+            try:
+                if not await self.run_once():
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {self.consumer_name} loop error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _execute(self, job: Job) -> None:
+        handler = get_job_handler(job.name)
+        if handler is None:
+            await self._fail(job, f"No handler registered for job '{job.name}'")
+            return
+
+        self.stats["in_progress"] += 1
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            logger.info(f"Job {job.id} ({job.name}, tenant={job.tenant}, attempt {job.attempts + 1}) started")
+            await handler(job.payload)
+        except asyncio.CancelledError:
+            # Остановка воркера: задача будет выполнена заново другим воркером
+            await asyncio.shield(self.queue.release(job))
+            raise
+        except Exception as e:
+            await self._fail(job, str(e))
+        else:
+            await self.queue.ack(job)
+            self.stats["processed"] += 1
+            logger.info(f"Job {job.id} ({job.name}) completed")
+        finally:
+            heartbeat.cancel()
+            self.stats["in_progress"] -= 1
+
+    async def _fail(self, job: Job, error: str) -> None:
+        self.stats["failed"] += 1
+        logger.warning(f"Job {job.id} ({job.name}) failed: {error}")
+        if not await self.queue.retry(job, error):
+            self.stats["dead_lettered"] += 1
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.queue.extend(job, self.consumer_name)
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job.id} failed: {e}")
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from core.config import get_settings
+
+    settings = get_settings()
+    load_job_handlers()
+
+    queue = create_job_queue(settings)
+    worker = JobWorker(
+        queue,
+        concurrency=args.concurrency or settings.JOB_WORKER_CONCURRENCY,
+        consumer_name=args.name or default_consumer_name(),
+        shutdown_grace=settings.JOB_SHUTDOWN_GRACE,
+    )
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    try:
+        await worker.run_until_stopped(stop_event)
+    finally:
+        await queue.close()
+
+
+def main() -> None:
+    """CLI entry point: python -m core.background.worker."""
+    parser = argparse.ArgumentParser(description="Run background job worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="Concurrent jobs (JOB_WORKER_CONCURRENCY)")
+    parser.add_argument("--name", default=None, help="Stable unique consumer name")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
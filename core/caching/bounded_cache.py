@@ -0,0 +1,181 @@
+"""
+Bounded in-process TTL/LRU cache.
+
+Ограниченный по числу записей и объему памяти LRU-кэш с TTL для процессных
+кэшей сервисов. Все операции O(1): порядок LRU хранится в OrderedDict,
+вытеснение идет по одной записи с головы без сортировки. Векторы хранятся
+как float32 numpy массивы (4 байта на компоненту вместо ~32 у list[float]).
+"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.logging import get_logger
+from core.caching.multi_level_cache import CacheStats
+
+logger = get_logger(__name__)
+
+# Approximate per-entry bookkeeping overhead: OrderedDict node, key, entry tuple
+ENTRY_OVERHEAD_BYTES = 200
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate memory footprint of a cached value in bytes."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class BoundedTTLCache:
+    """
+    LRU cache bounded by entry count and byte budget with per-entry TTL.
+
+    Expired entries are dropped lazily on access and are pushed to the LRU head
+    by fresher traffic, so no periodic sweep is needed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        size_of: Callable[[Any], int] = estimate_size,
+        name: str = "bounded_cache",
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+        self._size_of = size_of
+
+        # key -> (value, expires_at, size_bytes)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self.stats = CacheStats()
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not self._is_expired(entry)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value and mark it as most recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+
+        if self._is_expired(entry):
+            self._remove(key)
+            self.expirations += 1
+            self.stats.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Store value, evicting least recently used entries to fit the budget.
+
+        Returns:
+            False if the value alone exceeds the byte budget
+        """
+        size_bytes = self._size_of(value) + ENTRY_OVERHEAD_BYTES
+        if self.max_bytes is not None and size_bytes > self.max_bytes:
+            logger.warning(f"Value too large for {self.name}: {size_bytes} bytes")
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        while self._entries and (
+            len(self._entries) >= self.max_entries
+            or (self.max_bytes is not None and self.stats.size_bytes + size_bytes > self.max_bytes)
+        ):
+            lru_key = next(iter(self._entries))
+            self._remove(lru_key)
+            self.stats.evictions += 1
+
+        self._entries[key] = (value, expires_at, size_bytes)
+        self.stats.size_bytes += size_bytes
+        self.stats.entry_count = len(self._entries)
+        return True
+
+    def get_vector(self, key: Hashable) -> Optional[List[float]]:
+        """Get cached float32 vector as a list of floats."""
+        vector = self.get(key)
+        return vector.tolist() if vector is not None else None
+
+    def put_vector(self, key: Hashable, vector: Sequence[float], ttl_seconds: Optional[float] = None) -> bool:
+        """Store vector compactly as a float32 array."""
+        return self.put(key, np.asarray(vector, dtype=np.float32), ttl_seconds)
+
+    def delete(self, key: Hashable) -> bool:
+        """Delete entry by key."""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries (metrics are kept)."""
+        self._entries.clear()
+        self.stats.size_bytes = 0
+        self.stats.entry_count = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction metrics."""
+        total_requests = self.stats.hits + self.stats.misses
+        self.stats.hit_rate = self.stats.hits / total_requests if total_requests > 0 else 0.0
+
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "size_bytes": self.stats.size_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "evictions": self.stats.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.stats.hit_rate,
+        }
+
+    def publish_metrics(self) -> None:
+        """Export cache metrics as gauges to the shared metrics collector."""
+        try:
+            from core.monitoring.metrics import get_metrics_collector
+
+            collector = get_metrics_collector()
+            labels = {"cache": self.name}
+            for metric, value in self.get_stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    collector.set_gauge(f"cache.{metric}", float(value), labels)
+        except Exception as e:
+            logger.debug(f"Failed to publish metrics for {self.name}: {e}")
+
+    def _is_expired(self, entry: Tuple[Any, Optional[float], int]) -> bool:
+        expires_at = entry[1]
+        return expires_at is not None and time.monotonic() >= expires_at
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, size_bytes = self._entries.pop(key)
+        self.stats.size_bytes -= size_bytes
+        self.stats.entry_count = len(self._entries)
@@ -111,6 +111,8 @@ class HuggingFaceConfig(BaseAIConfig):
     def get_huggingface_config(
         model: str = None, 
         device: str = "cpu",
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
         **kwargs
     ) -> Dict[str, Any]:
         """Get HuggingFace configuration.
@@ -118,6 +120,8 @@ class HuggingFaceConfig(BaseAIConfig):
         Args:
             model: HuggingFace model name
             device: Device to run on ('cpu' or 'cuda')
+            max_batch_size: Maximum texts per batch of the local embedding worker
+            max_latency_ms: Batch collection window of the local embedding worker
             **kwargs: Additional model configuration
             
         Returns:
@@ -129,6 +133,8 @@ class HuggingFaceConfig(BaseAIConfig):
             **base,
             "model": model or ModelNames.HUGGINGFACE_DEFAULT,
             "device": device,
+            "max_batch_size": max_batch_size,
+            "max_latency_ms": max_latency_ms,
         }
 
 class OllamaConfig(BaseAIConfig):
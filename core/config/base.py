@@ -6,7 +6,7 @@ It uses a modular approach with separate modules for different concerns.
 """
 
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict, field_validator
 
@@ -136,6 +136,47 @@ class Settings(BaseSettings):
         default=DefaultTimeouts.DATABASE,
         description="Qdrant connection timeout"
     )
+    QDRANT_ASYNC_CLIENT: bool = Field(
+        default=False,
+        description="Use native AsyncQdrantClient adapter instead of thread-wrapped sync client"
+    )
+    QDRANT_PREFER_GRPC: bool = Field(
+        default=False,
+        description="Use gRPC transport for the async Qdrant client"
+    )
+    QDRANT_GRPC_PORT: int = Field(default=6334, description="Qdrant gRPC port")
+    QDRANT_POOL_SIZE: int = Field(
+        default=100,
+        description="Connection pool size of the async Qdrant client"
+    )
+    QDRANT_UPSERT_PARALLELISM: int = Field(
+        default=4,
+        description="Concurrent upsert requests for chunked upserts"
+    )
+    QDRANT_COLLECTION_PROFILE: Literal["float32", "int8", "binary"] = Field(
+        default="float32",
+        description="Storage profile of new material collections (quantization, on-disk originals, HNSW)"
+    )
+    QDRANT_PRICE_COLLECTION_PROFILE: Optional[Literal["float32", "int8", "binary"]] = Field(
+        default=None,
+        description="Storage profile of supplier price collections (default: QDRANT_COLLECTION_PROFILE)"
+    )
+    QDRANT_HNSW_M: Optional[int] = Field(
+        default=None, ge=4, le=128,
+        description="HNSW graph degree of new collections (default: profile value)"
+    )
+    QDRANT_HNSW_EF_CONSTRUCT: Optional[int] = Field(
+        default=None, ge=4,
+        description="HNSW build-time candidate list size of new collections (default: profile value)"
+    )
+    QDRANT_HNSW_EF: Optional[int] = Field(
+        default=None, ge=1,
+        description="HNSW search-time candidate list size (default: server value)"
+    )
+    ENSURE_PAYLOAD_INDEXES: bool = Field(
+        default=True,
+        description="Create and verify payload indexes on filterable material fields at startup"
+    )
     
     # Alternative vector databases
     WEAVIATE_URL: Optional[str] = Field(default=None, description="Weaviate instance URL")
@@ -164,6 +205,21 @@ class Settings(BaseSettings):
         default=ConnectionPools.POSTGRESQL_MAX_OVERFLOW,
         description="PostgreSQL max pool overflow"
     )
+    POSTGRESQL_PGVECTOR_SEARCH: bool = Field(
+        default=False,
+        description=(
+            "Hybrid search in one PostgreSQL query (pgvector distance + trigram score) instead of Qdrant + SQL fan-out; "
+            "requires migration 006 and embeddings stored in PostgreSQL"
+        )
+    )
+    POSTGRESQL_HNSW_EF_SEARCH: Optional[int] = Field(
+        default=None, ge=1,
+        description="pgvector hnsw.ef_search for vector and hybrid queries (default: server value, 40)"
+    )
+    POSTGRESQL_COPY_CHUNK_SIZE: int = Field(
+        default=10000, ge=1,
+        description="Rows per COPY + upsert transaction in bulk loads of materials and raw products"
+    )
     
     # === REDIS CONFIGURATION ===
     REDIS_URL: Optional[str] = Field(
@@ -278,6 +334,16 @@ class Settings(BaseSettings):
         default="cpu",
         description="HuggingFace device"
     )
+    HUGGINGFACE_MAX_BATCH_SIZE: int = Field(
+        default=64,
+        ge=1,
+        description="Максимум текстов в одном батче локального воркера эмбеддингов"
+    )
+    HUGGINGFACE_MAX_LATENCY_MS: float = Field(
+        default=5.0,
+        ge=0,
+        description="Сколько воркер ждет добора батча после первого запроса (мс)"
+    )
     
     # Ollama settings
     OLLAMA_URL: Optional[str] = Field(default=None, description="Ollama server URL")
@@ -324,6 +390,44 @@ class Settings(BaseSettings):
         default=ConnectionPools.MAX_CONCURRENT_UPLOADS,
         description="Maximum concurrent uploads"
     )
+    CPU_POOL_WORKERS: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Processes for CPU-bound work (None - CPU count, 0 - run in a thread)"
+    )
+    CPU_POOL_CHUNK_SIZE: int = Field(
+        default=512,
+        ge=1,
+        description="Items per chunk when CPU-bound work is split across processes"
+    )
+    FUZZY_INDEX_ENABLED: bool = Field(
+        default=True,
+        description="Build in-memory trigram index for fuzzy search over material names"
+    )
+    FUZZY_INDEX_MAX_CANDIDATES: int = Field(
+        default=2000,
+        ge=1,
+        description="Candidates shortlisted by trigram overlap and scored per fuzzy query"
+    )
+    FUZZY_INDEX_REBUILD_INTERVAL: float = Field(
+        default=600.0,
+        ge=0,
+        description="Seconds between fuzzy index rebuilds picking up changes of other workers (0 - build once)"
+    )
+    FACET_INDEX_ENABLED: bool = Field(
+        default=True,
+        description="Keep in-memory facet counts (category, unit, color, supplier) for search responses"
+    )
+    FACET_INDEX_REBUILD_INTERVAL: float = Field(
+        default=600.0,
+        ge=0,
+        description="Seconds between facet index rebuilds picking up changes of other workers (0 - build once)"
+    )
+    FACET_SEARCH_CANDIDATES: int = Field(
+        default=500,
+        ge=1,
+        description="Search candidates facet counts are computed over before the result page is cut"
+    )
     
     # === SECURITY SETTINGS ===
     MAX_REQUEST_SIZE_MB: int = Field(
@@ -338,6 +442,26 @@ class Settings(BaseSettings):
         default=True,
         description="Enable input validation"
     )
+    MIDDLEWARE_PIPELINE: Literal["fused", "stack"] = Field(
+        default="fused",
+        description="fused - one pure ASGI middleware over a shared request context; stack - separate BaseHTTPMiddleware layers"
+    )
+    REQUEST_LOG_SAMPLE_RATE: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Share of ordinary requests kept in the request log (errors and slow requests are always kept)"
+    )
+    REQUEST_LOG_SLOW_MS: float = Field(
+        default=1000.0,
+        gt=0,
+        description="Requests slower than this are always kept in the request log"
+    )
+    REQUEST_LOG_BODY_PREVIEW_BYTES: int = Field(
+        default=256,
+        ge=0,
+        description="Request/response body preview size in the request log (0 - no previews)"
+    )
     
     # === RATE LIMITING ===
     ENABLE_RATE_LIMITING: bool = Field(
@@ -356,7 +480,74 @@ class Settings(BaseSettings):
         default=RateLimits.BURST_LIMIT,
         description="Burst requests limit"
     )
-    
+    RATE_LIMIT_MODE: Literal["redis", "hybrid"] = Field(
+        default="hybrid",
+        description="redis - Redis round-trip per request; hybrid - local token buckets leasing quota from Redis"
+    )
+    RATE_LIMIT_LEASE_SIZE: int = Field(
+        default=10,
+        ge=1,
+        description="Requests leased from the shared Redis quota per round-trip (hybrid mode)"
+    )
+    RATE_LIMIT_FAIL_OPEN: bool = Field(
+        default=True,
+        description="Allow requests when Redis is unavailable (false - reject with 503)"
+    )
+
+    # === BACKGROUND JOB QUEUE ===
+    JOB_QUEUE_BACKEND: Literal["memory", "redis"] = Field(
+        default="memory",
+        description="Background job queue backend (redis for durable multi-worker queue)"
+    )
+    JOB_QUEUE_PREFIX: str = Field(
+        default="jobs",
+        description="Redis key prefix of the job queue streams"
+    )
+    JOB_VISIBILITY_TIMEOUT: float = Field(
+        default=300.0,
+        gt=0,
+        description="Seconds without heartbeat after which a job is reclaimed by another worker"
+    )
+    JOB_MAX_ATTEMPTS: int = Field(
+        default=3,
+        ge=1,
+        description="Attempts before a job is moved to the dead-letter stream"
+    )
+    JOB_WORKER_CONCURRENCY: int = Field(
+        default=5,
+        ge=1,
+        description="Concurrent jobs per worker"
+    )
+    JOB_WORKERS_IN_PROCESS: bool = Field(
+        default=True,
+        description="Run a job worker inside the API process"
+    )
+    JOB_SHUTDOWN_GRACE: float = Field(
+        default=30.0,
+        ge=0,
+        description="Seconds to wait for running jobs on shutdown before returning them to the queue"
+    )
+
+    # === PROGRESS COUNTERS ===
+    PROGRESS_COUNTERS_BACKEND: Literal["auto", "memory", "redis"] = Field(
+        default="auto",
+        description="Storage of batch progress counters and result streams (auto - redis when REDIS_URL is set; memory is single-process only)"
+    )
+    PROGRESS_COUNTERS_PREFIX: str = Field(
+        default="progress",
+        description="Redis key prefix of the progress counters"
+    )
+    PROGRESS_COUNTERS_TTL: int = Field(
+        default=604800,
+        ge=60,
+        description="Seconds to keep per-request counters after the last status change"
+    )
+    PROGRESS_RECONCILE_INTERVAL: float = Field(
+        default=300.0,
+        ge=0,
+        description="Seconds between counter reconciliations against processing records (0 - disabled)"
+    )
+
     # === MODEL CONFIGURATION ===
     model_config = ConfigDict(
         case_sensitive=True,
@@ -442,7 +633,16 @@ class Settings(BaseSettings):
                 api_key=self.QDRANT_API_KEY,
                 collection_name=self.QDRANT_COLLECTION_NAME,
                 vector_size=self.QDRANT_VECTOR_SIZE,
-                timeout=self.QDRANT_TIMEOUT
+                timeout=self.QDRANT_TIMEOUT,
+                async_client=self.QDRANT_ASYNC_CLIENT,
+                prefer_grpc=self.QDRANT_PREFER_GRPC,
+                grpc_port=self.QDRANT_GRPC_PORT,
+                pool_size=self.QDRANT_POOL_SIZE,
+                upsert_parallelism=self.QDRANT_UPSERT_PARALLELISM,
+                collection_profile=self.QDRANT_COLLECTION_PROFILE,
+                hnsw_m=self.QDRANT_HNSW_M,
+                hnsw_ef_construct=self.QDRANT_HNSW_EF_CONSTRUCT,
+                hnsw_ef=self.QDRANT_HNSW_EF
             )
         elif self.DATABASE_TYPE == DatabaseType.WEAVIATE:
             if not all([self.WEAVIATE_URL, self.WEAVIATE_API_KEY]):
@@ -511,7 +711,9 @@ class Settings(BaseSettings):
         elif self.AI_PROVIDER == AIProvider.HUGGINGFACE:
             return AIConfig.get_huggingface_config(
                 model=self.HUGGINGFACE_MODEL,
-                device=self.HUGGINGFACE_DEVICE
+                device=self.HUGGINGFACE_DEVICE,
+                max_batch_size=self.HUGGINGFACE_MAX_BATCH_SIZE,
+                max_latency_ms=self.HUGGINGFACE_MAX_LATENCY_MS
             )
         elif self.AI_PROVIDER == AIProvider.OLLAMA:
             return AIConfig.get_ollama_config(
@@ -568,6 +770,9 @@ class Settings(BaseSettings):
     LOG_BATCH_SIZE: int = Field(default=100, description="Log batch size")
     LOG_FLUSH_INTERVAL: float = Field(default=1.0, description="Log flush interval in seconds")
     LOG_MAX_QUEUE_SIZE: int = Field(default=10000, description="Maximum log queue size")
+    LOG_OVERFLOW_POLICY: Literal["drop", "block"] = Field(
+        default="drop", description="Full log ring buffer: drop new records or block the producer"
+    )
     
     # Performance thresholds
     LOG_SLOW_OPERATION_THRESHOLD_MS: int = Field(default=1000, description="Slow operation threshold in ms")
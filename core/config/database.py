@@ -7,7 +7,7 @@ This module provides configuration factories for all supported databases:
 - Cache databases: Redis
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .constants import (
     DefaultTimeouts, 
     DatabaseNames, 
@@ -44,7 +44,16 @@ class VectorDatabaseConfig(BaseDatabaseConfig):
         api_key: str, 
         collection_name: str = None,
         vector_size: int = 1536,
-        timeout: int = None
+        timeout: int = None,
+        async_client: bool = False,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        pool_size: int = 100,
+        upsert_parallelism: int = 4,
+        collection_profile: str = "float32",
+        hnsw_m: Optional[int] = None,
+        hnsw_ef_construct: Optional[int] = None,
+        hnsw_ef: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get Qdrant configuration.
         
@@ -54,6 +63,15 @@ class VectorDatabaseConfig(BaseDatabaseConfig):
             collection_name: Collection name for materials
             vector_size: Vector dimension size
             timeout: Connection timeout in seconds
+            async_client: Use native async client adapter
+            prefer_grpc: Use gRPC transport (async client only)
+            grpc_port: Qdrant gRPC port
+            pool_size: Async client connection pool size
+            upsert_parallelism: Concurrent upsert requests
+            collection_profile: Storage profile of new collections (float32, int8, binary)
+            hnsw_m: HNSW graph degree override
+            hnsw_ef_construct: HNSW build-time candidate list size override
+            hnsw_ef: HNSW search-time candidate list size override
             
         Returns:
             Qdrant configuration dictionary
@@ -69,6 +87,15 @@ class VectorDatabaseConfig(BaseDatabaseConfig):
             "api_key": api_key,
             "collection_name": collection_name or DatabaseNames.QDRANT_COLLECTION,
             "vector_size": vector_size,
+            "async_client": async_client,
+            "prefer_grpc": prefer_grpc,
+            "grpc_port": grpc_port,
+            "pool_size": pool_size,
+            "upsert_parallelism": upsert_parallelism,
+            "collection_profile": collection_profile,
+            "hnsw_m": hnsw_m,
+            "hnsw_ef_construct": hnsw_ef_construct,
+            "hnsw_ef": hnsw_ef,
         }
     
     @staticmethod
@@ -112,11 +112,8 @@ def get_ai_client(settings: Optional[Settings] = None):
     
     elif settings.AI_PROVIDER == AIProvider.HUGGINGFACE:
         try:
-            from sentence_transformers import SentenceTransformer
-            return SentenceTransformer(
-                config["model"],
-                device=config["device"]
-            )
+            from core.background.embedding_worker import get_local_embedding_worker
+            return get_local_embedding_worker(config)
         except ImportError:
             raise ImportError("sentence-transformers package is required for HuggingFace support")
     
@@ -50,6 +50,7 @@ class ParserConstants:
     # Cache settings
     DEFAULT_CACHE_TTL = 3600  # 1 hour
     DEFAULT_EMBEDDING_CACHE_TTL = 86400  # 24 hours
+    DEFAULT_PARSE_CACHE_TTL = 30 * 86400  # 30 days
 
 
 class ParserModelConfig(BaseModel):
@@ -218,6 +219,18 @@ class ParserCacheConfig(BaseModel):
         le=100000,
         description="Maximum number of cached items"
     )
+    
+    near_duplicate_cutoff: float = Field(
+        default=0.95,
+        ge=0.5,
+        le=1.0,
+        description="Minimum SimHash similarity for reusing a cached parse of a near-duplicate name"
+    )
+    
+    persistent_cache_ttl: int = Field(
+        default=ParserConstants.DEFAULT_PARSE_CACHE_TTL,
+        description="Persistent parse cache time-to-live in seconds"
+    )
 
 
 class ParserDebugConfig(BaseModel):
@@ -1,18 +1,34 @@
 """Database adapters for different database implementations.
 
 Адаптеры для реализации различных типов БД.
+
+Адаптеры загружаются лениво: модуль адаптера (и его клиентская библиотека -
+qdrant-client, weaviate-client, pinecone, sqlalchemy, redis) импортируется
+при первом обращении к классу, поэтому развертывание с одной БД не платит
+за импорт остальных.
 """
 
-from .qdrant_adapter import QdrantVectorDatabase
-from .postgresql_adapter import PostgreSQLAdapter
-from .redis_adapter import RedisDatabase
-from .weaviate_adapter import WeaviateVectorDatabase
-from .pinecone_adapter import PineconeVectorDatabase
-
-__all__ = [
-    "QdrantVectorDatabase",
-    "PostgreSQLAdapter", 
-    "RedisDatabase",
-    "WeaviateVectorDatabase",
-    "PineconeVectorDatabase"
-] 
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+# Реестр адаптеров: имя класса -> модуль
+ADAPTER_MODULES = {
+    "QdrantVectorDatabase": "qdrant_adapter",
+    "AsyncQdrantVectorDatabase": "qdrant_async_adapter",
+    "PostgreSQLAdapter": "postgresql_adapter",
+    "RedisDatabase": "redis_adapter",
+    "WeaviateVectorDatabase": "weaviate_adapter",
+    "PineconeVectorDatabase": "pinecone_adapter",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = ADAPTER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    adapter = getattr(import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = adapter
+    return adapter
+
+
+__all__ = list(ADAPTER_MODULES)
@@ -4,11 +4,12 @@
 """
 
 from core.logging import get_logger
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 import json
 from datetime import datetime
 
 from core.database.interfaces import IVectorDatabase
+from core.database.filters import RESIDUAL_OVERFETCH, FilterSpec
 from core.database.exceptions import DatabaseError, ConnectionError, ConfigurationError
 
 logger = get_logger(__name__)
@@ -174,14 +175,22 @@ class PineconeVectorDatabase(IVectorDatabase):
             return False
     
     async def search(self, collection_name: str, query_vector: List[float], 
-                    limit: int = 10, filter_dict: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                    limit: int = 10, filter_dict: Optional[Dict[str, Any]] = None,
+                    with_vectors: bool = False, fields: Optional[Sequence[str]] = None,
+                    score_threshold: Optional[float] = None, oversampling: Optional[float] = None,
+                    rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
         """Search for similar vectors in Pinecone.
         
         Args:
             collection_name: Collection name (not used in Pinecone, using default index)
             query_vector: Query vector for similarity search
             limit: Maximum number of results to return
-            filter_dict: Optional metadata filters
+            filter_dict: Optional metadata filters (dict or FilterSpec)
+            with_vectors: Return stored vectors (include_values)
+            fields: Metadata keys to keep (Pinecone cannot project metadata server-side)
+            score_threshold: Minimum score (applied to the returned matches)
+            oversampling: Ignored (Qdrant quantization option)
+            rescore: Ignored (Qdrant quantization option)
             
         Returns:
             List of search results with vectors and metadata
@@ -190,17 +199,24 @@ class PineconeVectorDatabase(IVectorDatabase):
             if not self.index:
                 await self.connect()
             
+            residual = None
+            metadata_filter = None
+            if isinstance(filter_dict, FilterSpec):
+                metadata_filter, residual = filter_dict.to_pinecone()
+            elif filter_dict:
+                metadata_filter = self._build_filter(filter_dict)
+            
             # Build query parameters
             query_params = {
                 "vector": query_vector,
-                "top_k": limit,
+                "top_k": limit * RESIDUAL_OVERFETCH if residual else limit,
                 "include_metadata": True,
-                "include_values": True
+                "include_values": with_vectors
             }
             
             # Add filters if provided
-            if filter_dict:
-                query_params["filter"] = self._build_filter(filter_dict)
+            if metadata_filter:
+                query_params["filter"] = metadata_filter
             
             # Execute query
             response = self.index.query(**query_params)
@@ -208,14 +224,24 @@ class PineconeVectorDatabase(IVectorDatabase):
             # Process results
             results = []
             for match in response.get("matches", []):
+                if score_threshold is not None and match.get("score", 0.0) < score_threshold:
+                    continue
                 metadata = match.get("metadata", {})
+                if residual and not residual.matches(metadata):
+                    continue
+                if fields is not None:
+                    metadata = {key: metadata[key] for key in fields if key in metadata}
                 
-                results.append({
+                result = {
                     "id": match.get("id", ""),
-                    "vector": match.get("values", []),
                     "metadata": metadata,
                     "score": match.get("score", 0.0)
-                })
+                }
+                if with_vectors:
+                    result["vector"] = match.get("values", [])
+                results.append(result)
+                if len(results) >= limit:
+                    break
             
             logger.info(f"Found {len(results)} results for vector search")
             return results
@@ -389,12 +415,15 @@ class PineconeVectorDatabase(IVectorDatabase):
         """
         return await self.upsert(collection_name, vectors, batch_size)
     
-    async def get_by_id(self, collection_name: str, vector_id: str) -> Optional[Dict[str, Any]]:
+    async def get_by_id(self, collection_name: str, vector_id: str,
+                        with_vectors: bool = False, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
         """Get vector by ID from Pinecone.
         
         Args:
             collection_name: Collection name (not used in Pinecone)
             vector_id: Vector ID to retrieve
+            with_vectors: Return the stored vector (fetch always transfers it)
+            fields: Metadata keys to keep
             
         Returns:
             Vector data or None if not found
@@ -408,12 +437,17 @@ class PineconeVectorDatabase(IVectorDatabase):
             
             if response and "vectors" in response and vector_id in response["vectors"]:
                 vector_data = response["vectors"][vector_id]
+                metadata = vector_data.get("metadata", {})
+                if fields is not None:
+                    metadata = {key: metadata[key] for key in fields if key in metadata}
                 
-                return {
+                record = {
                     "id": vector_id,
-                    "vector": vector_data.get("values", []),
-                    "metadata": vector_data.get("metadata", {})
+                    "metadata": metadata
                 }
+                if with_vectors:
+                    record["vector"] = vector_data.get("values", [])
+                return record
             
             return None
             
@@ -3,22 +3,26 @@
 Адаптер для работы с PostgreSQL БД.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Iterable, Callable, Sized
 from core.logging import get_logger
 from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+import time
 import uuid
 from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import String, DateTime, Text, Integer, Numeric, Boolean, Float, Index, func, or_
-from sqlalchemy.dialects.postgresql import UUID, ARRAY, REAL
+from sqlalchemy import String, DateTime, Text, Integer, Numeric, Boolean, Float, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, REAL, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text
 
 from core.database.interfaces import IRelationalDatabase
+from core.database.pgvector import EMBEDDING_DIMENSIONS, Vector, to_vector_literal
 from core.database.exceptions import ConnectionError, QueryError, DatabaseError, TransactionError
 from core.config import Settings
 from services.ssh_tunnel_service import get_tunnel_service
@@ -29,6 +33,15 @@ logger = get_logger(__name__)
 # SQLAlchemy Base
 Base = declarative_base()
 
+# Веса полнотекстового поиска: название и артикул > категория и цвет > описание
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(use_category, '') || ' ' || coalesce(color, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'C')"
+)
+
+
 
 class MaterialModel(Base):
     """SQLAlchemy model for materials table.
@@ -54,13 +67,19 @@ class MaterialModel(Base):
     
     # Vector embedding for semantic search (pgvector support)
     embedding: Mapped[Optional[List[float]]] = mapped_column(ARRAY(REAL), nullable=True)
+    # pgvector копия эмбеддинга с HNSW индексом (не загружается ORM-запросами)
+    embedding_vector: Mapped[Optional[List[float]]] = mapped_column(
+        Vector(EMBEDDING_DIMENSIONS), nullable=True, deferred=True
+    )
     
     # Metadata
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    # Full-text search support
-    search_vector: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Will use PostgreSQL tsvector
+    # Full-text search support: генерируемый tsvector (русская морфология + simple для артикулов и марок)
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True), nullable=True, deferred=True
+    )
     
     # Indexes for performance
     __table_args__ = (
@@ -70,6 +89,14 @@ class MaterialModel(Base):
         Index('idx_materials_category_unit', 'use_category', 'unit'),
         Index('idx_materials_color_unit', 'color', 'unit'),
         Index('idx_materials_normalized_color_unit', 'normalized_color', 'normalized_parsed_unit'),
+        Index(
+            'idx_materials_embedding_hnsw', 'embedding_vector',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding_vector': 'vector_cosine_ops'},
+        ),
+        # Ключ upsert материалов без артикула (с артикулом - уникальный sku)
+        Index('uq_materials_name_unit', 'name', 'unit', unique=True, postgresql_where=text('sku IS NULL')),
     )
 
 
@@ -121,6 +148,11 @@ class RawProductModel(Base):
         Index('idx_raw_products_supplier_pricelist', 'supplier_id', 'pricelistid'),
         Index('idx_raw_products_name_gin', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
         Index('idx_raw_products_processed', 'is_processed'),
+        # Ключи upsert строк прайс-листа: артикул, без артикула - название и единица
+        Index('uq_raw_products_pricelist_sku', 'supplier_id', 'pricelistid', 'sku',
+              unique=True, postgresql_where=text('sku IS NOT NULL')),
+        Index('uq_raw_products_pricelist_name_unit', 'supplier_id', 'pricelistid', 'name',
+              text("COALESCE(calc_unit, '')"), unique=True, postgresql_where=text('sku IS NULL')),
     )
 
 
@@ -133,6 +165,11 @@ class PostgreSQLAdapter(IRelationalDatabase):
         self.session_factory = None
         self._connection_string = None
         self._tunnel_service = None
+    
+    @property
+    def pgvector_search(self) -> bool:
+        """Whether hybrid search ranks by pgvector distance in PostgreSQL."""
+        return bool(getattr(self.settings, 'POSTGRESQL_PGVECTOR_SEARCH', False))
         
     async def connect(self) -> bool:
         """Connect to PostgreSQL with automatic SSH tunnel detection."""
@@ -250,6 +287,7 @@ class PostgreSQLAdapter(IRelationalDatabase):
                 # Enable required PostgreSQL extensions
                 await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))  # Trigram similarity
                 await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))  # GIN indexes
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))  # pgvector
                 
                 # Create all tables
                 await conn.run_sync(Base.metadata.create_all)
@@ -413,9 +451,6 @@ class PostgreSQLAdapter(IRelationalDatabase):
         """
         try:
             async with self.get_session() as session:
-                # Prepare search vector for full-text search
-                search_text = f"{material_data.get('name', '')} {material_data.get('description', '')} {material_data.get('use_category', '')}"
-                
                 material = MaterialModel(
                     id=material_data.get('id', str(uuid.uuid4())),
                     name=material_data['name'],
@@ -429,7 +464,7 @@ class PostgreSQLAdapter(IRelationalDatabase):
                     normalized_parsed_unit=material_data.get('normalized_parsed_unit'),
                     unit_coefficient=material_data.get('unit_coefficient'),
                     embedding=material_data.get('embedding'),
-                    search_vector=search_text,
+                    embedding_vector=material_data.get('embedding'),
                     created_at=material_data.get('created_at', datetime.utcnow()),
                     updated_at=material_data.get('updated_at', datetime.utcnow())
                 )
@@ -464,6 +499,50 @@ class PostgreSQLAdapter(IRelationalDatabase):
                 details=str(e)
             )
     
+    # Колонки результатов поиска: без эмбеддингов (не нужны в ответе)
+    _SEARCH_COLUMNS = (
+        "m.id, m.name, m.use_category, m.unit, m.sku, m.description, m.color, m.normalized_color, "
+        "m.normalized_parsed_unit, m.unit_coefficient, m.created_at, m.updated_at"
+    )
+    
+    # Текстовые кандидаты: FTS по search_vector (GIN) ∪ триграммы по name/description (GIN trgm).
+    # Каждая ветка берет не более :candidates строк по своему индексу, оценки считаются
+    # только для кандидатов: text_score = (ts_rank_cd + взвешенное триграммное сходство) / 2
+    _TEXT_CANDIDATES_SQL = """
+            query_terms AS (
+                SELECT websearch_to_tsquery('russian', :query) || websearch_to_tsquery('simple', :query) AS tsquery
+            ),
+            text_matches AS (
+                (
+                    SELECT m.id FROM materials m, query_terms q
+                    WHERE m.search_vector @@ q.tsquery
+                    ORDER BY ts_rank_cd(m.search_vector, q.tsquery, 32) DESC
+                    LIMIT :candidates
+                )
+                UNION
+                (
+                    SELECT id FROM materials
+                    WHERE name % :query OR description % :query
+                    ORDER BY similarity(name, :query) DESC
+                    LIMIT :candidates
+                )
+            ),
+            text_candidates AS (
+                SELECT id, fts_rank, name_similarity, description_similarity,
+                       (fts_rank + name_similarity * 0.6 + description_similarity * 0.3
+                        + category_similarity * 0.1) / 2 AS text_score
+                FROM (
+                    SELECT m.id,
+                           ts_rank_cd(m.search_vector, q.tsquery, 32) AS fts_rank,
+                           similarity(m.name, :query) AS name_similarity,
+                           similarity(COALESCE(m.description, ''), :query) AS description_similarity,
+                           similarity(m.use_category, :query) AS category_similarity
+                    FROM text_matches c
+                    JOIN materials m ON m.id = c.id
+                    CROSS JOIN query_terms q
+                ) scored
+            )"""
+    
     async def search_materials_hybrid(
         self, 
         query: str, 
@@ -472,12 +551,14 @@ class PostgreSQLAdapter(IRelationalDatabase):
     ) -> List[Dict[str, Any]]:
         """Hybrid search: full-text + trigram similarity.
         
-        Гибридный поиск материалов с использованием полнотекстового поиска и триграммного сходства.
+        Гибридный поиск материалов: полнотекстовый поиск с русской морфологией
+        (ts_rank_cd) и триграммное сходство в одном запросе по индексам, без
+        ILIKE '%q%' - время ответа не растет вместе с таблицей.
         
         Args:
             query: Search query
             limit: Maximum results
-            similarity_threshold: Minimum similarity threshold (0.0-1.0)
+            similarity_threshold: Trigram similarity threshold of the ``%`` operator (0.0-1.0)
             
         Returns:
             List of matching materials with similarity scores
@@ -485,68 +566,19 @@ class PostgreSQLAdapter(IRelationalDatabase):
         Raises:
             QueryError: If search fails
         """
+        sql = f"""
+            WITH {self._TEXT_CANDIDATES_SQL}
+            SELECT {self._SEARCH_COLUMNS}, t.fts_rank, t.name_similarity, t.description_similarity, t.text_score
+            FROM text_candidates t JOIN materials m ON m.id = t.id
+            ORDER BY t.text_score DESC
+            LIMIT :limit
+        """
+        params = {"query": query, "candidates": limit * 2, "limit": limit}
         try:
-            async with self.get_session() as session:
-                # Hybrid search query combining multiple approaches
-                search_query = select(
-                    MaterialModel,
-                    # Trigram similarity scores
-                    func.similarity(MaterialModel.name, query).label('name_similarity'),
-                    func.similarity(MaterialModel.description, query).label('desc_similarity'),
-                    # Combined similarity score
-                    (
-                        func.similarity(MaterialModel.name, query) * 0.6 +
-                        func.similarity(MaterialModel.description, query) * 0.3 +
-                        func.similarity(MaterialModel.use_category, query) * 0.1
-                    ).label('total_similarity')
-                ).where(
-                    or_(
-                        # Trigram similarity
-                        func.similarity(MaterialModel.name, query) > similarity_threshold,
-                        func.similarity(MaterialModel.description, query) > similarity_threshold,
-                        # ILIKE for partial matches
-                        MaterialModel.name.ilike(f'%{query}%'),
-                        MaterialModel.description.ilike(f'%{query}%'),
-                        MaterialModel.use_category.ilike(f'%{query}%'),
-                        MaterialModel.sku.ilike(f'%{query}%')
-                    )
-                ).order_by(
-                    text('total_similarity DESC')
-                ).limit(limit)
-                
-                result = await session.execute(search_query)
-                rows = result.fetchall()
-                
-                materials = []
-                for row in rows:
-                    material = row[0]  # MaterialModel instance
-                    name_sim = row[1]
-                    desc_sim = row[2]
-                    total_sim = row[3]
-                    
-                    materials.append({
-                        'id': material.id,
-                        'name': material.name,
-                        'use_category': material.use_category,
-                        'unit': material.unit,
-                        'sku': material.sku,
-                        'description': material.description,
-                        # Enhanced fields
-                        'color': material.color,
-                        'normalized_color': material.normalized_color,
-                        'normalized_parsed_unit': material.normalized_parsed_unit,
-                        'unit_coefficient': material.unit_coefficient,
-                        'embedding': material.embedding,
-                        'created_at': material.created_at,
-                        'updated_at': material.updated_at,
-                        'similarity_score': float(total_sim) if total_sim else 0.0,
-                        'name_similarity': float(name_sim) if name_sim else 0.0,
-                        'description_similarity': float(desc_sim) if desc_sim else 0.0
-                    })
-                
-                logger.info(f"Hybrid search found {len(materials)} materials for query: '{query}'")
-                return materials
-                
+            rows = await self._search_rows(sql, params, similarity_threshold=similarity_threshold)
+            logger.info(f"Hybrid search found {len(rows)} materials for query: '{query}'")
+            return rows
+            
         except SQLAlchemyError as e:
             logger.error(f"Hybrid search failed: {e}")
             raise QueryError(
@@ -555,6 +587,170 @@ class PostgreSQLAdapter(IRelationalDatabase):
                 query=query
             )
     
+    async def search_vector(
+        self,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        min_score: Optional[float] = None,
+        ef_search: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Semantic search over the pgvector HNSW index.
+        
+        Векторный поиск по косинусному расстоянию (оператор ``<=>``), использует
+        HNSW индекс idx_materials_embedding_hnsw.
+        
+        Args:
+            query_vector: Query embedding
+            limit: Maximum results
+            min_score: Minimum cosine similarity (0.0-1.0)
+            ef_search: HNSW candidate list size (default: POSTGRESQL_HNSW_EF_SEARCH / server)
+            
+        Returns:
+            Materials with ``vector_score`` (cosine similarity), best first
+            
+        Raises:
+            QueryError: If search fails
+        """
+        where = "WHERE n.vector_score >= :min_score" if min_score is not None else ""
+        sql = f"""
+            WITH nearest AS (
+                SELECT id, 1 - (embedding_vector <=> CAST(:query_vector AS vector)) AS vector_score
+                FROM materials
+                WHERE embedding_vector IS NOT NULL
+                ORDER BY embedding_vector <=> CAST(:query_vector AS vector)
+                LIMIT :limit
+            )
+            SELECT {self._SEARCH_COLUMNS}, n.vector_score
+            FROM nearest n JOIN materials m ON m.id = n.id
+            {where}
+            ORDER BY n.vector_score DESC
+        """
+        params = {"query_vector": to_vector_literal(query_vector), "limit": limit, "min_score": min_score}
+        try:
+            rows = await self._search_rows(sql, params, ef_search)
+            logger.info(f"pgvector search found {len(rows)} materials")
+            return rows
+            
+        except SQLAlchemyError as e:
+            logger.error(f"pgvector search failed: {e}")
+            raise QueryError(
+                message="Vector search failed",
+                details=str(e)
+            )
+    
+    async def search_hybrid(
+        self,
+        query: str,
+        query_vector: Sequence[float],
+        limit: int = 10,
+        vector_weight: float = 0.7,
+        text_weight: float = 0.3,
+        min_vector_score: float = 0.6,
+        candidates: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Hybrid search in one query: pgvector distance + full-text and trigram score.
+        
+        Один запрос вместо параллельных запросов в Qdrant и PostgreSQL со слиянием в Python:
+        кандидаты из HNSW индекса (по эмбеддингу) и из GIN индексов (tsvector и trgm, по тексту)
+        объединяются и ранжируются по взвешенной сумме оценок.
+        
+        Args:
+            query: Search text
+            query_vector: Query embedding
+            limit: Maximum results
+            vector_weight: Weight of cosine similarity
+            text_weight: Weight of the text score (ts_rank_cd and trigram similarity, see search_materials_hybrid)
+            min_vector_score: Minimum cosine similarity of vector-only candidates
+            candidates: Candidates taken from each index (default: limit * 2)
+            ef_search: HNSW candidate list size (default: POSTGRESQL_HNSW_EF_SEARCH / server)
+            
+        Returns:
+            Materials with ``vector_score``, ``text_score`` and ``hybrid_score``, best first
+            
+        Raises:
+            QueryError: If search fails
+        """
+        sql = f"""
+            WITH vector_candidates AS (
+                SELECT id, 1 - (embedding_vector <=> CAST(:query_vector AS vector)) AS vector_score
+                FROM materials
+                WHERE embedding_vector IS NOT NULL
+                ORDER BY embedding_vector <=> CAST(:query_vector AS vector)
+                LIMIT :candidates
+            ),
+            {self._TEXT_CANDIDATES_SQL},
+            ranked AS (
+                SELECT c.id,
+                       COALESCE(v.vector_score, 0) AS vector_score,
+                       COALESCE(t.text_score, 0) AS text_score,
+                       :vector_weight * COALESCE(v.vector_score, 0) + :text_weight * COALESCE(t.text_score, 0)
+                           AS hybrid_score
+                FROM (
+                    SELECT id FROM vector_candidates WHERE vector_score >= :min_vector_score
+                    UNION
+                    SELECT id FROM text_candidates
+                ) c
+                LEFT JOIN vector_candidates v ON v.id = c.id
+                LEFT JOIN text_candidates t ON t.id = c.id
+                ORDER BY hybrid_score DESC
+                LIMIT :limit
+            )
+            SELECT {self._SEARCH_COLUMNS}, r.vector_score, r.text_score, r.hybrid_score
+            FROM ranked r JOIN materials m ON m.id = r.id
+            ORDER BY r.hybrid_score DESC
+        """
+        params = {
+            "query": query,
+            "query_vector": to_vector_literal(query_vector),
+            "candidates": candidates or limit * 2,
+            "limit": limit,
+            "vector_weight": vector_weight,
+            "text_weight": text_weight,
+            "min_vector_score": min_vector_score,
+        }
+        try:
+            rows = await self._search_rows(sql, params, ef_search)
+            logger.info(f"Hybrid pgvector search found {len(rows)} materials for query: '{query}'")
+            return rows
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Hybrid pgvector search failed: {e}")
+            raise QueryError(
+                message="Hybrid search failed",
+                details=str(e),
+                query=query
+            )
+    
+    # Оценки в строках результатов поиска (numeric/real -> float)
+    _SCORE_COLUMNS = (
+        'vector_score', 'text_score', 'hybrid_score', 'fts_rank', 'name_similarity', 'description_similarity'
+    )
+    
+    async def _search_rows(self, sql: str, params: Dict[str, Any], ef_search: Optional[int] = None,
+                           similarity_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Run a search query with ``hnsw.ef_search`` / trigram threshold set for its transaction."""
+        ef_search = ef_search or getattr(self.settings, 'POSTGRESQL_HNSW_EF_SEARCH', None)
+        async with self.get_session() as session:
+            if ef_search:
+                await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+            if similarity_threshold is not None:
+                await session.execute(
+                    text("SELECT set_config('pg_trgm.similarity_threshold', :threshold, true)"),
+                    {"threshold": str(similarity_threshold)}
+                )
+            result = await session.execute(text(sql), params)
+            rows = [dict(row) for row in result.mappings().all()]
+        for row in rows:
+            row['id'] = str(row['id'])
+            for score in self._SCORE_COLUMNS:
+                if score in row:
+                    row[score] = float(row[score] or 0.0)
+            row['similarity_score'] = row.get(
+                'hybrid_score', row.get('vector_score', row.get('text_score', 0.0))
+            )
+        return rows
+    
     async def get_materials(
         self, 
         skip: int = 0, 
@@ -613,6 +809,201 @@ class PostgreSQLAdapter(IRelationalDatabase):
                 details=str(e)
             )
     
+    # === Bulk ingestion (COPY) ===
+    
+    # Ключи upsert: (выражения конфликта, предикат частичного уникального индекса)
+    MATERIAL_UPSERT_KEYS = (
+        (("sku",), "sku IS NOT NULL"),
+        (("name", "unit"), "sku IS NULL"),
+    )
+    RAW_PRODUCT_UPSERT_KEYS = (
+        (("supplier_id", "pricelistid", "sku"), "sku IS NOT NULL"),
+        (("supplier_id", "pricelistid", "name", "COALESCE(calc_unit, '')"), "sku IS NULL"),
+    )
+    
+    async def bulk_upsert_materials(
+        self,
+        materials: Iterable[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Dict[str, Any]:
+        """Load materials with COPY and upsert them by ``sku`` or ``(name, unit)``.
+        
+        Массовая загрузка вместо create_material на каждую строку: пачка передается
+        через COPY во временную таблицу и переносится одним INSERT ... ON CONFLICT
+        на ключ (материалы с артикулом - по sku, без артикула - по name и unit).
+        
+        Args:
+            materials: Material dicts (same keys as ``create_material``), may be a generator
+            chunk_size: Rows per COPY + upsert transaction (default: POSTGRESQL_COPY_CHUNK_SIZE)
+            progress_callback: Called with (processed rows, total rows or None) after each chunk
+            
+        Returns:
+            Summary: total, upserted, failed rows and per-chunk errors
+        """
+        return await self._bulk_upsert(
+            MaterialModel.__table__, materials, self.MATERIAL_UPSERT_KEYS,
+            derived={
+                # Как в create_material: pgvector копия эмбеддинга (search_vector генерируется БД)
+                "embedding_vector": (
+                    f"CASE WHEN array_length(embedding, 1) = {EMBEDDING_DIMENSIONS} THEN embedding::vector END"
+                ),
+            },
+            immutable=("id", "created_at"),
+            chunk_size=chunk_size,
+            progress_callback=progress_callback
+        )
+    
+    async def bulk_upsert_raw_products(
+        self,
+        products: Iterable[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Dict[str, Any]:
+        """Load price list rows with COPY and upsert them per supplier price list.
+        
+        Ключ строки: (supplier_id, pricelistid, sku), без артикула -
+        (supplier_id, pricelistid, name, calc_unit). Повторная загрузка прайс-листа
+        обновляет цены существующих строк.
+        
+        Args:
+            products: Raw product dicts (RawProductModel columns), may be a generator
+            chunk_size: Rows per COPY + upsert transaction (default: POSTGRESQL_COPY_CHUNK_SIZE)
+            progress_callback: Called with (processed rows, total rows or None) after each chunk
+            
+        Returns:
+            Summary: total, upserted, failed rows and per-chunk errors
+        """
+        return await self._bulk_upsert(
+            RawProductModel.__table__, products, self.RAW_PRODUCT_UPSERT_KEYS,
+            immutable=("id", "created"),
+            chunk_size=chunk_size,
+            progress_callback=progress_callback
+        )
+    
+    async def _bulk_upsert(
+        self,
+        table,
+        rows: Iterable[Dict[str, Any]],
+        keys: Sequence[tuple],
+        derived: Optional[Dict[str, str]] = None,
+        immutable: Sequence[str] = (),
+        chunk_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Dict[str, Any]:
+        """COPY rows chunk by chunk into a staging table and upsert each chunk in its transaction.
+        
+        Ошибка пачки (нарушение ограничений, неверные данные) откатывает только ее:
+        строки пачки попадают в ``failed``, загрузка продолжается со следующей пачки.
+        """
+        derived = derived or {}
+        chunk_size = chunk_size or getattr(self.settings, 'POSTGRESQL_COPY_CHUNK_SIZE', 10000)
+        columns = [
+            column for column in table.columns
+            if column.name not in derived and column.computed is None
+        ]
+        names = [column.name for column in columns]
+        staging = f"_bulk_{table.name}"
+        statements = [
+            self._upsert_sql(table.name, staging, names, key, predicate, derived, immutable)
+            for key, predicate in keys
+        ]
+        total = len(rows) if isinstance(rows, Sized) else None
+        summary = {"total": 0, "upserted": 0, "failed": 0, "errors": []}
+        start = time.perf_counter()
+        
+        iterator = iter(rows)
+        while chunk := list(islice(iterator, chunk_size)):
+            offset = summary["total"]
+            summary["total"] += len(chunk)
+            try:
+                records = self._copy_records(columns, chunk)
+                summary["upserted"] += await self._copy_and_upsert(table.name, staging, names, records, statements)
+            except Exception as e:
+                logger.error(f"Bulk load of {table.name} rows {offset}-{offset + len(chunk) - 1} failed: {e}")
+                summary["failed"] += len(chunk)
+                summary["errors"].append({"offset": offset, "rows": len(chunk), "error": str(e)})
+            if progress_callback:
+                progress_callback(summary["total"], total)
+        
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Bulk load of {table.name}: {summary['upserted']} upserted, {summary['failed']} failed "
+            f"of {summary['total']} rows in {elapsed:.2f}s"
+        )
+        return summary
+    
+    async def _copy_and_upsert(self, table: str, staging: str, columns: List[str],
+                               records: List[tuple], statements: List[str]) -> int:
+        """One transaction: staging table, COPY of the records, set-based upserts."""
+        async with self.get_session() as session:
+            await session.execute(text(f"CREATE TEMP TABLE {staging} (LIKE {table}, _ord integer) ON COMMIT DROP"))
+            # COPY идет через соединение asyncpg внутри той же транзакции
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                staging, records=records, columns=[*columns, "_ord"]
+            )
+            upserted = 0
+            for statement in statements:
+                result = await session.execute(text(statement))
+                upserted += result.rowcount
+            await session.commit()
+        return upserted
+    
+    @staticmethod
+    def _copy_records(columns, rows: List[Dict[str, Any]]) -> List[tuple]:
+        """COPY records in column order: model defaults for missing values, Decimal for NUMERIC.
+        
+        Последнее поле - порядковый номер строки в пачке (из дублей ключа побеждает последняя).
+        """
+        converters = []
+        for column in columns:
+            default = column.default
+            if default is None:
+                make_default = None
+            elif default.is_callable:
+                make_default = lambda factory=default.arg: factory(None)
+            else:
+                make_default = lambda value=default.arg: value
+            decimal = isinstance(column.type, Numeric) and not isinstance(column.type, Float)
+            converters.append((column.name, make_default, decimal))
+        
+        records = []
+        for position, row in enumerate(rows):
+            values = []
+            for name, make_default, decimal in converters:
+                value = row.get(name)
+                if value is None and make_default is not None:
+                    value = make_default()
+                elif decimal and value is not None and not isinstance(value, Decimal):
+                    value = Decimal(str(value))
+                values.append(value)
+            values.append(position)
+            records.append(tuple(values))
+        return records
+    
+    @staticmethod
+    def _upsert_sql(table: str, staging: str, columns: Sequence[str], key: Sequence[str],
+                    predicate: str, derived: Dict[str, str], immutable: Sequence[str]) -> str:
+        """INSERT ... SELECT DISTINCT ON (key) ... ON CONFLICT (key) WHERE predicate DO UPDATE."""
+        insert_columns = [*columns, *derived]
+        key_list = ", ".join(key)
+        # Выражения в ключе конфликта записываются в скобках
+        conflict_target = ", ".join(part if part.isidentifier() else f"({part})" for part in key)
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in insert_columns
+            if column not in key and column not in immutable
+        )
+        return (
+            f"INSERT INTO {table} ({', '.join(insert_columns)}) "
+            f"SELECT DISTINCT ON ({key_list}) {', '.join([*columns, *derived.values()])} "
+            f"FROM {staging} WHERE {predicate} "
+            f"ORDER BY {key_list}, _ord DESC "
+            f"ON CONFLICT ({conflict_target}) WHERE {predicate} DO UPDATE SET {updates}"
+        )
+    
     async def close(self) -> None:
         """Close database connections.
         
@@ -3,14 +3,22 @@
 Адаптер для Qdrant Vector Database с поддержкой облачной и локальной версий.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional, Sequence, Tuple, Union
 from core.logging import get_logger
 import asyncio
+import time
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance, PointStruct, Filter, FieldCondition, MatchValue, MatchAny,
+    PayloadSchemaType, KeywordIndexParams, QueryRequest,
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation,
+    SetPayload, SetPayloadOperation
+)
 
 from core.database.interfaces import IVectorDatabase
+from core.database.collection_profiles import CollectionProfile, get_collection_profile
+from core.database.filters import RESIDUAL_OVERFETCH, FilterSpec, apply_residual, with_residual_fields
 from core.database.exceptions import ConnectionError, QueryError, DatabaseError
 from core.repositories.interfaces import IBatchProcessingRepository
 from datetime import datetime
@@ -45,6 +53,7 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             self.collection_name = config.get("collection_name", "materials")
             self.vector_size = config.get("vector_size", 1536)
             self.distance = getattr(Distance, config.get("distance", "COSINE").upper())
+            self.profile = self.resolve_collection_profile(config.get("collection_profile"))
             
             logger.info(f"Qdrant client initialized for collection: {self.collection_name}")
             
@@ -56,13 +65,15 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
                 details=str(e)
             )
     
-    async def create_collection(self, name: str, vector_size: int, distance_metric: str = "cosine") -> bool:
+    async def create_collection(self, name: str, vector_size: int, distance_metric: str = "cosine",
+                               profile: Optional[Union[str, CollectionProfile]] = None) -> bool:
         """Create a new collection for storing vectors.
         
         Args:
             name: Collection name
             vector_size: Dimension of vectors
             distance_metric: Distance calculation method
+            profile: Storage profile (float32, int8, binary; default - configured profile)
             
         Returns:
             True if collection created successfully
@@ -71,30 +82,41 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             DatabaseError: If collection creation fails
         """
         try:
-            distance_map = {
-                "cosine": Distance.COSINE,
-                "euclidean": Distance.EUCLID,
-                "dot": Distance.DOT
-            }
-            
-            distance = distance_map.get(distance_metric.lower(), Distance.COSINE)
-            
+            profile = self.resolve_collection_profile(profile)
             await asyncio.to_thread(
                 self.client.create_collection,
                 collection_name=name,
-                vectors_config=VectorParams(
-                    size=vector_size,
-                    distance=distance
-                )
+                **profile.collection_kwargs(vector_size, self._distance(distance_metric))
             )
             
-            logger.info(f"Created Qdrant collection: {name}")
+            logger.info(f"Created Qdrant collection: {name} (profile: {profile.name})")
             return True
             
         except Exception as e:
             logger.error(f"Failed to create collection {name}: {e}")
             raise DatabaseError(f"Failed to create collection {name}", details=str(e))
     
+    async def delete_collection(self, name: str) -> bool:
+        """Delete a collection with all its points.
+        
+        Args:
+            name: Collection name
+            
+        Returns:
+            True if collection deleted successfully
+            
+        Raises:
+            DatabaseError: If deletion fails
+        """
+        try:
+            await asyncio.to_thread(self.client.delete_collection, collection_name=name)
+            logger.info(f"Deleted Qdrant collection: {name}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to delete collection {name}: {e}")
+            raise DatabaseError(f"Failed to delete collection {name}", details=str(e))
+    
     async def collection_exists(self, name: str) -> bool:
         """Check if collection exists.
         
@@ -105,9 +127,8 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             True if collection exists
         """
         try:
-            collections = await asyncio.to_thread(self.client.get_collections)
-            collection_names = [c.name for c in collections.collections]
-            return name in collection_names
+            # Учитывает alias: мигрированная коллекция доступна под прежним именем
+            return await asyncio.to_thread(self.client.collection_exists, name)
             
         except Exception as e:
             logger.error(f"Failed to check collection existence {name}: {e}")
@@ -140,12 +161,7 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
                 )
                 points.append(point)
             
-            # Use asyncio.to_thread to avoid blocking the event loop
-            operation_info = await asyncio.to_thread(
-                self.client.upsert,
-                collection_name=collection_name,
-                points=points
-            )
+            await self._upsert_points(collection_name, points)
             
             logger.info(f"Upserted {len(points)} vectors to {collection_name}")
             return True
@@ -155,14 +171,22 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             raise DatabaseError(f"Failed to upsert vectors", details=str(e))
     
     async def search(self, collection_name: str, query_vector: List[float], 
-                    limit: int = 10, filter_conditions: Optional[Dict] = None) -> List[Dict[str, Any]]:
+                    limit: int = 10, filter_conditions: Optional[Dict] = None,
+                    with_vectors: bool = False, fields: Optional[Sequence[str]] = None,
+                    score_threshold: Optional[float] = None, oversampling: Optional[float] = None,
+                    rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
         """Search for similar vectors.
         
         Args:
             collection_name: Collection to search in
             query_vector: Query vector
             limit: Maximum number of results
-            filter_conditions: Optional filtering conditions
+            filter_conditions: Optional filtering conditions (dict, Filter or FilterSpec)
+            with_vectors: Fetch stored vectors
+            fields: Payload keys to fetch (None - whole payload)
+            score_threshold: Minimum score of returned results
+            oversampling: Quantized candidates per result (default - profile value)
+            rescore: Re-score candidates with original vectors (default - profile value)
             
         Returns:
             List of search results with scores and metadata
@@ -171,23 +195,22 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             QueryError: If search operation fails
         """
         try:
-            search_result = await asyncio.to_thread(
-                self.client.search,
+            query_filter, residual = self._compile_filter(filter_conditions)
+            response = await asyncio.to_thread(
+                self.client.query_points,
                 collection_name=collection_name,
-                query_vector=query_vector,
-                limit=limit,
-                query_filter=filter_conditions
+                query=query_vector,
+                limit=limit * RESIDUAL_OVERFETCH if residual else limit,
+                query_filter=query_filter,
+                with_payload=self._payload_selector(with_residual_fields(fields, residual) if residual else fields),
+                with_vectors=with_vectors,
+                score_threshold=score_threshold,
+                search_params=self.profile.search_params(oversampling, rescore)
             )
             
-            results = []
-            for scored_point in search_result:
-                result = {
-                    "id": str(scored_point.id),
-                    "score": scored_point.score,
-                    "payload": scored_point.payload,
-                    "vector": scored_point.vector
-                }
-                results.append(result)
+            results = [self._scored_point_to_dict(point, with_vectors) for point in response.points]
+            if residual:
+                results = apply_residual(results, residual, limit, fields)
             
             logger.info(f"Found {len(results)} results in {collection_name}")
             return results
@@ -196,12 +219,74 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             logger.error(f"Failed to search in {collection_name}: {e}")
             raise QueryError(f"Search failed in {collection_name}", details=str(e))
     
-    async def get_by_id(self, collection_name: str, vector_id: str) -> Optional[Dict[str, Any]]:
+    async def search_batch(self, collection_name: str, query_vectors: List[List[float]],
+                          limit: int = 10, filter_conditions: Optional[Dict] = None,
+                          with_vectors: bool = False,
+                          fields: Optional[Sequence[str]] = None,
+                          oversampling: Optional[float] = None,
+                          rescore: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """Search for several query vectors in a single request.
+        
+        Args:
+            collection_name: Collection to search in
+            query_vectors: Query vectors
+            limit: Maximum number of results per query
+            filter_conditions: Optional filtering conditions applied to every query
+            with_vectors: Fetch stored vectors
+            fields: Payload keys to fetch (None - whole payload)
+            oversampling: Quantized candidates per result (default - profile value)
+            rescore: Re-score candidates with original vectors (default - profile value)
+            
+        Returns:
+            List of result lists, in the order of ``query_vectors``
+            
+        Raises:
+            QueryError: If search operation fails
+        """
+        if not query_vectors:
+            return []
+        
+        try:
+            query_filter = self._build_filter(filter_conditions)
+            with_payload = self._payload_selector(fields)
+            search_params = self.profile.search_params(oversampling, rescore)
+            requests = [
+                QueryRequest(
+                    query=query_vector,
+                    limit=limit,
+                    filter=query_filter,
+                    params=search_params,
+                    with_payload=with_payload,
+                    with_vector=with_vectors
+                )
+                for query_vector in query_vectors
+            ]
+            responses = await asyncio.to_thread(
+                self.client.query_batch_points,
+                collection_name=collection_name,
+                requests=requests
+            )
+            
+            results = [
+                [self._scored_point_to_dict(point, with_vectors) for point in response.points]
+                for response in responses
+            ]
+            logger.debug(f"Batch search of {len(query_vectors)} queries in {collection_name}")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Failed to batch search in {collection_name}: {e}")
+            raise QueryError(f"Batch search failed in {collection_name}", details=str(e))
+    
+    async def get_by_id(self, collection_name: str, vector_id: str,
+                        with_vectors: bool = False, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
         """Get vector by ID.
         
         Args:
             collection_name: Collection name
             vector_id: Vector ID
+            with_vectors: Fetch the stored vector
+            fields: Payload keys to fetch (None - whole payload)
             
         Returns:
             Vector data or None if not found
@@ -211,18 +296,14 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
                 self.client.retrieve,
                 collection_name=collection_name,
                 ids=[vector_id],
-                with_vectors=True
+                with_payload=self._payload_selector(fields),
+                with_vectors=with_vectors
             )
             
             if not results:
                 return None
             
-            result = results[0]
-            return {
-                "id": str(result.id),
-                "vector": result.vector,
-                "payload": result.payload
-            }
+            return self._record_to_dict(results[0], with_vectors)
             
         except Exception as e:
             logger.error(f"Failed to get vector {vector_id} from {collection_name}: {e}")
@@ -243,8 +324,8 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             True if update successful
         """
         try:
-            # Get existing data if partial update
-            existing = await self.get_by_id(collection_name, vector_id)
+            # Get existing data if partial update (the stored vector only if it is kept)
+            existing = await self.get_by_id(collection_name, vector_id, with_vectors=vector is None)
             if not existing:
                 return False
             
@@ -277,11 +358,7 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             True if deletion successful
         """
         try:
-            operation_info = await asyncio.to_thread(
-                self.client.delete,
-                collection_name=collection_name,
-                points_selector=[vector_id]
-            )
+            await self._delete_points(collection_name, [vector_id])
             
             logger.info(f"Deleted vector {vector_id} from {collection_name}")
             return True
@@ -290,13 +367,15 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             logger.error(f"Failed to delete vector {vector_id} from {collection_name}: {e}")
             return False
     
-    async def scroll_all(self, collection_name: str, with_payload: bool = True, with_vectors: bool = False) -> List[Dict[str, Any]]:
+    async def scroll_all(self, collection_name: str, with_payload: bool = True, with_vectors: bool = False,
+                         fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
         """Get all records from collection using scroll method.
         
         Args:
             collection_name: Collection name
             with_payload: Include payload data
             with_vectors: Include vector data
+            fields: Payload keys to fetch (None - whole payload)
             
         Returns:
             List of all records in collection
@@ -312,7 +391,7 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
                     collection_name=collection_name,
                     limit=100,  # Process in chunks of 100
                     offset=next_page_offset,
-                    with_payload=with_payload,
+                    with_payload=self._payload_selector(fields) if with_payload else False,
                     with_vectors=with_vectors
                 )
                 
@@ -364,6 +443,287 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             logger.error(f"Failed batch upsert to {collection_name}: {e}")
             raise DatabaseError(f"Batch upsert failed", details=str(e))
     
+    async def upsert_many(self, collection_name: str, vectors: List[Dict[str, Any]],
+                         chunk_size: Optional[int] = None,
+                         parallelism: Optional[int] = None) -> int:
+        """Insert or update vectors with a single upsert request.
+        
+        Синхронный клиент блокирует поток на время запроса, поэтому точки
+        отправляются одним запросом, а не параллельными чанками.
+        
+        Args:
+            collection_name: Target collection
+            vectors: List of vector objects with id, vector, and payload
+            chunk_size: Ignored (kept for interface compatibility)
+            parallelism: Ignored (kept for interface compatibility)
+            
+        Returns:
+            Number of upserted vectors
+            
+        Raises:
+            DatabaseError: If upsert operation fails
+        """
+        if not vectors:
+            return 0
+        await self.upsert(collection_name, vectors)
+        return len(vectors)
+    
+    async def retrieve_many(self, collection_name: str, vector_ids: List[str],
+                           with_vectors: bool = False,
+                           fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get several vectors by ID in one request.
+        
+        Args:
+            collection_name: Collection name
+            vector_ids: Vector IDs
+            with_vectors: Include vector data
+            fields: Payload keys to fetch (None - whole payload)
+            
+        Returns:
+            Found records (missing IDs are skipped)
+        """
+        try:
+            records = await asyncio.to_thread(
+                self.client.retrieve,
+                collection_name=collection_name,
+                ids=vector_ids,
+                with_payload=self._payload_selector(fields),
+                with_vectors=with_vectors
+            )
+            return [self._record_to_dict(record, with_vectors) for record in records]
+            
+        except Exception as e:
+            logger.error(f"Failed to retrieve {len(vector_ids)} vectors from {collection_name}: {e}")
+            raise QueryError(f"Retrieve failed in {collection_name}", details=str(e))
+    
+    async def create_payload_index(self, collection_name: str, field_name: str,
+                                  field_type: str = "keyword") -> bool:
+        """Create payload index (idempotent in Qdrant).
+        
+        Args:
+            collection_name: Collection name
+            field_name: Payload field to index
+            field_type: Index type (keyword, keyword_prefix, integer, float, datetime, text)
+            
+        Returns:
+            True if index was created
+        """
+        try:
+            await asyncio.to_thread(
+                self.client.create_payload_index,
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=self._field_schema(field_type)
+            )
+            logger.info(f"Payload index '{field_name}' ({field_type}) ensured on {collection_name}")
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Failed to create payload index '{field_name}' on {collection_name}: {e}")
+            return False
+    
+    async def get_payload_indexes(self, collection_name: str) -> Dict[str, str]:
+        """Get payload indexes of a collection.
+        
+        Args:
+            collection_name: Collection name
+            
+        Returns:
+            Field name -> index type
+        """
+        info = await self._get_collection_info(collection_name)
+        return self._payload_index_types(info)
+    
+    async def ensure_payload_indexes(self, collection_name: str,
+                                    indexes: Dict[str, str]) -> Dict[str, bool]:
+        """Create missing payload indexes and verify them against the collection schema.
+        
+        Индексы с неверным типом пересоздаются; результат проверяется повторным
+        чтением payload_schema коллекции.
+        
+        Args:
+            collection_name: Collection name
+            indexes: Field name -> index type (keyword, integer, float, datetime, text)
+            
+        Returns:
+            Field name -> whether the index is in place
+        """
+        try:
+            existing = await self.get_payload_indexes(collection_name)
+        except Exception as e:
+            logger.warning(f"Failed to read payload indexes of {collection_name}: {e}")
+            return {field_name: False for field_name in indexes}
+        
+        missing = {name: kind for name, kind in indexes.items() if existing.get(name) != kind}
+        if not missing:
+            return {field_name: True for field_name in indexes}
+        
+        for field_name, field_type in missing.items():
+            await self.create_payload_index(collection_name, field_name, field_type)
+        try:
+            existing = await self.get_payload_indexes(collection_name)
+        except Exception as e:
+            logger.warning(f"Failed to verify payload indexes of {collection_name}: {e}")
+        
+        verified = {field_name: existing.get(field_name) == field_type for field_name, field_type in indexes.items()}
+        unverified = [field_name for field_name, ok in verified.items() if not ok]
+        if unverified:
+            logger.warning(
+                f"Payload indexes missing on {collection_name}: {', '.join(unverified)} "
+                f"(filtered searches on these fields scan payloads)"
+            )
+        else:
+            logger.info(f"Payload indexes verified on {collection_name}: {', '.join(indexes)}")
+        return verified
+    
+    async def iter_points(self, collection_name: str, batch_size: int = 256,
+                          with_vectors: bool = True) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream all points of a collection page by page.
+        
+        В отличие от scroll_all не держит коллекцию в памяти целиком.
+        
+        Args:
+            collection_name: Collection name
+            batch_size: Points per page
+            with_vectors: Include vector data
+            
+        Yields:
+            Pages of records with id, payload and (optionally) vector
+        """
+        offset = None
+        while True:
+            records, offset = await self._scroll_page(collection_name, batch_size, offset, with_vectors)
+            if records:
+                yield [self._record_to_dict(record, with_vectors) for record in records]
+            if offset is None:
+                break
+    
+    async def migrate_collection_profile(self, collection_name: str,
+                                         profile: Union[str, CollectionProfile],
+                                         batch_size: int = 256) -> Dict[str, Any]:
+        """Move a collection to a storage profile, keeping its points, and switch the name over by alias.
+        
+        Qdrant не меняет хранение векторов существующей коллекции на месте, поэтому
+        точки копируются в новую физическую коллекцию ``<name>__<profile>_<ts>``,
+        индексы payload восстанавливаются, после чего имя ``<name>`` атомарно
+        переключается на копию через alias. Исходная коллекция не меняется до
+        переключения: при ошибке или неполной копии удаляется только новая коллекция.
+        При первой миграции ``<name>`` - обычная коллекция, она удаляется перед
+        созданием alias с тем же именем. Если сбой произошел между удалением и
+        созданием alias, повторный запуск берет самую полную копию ``<name>__*``.
+        
+        Args:
+            collection_name: Collection (or alias) to migrate
+            profile: Target profile name or instance
+            batch_size: Points per scroll/upsert request
+            
+        Returns:
+            Migration summary (profile, physical collection, points, payload indexes)
+            
+        Raises:
+            DatabaseError: If copying loses points
+        """
+        profile = self.resolve_collection_profile(profile)
+        aliases = await self._get_aliases()
+        source = aliases.get(collection_name)
+        if source is None and not await self.collection_exists(collection_name):
+            source = await self._recover_alias(collection_name)
+        # Копии прерванных миграций, на которые не указывает alias
+        for name in await self._collection_names():
+            if name.startswith(f"{collection_name}__") and name != source:
+                await self.delete_collection(name)
+        
+        info = await self._get_collection_info(collection_name)
+        vectors = info.config.params.vectors
+        distance = getattr(vectors.distance, "value", vectors.distance).lower()
+        indexes = self._payload_index_types(info)
+        expected = await self.count(collection_name)
+        
+        target = f"{collection_name}__{profile.name}_{time.time_ns() // 1_000_000}"
+        await self.create_collection(target, vectors.size, distance, profile)
+        try:
+            await self._copy_points(collection_name, target, expected, batch_size)
+            verified = await self.ensure_payload_indexes(target, indexes) if indexes else {}
+        except Exception:
+            await self.delete_collection(target)
+            raise
+        
+        if source is None:
+            # Первая миграция: имя занято самой коллекцией, alias с тем же именем создать нельзя
+            await self.delete_collection(collection_name)
+            await self._update_aliases([CreateAliasOperation(
+                create_alias=CreateAlias(collection_name=target, alias_name=collection_name)
+            )])
+        else:
+            await self._update_aliases([
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=collection_name)),
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=collection_name)),
+            ])
+            await self.delete_collection(source)
+        
+        logger.info(f"Migrated {collection_name} to profile {profile.name}: {expected} points in {target}")
+        return {
+            "collection": collection_name,
+            "target": target,
+            "profile": profile.name,
+            "points": expected,
+            "payload_indexes": verified,
+        }
+    
+    async def _recover_alias(self, collection_name: str) -> str:
+        """Point the alias at the fullest ``<name>__*`` copy left by an interrupted migration."""
+        copies = [name for name in await self._collection_names() if name.startswith(f"{collection_name}__")]
+        if not copies:
+            raise DatabaseError(f"Collection {collection_name} not found")
+        counts = {name: await self.count(name) for name in copies}
+        source = max(copies, key=lambda name: counts[name])
+        logger.warning(f"Restoring alias {collection_name} -> {source} ({counts[source]} points)")
+        await self._update_aliases([CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=source, alias_name=collection_name)
+        )])
+        return source
+    
+    async def _copy_points(self, source: str, target: str, expected: int, batch_size: int) -> int:
+        """Copy all points page by page and check the target count."""
+        copied = 0
+        async for page in self.iter_points(source, batch_size, with_vectors=True):
+            await self._upsert_points(target, [
+                PointStruct(id=record["id"], vector=record["vector"], payload=record["payload"]) for record in page
+            ])
+            copied += len(page)
+            logger.debug(f"Copied {copied}/{expected} points {source} -> {target}")
+        
+        count = await self.count(target)
+        if count != expected:
+            raise DatabaseError(
+                f"Collection copy {source} -> {target} is incomplete",
+                details=f"expected {expected} points, got {count}"
+            )
+        return copied
+    
+    async def count(self, collection_name: str, filter_conditions: Optional[Dict] = None) -> int:
+        """Count vectors in collection.
+        
+        Args:
+            collection_name: Collection name
+            filter_conditions: Optional filtering conditions
+            
+        Returns:
+            Number of matching vectors
+        """
+        try:
+            result = await asyncio.to_thread(
+                self.client.count,
+                collection_name=collection_name,
+                count_filter=self._build_filter(filter_conditions),
+                exact=True
+            )
+            return result.count
+            
+        except Exception as e:
+            logger.error(f"Failed to count vectors in {collection_name}: {e}")
+            raise QueryError(f"Count failed in {collection_name}", details=str(e))
+    
     async def health_check(self) -> Dict[str, Any]:
         """Check database health status.
         
@@ -412,6 +772,175 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
                 "error": str(e)
             } 
 
+    # === Low-level point operations (overridden by the async adapter) ===
+
+    async def _get_collection_info(self, collection_name: str) -> Any:
+        """Collection info (vectors config, payload schema) without blocking the event loop."""
+        return await asyncio.to_thread(self.client.get_collection, collection_name)
+
+    async def _collection_names(self) -> List[str]:
+        """Names of the physical collections (aliases are not listed)."""
+        collections = await asyncio.to_thread(self.client.get_collections)
+        return [collection.name for collection in collections.collections]
+
+    async def _get_aliases(self) -> Dict[str, str]:
+        """Collection aliases: alias name -> collection name."""
+        result = await asyncio.to_thread(self.client.get_aliases)
+        return {alias.alias_name: alias.collection_name for alias in result.aliases}
+
+    async def _update_aliases(self, operations: List[Any]) -> None:
+        """Apply alias operations in one atomic request."""
+        await asyncio.to_thread(self.client.update_collection_aliases, change_aliases_operations=operations)
+
+    async def _scroll_page(self, collection_name: str, limit: int, offset: Optional[Any],
+                           with_vectors: bool) -> Tuple[List[Any], Optional[Any]]:
+        """One scroll page of records and the next page offset."""
+        return await asyncio.to_thread(
+            self.client.scroll,
+            collection_name=collection_name,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors
+        )
+
+    async def _upsert_points(self, collection_name: str, points: List[PointStruct]) -> None:
+        """Upsert prepared points without blocking the event loop."""
+        await asyncio.to_thread(
+            self.client.upsert,
+            collection_name=collection_name,
+            points=points
+        )
+
+    async def _delete_points(self, collection_name: str, point_ids: List[str]) -> None:
+        """Delete points by ID without blocking the event loop."""
+        await asyncio.to_thread(
+            self.client.delete,
+            collection_name=collection_name,
+            points_selector=point_ids
+        )
+
+    async def _set_payload(self, collection_name: str, payload: Dict[str, Any], points_filter: Filter) -> None:
+        """Set payload keys on all points matching the filter without blocking the event loop."""
+        await asyncio.to_thread(
+            self.client.set_payload,
+            collection_name=collection_name,
+            payload=payload,
+            points=points_filter
+        )
+
+    async def _batch_update_points(self, collection_name: str, operations: List[Any]) -> None:
+        """Apply several point update operations in one request without blocking the event loop."""
+        await asyncio.to_thread(
+            self.client.batch_update_points,
+            collection_name=collection_name,
+            update_operations=operations
+        )
+
+    def resolve_collection_profile(self, profile: Optional[Union[str, CollectionProfile]] = None) -> CollectionProfile:
+        """Resolve a profile (None - the configured one) with the configured HNSW overrides."""
+        if profile is None and getattr(self, "profile", None) is not None:
+            return self.profile
+        return get_collection_profile(
+            profile or self.config.get("collection_profile"),
+            hnsw_m=self.config.get("hnsw_m"),
+            hnsw_ef_construct=self.config.get("hnsw_ef_construct"),
+            hnsw_ef=self.config.get("hnsw_ef")
+        )
+
+    @staticmethod
+    def _distance(distance_metric: str) -> Distance:
+        """Qdrant distance for a metric name (unknown names - cosine)."""
+        distance_map = {
+            "cosine": Distance.COSINE,
+            "euclidean": Distance.EUCLID,
+            "euclid": Distance.EUCLID,
+            "dot": Distance.DOT
+        }
+        return distance_map.get(distance_metric.lower(), Distance.COSINE)
+
+    @classmethod
+    def _compile_filter(cls, filter_conditions: Optional[Any]) -> Tuple[Optional[Filter], Optional[FilterSpec]]:
+        """Native filter and the residual conditions ``search`` checks on its results."""
+        if isinstance(filter_conditions, FilterSpec):
+            return filter_conditions.to_qdrant()
+        return cls._build_filter(filter_conditions), None
+
+    @staticmethod
+    def _build_filter(filter_conditions: Optional[Any]) -> Optional[Filter]:
+        """Build Qdrant filter from filter conditions.
+        
+        Accepts a ``FilterSpec``, a ready ``Filter``, a Qdrant-shaped dict
+        (``must``/``should``/``must_not``) or a flat ``{field: value}`` dict of
+        exact matches. Residual ``FilterSpec`` conditions (wildcard patterns)
+        are only narrowed here: ``search`` re-checks them.
+        """
+        if not filter_conditions:
+            return None
+        if isinstance(filter_conditions, FilterSpec):
+            return filter_conditions.to_qdrant().native
+        if isinstance(filter_conditions, Filter):
+            return filter_conditions
+        if any(key in filter_conditions for key in ("must", "should", "must_not", "min_should")):
+            return Filter(**filter_conditions)
+        
+        conditions = []
+        for key, value in filter_conditions.items():
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(FieldCondition(key=key, match=MatchAny(any=list(value))))
+            else:
+                conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+        return Filter(must=conditions)
+
+    @staticmethod
+    def _field_schema(field_type: str) -> Union[PayloadSchemaType, KeywordIndexParams]:
+        """Index schema for an index type name ("keyword_prefix" - keyword index serving MatchPrefix)."""
+        if field_type == "keyword_prefix":
+            return KeywordIndexParams(type="keyword", prefix=True)
+        return PayloadSchemaType(field_type)
+
+    @staticmethod
+    def _payload_index_types(collection_info: Any) -> Dict[str, str]:
+        """Field name -> index type name from collection info ``payload_schema``."""
+        schema = getattr(collection_info, "payload_schema", None) or {}
+        types = {}
+        for field_name, index in schema.items():
+            field_type = getattr(index.data_type, "value", index.data_type)
+            if field_type == "keyword" and getattr(index.params, "prefix", False):
+                field_type = "keyword_prefix"
+            types[field_name] = field_type
+        return types
+
+    @staticmethod
+    def _payload_selector(fields: Optional[Sequence[str]]) -> Union[bool, List[str]]:
+        """Qdrant ``with_payload`` value: the whole payload or only the requested keys."""
+        if fields is None:
+            return True
+        return list(fields) or False
+
+    @staticmethod
+    def _record_to_dict(record: Any, with_vectors: bool = True) -> Dict[str, Any]:
+        """Convert Qdrant record to adapter dict format."""
+        result = {
+            "id": str(record.id),
+            "payload": record.payload or {}
+        }
+        if with_vectors:
+            result["vector"] = record.vector
+        return result
+
+    @staticmethod
+    def _scored_point_to_dict(scored_point: Any, with_vectors: bool = True) -> Dict[str, Any]:
+        """Convert Qdrant scored point to adapter dict format."""
+        result = {
+            "id": str(scored_point.id),
+            "score": scored_point.score,
+            "payload": scored_point.payload or {}
+        }
+        if with_vectors:
+            result["vector"] = scored_point.vector
+        return result
+
     # === IBatchProcessingRepository methods (stubs, to be implemented) ===
 
     async def create_processing_records(self, request_id: str, materials: list) -> list:
@@ -465,11 +994,7 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             material_ids.append(material_id)
 
         # 2. Upsert all points in batch
-        await asyncio.to_thread(
-            self.client.upsert,
-            collection_name=collection_name,
-            points=points
-        )
+        await self._upsert_points(collection_name, points)
         logger.info(f"Created {len(points)} processing records in Qdrant for request {request_id}")
         return material_ids
 
@@ -530,14 +1055,49 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             payload=updated_payload
         )
         
-        await asyncio.to_thread(
-            self.client.upsert,
-            collection_name,
-            [point]
-        )
+        await self._upsert_points(collection_name, [point])
         
         return True
 
+    async def update_processing_statuses(self, request_id: str, material_ids: List[str], status: str) -> bool:
+        """Set one status for several materials of a request with a single set_payload call."""
+        if not material_ids:
+            return True
+        await self._set_payload(
+            "processing_records",
+            {"status": status, "updated_at": datetime.utcnow().isoformat()},
+            Filter(must=[
+                FieldCondition(key="request_id", match=MatchValue(value=request_id)),
+                FieldCondition(key="material_id", match=MatchAny(any=list(material_ids))),
+            ])
+        )
+        return True
+
+    async def update_processing_results(self, request_id: str, updates: List[Dict[str, Any]]) -> bool:
+        """Store results of several materials with one batch of set_payload operations (без scroll)."""
+        if not updates:
+            return True
+        now_iso = datetime.utcnow().isoformat()
+        operations = []
+        for update in updates:
+            payload = {
+                key: value for key, value in update.items()
+                if key != 'material_id' and value is not None
+            }
+            payload['error'] = update.get('error')
+            payload['updated_at'] = now_iso
+            if payload.get('processed_at') is None and payload['status'] in ['completed', 'failed']:
+                payload['processed_at'] = now_iso
+            operations.append(SetPayloadOperation(set_payload=SetPayload(
+                payload=payload,
+                filter=Filter(must=[
+                    FieldCondition(key="request_id", match=MatchValue(value=request_id)),
+                    FieldCondition(key="material_id", match=MatchValue(value=update['material_id'])),
+                ])
+            )))
+        await self._batch_update_points("processing_records", operations)
+        return True
+
     async def get_processing_progress(self, request_id: str):
         """Get processing progress for a batch request (Qdrant).
 
@@ -639,11 +1199,7 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             except Exception:
                 continue
         if to_delete:
-            await asyncio.to_thread(
-                self.client.delete,
-                collection_name=collection_name,
-                points_selector=to_delete
-            )
+            await self._delete_points(collection_name, to_delete)
         logger.info(f"Deleted {len(to_delete)} old processing records from Qdrant (older than {days_old} days)")
         return len(to_delete) 
 
@@ -700,9 +1256,5 @@ class QdrantVectorDatabase(IVectorDatabase, IBatchProcessingRepository):
             vector=[0.0],
             payload=payload
         )
-        await asyncio.to_thread(
-            self.client.upsert,
-            collection_name=collection_name,
-            points=[point]
-        )
+        await self._upsert_points(collection_name, [point])
         return True 
\ No newline at end of file
@@ -0,0 +1,572 @@
+"""Native async Qdrant adapter with optional gRPC transport.
+
+Асинхронный адаптер Qdrant на базе AsyncQdrantClient: без asyncio.to_thread,
+с опциональным gRPC и пакетными операциями (search_batch, retrieve_many, upsert_many).
+"""
+
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from core.logging import get_logger
+import asyncio
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    Distance, Filter, PointStruct, QueryRequest
+)
+
+from core.database.adapters.qdrant_adapter import QdrantVectorDatabase
+from core.database.collection_profiles import CollectionProfile
+from core.database.filters import RESIDUAL_OVERFETCH, apply_residual, with_residual_fields
+from core.database.exceptions import ConnectionError, QueryError, DatabaseError
+
+
+logger = get_logger(__name__)
+
+
+class AsyncQdrantVectorDatabase(QdrantVectorDatabase):
+    """Qdrant vector database adapter built on AsyncQdrantClient.
+
+    Асинхронный адаптер Qdrant: все вызовы выполняются в event loop без пула потоков,
+    поэтому параллелизм ограничен только пулом соединений клиента.
+    Методы IBatchProcessingRepository наследуются от QdrantVectorDatabase.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize async Qdrant client.
+
+        Args:
+            config: Qdrant configuration dictionary
+                - url: Qdrant URL (or location=":memory:" for local mode)
+                - api_key: Qdrant API key
+                - timeout: Request timeout in seconds (default: 30)
+                - prefer_grpc: Use gRPC transport (default: False)
+                - grpc_port: gRPC port (default: 6334)
+                - pool_size: HTTP/gRPC connection pool size (default: 100)
+                - upsert_chunk_size: Points per upsert request (default: 256)
+                - upsert_parallelism: Concurrent upsert requests (default: 4)
+                - collection_profile: Storage profile of new collections (default: float32)
+                - hnsw_m, hnsw_ef_construct, hnsw_ef: HNSW overrides of the profile
+
+        Raises:
+            ConnectionError: If client initialization fails
+        """
+        try:
+            self.config = config
+            client_kwargs = {
+                "api_key": config.get("api_key"),
+                "timeout": config.get("timeout", 30),
+                "prefer_grpc": config.get("prefer_grpc", False),
+                "grpc_port": config.get("grpc_port", 6334),
+                "pool_size": config.get("pool_size", 100),
+            }
+            if config.get("location"):
+                self.client = AsyncQdrantClient(location=config["location"])
+            else:
+                self.client = AsyncQdrantClient(url=config["url"], **client_kwargs)
+
+            self.collection_name = config.get("collection_name", "materials")
+            self.vector_size = config.get("vector_size", 1536)
+            self.distance = getattr(Distance, config.get("distance", "COSINE").upper())
+            self.upsert_chunk_size = config.get("upsert_chunk_size", 256)
+            self.upsert_parallelism = config.get("upsert_parallelism", 4)
+            self.profile = self.resolve_collection_profile(config.get("collection_profile"))
+
+            logger.info(
+                f"Async Qdrant client initialized for collection: {self.collection_name} "
+                f"(grpc={client_kwargs['prefer_grpc']}, pool_size={client_kwargs['pool_size']})"
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to initialize async Qdrant client: {e}")
+            raise ConnectionError(
+                database_type="Qdrant",
+                message="Failed to connect to Qdrant",
+                details=str(e)
+            )
+
+    async def create_collection(self, name: str, vector_size: int, distance_metric: str = "cosine",
+                               profile: Optional[Union[str, CollectionProfile]] = None) -> bool:
+        """Create a new collection for storing vectors.
+
+        Args:
+            name: Collection name
+            vector_size: Dimension of vectors
+            distance_metric: Distance calculation method
+            profile: Storage profile (float32, int8, binary; default - configured profile)
+
+        Returns:
+            True if collection created successfully
+
+        Raises:
+            DatabaseError: If collection creation fails
+        """
+        try:
+            profile = self.resolve_collection_profile(profile)
+            await self.client.create_collection(
+                collection_name=name,
+                **profile.collection_kwargs(vector_size, self._distance(distance_metric))
+            )
+
+            logger.info(f"Created Qdrant collection: {name} (profile: {profile.name})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to create collection {name}: {e}")
+            raise DatabaseError(f"Failed to create collection {name}", details=str(e))
+
+    async def delete_collection(self, name: str) -> bool:
+        """Delete a collection with all its points.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            True if collection deleted successfully
+
+        Raises:
+            DatabaseError: If deletion fails
+        """
+        try:
+            await self.client.delete_collection(collection_name=name)
+            logger.info(f"Deleted Qdrant collection: {name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete collection {name}: {e}")
+            raise DatabaseError(f"Failed to delete collection {name}", details=str(e))
+
+    async def collection_exists(self, name: str) -> bool:
+        """Check if collection exists.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            True if collection exists
+        """
+        try:
+            return await self.client.collection_exists(name)
+
+        except Exception as e:
+            logger.error(f"Failed to check collection existence {name}: {e}")
+            return False
+
+    async def search(self, collection_name: str, query_vector: List[float],
+                    limit: int = 10, filter_conditions: Optional[Dict] = None,
+                    with_vectors: bool = False, fields: Optional[Sequence[str]] = None,
+                    score_threshold: Optional[float] = None, oversampling: Optional[float] = None,
+                    rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Search for similar vectors.
+
+        Args:
+            collection_name: Collection to search in
+            query_vector: Query vector
+            limit: Maximum number of results
+            filter_conditions: Optional filtering conditions (dict, Filter or FilterSpec)
+            with_vectors: Fetch stored vectors
+            fields: Payload keys to fetch (None - whole payload)
+            score_threshold: Minimum score of returned results
+            oversampling: Quantized candidates per result (default - profile value)
+            rescore: Re-score candidates with original vectors (default - profile value)
+
+        Returns:
+            List of search results with scores and metadata
+
+        Raises:
+            QueryError: If search operation fails
+        """
+        try:
+            query_filter, residual = self._compile_filter(filter_conditions)
+            response = await self.client.query_points(
+                collection_name=collection_name,
+                query=query_vector,
+                limit=limit * RESIDUAL_OVERFETCH if residual else limit,
+                query_filter=query_filter,
+                with_payload=self._payload_selector(with_residual_fields(fields, residual) if residual else fields),
+                with_vectors=with_vectors,
+                score_threshold=score_threshold,
+                search_params=self.profile.search_params(oversampling, rescore)
+            )
+
+            results = [self._scored_point_to_dict(point, with_vectors) for point in response.points]
+            if residual:
+                results = apply_residual(results, residual, limit, fields)
+            logger.debug(f"Found {len(results)} results in {collection_name}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Failed to search in {collection_name}: {e}")
+            raise QueryError(f"Search failed in {collection_name}", details=str(e))
+
+    async def search_batch(self, collection_name: str, query_vectors: List[List[float]],
+                          limit: int = 10, filter_conditions: Optional[Dict] = None,
+                          with_vectors: bool = False,
+                          fields: Optional[Sequence[str]] = None,
+                          oversampling: Optional[float] = None,
+                          rescore: Optional[bool] = None) -> List[List[Dict[str, Any]]]:
+        """Search for several query vectors in a single request.
+
+        Args:
+            collection_name: Collection to search in
+            query_vectors: Query vectors
+            limit: Maximum number of results per query
+            filter_conditions: Optional filtering conditions applied to every query
+            with_vectors: Fetch stored vectors
+            fields: Payload keys to fetch (None - whole payload)
+            oversampling: Quantized candidates per result (default - profile value)
+            rescore: Re-score candidates with original vectors (default - profile value)
+
+        Returns:
+            List of result lists, in the order of ``query_vectors``
+
+        Raises:
+            QueryError: If search operation fails
+        """
+        if not query_vectors:
+            return []
+
+        try:
+            query_filter = self._build_filter(filter_conditions)
+            with_payload = self._payload_selector(fields)
+            search_params = self.profile.search_params(oversampling, rescore)
+            requests = [
+                QueryRequest(
+                    query=query_vector,
+                    limit=limit,
+                    filter=query_filter,
+                    params=search_params,
+                    with_payload=with_payload,
+                    with_vector=with_vectors
+                )
+                for query_vector in query_vectors
+            ]
+            responses = await self.client.query_batch_points(
+                collection_name=collection_name,
+                requests=requests
+            )
+
+            results = [
+                [self._scored_point_to_dict(point, with_vectors) for point in response.points]
+                for response in responses
+            ]
+            logger.debug(f"Batch search of {len(query_vectors)} queries in {collection_name}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Failed to batch search in {collection_name}: {e}")
+            raise QueryError(f"Batch search failed in {collection_name}", details=str(e))
+
+    async def get_by_id(self, collection_name: str, vector_id: str,
+                        with_vectors: bool = False, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """Get vector by ID.
+
+        Args:
+            collection_name: Collection name
+            vector_id: Vector ID
+            with_vectors: Fetch the stored vector
+            fields: Payload keys to fetch (None - whole payload)
+
+        Returns:
+            Vector data or None if not found
+        """
+        try:
+            results = await self.client.retrieve(
+                collection_name=collection_name,
+                ids=[vector_id],
+                with_payload=self._payload_selector(fields),
+                with_vectors=with_vectors
+            )
+
+            if not results:
+                return None
+
+            return self._record_to_dict(results[0], with_vectors)
+
+        except Exception as e:
+            logger.error(f"Failed to get vector {vector_id} from {collection_name}: {e}")
+            return None
+
+    async def retrieve_many(self, collection_name: str, vector_ids: List[str],
+                           with_vectors: bool = False,
+                           fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get several vectors by ID in one request.
+
+        Args:
+            collection_name: Collection name
+            vector_ids: Vector IDs
+            with_vectors: Include vector data
+            fields: Payload keys to fetch (None - whole payload)
+
+        Returns:
+            Found records (missing IDs are skipped)
+
+        Raises:
+            QueryError: If retrieve operation fails
+        """
+        if not vector_ids:
+            return []
+
+        try:
+            records = await self.client.retrieve(
+                collection_name=collection_name,
+                ids=vector_ids,
+                with_payload=self._payload_selector(fields),
+                with_vectors=with_vectors
+            )
+            return [self._record_to_dict(record, with_vectors) for record in records]
+
+        except Exception as e:
+            logger.error(f"Failed to retrieve {len(vector_ids)} vectors from {collection_name}: {e}")
+            raise QueryError(f"Retrieve failed in {collection_name}", details=str(e))
+
+    async def upsert_many(self, collection_name: str, vectors: List[Dict[str, Any]],
+                         chunk_size: Optional[int] = None,
+                         parallelism: Optional[int] = None) -> int:
+        """Insert or update vectors in chunks, several chunks in flight.
+
+        Args:
+            collection_name: Target collection
+            vectors: List of vector objects with id, vector, and payload
+            chunk_size: Points per request (default: upsert_chunk_size)
+            parallelism: Maximum concurrent requests (default: upsert_parallelism)
+
+        Returns:
+            Number of upserted vectors
+
+        Raises:
+            DatabaseError: If any chunk fails
+        """
+        if not vectors:
+            return 0
+
+        chunk_size = chunk_size or self.upsert_chunk_size
+        semaphore = asyncio.Semaphore(parallelism or self.upsert_parallelism)
+
+        try:
+            if not await self.collection_exists(collection_name):
+                await self.create_collection(collection_name, self.vector_size)
+
+            points = [
+                PointStruct(
+                    id=vector_data["id"],
+                    vector=vector_data["vector"],
+                    payload=vector_data.get("payload", {})
+                )
+                for vector_data in vectors
+            ]
+
+            async def upsert_chunk(chunk: List[PointStruct]) -> None:
+                async with semaphore:
+                    await self._upsert_points(collection_name, chunk)
+
+            await asyncio.gather(*[
+                upsert_chunk(points[i:i + chunk_size])
+                for i in range(0, len(points), chunk_size)
+            ])
+
+            logger.info(f"Upserted {len(points)} vectors to {collection_name} in chunks of {chunk_size}")
+            return len(points)
+
+        except Exception as e:
+            logger.error(f"Failed parallel upsert to {collection_name}: {e}")
+            raise DatabaseError("Parallel upsert failed", details=str(e))
+
+    async def batch_upsert(self, collection_name: str, vectors: List[Dict[str, Any]],
+                          batch_size: int = 100) -> bool:
+        """Insert or update multiple vectors in parallel batches.
+
+        Args:
+            collection_name: Target collection
+            vectors: List of vector objects with id, vector, and payload
+            batch_size: Size of processing batches
+
+        Returns:
+            True if batch upsert successful
+        """
+        await self.upsert_many(collection_name, vectors, chunk_size=batch_size)
+        return True
+
+    async def create_payload_index(self, collection_name: str, field_name: str,
+                                  field_type: str = "keyword") -> bool:
+        """Create payload index (idempotent in Qdrant).
+
+        Args:
+            collection_name: Collection name
+            field_name: Payload field to index
+            field_type: Index type (keyword, keyword_prefix, integer, float, datetime, text)
+
+        Returns:
+            True if index was created
+        """
+        try:
+            await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=self._field_schema(field_type)
+            )
+            logger.info(f"Payload index '{field_name}' ({field_type}) ensured on {collection_name}")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Failed to create payload index '{field_name}' on {collection_name}: {e}")
+            return False
+
+    async def count(self, collection_name: str, filter_conditions: Optional[Dict] = None) -> int:
+        """Count vectors in collection.
+
+        Args:
+            collection_name: Collection name
+            filter_conditions: Optional filtering conditions
+
+        Returns:
+            Number of matching vectors
+
+        Raises:
+            QueryError: If count operation fails
+        """
+        try:
+            result = await self.client.count(
+                collection_name=collection_name,
+                count_filter=self._build_filter(filter_conditions),
+                exact=True
+            )
+            return result.count
+
+        except Exception as e:
+            logger.error(f"Failed to count vectors in {collection_name}: {e}")
+            raise QueryError(f"Count failed in {collection_name}", details=str(e))
+
+    async def scroll_all(self, collection_name: str, with_payload: bool = True, with_vectors: bool = False,
+                         fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get all records from collection using scroll method.
+
+        Args:
+            collection_name: Collection name
+            with_payload: Include payload data
+            with_vectors: Include vector data
+            fields: Payload keys to fetch (None - whole payload)
+
+        Returns:
+            List of all records in collection
+        """
+        try:
+            all_records = []
+            next_page_offset = None
+
+            while True:
+                records, next_page_offset = await self.client.scroll(
+                    collection_name=collection_name,
+                    limit=256,
+                    offset=next_page_offset,
+                    with_payload=self._payload_selector(fields) if with_payload else False,
+                    with_vectors=with_vectors
+                )
+
+                for record in records:
+                    result = self._record_to_dict(record, with_vectors)
+                    if not with_payload:
+                        result["payload"] = {}
+                    all_records.append(result)
+
+                if next_page_offset is None:
+                    break
+
+            return all_records
+
+        except Exception as e:
+            logger.error(f"Failed to scroll all records from {collection_name}: {e}")
+            return []
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Check database health status.
+
+        Returns:
+            Health status information
+        """
+        try:
+            collections = await self.client.get_collections()
+            collection_exists = await self.collection_exists(self.collection_name)
+
+            vectors_count = 0
+            if collection_exists:
+                try:
+                    vectors_count = await self.count(self.collection_name)
+                except Exception:
+                    pass
+
+            return {
+                "status": "healthy",
+                "details": {
+                    "database_type": "Qdrant",
+                    "client": "async",
+                    "transport": "grpc" if self.config.get("prefer_grpc") else "http",
+                    "url": self.config.get("url") or self.config.get("location"),
+                    "collections_count": len(collections.collections),
+                    "default_collection": self.collection_name,
+                    "default_collection_exists": collection_exists,
+                    "vectors_count": vectors_count,
+                    "connection_test": "passed"
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Qdrant health check failed: {e}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+    async def close(self) -> None:
+        """Close client connections."""
+        try:
+            await self.client.close()
+            logger.info("Async Qdrant client closed")
+        except Exception as e:
+            logger.error(f"Error closing async Qdrant client: {e}")
+
+    # === Low-level point operations ===
+
+    async def _get_collection_info(self, collection_name: str) -> Any:
+        """Collection info (vectors config, payload schema; no payload indexes in local mode)."""
+        return await self.client.get_collection(collection_name)
+
+    async def _collection_names(self) -> List[str]:
+        """Names of the physical collections (aliases are not listed)."""
+        collections = await self.client.get_collections()
+        return [collection.name for collection in collections.collections]
+
+    async def _get_aliases(self) -> Dict[str, str]:
+        """Collection aliases: alias name -> collection name."""
+        result = await self.client.get_aliases()
+        return {alias.alias_name: alias.collection_name for alias in result.aliases}
+
+    async def _update_aliases(self, operations: List[Any]) -> None:
+        """Apply alias operations in one atomic request."""
+        await self.client.update_collection_aliases(change_aliases_operations=operations)
+
+    async def _scroll_page(self, collection_name: str, limit: int, offset: Optional[Any],
+                           with_vectors: bool) -> Tuple[List[Any], Optional[Any]]:
+        """One scroll page of records and the next page offset."""
+        return await self.client.scroll(
+            collection_name=collection_name,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors
+        )
+
+    async def _upsert_points(self, collection_name: str, points: List[PointStruct]) -> None:
+        """Upsert prepared points."""
+        await self.client.upsert(collection_name=collection_name, points=points)
+
+    async def _delete_points(self, collection_name: str, point_ids: List[str]) -> None:
+        """Delete points by ID."""
+        await self.client.delete(collection_name=collection_name, points_selector=point_ids)
+
+    async def _set_payload(self, collection_name: str, payload: Dict[str, Any], points_filter: Filter) -> None:
+        """Set payload keys on all points matching the filter."""
+        await self.client.set_payload(collection_name=collection_name, payload=payload, points=points_filter)
+
+    async def _batch_update_points(self, collection_name: str, operations: List[Any]) -> None:
+        """Apply several point update operations in one request."""
+        await self.client.batch_update_points(collection_name=collection_name, update_operations=operations)
+
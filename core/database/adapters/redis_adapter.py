@@ -28,6 +28,25 @@ from core.database.exceptions import ConnectionError, DatabaseError
 
 logger = get_logger(__name__)
 
+# GET списка ID (JSON без сериализации адаптера) и MGET значений по ним за один round-trip.
+# Ключи значений строятся в скрипте, поэтому в Redis Cluster они должны быть в одном слоте.
+GET_REFERENCED_SCRIPT = """
+local ids = redis.call('GET', KEYS[1])
+if not ids then
+    return false
+end
+ids = cjson.decode(ids)
+local count = math.min(#ids, tonumber(ARGV[2]))
+if count == 0 then
+    return {}
+end
+local keys = {}
+for i = 1, count do
+    keys[i] = ARGV[1] .. ids[i]
+end
+return redis.call('MGET', unpack(keys))
+"""
+
 
 class RedisDatabase(ICacheDatabase):
     """Redis cache database adapter with async/await support.
@@ -83,6 +102,7 @@ class RedisDatabase(ICacheDatabase):
             # Cache configuration
             self.default_ttl = config.get("default_ttl", 3600)  # 1 hour
             self.key_prefix = config.get("key_prefix", "rag_materials:")
+            self._get_referenced_script = None
             
             logger.info(f"Redis adapter initialized with max_connections={pool_kwargs['max_connections']}")
             
@@ -298,7 +318,37 @@ class RedisDatabase(ICacheDatabase):
                 message=f"Failed to get TTL for key '{key}'",
                 details=str(e)
             )
-    
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """Atomically increment integer counter.
+
+        Counter is stored as a raw Redis integer (not serialized), read it back
+        with ``get(key, deserialize=False)``.
+
+        Args:
+            key: Counter key
+            amount: Increment value
+
+        Returns:
+            Counter value after increment
+
+        Raises:
+            DatabaseError: If operation fails
+        """
+        try:
+            full_key = self._build_key(key)
+            result = await self.redis.incrby(full_key, amount)
+
+            logger.debug(f"Incremented counter '{key}' to {result}")
+            return int(result)
+
+        except RedisError as e:
+            logger.error(f"Failed to increment counter '{key}': {e}")
+            raise DatabaseError(
+                message=f"Failed to increment counter '{key}'",
+                details=str(e)
+            )
+
     # === Hash operations ===
     
     async def hset(self, key: str, field: str, value: Any, ttl: Optional[int] = None) -> bool:
@@ -572,18 +622,16 @@ class RedisDatabase(ICacheDatabase):
                 serialized_value = self._serialize_value(value)
                 full_mapping[full_key] = serialized_value
             
-            result = await self.redis.mset(full_mapping)
-            
-            # Set TTL for all keys if provided
+            # MSET and per-key EXPIRE in one pipelined round-trip
+            pipeline = self.redis.pipeline(transaction=False)
+            pipeline.mset(full_mapping)
             if ttl:
-                keys = list(full_mapping.keys())
-                pipeline = self.redis.pipeline()
-                for key in keys:
+                for key in full_mapping:
                     pipeline.expire(key, ttl)
-                await pipeline.execute()
+            results = await pipeline.execute()
             
             logger.debug(f"Set {len(mapping)} keys with batch operation")
-            return result
+            return bool(results[0])
             
         except RedisError as e:
             logger.error(f"Failed to set multiple keys: {e}")
@@ -626,6 +674,41 @@ class RedisDatabase(ICacheDatabase):
                 details=str(e)
             )
     
+    async def get_referenced(self, key: str, value_prefix: str, limit: int) -> Optional[List[Any]]:
+        """Get values referenced by a stored ID list in one round-trip.
+        
+        Под ``key`` хранится JSON список ID (записанный с ``serialize=False``);
+        Lua скрипт читает его и делает MGET ``value_prefix + id`` для первых
+        ``limit`` ID на сервере.
+        
+        Args:
+            key: Cache key of the ID list
+            value_prefix: Key prefix of the referenced values
+            limit: Maximum number of IDs to resolve
+            
+        Returns:
+            Values in ID order (None for missing keys), None if ``key`` is missing
+            
+        Raises:
+            DatabaseError: If operation fails
+        """
+        try:
+            if self._get_referenced_script is None:
+                self._get_referenced_script = self.redis.register_script(GET_REFERENCED_SCRIPT)
+            result = await self._get_referenced_script(
+                keys=[self._build_key(key)], args=[self._build_key(value_prefix), limit]
+            )
+            if result is None:
+                return None
+            return [None if value is None else self._deserialize_value(value) for value in result]
+            
+        except RedisError as e:
+            logger.error(f"Failed to get values referenced by '{key}': {e}")
+            raise DatabaseError(
+                message=f"Failed to get values referenced by '{key}'",
+                details=str(e)
+            )
+    
     async def delete_pattern(self, pattern: str) -> int:
         """Delete keys matching pattern.
         
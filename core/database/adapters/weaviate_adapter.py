@@ -4,11 +4,12 @@
 """
 
 from core.logging import get_logger
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 import uuid
 from datetime import datetime
 
 from core.database.interfaces import IVectorDatabase
+from core.database.filters import RESIDUAL_OVERFETCH, FilterSpec, apply_residual
 from core.database.exceptions import DatabaseError, ConnectionError, ConfigurationError
 
 logger = get_logger(__name__)
@@ -21,6 +22,11 @@ class WeaviateVectorDatabase(IVectorDatabase):
     Supports all required methods: search, upsert, delete, batch_upsert, get_by_id, health_check
     """
     
+    # Material properties returned by search unless a projection is requested
+    PROPERTIES = ["material_id", "name", "description", "category", "unit", "price", "metadata", "created_at"]
+    # Logical filter fields stored under other property names
+    FIELD_MAP = {"use_category": "category"}
+    
     def __init__(self, config: Dict[str, Any]):
         """Initialize Weaviate database client.
         
@@ -167,14 +173,22 @@ class WeaviateVectorDatabase(IVectorDatabase):
             raise DatabaseError(f"Schema creation failed: {e}")
     
     async def search(self, collection_name: str, query_vector: List[float], 
-                    limit: int = 10, filter_dict: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+                    limit: int = 10, filter_dict: Optional[Dict[str, Any]] = None,
+                    with_vectors: bool = False, fields: Optional[Sequence[str]] = None,
+                    score_threshold: Optional[float] = None, oversampling: Optional[float] = None,
+                    rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
         """Search for similar vectors in Weaviate.
         
         Args:
             collection_name: Collection name (mapped to Weaviate class)
             query_vector: Query vector for similarity search
             limit: Maximum number of results to return
-            filter_dict: Optional metadata filters
+            filter_dict: Optional metadata filters (dict or FilterSpec)
+            with_vectors: Return stored vectors
+            fields: Properties to fetch (None - all material properties)
+            score_threshold: Minimum certainty (default 0.7)
+            oversampling: Ignored (Qdrant quantization option)
+            rescore: Ignored (Qdrant quantization option)
             
         Returns:
             List of search results with vectors and metadata
@@ -183,23 +197,28 @@ class WeaviateVectorDatabase(IVectorDatabase):
             if not self.client:
                 await self.connect()
             
+            residual = None
+            where_filter = None
+            if isinstance(filter_dict, FilterSpec):
+                where_filter, residual = filter_dict.to_weaviate(self.FIELD_MAP, self.PROPERTIES)
+            elif filter_dict:
+                where_filter = self._build_where_filter(filter_dict)
+            
             # Build the query
             query = (
                 self.client.query
-                .get(self.class_name, ["material_id", "name", "description", "category", "unit", "price", "metadata", "created_at"])
+                .get(self.class_name, list(fields) if fields else self.PROPERTIES)
                 .with_near_vector({
                     "vector": query_vector,
-                    "certainty": 0.7  # Minimum similarity threshold
+                    "certainty": 0.7 if score_threshold is None else score_threshold  # Minimum similarity threshold
                 })
-                .with_limit(limit)
-                .with_additional(["certainty", "id"])
+                .with_limit(limit * RESIDUAL_OVERFETCH if residual else limit)
+                .with_additional(["certainty", "id", "vector"] if with_vectors else ["certainty", "id"])
             )
             
             # Add filters if provided
-            if filter_dict:
-                where_filter = self._build_where_filter(filter_dict)
-                if where_filter:
-                    query = query.with_where(where_filter)
+            if where_filter:
+                query = query.with_where(where_filter)
             
             # Execute query
             result = query.do()
@@ -222,12 +241,18 @@ class WeaviateVectorDatabase(IVectorDatabase):
                         "created_at": item.get("created_at", "")
                     }
                     
-                    results.append({
+                    result = {
                         "id": item["_additional"]["id"],
-                        "vector": query_vector,  # Weaviate doesn't return vectors by default
                         "metadata": metadata,
                         "score": item["_additional"]["certainty"]
-                    })
+                    }
+                    if with_vectors:
+                        result["vector"] = item["_additional"].get("vector", [])
+                    results.append(result)
+            
+            # Условия по полям вне схемы класса проверяются на метаданных результатов
+            if residual:
+                results = apply_residual(results, residual, limit, payload_key="metadata", field_map=self.FIELD_MAP)
             
             logger.info(f"Found {len(results)} results for vector search")
             return results
@@ -420,12 +445,15 @@ class WeaviateVectorDatabase(IVectorDatabase):
         """
         return await self.upsert(collection_name, vectors, batch_size)
     
-    async def get_by_id(self, collection_name: str, vector_id: str) -> Optional[Dict[str, Any]]:
+    async def get_by_id(self, collection_name: str, vector_id: str,
+                        with_vectors: bool = False, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
         """Get vector by ID from Weaviate.
         
         Args:
             collection_name: Collection name (mapped to Weaviate class)
             vector_id: Vector ID to retrieve
+            with_vectors: Return the stored vector
+            fields: Unused (Weaviate returns the whole object by ID)
             
         Returns:
             Vector data or None if not found
@@ -438,7 +466,7 @@ class WeaviateVectorDatabase(IVectorDatabase):
             result = self.client.data_object.get_by_id(
                 vector_id,
                 class_name=self.class_name,
-                with_vector=True
+                with_vector=with_vectors
             )
             
             if result:
@@ -456,11 +484,13 @@ class WeaviateVectorDatabase(IVectorDatabase):
                     "created_at": properties.get("created_at", "")
                 }
                 
-                return {
+                record = {
                     "id": vector_id,
-                    "vector": result.get("vector", []),
                     "metadata": metadata
                 }
+                if with_vectors:
+                    record["vector"] = result.get("vector", [])
+                return record
             
             return None
             
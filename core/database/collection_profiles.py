@@ -0,0 +1,139 @@
+"""Qdrant collection profiles: vector quantization, storage and HNSW settings.
+
+Профили коллекций Qdrant: квантизация векторов (int8 / binary), хранение
+оригинальных float32 векторов на диске, параметры HNSW (m, ef_construct) и
+параметры поиска по умолчанию (oversampling, rescore, hnsw_ef).
+
+С квантизацией в RAM остаются только квантованные векторы и граф HNSW: поиск
+идет по ним с запасом кандидатов (oversampling), затем кандидаты пересчитываются
+(rescore) по оригинальным векторам с диска.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+from qdrant_client import models
+
+QUANTIZATIONS = (None, "scalar", "binary")
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """Storage and search settings of a vector collection."""
+    name: str
+    quantization: Optional[str] = None
+    quantile: float = 0.99
+    quantized_in_ram: bool = True
+    vectors_on_disk: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    hnsw_ef: Optional[int] = None
+    oversampling: Optional[float] = None
+    rescore: Optional[bool] = None
+
+    def __post_init__(self):
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {self.quantization!r} (expected one of {QUANTIZATIONS})")
+
+    @property
+    def quantized(self) -> bool:
+        return self.quantization is not None
+
+    def with_overrides(self, **overrides: Any) -> "CollectionProfile":
+        """Copy with the given non-None settings replaced (e.g. hnsw_m from settings)."""
+        overrides = {key: value for key, value in overrides.items() if value is not None}
+        return replace(self, **overrides) if overrides else self
+
+    # === Collection creation ===
+
+    def vectors_config(self, vector_size: int, distance: models.Distance) -> models.VectorParams:
+        return models.VectorParams(size=vector_size, distance=distance, on_disk=self.vectors_on_disk or None)
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=self.quantile, always_ram=self.quantized_in_ram,
+            ))
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=self.quantized_in_ram))
+        return None
+
+    def hnsw_config(self) -> Optional[models.HnswConfigDiff]:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def collection_kwargs(self, vector_size: int, distance: models.Distance = models.Distance.COSINE) -> Dict[str, Any]:
+        """Keyword arguments of ``QdrantClient.create_collection`` for this profile."""
+        kwargs: Dict[str, Any] = {"vectors_config": self.vectors_config(vector_size, distance)}
+        if self.quantized:
+            kwargs["quantization_config"] = self.quantization_config()
+        if self.hnsw_config() is not None:
+            kwargs["hnsw_config"] = self.hnsw_config()
+        return kwargs
+
+    # === Search ===
+
+    def search_params(self, oversampling: Optional[float] = None, rescore: Optional[bool] = None,
+                      hnsw_ef: Optional[int] = None) -> Optional[models.SearchParams]:
+        """Search parameters: per-request values override the profile defaults.
+
+        Returns None when nothing differs from the server defaults.
+        """
+        oversampling = oversampling if oversampling is not None else self.oversampling
+        rescore = rescore if rescore is not None else self.rescore
+        hnsw_ef = hnsw_ef if hnsw_ef is not None else self.hnsw_ef
+        quantization = None
+        if oversampling is not None or rescore is not None:
+            quantization = models.QuantizationSearchParams(oversampling=oversampling, rescore=rescore)
+        if quantization is None and hnsw_ef is None:
+            return None
+        return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+    # === Sizing ===
+
+    def estimate_memory(self, points: int, vector_size: int) -> Dict[str, int]:
+        """Approximate RAM and disk bytes of the vectors and the HNSW graph.
+
+        Оценка: float32 - 4 байта на измерение, int8 - 1 байт, binary - 1 бит;
+        граф HNSW - 2 * m ссылок по 4 байта на точку на нулевом уровне.
+        """
+        original = points * vector_size * 4
+        quantized = {"scalar": points * vector_size, "binary": points * ((vector_size + 7) // 8)}.get(
+            self.quantization, 0
+        )
+        graph = points * 2 * (self.hnsw_m or 16) * 4
+        ram = graph + (0 if self.vectors_on_disk else original) + (quantized if self.quantized_in_ram else 0)
+        disk = (original if self.vectors_on_disk else 0) + (0 if self.quantized_in_ram else quantized)
+        return {"ram_bytes": ram, "disk_bytes": disk}
+
+
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    # Как раньше: float32 векторы в RAM, параметры HNSW сервера
+    "float32": CollectionProfile("float32"),
+    # int8: в 4 раза меньше RAM, recall почти без потерь при rescore
+    "int8": CollectionProfile(
+        "int8", quantization="scalar", vectors_on_disk=True,
+        hnsw_m=16, hnsw_ef_construct=128, oversampling=2.0, rescore=True,
+    ),
+    # binary: в 32 раза меньше RAM на векторы (для >= 1024 измерений); на кластеризованном
+    # каталоге recall@10 ~0.99 только при oversampling 8 (см. test_quantization_performance)
+    "binary": CollectionProfile(
+        "binary", quantization="binary", vectors_on_disk=True,
+        hnsw_m=16, hnsw_ef_construct=200, oversampling=8.0, rescore=True,
+    ),
+}
+
+
+def get_collection_profile(profile: Optional[Any] = None, **overrides: Any) -> CollectionProfile:
+    """Resolve a profile by name (None - "float32"), applying non-None overrides.
+
+    Raises:
+        ValueError: If the profile name is unknown
+    """
+    if isinstance(profile, CollectionProfile):
+        return profile.with_overrides(**overrides)
+    name = profile or "float32"
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile: {name!r} (available: {', '.join(COLLECTION_PROFILES)})")
+    return COLLECTION_PROFILES[name].with_overrides(**overrides)
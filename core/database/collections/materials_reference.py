@@ -9,6 +9,7 @@ from datetime import datetime
 from core.logging import get_logger
 from core.database.interfaces import IVectorDatabase
 from core.database.factories import DatabaseFactory
+from core.database.filters import normalize_keyword
 
 logger = get_logger(__name__)
 
@@ -65,6 +66,7 @@ class MaterialsReferenceCollection:
                 "sku": sku,
                 "name": name,
                 "unit": unit,
+                "unit_key": normalize_keyword(unit),
                 "color": color,
                 "created_at": datetime.utcnow().isoformat(),
                 "updated_at": datetime.utcnow().isoformat()
@@ -87,6 +89,56 @@ class MaterialsReferenceCollection:
             self.logger.error(f"❌ Failed to save material reference {sku}: {e}")
             return False
     
+    async def save_material_references(self, references: List[Dict[str, Any]]) -> bool:
+        """
+        Save several materials to reference database with one upsert.
+        
+        Пакетное сохранение материалов в справочник.
+        
+        Args:
+            references: Dicts with sku, name, unit, color and embedding
+            
+        Returns:
+            True if saved successfully
+        """
+        if not references:
+            return True
+        
+        try:
+            if not self.vector_db:
+                raise ValueError("Vector database not available")
+            
+            now = datetime.utcnow().isoformat()
+            # SKU is the point ID: the last reference for a SKU wins
+            vectors = {
+                ref["sku"]: {
+                    "id": ref["sku"],
+                    "vector": ref["embedding"],
+                    "payload": {
+                        "sku": ref["sku"],
+                        "name": ref["name"],
+                        "unit": ref["unit"],
+                        "unit_key": normalize_keyword(ref["unit"]),
+                        "color": ref.get("color"),
+                        "created_at": now,
+                        "updated_at": now
+                    }
+                }
+                for ref in references
+            }
+            
+            await self.vector_db.upsert(
+                collection_name=self.collection_name,
+                vectors=list(vectors.values())
+            )
+            
+            self.logger.info(f"✅ Saved {len(vectors)} material references")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"❌ Failed to save {len(references)} material references: {e}")
+            return False
+    
     async def find_material_by_sku(self, sku: str) -> Optional[Dict]:
         """
         Find material by SKU.
@@ -227,6 +279,7 @@ class MaterialsReferenceCollection:
                 payload["name"] = name
             if unit:
                 payload["unit"] = unit
+                payload["unit_key"] = normalize_keyword(unit)
             if color is not None:  # Allow None color
                 payload["color"] = color
             
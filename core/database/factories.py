@@ -48,17 +48,13 @@ class DatabaseFactory:
             
             logger.info(f"Creating vector database client: {database_type}")
             
-            if database_type in [DatabaseType.QDRANT_CLOUD.value, DatabaseType.QDRANT_LOCAL.value]:
-                return DatabaseFactory._create_qdrant_client(config)
-            elif database_type == DatabaseType.WEAVIATE.value:
-                return DatabaseFactory._create_weaviate_client(config)
-            elif database_type == DatabaseType.PINECONE.value:
-                return DatabaseFactory._create_pinecone_client(config)
-            else:
+            creator = VECTOR_DATABASE_REGISTRY.get(database_type)
+            if creator is None:
                 raise ConfigurationError(
                     config_key="DATABASE_TYPE",
                     message=f"Unsupported vector database type: {database_type}"
                 )
+            return creator(config)
                 
         except Exception as e:
             logger.error(f"Failed to create vector database client: {e}")
@@ -197,6 +193,10 @@ class DatabaseFactory:
         Returns:
             Qdrant vector database client
         """
+        if config.get("async_client"):
+            from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+            return AsyncQdrantVectorDatabase(config)
+        
         from core.database.adapters.qdrant_adapter import QdrantVectorDatabase
         return QdrantVectorDatabase(config)
     
@@ -283,19 +283,13 @@ class AIClientFactory:
             
             logger.info(f"Creating AI client: {ai_provider}")
             
-            if ai_provider == AIProvider.OPENAI.value:
-                return AIClientFactory._create_openai_client(config)
-            elif ai_provider == AIProvider.AZURE_OPENAI.value:
-                return AIClientFactory._create_azure_openai_client(config)
-            elif ai_provider == AIProvider.HUGGINGFACE.value:
-                return AIClientFactory._create_huggingface_client(config)
-            elif ai_provider == AIProvider.OLLAMA.value:
-                return AIClientFactory._create_ollama_client(config)
-            else:
+            creator = AI_PROVIDER_REGISTRY.get(ai_provider)
+            if creator is None:
                 raise ConfigurationError(
                     config_key="AI_PROVIDER",
                     message=f"Unsupported AI provider: {ai_provider}"
                 )
+            return creator(config)
                 
         except Exception as e:
             logger.error(f"Failed to create AI client: {e}")
@@ -330,12 +324,9 @@ class AIClientFactory:
     
     @staticmethod
     def _create_huggingface_client(config: Dict[str, Any]) -> Any:
-        """Create HuggingFace client instance."""
-        from sentence_transformers import SentenceTransformer
-        return SentenceTransformer(
-            config["model"],
-            device=config.get("device", "cpu")
-        )
+        """Create local HuggingFace embedding worker (shared model, dynamic batching)."""
+        from core.background.embedding_worker import get_local_embedding_worker
+        return get_local_embedding_worker(config)
     
     @staticmethod
     def _create_ollama_client(config: Dict[str, Any]) -> Any:
@@ -357,6 +348,46 @@ class AIClientFactory:
         }
 
 
+# Реестры клиентов: тип из настроек -> фабричная функция. Модуль адаптера и его
+# клиентская библиотека импортируются внутри фабрики, т.е. загружается только
+# сконфигурированный DATABASE_TYPE / AI_PROVIDER.
+VECTOR_DATABASE_REGISTRY: Dict[str, Callable[[Dict[str, Any]], IVectorDatabase]] = {
+    DatabaseType.QDRANT_CLOUD.value: DatabaseFactory._create_qdrant_client,
+    DatabaseType.QDRANT_LOCAL.value: DatabaseFactory._create_qdrant_client,
+    DatabaseType.WEAVIATE.value: DatabaseFactory._create_weaviate_client,
+    DatabaseType.PINECONE.value: DatabaseFactory._create_pinecone_client,
+}
+
+AI_PROVIDER_REGISTRY: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    AIProvider.OPENAI.value: AIClientFactory._create_openai_client,
+    AIProvider.AZURE_OPENAI.value: AIClientFactory._create_azure_openai_client,
+    AIProvider.HUGGINGFACE.value: AIClientFactory._create_huggingface_client,
+    AIProvider.OLLAMA.value: AIClientFactory._create_ollama_client,
+}
+
+
+def register_vector_database(db_type: str, creator: Callable[[Dict[str, Any]], IVectorDatabase]) -> None:
+    """Register vector database client factory for a DATABASE_TYPE value.
+
+    Args:
+        db_type: Database type name
+        creator: Factory taking vector DB config; should import its adapter lazily
+    """
+    VECTOR_DATABASE_REGISTRY[db_type] = creator
+    DatabaseFactory.create_vector_database.cache_clear()
+
+
+def register_ai_provider(provider: str, creator: Callable[[Dict[str, Any]], Any]) -> None:
+    """Register AI client factory for an AI_PROVIDER value.
+
+    Args:
+        provider: AI provider name
+        creator: Factory taking AI config; should import its SDK lazily
+    """
+    AI_PROVIDER_REGISTRY[provider] = creator
+    AIClientFactory.create_ai_client.cache_clear()
+
+
 class AllDatabasesUnavailableError(Exception):
     """Raised when all databases are unavailable for operation."""
     def __init__(self, errors: Dict[str, str]):
@@ -603,6 +634,34 @@ class DatabaseFallbackManager:
         self.logger.error(f"All DBs down for update_processing_status: {errors}")
         raise AllDatabasesUnavailableError(errors or {'all': 'No DB clients available'})
 
+    async def update_processing_statuses(self, request_id: str, material_ids: list, status: str) -> bool:
+        """Set one status for several materials of a batch (one bulk update) with fallback."""
+        errors = {}
+        for db, client in [('sql', self.sql_client), ('vector', self.vector_client)]:
+            if client is not None:
+                try:
+                    return await client.update_processing_statuses(request_id, material_ids, status)
+                except Exception as e:
+                    self.status[db] = False
+                    errors[db] = str(e)
+                    self.logger.error(f"{db} DB update_processing_statuses failed: {e}")
+        self.logger.error(f"All DBs down for update_processing_statuses: {errors}")
+        raise AllDatabasesUnavailableError(errors or {'all': 'No DB clients available'})
+
+    async def update_processing_results(self, request_id: str, updates: list) -> bool:
+        """Store results of several materials of a batch (one bulk update) with fallback."""
+        errors = {}
+        for db, client in [('sql', self.sql_client), ('vector', self.vector_client)]:
+            if client is not None:
+                try:
+                    return await client.update_processing_results(request_id, updates)
+                except Exception as e:
+                    self.status[db] = False
+                    errors[db] = str(e)
+                    self.logger.error(f"{db} DB update_processing_results failed: {e}")
+        self.logger.error(f"All DBs down for update_processing_results: {errors}")
+        raise AllDatabasesUnavailableError(errors or {'all': 'No DB clients available'})
+
     async def get_processing_progress(self, request_id: str):
         """Get processing progress for a batch request with fallback."""
         errors = {}
@@ -0,0 +1,304 @@
+"""Typed search filters compiled to native vector database filters.
+
+Типизированные фильтры поиска: одно описание условий компилируется в нативный
+фильтр Qdrant (``Filter``), Weaviate (``where``) или Pinecone (metadata filter),
+чтобы фильтрация выполнялась в базе, а не в Python после over-fetch.
+
+Условия, которые бэкенд не умеет проверить точно (например, SKU-шаблон с
+``*``/``?`` в Qdrant), возвращаются как остаток (``residual``): адаптер проверяет
+его сам на результатах поиска.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+WILDCARDS = re.compile(r"[*?]+")
+# Во сколько раз больше кандидатов запрашивается, когда часть фильтра проверяется на результатах
+RESIDUAL_OVERFETCH = 5
+
+
+@dataclass(frozen=True)
+class MatchCondition:
+    """Field equals value."""
+    field: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class AnyCondition:
+    """Field equals one of the values."""
+    field: str
+    values: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class RangeCondition:
+    """Field within inclusive bounds (datetimes or numbers)."""
+    field: str
+    gte: Optional[Union[datetime, float]] = None
+    lte: Optional[Union[datetime, float]] = None
+
+    @property
+    def is_datetime(self) -> bool:
+        return isinstance(self.gte, datetime) or isinstance(self.lte, datetime)
+
+
+@dataclass(frozen=True)
+class PatternCondition:
+    """Field matches a shell-style pattern (``*`` and ``?``, case-sensitive)."""
+    field: str
+    pattern: str
+
+    @property
+    def literal(self) -> Optional[str]:
+        """The pattern itself when it has no wildcards."""
+        return None if WILDCARDS.search(self.pattern) else self.pattern
+
+    @property
+    def prefix(self) -> str:
+        """The literal part before the first wildcard (every match starts with it)."""
+        return WILDCARDS.split(self.pattern, maxsplit=1)[0]
+
+    @property
+    def is_prefix(self) -> bool:
+        """The pattern is ``<literal>*``: a prefix match is exact."""
+        return bool(self.prefix) and self.pattern.endswith("*") and WILDCARDS.search(self.pattern[:-1]) is None
+
+
+Condition = Union[MatchCondition, AnyCondition, RangeCondition, PatternCondition]
+
+
+class CompiledFilter(NamedTuple):
+    """A native filter plus the conditions it could not express exactly."""
+    native: Any
+    residual: Optional["FilterSpec"]
+
+
+def normalize_keyword(value: Any) -> Optional[str]:
+    """Form of a keyword payload value compared by exact-match filters.
+
+    Ключевые поля (единицы измерения) хранятся рядом с исходным значением в
+    нормализованном виде (без пробелов по краям, в нижнем регистре), чтобы
+    " Кг" и "кг" совпадали при точном сравнении в базе.
+    """
+    if value is None:
+        return None
+    return str(value).strip().lower()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    """Stored dates are ISO strings in payloads and datetimes in models."""
+    if isinstance(value, datetime):
+        return _as_utc(value)
+    if isinstance(value, str) and value:
+        try:
+            return _as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """A conjunction of field conditions.
+
+    Все условия объединяются через AND; пустой FilterSpec ничего не фильтрует.
+    """
+    conditions: Tuple[Condition, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions)
+
+    @property
+    def fields(self) -> List[str]:
+        """Payload fields the conditions read."""
+        return list(dict.fromkeys(condition.field for condition in self.conditions))
+
+    def matches(self, record: Mapping[str, Any], field_map: Optional[Mapping[str, str]] = None) -> bool:
+        """Evaluate the conditions against a payload (or model field) mapping.
+
+        Args:
+            record: Payload dict or ``vars(model)``
+            field_map: Renames of logical fields in the record (e.g. use_category -> category)
+        """
+        for condition in self.conditions:
+            field = field_map.get(condition.field, condition.field) if field_map else condition.field
+            value = record.get(field)
+            if isinstance(condition, MatchCondition):
+                if value != condition.value:
+                    return False
+            elif isinstance(condition, AnyCondition):
+                if value not in condition.values:
+                    return False
+            elif isinstance(condition, RangeCondition):
+                if condition.is_datetime:
+                    value = _to_datetime(value)
+                    gte = _as_utc(condition.gte) if condition.gte is not None else None
+                    lte = _as_utc(condition.lte) if condition.lte is not None else None
+                else:
+                    gte, lte = condition.gte, condition.lte
+                if value is None or (gte is not None and value < gte) or (lte is not None and value > lte):
+                    return False
+            elif value is None or not fnmatchcase(str(value), condition.pattern):
+                return False
+        return True
+
+    # === Compilers ===
+
+    def to_qdrant(self) -> CompiledFilter:
+        """Compile to a Qdrant ``Filter``.
+
+        ``CEM*`` patterns become an exact ``MatchPrefix``; other wildcard patterns
+        are narrowed by the prefix before the first wildcard and re-checked as
+        a residual.
+        """
+        # qdrant-client импортируется только развертываниями с Qdrant
+        from qdrant_client import models
+
+        must, residual = [], []
+        for condition in self.conditions:
+            if isinstance(condition, MatchCondition):
+                must.append(models.FieldCondition(key=condition.field, match=models.MatchValue(value=condition.value)))
+            elif isinstance(condition, AnyCondition):
+                must.append(models.FieldCondition(key=condition.field, match=models.MatchAny(any=list(condition.values))))
+            elif isinstance(condition, RangeCondition):
+                range_type = models.DatetimeRange if condition.is_datetime else models.Range
+                must.append(models.FieldCondition(key=condition.field, range=range_type(gte=condition.gte, lte=condition.lte)))
+            elif condition.literal is not None:
+                must.append(models.FieldCondition(key=condition.field, match=models.MatchValue(value=condition.literal)))
+            else:
+                if condition.prefix:
+                    must.append(models.FieldCondition(key=condition.field, match=models.MatchPrefix(prefix=condition.prefix)))
+                if not condition.is_prefix:
+                    residual.append(condition)
+        return CompiledFilter(
+            models.Filter(must=must) if must else None,
+            FilterSpec(tuple(residual)) if residual else None,
+        )
+
+    def to_weaviate(
+        self,
+        field_map: Optional[Mapping[str, str]] = None,
+        properties: Optional[Sequence[str]] = None,
+    ) -> CompiledFilter:
+        """Compile to a Weaviate ``where`` filter.
+
+        Args:
+            field_map: Logical field -> Weaviate property
+            properties: Properties of the class; conditions on other fields stay residual
+        """
+        operands, residual = [], []
+        for condition in self.conditions:
+            path = [field_map.get(condition.field, condition.field) if field_map else condition.field]
+            if properties is not None and path[0] not in properties:
+                residual.append(condition)
+            elif isinstance(condition, MatchCondition):
+                operands.append({"path": path, "operator": "Equal", **self._weaviate_value(condition.value)})
+            elif isinstance(condition, AnyCondition):
+                operands.append({
+                    "operator": "Or",
+                    "operands": [
+                        {"path": path, "operator": "Equal", **self._weaviate_value(value)} for value in condition.values
+                    ],
+                })
+            elif isinstance(condition, RangeCondition):
+                for operator, bound in (("GreaterThanEqual", condition.gte), ("LessThanEqual", condition.lte)):
+                    if bound is not None:
+                        operands.append({"path": path, "operator": operator, **self._weaviate_value(bound)})
+            else:
+                operands.append({"path": path, "operator": "Like", "valueText": condition.pattern})
+
+        native = None
+        if len(operands) == 1:
+            native = operands[0]
+        elif operands:
+            native = {"operator": "And", "operands": operands}
+        return CompiledFilter(native, FilterSpec(tuple(residual)) if residual else None)
+
+    @staticmethod
+    def _weaviate_value(value: Any) -> Dict[str, Any]:
+        if isinstance(value, datetime):
+            return {"valueDate": _as_utc(value).isoformat()}
+        if isinstance(value, bool):
+            return {"valueBoolean": value}
+        if isinstance(value, (int, float)):
+            return {"valueNumber": float(value)}
+        return {"valueText": str(value)}
+
+    def to_pinecone(self) -> CompiledFilter:
+        """Compile to a Pinecone metadata filter.
+
+        Pinecone compares only numbers in ranges and has no pattern operator:
+        date ranges (stored as ISO strings) and patterns stay residual.
+        """
+        clauses, residual = [], []
+        for condition in self.conditions:
+            if isinstance(condition, MatchCondition):
+                clauses.append({condition.field: {"$eq": condition.value}})
+            elif isinstance(condition, AnyCondition):
+                clauses.append({condition.field: {"$in": list(condition.values)}})
+            elif isinstance(condition, RangeCondition) and not condition.is_datetime:
+                bounds = {}
+                if condition.gte is not None:
+                    bounds["$gte"] = condition.gte
+                if condition.lte is not None:
+                    bounds["$lte"] = condition.lte
+                clauses.append({condition.field: bounds})
+            elif isinstance(condition, PatternCondition) and condition.literal is not None:
+                clauses.append({condition.field: {"$eq": condition.literal}})
+            else:
+                residual.append(condition)
+
+        native = None
+        if len(clauses) == 1:
+            native = clauses[0]
+        elif clauses:
+            native = {"$and": clauses}
+        return CompiledFilter(native, FilterSpec(tuple(residual)) if residual else None)
+
+
+def apply_residual(
+    results: List[Dict[str, Any]],
+    residual: FilterSpec,
+    limit: int,
+    fields: Optional[Sequence[str]] = None,
+    payload_key: str = "payload",
+    field_map: Optional[Mapping[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """Keep the results that pass the residual conditions (at most ``limit``).
+
+    Args:
+        results: Adapter results over-fetched with the native part of the filter
+        residual: The conditions the native filter could not express
+        limit: The number of results requested
+        fields: The requested payload projection; keys fetched only for the
+            residual check are removed again
+        payload_key: The result key holding the payload ("payload" or "metadata")
+        field_map: Logical field -> stored key
+    """
+    kept = []
+    for result in results:
+        if not residual.matches(result.get(payload_key) or {}, field_map):
+            continue
+        if fields is not None:
+            result[payload_key] = {key: value for key, value in result[payload_key].items() if key in fields}
+        kept.append(result)
+        if len(kept) >= limit:
+            break
+    return kept
+
+
+def with_residual_fields(fields: Optional[Sequence[str]], residual: FilterSpec,
+                         field_map: Optional[Mapping[str, str]] = None) -> Optional[List[str]]:
+    """Extend a payload projection with the fields the residual check reads."""
+    if fields is None:
+        return None
+    extra = [field_map.get(field, field) if field_map else field for field in residual.fields]
+    return list(dict.fromkeys([*fields, *extra]))
@@ -3,8 +3,9 @@
 Интерфейсы для работы с различными типами БД в мульти-БД архитектуре.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 
 
 class IVectorDatabase(ABC):
@@ -52,26 +53,39 @@ class IVectorDatabase(ABC):
     
     @abstractmethod
     async def search(self, collection_name: str, query_vector: List[float], 
-                    limit: int = 10, filter_conditions: Optional[Dict] = None) -> List[Dict[str, Any]]:
+                    limit: int = 10, filter_conditions: Optional[Dict] = None,
+                    with_vectors: bool = False, fields: Optional[Sequence[str]] = None,
+                    score_threshold: Optional[float] = None, oversampling: Optional[float] = None,
+                    rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
         """Search for similar vectors.
         
         Args:
             collection_name: Collection to search in
             query_vector: Query vector
             limit: Maximum number of results
-            filter_conditions: Optional filtering conditions
+            filter_conditions: Optional filtering conditions (dict or ``FilterSpec``,
+                compiled to the native filter of the backend)
+            with_vectors: Fetch stored vectors ("vector" key is present only then)
+            fields: Payload keys to fetch (None - whole payload)
+            score_threshold: Minimum score of returned results
+            oversampling: Candidates fetched from quantized vectors per result
+                (Qdrant quantized collections; ignored by other backends)
+            rescore: Re-score the candidates with the original vectors
             
         Returns:
             List of search results with scores and metadata
         """
     
     @abstractmethod
-    async def get_by_id(self, collection_name: str, vector_id: str) -> Optional[Dict[str, Any]]:
+    async def get_by_id(self, collection_name: str, vector_id: str,
+                        with_vectors: bool = False, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
         """Get vector by ID.
         
         Args:
             collection_name: Collection name
             vector_id: Vector ID
+            with_vectors: Fetch the stored vector ("vector" key is present only then)
+            fields: Payload keys to fetch (None - whole payload)
             
         Returns:
             Vector data or None if not found
@@ -126,6 +140,112 @@ class IVectorDatabase(ABC):
         Returns:
             Health status information
         """
+    
+    # === Batched operations (default implementations, override natively) ===
+    
+    async def search_batch(self, collection_name: str, query_vectors: List[List[float]],
+                          limit: int = 10, filter_conditions: Optional[Dict] = None,
+                          with_vectors: bool = False,
+                          fields: Optional[Sequence[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Search for several query vectors at once.
+        
+        Default implementation runs ``search`` concurrently; adapters with a
+        native batch API should send all queries in a single request.
+        
+        Args:
+            collection_name: Collection to search in
+            query_vectors: Query vectors
+            limit: Maximum number of results per query
+            filter_conditions: Optional filtering conditions applied to every query
+            with_vectors: Fetch stored vectors
+            fields: Payload keys to fetch (None - whole payload)
+            
+        Returns:
+            List of result lists, in the order of ``query_vectors``
+        """
+        return list(await asyncio.gather(*[
+            self.search(collection_name, query_vector, limit, filter_conditions,
+                        with_vectors=with_vectors, fields=fields)
+            for query_vector in query_vectors
+        ]))
+    
+    async def retrieve_many(self, collection_name: str, vector_ids: List[str],
+                           with_vectors: bool = False,
+                           fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Get several vectors by ID.
+        
+        Args:
+            collection_name: Collection name
+            vector_ids: Vector IDs
+            with_vectors: Include vector data
+            fields: Payload keys to fetch (None - whole payload)
+            
+        Returns:
+            Found records (missing IDs are skipped)
+        """
+        records = await asyncio.gather(*[
+            self.get_by_id(collection_name, vector_id, with_vectors=with_vectors, fields=fields)
+            for vector_id in vector_ids
+        ])
+        return [record for record in records if record is not None]
+    
+    async def upsert_many(self, collection_name: str, vectors: List[Dict[str, Any]],
+                         chunk_size: int = 256, parallelism: int = 4) -> int:
+        """Insert or update vectors in chunks, several chunks in flight.
+        
+        Args:
+            collection_name: Target collection
+            vectors: List of vector objects with id, vector, and payload
+            chunk_size: Vectors per request
+            parallelism: Maximum concurrent chunk requests
+            
+        Returns:
+            Number of upserted vectors
+        """
+        await self.batch_upsert(collection_name, vectors, batch_size=chunk_size)
+        return len(vectors)
+    
+    async def create_payload_index(self, collection_name: str, field_name: str,
+                                  field_type: str = "keyword") -> bool:
+        """Create payload (metadata) index used by filtered searches.
+        
+        Args:
+            collection_name: Collection name
+            field_name: Payload field to index
+            field_type: Index type (keyword, integer, float, datetime, text)
+            
+        Returns:
+            True if index was created, False if backend does not need/support it
+        """
+        return False
+    
+    async def ensure_payload_indexes(self, collection_name: str,
+                                    indexes: Dict[str, str]) -> Dict[str, bool]:
+        """Create payload indexes for filterable fields.
+        
+        Args:
+            collection_name: Collection name
+            indexes: Field name -> index type (keyword, keyword_prefix, integer, float, datetime, text)
+            
+        Returns:
+            Field name -> whether the index is in place
+        """
+        return {
+            field_name: await self.create_payload_index(collection_name, field_name, field_type)
+            for field_name, field_type in indexes.items()
+        }
+    
+    async def count(self, collection_name: str, filter_conditions: Optional[Dict] = None) -> int:
+        """Count vectors in collection.
+        
+        Args:
+            collection_name: Collection name
+            filter_conditions: Optional filtering conditions
+            
+        Returns:
+            Number of matching vectors
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support count")
 
 
 class IRelationalDatabase(ABC):
@@ -0,0 +1,45 @@
+"""pgvector column type for SQLAlchemy.
+
+Тип колонки pgvector ``vector(n)`` без зависимости от пакета pgvector:
+значения передаются в текстовом формате ``[0.1,0.2,...]`` с явным приведением
+к vector, поэтому asyncpg не нужен отдельный кодек для типа расширения.
+"""
+
+from typing import Optional, Sequence
+
+from sqlalchemy import Text, cast
+from sqlalchemy.types import UserDefinedType
+
+# Размерность эмбеддингов материалов (text-embedding-3-small)
+EMBEDDING_DIMENSIONS = 1536
+
+
+def to_vector_literal(values: Sequence[float]) -> str:
+    """pgvector text representation: ``[0.1,0.2,...]``."""
+    return "[" + ",".join(repr(float(value)) for value in values) + "]"
+
+
+class Vector(UserDefinedType):
+    """pgvector ``vector(n)`` column type."""
+    cache_ok = True
+    
+    def __init__(self, dimensions: Optional[int] = None):
+        self.dimensions = dimensions
+    
+    def get_col_spec(self, **kw) -> str:
+        return f"VECTOR({self.dimensions})" if self.dimensions else "VECTOR"
+    
+    def bind_expression(self, bindvalue):
+        return cast(cast(bindvalue, Text), self)
+    
+    def bind_processor(self, dialect):
+        def process(value):
+            return None if value is None else to_vector_literal(value)
+        return process
+    
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None or isinstance(value, list):
+                return value
+            return [float(item) for item in value.strip("[]").split(",") if item]
+        return process
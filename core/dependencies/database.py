@@ -4,17 +4,19 @@
 """
 
 from functools import lru_cache
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 from contextlib import asynccontextmanager
-from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, async_sessionmaker
 
 from core.database.interfaces import IVectorDatabase, IRelationalDatabase, ICacheDatabase
 from core.repositories.interfaces import IMaterialsRepository
-from core.repositories.hybrid_materials import HybridMaterialsRepository
+
+if TYPE_CHECKING:
+    # SQLAlchemy загружается при создании первой сессии
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
 # Глобальный кеш для engine чтобы избежать повторного создания
-_db_engine: Optional[AsyncEngine] = None
-_session_factory: Optional[async_sessionmaker] = None
+_db_engine: Optional["AsyncEngine"] = None
+_session_factory: Optional["async_sessionmaker"] = None
 
 
 @lru_cache(maxsize=1)
@@ -98,6 +100,8 @@ def get_materials_repository() -> IMaterialsRepository:
     Returns:
         Materials repository instance
     """
+    from core.repositories.hybrid_materials import HybridMaterialsRepository
+
     vector_db = get_vector_db_dependency()
     relational_db = get_relational_db_dependency()
     return HybridMaterialsRepository(vector_db=vector_db, relational_db=relational_db)
@@ -124,7 +128,7 @@ async def get_db_session():
     # Инициализируем engine и session_factory только один раз
     if _db_engine is None or _session_factory is None:
         from core.config.base import get_settings
-        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
         
         settings = get_settings()
         
@@ -9,6 +9,8 @@ from core.logging.optimized.async_logging import (
     BatchProcessor,
     LoggingQueue,
     AsyncWorker,
+    RingBufferTransport,
+    RingBufferHandler,
 )
 from core.logging.optimized.memory import (
     LoggerPool,
@@ -34,6 +36,8 @@ __all__ = [
     "BatchProcessor",
     "LoggingQueue",
     "AsyncWorker",
+    "RingBufferTransport",
+    "RingBufferHandler",
     
     # Memory optimization
     "LoggerPool",
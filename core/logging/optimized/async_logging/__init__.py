@@ -7,6 +7,11 @@ This module provides components for asynchronous logging.
 from core.logging.optimized.async_logging.async_logger import AsyncLogger
 from core.logging.optimized.async_logging.batch_processor import BatchProcessor
 from core.logging.optimized.async_logging.logging_queue import LoggingQueue
+from core.logging.optimized.async_logging.ring_transport import (
+    RingBufferHandler,
+    RingBufferTransport,
+    serialize_entry,
+)
 from core.logging.optimized.async_logging.worker import AsyncWorker
 
 __all__ = [
@@ -14,4 +19,7 @@ __all__ = [
     "BatchProcessor",
     "LoggingQueue",
     "AsyncWorker",
+    "RingBufferTransport",
+    "RingBufferHandler",
+    "serialize_entry",
 ] 
\ No newline at end of file
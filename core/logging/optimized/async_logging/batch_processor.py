@@ -7,7 +7,7 @@ This module provides a processor for batched log processing.
 import asyncio
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional
 
 from core.logging.interfaces import IHandler
 from core.logging.optimized.async_logging.logging_queue import LoggingQueue
@@ -28,6 +28,7 @@ class BatchProcessor:
         worker_count: int = 1,
         handlers: Optional[List[IHandler]] = None,
         error_logger: Optional[logging.Logger] = None,
+        encoded_stream: Optional[BinaryIO] = None,
     ):
         """
         Initialize a new batch processor.
@@ -39,6 +40,8 @@ class BatchProcessor:
             worker_count: The number of worker tasks
             handlers: The handlers for processing logs
             error_logger: The logger for error reporting
+            encoded_stream: Binary stream for pre-encoded entries ({"encoded": bytes});
+                the whole batch is written with one write() instead of going through handlers
         """
         self._queue = queue or LoggingQueue()
         self._batch_size = batch_size
@@ -46,6 +49,7 @@ class BatchProcessor:
         self._worker_count = worker_count
         self._handlers = handlers or []
         self._error_logger = error_logger or logging.getLogger("batch_processor")
+        self._encoded_stream = encoded_stream
         
         self._workers: List[asyncio.Task] = []
         self._running = False
@@ -144,6 +148,11 @@ class BatchProcessor:
         if not batch:
             return
         
+        if self._encoded_stream is not None:
+            batch = self._write_encoded(batch)
+            if not batch:
+                return
+        
         try:
             # Process each log entry with all handlers
             for handler in self._handlers:
@@ -170,6 +179,30 @@ class BatchProcessor:
             self._error_count += 1
             self._error_logger.error(f"Error processing batch: {e}", exc_info=True)
     
+    def _write_encoded(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write pre-encoded entries of the batch with a single write.
+        
+        Args:
+            batch: The batch of logs
+            
+        Returns:
+            The entries that still need handlers
+        """
+        encoded = [log_entry["encoded"] for log_entry in batch if "encoded" in log_entry]
+        if not encoded:
+            return batch
+        
+        try:
+            self._encoded_stream.write(b"".join(encoded))
+            self._encoded_stream.flush()
+            self._processed_count += len(encoded)
+        except Exception as e:
+            self._error_count += 1
+            self._error_logger.error(f"Error writing pre-encoded logs: {e}", exc_info=True)
+        
+        return [log_entry for log_entry in batch if "encoded" not in log_entry]
+    
     def _create_log_record(self, log_entry: Dict[str, Any]) -> logging.LogRecord:
         """
         Create a log record from a log entry.
@@ -182,7 +215,11 @@ class BatchProcessor:
         """
         # Extract log information
         level = log_entry["level"]
-        message = log_entry["message"]
+        if "encoded" in log_entry:
+            # Pre-encoded line without a stream: the line becomes the message
+            message = log_entry["encoded"].decode("utf-8", errors="replace").rstrip("\n")
+        else:
+            message = log_entry["message"]
         args = log_entry.get("args", ())
         kwargs = log_entry.get("kwargs", {})
         extra = kwargs.get("extra", {})
@@ -6,7 +6,8 @@ This module provides a queue for asynchronous logging.
 
 import asyncio
 import time
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 
 class LoggingQueue:
@@ -23,7 +24,8 @@ class LoggingQueue:
         Args:
             max_size: The maximum queue size
         """
-        self._queue: List[Dict[str, Any]] = []
+        # deque: popleft() is O(1), list.pop(0) shifts the whole queue
+        self._queue: Deque[Dict[str, Any]] = deque()
         self._max_size = max_size
         self._lock = asyncio.Lock()
         self._not_empty = asyncio.Condition(self._lock)
@@ -77,7 +79,7 @@ class LoggingQueue:
             await self._not_empty.wait_for(lambda: len(self._queue) > 0)
             
             # Get the item
-            return self._queue.pop(0) if self._queue else None
+            return self._queue.popleft() if self._queue else None
     
     def get_nowait(self) -> Optional[Dict[str, Any]]:
         """
@@ -89,7 +91,7 @@ class LoggingQueue:
         if not self._queue:
             return None
         
-        return self._queue.pop(0)
+        return self._queue.popleft()
     
     async def get_batch(self, batch_size: int, timeout: float = 0.1) -> List[Dict[str, Any]]:
         """
@@ -118,7 +120,7 @@ class LoggingQueue:
             
             # Get items up to the batch size
             while self._queue and len(batch) < batch_size:
-                batch.append(self._queue.pop(0))
+                batch.append(self._queue.popleft())
         
         return batch
     
@@ -129,8 +131,8 @@ class LoggingQueue:
         Returns:
             All items from the queue
         """
-        items = self._queue
-        self._queue = []
+        items = list(self._queue)
+        self._queue.clear()
         return items
     
     def size(self) -> int:
@@ -157,4 +159,4 @@ class LoggingQueue:
     
     def clear(self) -> None:
         """Clear the queue."""
-        self._queue = [] 
\ No newline at end of file
+        self._queue.clear() 
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Ring buffer log transport implementation.
+
+This module provides a log transport for hot paths: producers append an entry
+(a tuple, a dict or pre-encoded bytes) to a bounded ``collections.deque`` and
+return; a single background writer thread serializes the entries in batches
+and writes every batch to a binary stream with one ``write()``.
+
+No locks, conditions or event loop hops on the producer side: ``deque.append``
+and ``deque.popleft`` are atomic, the writer is woken by a ``threading.Event``
+only when a full batch is waiting and otherwise polls every flush interval.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+Entry = Union[bytes, Dict[str, Any], Tuple[Any, ...]]
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+
+def serialize_entry(entry: Entry) -> bytes:
+    """
+    Serialize a log entry to a JSON line.
+
+    Args:
+        entry: Pre-encoded bytes (written as-is), a dict (one JSON object) or a
+            ``(created, level, logger, message[, fields])`` tuple
+
+    Returns:
+        The encoded line
+    """
+    if isinstance(entry, bytes):
+        return entry
+    if isinstance(entry, tuple):
+        record = {"ts": round(entry[0], 3), "level": entry[1], "logger": entry[2], "message": entry[3]}
+        if len(entry) > 4 and entry[4]:
+            record.update(entry[4])
+        entry = record
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+
+
+class RingBufferTransport:
+    """
+    Bounded in-memory log transport with a dedicated writer thread.
+
+    Overflow policies:
+        drop: the new entry is discarded and counted (the producer never waits)
+        block: the producer waits up to ``block_timeout`` for the writer to
+            free space, then drops; use it off the event loop, where losing
+            records is worse than waiting
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        capacity: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.1,
+        overflow: str = "drop",
+        block_timeout: float = 1.0,
+        serializer: Callable[[Entry], bytes] = serialize_entry,
+        name: str = "log-writer",
+        error_logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Initialize a new ring buffer transport.
+
+        Args:
+            stream: The binary stream the batches are written to
+            capacity: The maximum number of pending entries
+            batch_size: The maximum number of entries per write
+            flush_interval: How often the writer drains partial batches (seconds)
+            overflow: The overflow policy ("drop" or "block")
+            block_timeout: How long a producer waits for space with the "block" policy
+            serializer: Turns an entry into an encoded line (runs in the writer thread)
+            name: The writer thread name
+            error_logger: The logger for write and serialization errors
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow!r} (expected one of {OVERFLOW_POLICIES})")
+        self._stream = stream
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._serializer = serializer
+        self._name = name
+        self._error_logger = error_logger or logging.getLogger("ring_transport")
+
+        self._buffer: Deque[Entry] = deque()
+        self._wakeup = threading.Event()
+        self._space = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._blocked = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.dropped = 0
+        self.written = 0
+        self.writes = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def emit(self, entry: Entry) -> bool:
+        """
+        Queue an entry for the writer thread.
+
+        Args:
+            entry: The entry (see serialize_entry)
+
+        Returns:
+            Whether the entry was queued (False when it was dropped)
+        """
+        buffer = self._buffer
+        if len(buffer) >= self.capacity and (self.overflow == "drop" or not self._wait_for_space()):
+            self.dropped += 1
+            return False
+        buffer.append(entry)
+        if len(buffer) >= self.batch_size and not self._wakeup.is_set():
+            self._wakeup.set()
+        return True
+
+    def _wait_for_space(self) -> bool:
+        """Wait for the writer to drain the buffer ("block" policy)."""
+        if not self.running:
+            return False
+        self._wakeup.set()
+        with self._space:
+            self._blocked += 1
+            try:
+                return self._space.wait_for(lambda: len(self._buffer) < self.capacity, self.block_timeout)
+            finally:
+                self._blocked -= 1
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the writer thread and write pending entries.
+
+        Args:
+            timeout: How long to wait for the writer thread
+        """
+        thread = self._thread
+        if thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> None:
+        """Write all pending entries from the calling thread."""
+        while self._buffer:
+            self._write_batch()
+
+    def _run(self) -> None:
+        """Writer thread: drain the buffer in batches until stopped."""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self._stopping:
+                return
+
+    def _write_batch(self) -> None:
+        """Serialize up to one batch of entries and write it with a single write."""
+        with self._write_lock:
+            buffer = self._buffer
+            popleft = buffer.popleft
+            count = min(len(buffer), self.batch_size)
+            batch: List[Entry] = [popleft() for _ in range(count)]
+            if self._blocked:
+                with self._space:
+                    self._space.notify_all()
+            if not batch:
+                return
+
+            lines = []
+            serializer = self._serializer
+            for entry in batch:
+                try:
+                    lines.append(serializer(entry))
+                except Exception as e:
+                    self.errors += 1
+                    self._error_logger.error(f"Error serializing log entry: {e}")
+            try:
+                self._stream.write(b"".join(lines))
+                self._stream.flush()
+                self.written += len(lines)
+                self.writes += 1
+            except Exception as e:
+                self.errors += 1
+                self._error_logger.error(f"Error writing log batch: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the transport.
+
+        Returns:
+            Statistics about the transport
+        """
+        return {
+            "pending": len(self._buffer),
+            "capacity": self.capacity,
+            "overflow": self.overflow,
+            "dropped": self.dropped,
+            "written": self.written,
+            "writes": self.writes,
+            "errors": self.errors,
+            "running": self.running,
+        }
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Logging handler that hands records to a ring buffer transport.
+
+    Only the message is formatted on the calling thread (exceptions too, since
+    tracebacks cannot outlive the frame); the JSON line is built by the writer.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def __init__(self, transport: RingBufferTransport, level: int = logging.NOTSET):
+        """
+        Initialize a new ring buffer handler.
+
+        Args:
+            transport: The transport to emit records to
+            level: The handler level
+        """
+        super().__init__(level)
+        self.transport = transport
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            fields = None
+            if record.exc_info:
+                fields = {"exception": self._exception_formatter.formatException(record.exc_info)}
+            self.transport.emit((record.created, record.levelname, record.name, record.getMessage(), fields))
+        except Exception:
+            self.handleError(record)
+
+    # The transport is thread-safe by itself: no handler lock per record
+    def handle(self, record: logging.LogRecord) -> bool:
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return bool(rv)
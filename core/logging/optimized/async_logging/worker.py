@@ -7,7 +7,7 @@ This module provides a worker for asynchronous log processing.
 import asyncio
 import logging
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional
 
 from core.logging.interfaces import IHandler
 from core.logging.optimized.async_logging.batch_processor import BatchProcessor
@@ -28,6 +28,7 @@ class AsyncWorker:
         flush_interval: float = 0.5,
         worker_count: int = 1,
         error_logger: Optional[logging.Logger] = None,
+        encoded_stream: Optional[BinaryIO] = None,
     ):
         """
         Initialize a new asynchronous worker.
@@ -38,6 +39,7 @@ class AsyncWorker:
             flush_interval: The flush interval in seconds
             worker_count: The number of worker tasks
             error_logger: The logger for error reporting
+            encoded_stream: Binary stream for pre-encoded entries (one write per batch)
         """
         self._handlers = handlers or []
         self._batch_size = batch_size
@@ -52,6 +54,7 @@ class AsyncWorker:
             worker_count=worker_count,
             handlers=handlers,
             error_logger=error_logger,
+            encoded_stream=encoded_stream,
         )
         
         self._running = False
@@ -8,6 +8,9 @@ from core.logging.specialized.http.request_logger import RequestLogger, AsyncReq
 from core.logging.specialized.http.request_logging_middleware import (
     RequestLoggingMiddleware, AsyncRequestLoggingMiddleware, get_request_logging_middleware
 )
+from core.logging.specialized.http.sampled_request_logger import (
+    SampledRequestLogger, TailSampler, body_preview, get_sampled_request_logger
+)
 
 
 __all__ = [
@@ -16,4 +19,8 @@ __all__ = [
     "RequestLoggingMiddleware",
     "AsyncRequestLoggingMiddleware",
     "get_request_logging_middleware",
+    "SampledRequestLogger",
+    "TailSampler",
+    "body_preview",
+    "get_sampled_request_logger",
 ] 
\ No newline at end of file
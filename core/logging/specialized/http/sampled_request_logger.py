@@ -0,0 +1,255 @@
+"""
+Sampled request logger implementation.
+
+This module provides a high-throughput request log: one record per request,
+decided after the response (tail-based sampling) and written as a JSON line
+either by the async_logging batch worker (pre-encoded) or by the ring buffer
+transport writer thread (serialized there, off the request path).
+
+Nothing is formatted for requests that are not kept: the sampler and the log
+level are checked first, bodies are referenced as-is and only the kept
+records slice a capped preview out of them through a memoryview.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, Union
+
+from core.logging.optimized.async_logging import BatchProcessor, RingBufferTransport
+
+
+BodyLike = Union[bytes, bytearray, memoryview]
+
+
+class TailSampler:
+    """Keep errors and slow requests, sample the rest."""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.1,
+        slow_threshold_ms: float = 1000.0,
+        random_func: Callable[[], float] = random.random,
+    ):
+        """
+        Initialize a new tail sampler.
+
+        Args:
+            sample_rate: Share of ordinary requests to keep (0..1)
+            slow_threshold_ms: Requests at least this slow are always kept
+            random_func: Source of uniform [0, 1) numbers
+        """
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self._random = random_func
+
+    def decide(self, status_code: int, duration_ms: float, error: Optional[BaseException] = None) -> Optional[str]:
+        """
+        Decide whether to keep a finished request.
+
+        Args:
+            status_code: The response status code
+            duration_ms: The request duration in milliseconds
+            error: The exception raised by the application, if any
+
+        Returns:
+            The reason to keep the request ("error", "slow", "sampled") or None
+        """
+        if error is not None or status_code >= 500:
+            return "error"
+        if duration_ms >= self.slow_threshold_ms:
+            return "slow"
+        if self.sample_rate >= 1.0 or (self.sample_rate > 0.0 and self._random() < self.sample_rate):
+            return "sampled"
+        return None
+
+
+def body_preview(body: Optional[BodyLike], limit: int) -> Optional[str]:
+    """
+    Decode at most ``limit`` bytes of a body without copying the rest.
+
+    Args:
+        body: The body bytes
+        limit: The preview size in bytes
+
+    Returns:
+        The preview text, or None for empty bodies
+    """
+    if not body or limit <= 0:
+        return None
+    view = memoryview(body)
+    if len(view) <= limit:
+        return str(view, "utf-8", "replace")
+    return str(view[:limit], "utf-8", "replace") + "..."
+
+
+class SampledRequestLogger:
+    """Tail-sampled request logger writing pre-encoded JSON lines."""
+
+    # Record level by the reason it was kept
+    LEVELS = {"error": logging.ERROR, "slow": logging.WARNING, "sampled": logging.INFO}
+
+    def __init__(
+        self,
+        name: str = "request",
+        sampler: Optional[TailSampler] = None,
+        processor: Optional[BatchProcessor] = None,
+        preview_limit: int = 256,
+        transport: Optional[RingBufferTransport] = None,
+    ):
+        """
+        Initialize a new sampled request logger.
+
+        Args:
+            name: The logger name (its level filters records)
+            sampler: The tail sampler
+            processor: The batch processor writing the encoded lines;
+                records go through the logger itself until it is started
+            preview_limit: Body preview size in bytes (0 disables previews)
+            transport: The ring buffer transport; kept records are handed over
+                as dicts and serialized by its writer thread (takes precedence
+                over the processor)
+        """
+        self._logger = logging.getLogger(name)
+        self.sampler = sampler or TailSampler()
+        self.processor = processor
+        self.transport = transport
+        self.preview_limit = preview_limit
+        self._started = False
+        self.stats = {"seen": 0, "kept": 0, "dropped": 0, "error": 0, "slow": 0, "sampled": 0}
+
+    async def start(self) -> None:
+        """Start the transport writer thread or the batch processor."""
+        if self._started:
+            return
+        if self.transport is not None:
+            self.transport.start()
+            self._started = True
+        elif self.processor is not None:
+            await self.processor.start()
+            self._started = True
+
+    async def stop(self) -> None:
+        """Stop the writer and flush pending records."""
+        if self._started:
+            self._started = False
+            if self.transport is not None:
+                await asyncio.to_thread(self.transport.stop)
+            else:
+                await self.processor.stop()
+
+    def log(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        duration_ms: float,
+        correlation_id: Optional[str] = None,
+        client_ip: Optional[str] = None,
+        path: Optional[str] = None,
+        response_bytes: int = 0,
+        request_body: Optional[BodyLike] = None,
+        response_body: Optional[BodyLike] = None,
+        error: Optional[BaseException] = None,
+    ) -> bool:
+        """
+        Log a finished request if the sampler keeps it.
+
+        Args:
+            method: The HTTP method
+            route: The route template
+            status_code: The status code
+            duration_ms: The duration in milliseconds
+            correlation_id: The correlation ID
+            client_ip: The client IP
+            path: The concrete request path
+            response_bytes: The response size in bytes
+            request_body: The request body (referenced, previewed only if kept)
+            response_body: The first response body chunk (same)
+            error: The exception raised by the application, if any
+
+        Returns:
+            Whether the request was logged
+        """
+        self.stats["seen"] += 1
+        reason = self.sampler.decide(status_code, duration_ms, error)
+        if reason is None:
+            self.stats["dropped"] += 1
+            return False
+        level = self.LEVELS[reason]
+        if not self._logger.isEnabledFor(level):
+            self.stats["dropped"] += 1
+            return False
+
+        self.stats["kept"] += 1
+        self.stats[reason] += 1
+        record: Dict[str, Any] = {
+            "ts": round(time.time(), 3),
+            "level": logging.getLevelName(level),
+            "logger": self._logger.name,
+            "method": method,
+            "route": route,
+            "path": path or route,
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "response_bytes": response_bytes,
+            "correlation_id": correlation_id,
+            "client_ip": client_ip,
+            "sampled": reason,
+        }
+        if self.preview_limit:
+            if request_body:
+                record["request_body"] = body_preview(request_body, self.preview_limit)
+            if response_body:
+                record["response_body"] = body_preview(response_body, self.preview_limit)
+        if error is not None:
+            record["error"] = str(error)
+            record["error_type"] = type(error).__name__
+
+        if self._started and self.transport is not None:
+            self.transport.emit(record)
+            return True
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        if self._started:
+            self.processor.process_sync({"level": level, "encoded": line.encode("utf-8") + b"\n"})
+        else:
+            self._logger.log(level, line)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        if self.transport is not None:
+            stats["transport"] = self.transport.get_stats()
+        elif self.processor is not None:
+            stats["processor"] = self.processor.get_stats()
+        return stats
+
+
+_sampled_request_logger: Optional[SampledRequestLogger] = None
+
+
+def get_sampled_request_logger() -> SampledRequestLogger:
+    """Get the global sampled request logger (JSON lines to stdout)."""
+    global _sampled_request_logger
+    if _sampled_request_logger is None:
+        from core.config import get_settings
+
+        settings = get_settings()
+        # Without a binary stdout (captured output) records go through the logger itself
+        stream = getattr(sys.stdout, "buffer", None)
+        _sampled_request_logger = SampledRequestLogger(
+            sampler=TailSampler(settings.REQUEST_LOG_SAMPLE_RATE, settings.REQUEST_LOG_SLOW_MS),
+            preview_limit=settings.REQUEST_LOG_BODY_PREVIEW_BYTES,
+            transport=RingBufferTransport(
+                stream=stream,
+                capacity=settings.LOG_MAX_QUEUE_SIZE,
+                batch_size=settings.LOG_BATCH_SIZE,
+                flush_interval=settings.LOG_BACKGROUND_FLUSH_INTERVAL,
+                overflow=settings.LOG_OVERFLOW_POLICY,
+                name="request-log-writer",
+            ) if stream is not None else None,
+        )
+    return _sampled_request_logger
@@ -10,15 +10,21 @@ This package contains middleware components for:
 
 from core.logging.specialized.http.request_logging_middleware import RequestLoggingMiddleware as LoggingMiddleware
 from .rate_limiting import RateLimitMiddleware
+from .hybrid_rate_limiting import HybridRateLimitMiddleware
 from .security import SecurityMiddleware
 from .conditional import ConditionalMiddleware, MiddlewareOptimizer
 from .compression import CompressionMiddleware
+from .pipeline import FusedMiddlewarePipeline, RequestContext, get_request_context
 
 __all__ = [
     "LoggingMiddleware",
     "RateLimitMiddleware", 
+    "HybridRateLimitMiddleware",
     "SecurityMiddleware",
     "ConditionalMiddleware",
     "CompressionMiddleware",
     "MiddlewareOptimizer",
+    "FusedMiddlewarePipeline",
+    "RequestContext",
+    "get_request_context",
 ] 
\ No newline at end of file
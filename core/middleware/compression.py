@@ -17,6 +17,17 @@ from starlette.types import ASGIApp
 
 logger = get_logger(__name__)
 
+# Content types that are not compressed by default
+DEFAULT_EXCLUDED_CONTENT_TYPES = (
+    "image/jpeg", "image/png", "image/gif", "image/webp",
+    "video/mp4", "video/mpeg", "video/webm",
+    "audio/mpeg", "audio/wav", "audio/ogg",
+    "application/zip", "application/gzip",
+    "application/x-rar-compressed", "application/x-7z-compressed",
+    # Push streams: gzip would buffer events until the stream ends
+    "text/event-stream", "application/x-ndjson",
+)
+
 
 class CompressionMiddleware(BaseHTTPMiddleware):
     """
@@ -66,13 +77,7 @@ class CompressionMiddleware(BaseHTTPMiddleware):
         self.enable_performance_logging = enable_performance_logging
         
         # Default excluded content types (already compressed)
-        self.exclude_content_types = set(exclude_content_types or [
-            "image/jpeg", "image/png", "image/gif", "image/webp",
-            "video/mp4", "video/mpeg", "video/webm",
-            "audio/mpeg", "audio/wav", "audio/ogg",
-            "application/zip", "application/gzip",
-            "application/x-rar-compressed", "application/x-7z-compressed",
-        ])
+        self.exclude_content_types = set(exclude_content_types or DEFAULT_EXCLUDED_CONTENT_TYPES)
         
         self.exclude_paths = set(exclude_paths or [])
         
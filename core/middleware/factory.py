@@ -13,7 +13,9 @@ from core.middleware import LoggingMiddleware
 from core.middleware.security import SecurityMiddleware
 from core.middleware.compression import CompressionMiddleware
 from core.middleware.rate_limiting import RateLimitMiddleware
+from core.middleware.hybrid_rate_limiting import HybridRateLimitMiddleware
 from core.middleware.body_cache import BodyCacheMiddleware
+from core.middleware.pipeline import FusedMiddlewarePipeline
 
 
 class MiddlewareConfig:
@@ -73,6 +75,30 @@ class MiddlewareConfig:
             "rate_limit_headers": True,
         }
     
+    @staticmethod
+    def get_hybrid_rate_limit_config(settings: Settings) -> Dict[str, Any]:
+        """Get hybrid (local buckets + Redis leases) rate limiting configuration."""
+        return {
+            "default_requests_per_minute": settings.RATE_LIMIT_RPM,
+            "default_requests_per_hour": settings.RATE_LIMIT_RPH,
+            "default_burst_size": settings.RATE_LIMIT_BURST,
+            "enable_burst_protection": True,
+            "rate_limit_headers": True,
+            "lease_size": settings.RATE_LIMIT_LEASE_SIZE,
+            "fail_open": settings.RATE_LIMIT_FAIL_OPEN,
+        }
+    
+    @staticmethod
+    def get_pipeline_config(settings: Settings) -> Dict[str, Any]:
+        """Get fused pipeline configuration (phase configs of the stacked middleware)."""
+        hybrid_rate_limit = settings.ENABLE_RATE_LIMITING and settings.RATE_LIMIT_MODE == "hybrid"
+        return {
+            "security": MiddlewareConfig.get_security_config(settings),
+            "rate_limit": MiddlewareConfig.get_hybrid_rate_limit_config(settings) if hybrid_rate_limit else None,
+            "compression": MiddlewareConfig.get_compression_config(settings),
+            "body_cache": MiddlewareConfig.get_body_cache_config(settings),
+        }
+    
     @staticmethod
     def get_cors_config(security_middleware: SecurityMiddleware) -> Dict[str, Any]:
         """Get CORS middleware configuration."""
@@ -99,6 +125,19 @@ class MiddlewareFactory:
         """
         middleware_stack = []
         
+        if self.settings.MIDDLEWARE_PIPELINE == "fused":
+            # Security, rate limit, compression and logging in one pure ASGI layer
+            middleware_stack.append((
+                FusedMiddlewarePipeline,
+                self.config.get_pipeline_config(self.settings)
+            ))
+            if self.settings.ENABLE_RATE_LIMITING and self.settings.RATE_LIMIT_MODE == "redis":
+                middleware_stack.append((
+                    RateLimitMiddleware,
+                    self.config.get_rate_limit_config(self.settings)
+                ))
+            return middleware_stack
+        
         # 1. Logging middleware (executes first)
         middleware_stack.append((
             LoggingMiddleware,
@@ -124,7 +163,12 @@ class MiddlewareFactory:
         ))
         
         # 5. Rate limiting middleware (optional)
-        if self.settings.ENABLE_RATE_LIMITING:
+        if self.settings.ENABLE_RATE_LIMITING and self.settings.RATE_LIMIT_MODE == "hybrid":
+            middleware_stack.append((
+                HybridRateLimitMiddleware,
+                self.config.get_hybrid_rate_limit_config(self.settings)
+            ))
+        elif self.settings.ENABLE_RATE_LIMITING:
             middleware_stack.append((
                 RateLimitMiddleware,
                 self.config.get_rate_limit_config(self.settings)
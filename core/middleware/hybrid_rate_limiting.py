@@ -0,0 +1,392 @@
+"""
+Hybrid rate limiting: local token buckets leasing quota from Redis.
+
+RateLimitMiddleware / OptimizedRateLimitMiddleware обращаются к Redis на
+каждом запросе до роутинга. Здесь каждый воркер держит локальный бакет
+клиента и списывает запросы из него без сетевых вызовов; общая квота окна
+(минута, час) хранится в Redis и арендуется порциями ``lease_size`` через
+INCRBY - один round-trip на порцию запросов. Когда остаток бакета опускается
+ниже половины порции, следующая порция запрашивается в фоне.
+
+Точность: сумма арендованного всеми воркерами не превышает лимит окна
+(INCRBY атомарен, выдача обрезается по лимиту). Каждое окно списывает только
+реально выданное: если одно окно выдало меньше порции, излишек возвращается
+DECRBY во все окна. Когда аренда истекает вместе с минутным окном, ее
+неизрасходованный остаток возвращается в еще живые окна (часовое) при
+следующей аренде того же клиента - часовая квота не сгорает на редком трафике.
+Неизрасходованный остаток аренды других воркеров может недодать клиенту не
+больше ``workers * lease_size`` запросов; у границы лимита аренда идет по
+одному запросу. Burst ограничивается локальным бакетом каждого воркера.
+
+При недоступности Redis запросы пропускаются (``fail_open``, остается только
+burst бакет) или отклоняются с 503; повторное подключение не чаще
+``redis_retry_interval``.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Окна общей квоты: ключ лимита -> длительность окна (сек)
+WINDOWS = (("rpm", 60), ("rph", 3600))
+BURST_WINDOW = 10
+
+
+class _ClientQuota:
+    """Local bucket of one client and limit group."""
+
+    __slots__ = ("tokens", "lease_expires", "lease_keys", "refunds", "remaining", "exhausted_until",
+                 "burst_tokens", "burst_updated", "leasing")
+
+    def __init__(self, burst: int, now: float):
+        self.tokens = 0
+        self.lease_expires = 0.0
+        # Ключи окон последней аренды и конец каждого окна
+        self.lease_keys: List[Tuple[str, float]] = []
+        # Неизрасходованные токены истекших аренд: ключ окна -> сколько вернуть
+        self.refunds: Dict[str, int] = {}
+        self.remaining: Optional[int] = None
+        self.exhausted_until = 0.0
+        self.burst_tokens = float(burst)
+        self.burst_updated = now
+        self.leasing: Optional[asyncio.Task] = None
+
+
+class HybridRateLimitMiddleware:
+    """
+    Pure ASGI rate limiter with per-worker token buckets and shared Redis quota.
+
+    Лимиты и заголовки совместимы с RateLimitMiddleware (rpm, rph, burst,
+    X-RateLimit-*).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        redis_url: Optional[str] = None,
+        redis_client: Any = None,
+        default_requests_per_minute: int = 60,
+        default_requests_per_hour: int = 1000,
+        default_burst_size: int = 10,
+        enable_burst_protection: bool = True,
+        rate_limit_headers: bool = True,
+        lease_size: int = 10,
+        fail_open: bool = True,
+        max_clients: int = 10000,
+        redis_retry_interval: float = 5.0,
+        key_prefix: str = "rate_limit:hybrid",
+        endpoint_limits: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        """
+        Args:
+            app: Следующее ASGI приложение
+            redis_url: URL Redis (по умолчанию REDIS_URL)
+            redis_client: Готовый клиент redis.asyncio (тесты, общий пул)
+            lease_size: Сколько запросов арендовать из общей квоты за один round-trip
+            fail_open: Пропускать запросы при недоступности Redis
+            max_clients: Максимум локальных бакетов (LRU)
+            redis_retry_interval: Пауза перед повторной попыткой после ошибки Redis (сек)
+            endpoint_limits: Лимиты по префиксам путей {prefix: {rpm, rph, burst}}
+        """
+        self.app = app
+        self.redis_url = redis_url
+        self._redis = redis_client
+        self.default_limits = {
+            "rpm": default_requests_per_minute,
+            "rph": default_requests_per_hour,
+            "burst": default_burst_size,
+        }
+        self.enable_burst = enable_burst_protection
+        self.include_headers = rate_limit_headers
+        self.lease_size = max(1, lease_size)
+        self.fail_open = fail_open
+        self.max_clients = max_clients
+        self.redis_retry_interval = redis_retry_interval
+        self.key_prefix = key_prefix
+        self.endpoint_limits = endpoint_limits if endpoint_limits is not None else {
+            "/api/v1/search": {"rpm": 30, "rph": 500, "burst": 5},
+            "/api/v1/prices/upload": {"rpm": 5, "rph": 50, "burst": 2},
+            "/api/v1/materials/bulk": {"rpm": 10, "rph": 100, "burst": 3},
+        }
+
+        self._quotas: "OrderedDict[Tuple[str, str], _ClientQuota]" = OrderedDict()
+        self._redis_down_until = 0.0
+        self.stats = {
+            "requests": 0, "allowed": 0, "denied": 0, "leases": 0,
+            "redis_errors": 0, "fail_open_allowed": 0, "fail_closed_denied": 0,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        allowed, info = await self.check(self._client_identifier(scope), scope.get("path", ""))
+        if not allowed:
+            await self.send_rejection(send, info)
+            return
+
+        if not self.include_headers:
+            await self.app(scope, receive, send)
+            return
+
+        headers = self.limit_headers(info)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def check(self, client_id: str, path: str) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Take one request from the client's local bucket.
+
+        Returns:
+            (allowed, limit info); Redis вызывается только когда аренда кончилась
+        """
+        self.stats["requests"] += 1
+        group, limits = self._limits_for(path)
+        now = time.time()
+        quota = self._quota((client_id, group), limits, now)
+        info = {"limit_rpm": limits["rpm"], "limit_rph": limits["rph"], "limit_burst": limits["burst"]}
+
+        if self.enable_burst and not self._take_burst(quota, limits, now):
+            rate = limits["burst"] / BURST_WINDOW
+            return self._deny(info, "burst", math.ceil((1 - quota.burst_tokens) / rate) if rate else BURST_WINDOW)
+
+        if now >= quota.lease_expires:
+            self._release(quota, now)
+
+        if quota.tokens <= 0:
+            if quota.exhausted_until > now:
+                self._refund_burst(quota)
+                return self._deny(info, "quota", math.ceil(quota.exhausted_until - now))
+
+            leased = await self._acquire_lease(client_id, group, quota, limits)
+            if leased is None:
+                return self._redis_unavailable(quota, info)
+            if quota.tokens <= 0:
+                self._refund_burst(quota)
+                return self._deny(info, "quota", math.ceil(max(quota.exhausted_until - now, 1)))
+
+        quota.tokens -= 1
+        if quota.tokens <= self.lease_size // 2 and quota.remaining and quota.leasing is None:
+            # Следующая порция - в фоне, текущий запрос не ждет Redis
+            quota.leasing = asyncio.create_task(self._lease(client_id, group, quota, limits))
+
+        self.stats["allowed"] += 1
+        info["remaining_rpm"] = quota.tokens + (quota.remaining or 0)
+        info["remaining_burst"] = int(quota.burst_tokens)
+        return True, info
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "clients": len(self._quotas),
+            "redis_round_trips_per_request": self.stats["leases"] / self.stats["requests"] if self.stats["requests"] else 0.0,
+        }
+
+    async def cleanup(self) -> None:
+        """Close Redis connection."""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _acquire_lease(
+        self, client_id: str, group: str, quota: _ClientQuota, limits: Dict[str, int]
+    ) -> Optional[bool]:
+        """Wait for a lease (shared by concurrent requests of the client); None - Redis unavailable."""
+        if time.time() < self._redis_down_until:
+            return None
+        if quota.leasing is None:
+            quota.leasing = asyncio.create_task(self._lease(client_id, group, quota, limits))
+        return await asyncio.shield(quota.leasing)
+
+    async def _lease(
+        self, client_id: str, group: str, quota: _ClientQuota, limits: Dict[str, int]
+    ) -> Optional[bool]:
+        """Lease a chunk of the shared window quota: INCRBY on every window in one round-trip."""
+        refunds: Dict[str, int] = {}
+        try:
+            now = time.time()
+            # У границы лимита - по одному запросу, чтобы не держать чужую квоту
+            chunk = self.lease_size if quota.remaining is None or quota.remaining > 2 * self.lease_size else 1
+            chunk = max(1, min(chunk, *(limits[limit_key] for limit_key, _ in WINDOWS)))
+
+            lease_expires = min((int(now // window) + 1) * window for _, window in WINDOWS)
+            if lease_expires != quota.lease_expires:
+                # Новое окно: остаток прошлой аренды возвращается в еще открытые окна
+                self._release(quota, now)
+                quota.lease_expires = lease_expires
+
+            redis = await self._get_redis()
+            refunds, quota.refunds = quota.refunds, {}
+            pipe = redis.pipeline(transaction=False)
+            windows: List[Tuple[str, int, float]] = []
+            for limit_key, window in WINDOWS:
+                window_id = int(now // window)
+                key = f"{self.key_prefix}:{client_id}:{group}:{limit_key}:{window_id}"
+                # Возврат остатка истекшей аренды - в том же INCRBY
+                pipe.incrby(key, chunk - refunds.get(key, 0))
+                pipe.expire(key, window)
+                windows.append((key, limits[limit_key], (window_id + 1) * window))
+            results = await pipe.execute()
+            self.stats["leases"] += 1
+
+            used = [int(results[index * 2]) for index in range(len(windows))]
+            window_granted = [
+                max(0, min(chunk, limit - (window_used - chunk)))
+                for (_, limit, _), window_used in zip(windows, used)
+            ]
+            granted = min(window_granted)
+            if granted < chunk:
+                # Окна списывают только выданное: излишек возвращается во все окна
+                pipe = redis.pipeline(transaction=False)
+                for key, _, _ in windows:
+                    pipe.decrby(key, chunk - granted)
+                await pipe.execute()
+                used = [window_used - (chunk - granted) for window_used in used]
+
+            remaining = min(max(0, limit - window_used) for (_, limit, _), window_used in zip(windows, used))
+            for (_, _, window_end), available in zip(windows, window_granted):
+                if available == 0:
+                    quota.exhausted_until = max(quota.exhausted_until, window_end)
+
+            quota.tokens += granted
+            quota.lease_keys = [(key, window_end) for key, _, window_end in windows]
+            quota.remaining = remaining
+            return True
+        except Exception as e:
+            for key, tokens in refunds.items():
+                quota.refunds[key] = quota.refunds.get(key, 0) + tokens
+            self.stats["redis_errors"] += 1
+            self._redis_down_until = time.time() + self.redis_retry_interval
+            logger.warning(f"Rate limit lease failed, Redis unavailable for {self.redis_retry_interval}s: {e}")
+            return None
+        finally:
+            quota.leasing = None
+
+    @staticmethod
+    def _release(quota: _ClientQuota, now: float) -> None:
+        """Drop the expired lease; its unused tokens are refunded to windows still open."""
+        if quota.tokens > 0:
+            for key, window_end in quota.lease_keys:
+                if window_end > now:
+                    quota.refunds[key] = quota.refunds.get(key, 0) + quota.tokens
+        quota.tokens = 0
+        quota.remaining = None
+
+    async def _get_redis(self) -> Any:
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            from core.config import get_settings
+
+            self._redis = aioredis.from_url(self.redis_url or get_settings().REDIS_URL, max_connections=20)
+        return self._redis
+
+    def _redis_unavailable(self, quota: _ClientQuota, info: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        if self.fail_open:
+            self.stats["fail_open_allowed"] += 1
+            self.stats["allowed"] += 1
+            return True, {**info, "remaining_rpm": -1}
+        self._refund_burst(quota)
+        self.stats["fail_closed_denied"] += 1
+        return self._deny(info, "unavailable", math.ceil(self.redis_retry_interval))
+
+    def _deny(self, info: Dict[str, Any], reason: str, retry_after: int) -> Tuple[bool, Dict[str, Any]]:
+        self.stats["denied"] += 1
+        return False, {**info, "reason": reason, "retry_after": max(1, retry_after), "remaining_rpm": 0}
+
+    def _take_burst(self, quota: _ClientQuota, limits: Dict[str, int], now: float) -> bool:
+        burst = limits["burst"]
+        quota.burst_tokens = min(burst, quota.burst_tokens + (now - quota.burst_updated) * burst / BURST_WINDOW)
+        quota.burst_updated = now
+        if quota.burst_tokens < 1:
+            return False
+        quota.burst_tokens -= 1
+        return True
+
+    def _refund_burst(self, quota: _ClientQuota) -> None:
+        if self.enable_burst:
+            quota.burst_tokens += 1
+
+    def _quota(self, key: Tuple[str, str], limits: Dict[str, int], now: float) -> _ClientQuota:
+        quota = self._quotas.get(key)
+        if quota is None:
+            quota = self._quotas[key] = _ClientQuota(limits["burst"], now)
+            if len(self._quotas) > self.max_clients:
+                self._quotas.popitem(last=False)
+        else:
+            self._quotas.move_to_end(key)
+        return quota
+
+    def _limits_for(self, path: str) -> Tuple[str, Dict[str, int]]:
+        for prefix, limits in self.endpoint_limits.items():
+            if path.startswith(prefix):
+                return prefix, {**self.default_limits, **limits}
+        return "default", self.default_limits
+
+    @staticmethod
+    def _client_identifier(scope: Scope) -> str:
+        """API key, X-Forwarded-For / X-Real-IP or peer address - как в RateLimitMiddleware."""
+        headers = {}
+        for name, value in scope.get("headers", []):
+            if name in (b"x-api-key", b"x-forwarded-for", b"x-real-ip"):
+                headers[name] = value.decode("latin-1")
+        if b"x-api-key" in headers:
+            return f"key:{headers[b'x-api-key']}"
+
+        client_ip = (
+            headers.get(b"x-forwarded-for", "").split(",")[0].strip()
+            or headers.get(b"x-real-ip")
+            or (scope.get("client") or ("unknown",))[0]
+        )
+        return f"ip:{client_ip}"
+
+    def limit_headers(self, info: Dict[str, Any]) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (b"x-ratelimit-limit-rpm", str(info["limit_rpm"]).encode()),
+            (b"x-ratelimit-limit-rph", str(info["limit_rph"]).encode()),
+        ]
+        if info.get("remaining_rpm", -1) >= 0:
+            headers.append((b"x-ratelimit-remaining-rpm", str(info["remaining_rpm"]).encode()))
+        if self.enable_burst:
+            headers.append((b"x-ratelimit-limit-burst", str(info["limit_burst"]).encode()))
+            if "remaining_burst" in info:
+                headers.append((b"x-ratelimit-remaining-burst", str(info["remaining_burst"]).encode()))
+        return headers
+
+    async def send_rejection(self, send: Send, info: Dict[str, Any]) -> None:
+        unavailable = info["reason"] == "unavailable"
+        body = json.dumps({
+            "error": "Rate limiter unavailable" if unavailable else "Rate limit exceeded",
+            "message": "Too many requests. Please try again later.",
+            "retry_after_seconds": info["retry_after"],
+            "limits": {
+                "requests_per_minute": info["limit_rpm"],
+                "requests_per_hour": info["limit_rph"],
+                "burst_limit": info["limit_burst"],
+            },
+            "reason": info["reason"],
+        }).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(info["retry_after"]).encode()),
+        ]
+        if self.include_headers:
+            headers += self.limit_headers(info)
+        await send({"type": "http.response.start", "status": 503 if unavailable else 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
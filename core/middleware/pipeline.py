@@ -0,0 +1,362 @@
+"""
+Fused pure-ASGI middleware pipeline.
+
+Стек из BaseHTTPMiddleware (логирование, сжатие, безопасность, rate limit)
+добавляет на каждый запрос по задаче и буферу ответа на слой, и каждый слой
+заново разбирает заголовки, IP клиента и путь. Здесь все фазы выполняются в
+одном ASGI вызове над общим RequestContext, который вычисляется один раз:
+
+1. context - correlation ID, IP и идентификатор клиента, заголовки, время старта;
+2. security - размер, user agent, path traversal, тип загрузки, SQL/XSS в query
+   (SecurityMiddleware.check_request_line);
+3. rate limit - локальный бакет HybridRateLimitMiddleware.check();
+4. app - тело запроса кешируется BodyCacheMiddleware, send добавляет заголовки,
+   сжимает тело по чанкам и считает размер ответа;
+5. logging - решение о записи после ответа (SampledRequestLogger: ошибки и
+   медленные запросы всегда, остальные - выборкой), запись - готовая JSON строка.
+
+Контекст доступен в эндпоинтах через ``request.state.request_context``,
+correlation ID - через ``request.state.correlation_id`` и contextvar логирования.
+"""
+
+import gzip
+import json
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.logging import get_logger, set_correlation_id
+from core.logging.specialized.http.sampled_request_logger import SampledRequestLogger, get_sampled_request_logger
+from core.middleware.body_cache import BodyCacheMiddleware
+from core.middleware.compression import DEFAULT_EXCLUDED_CONTENT_TYPES
+from core.middleware.hybrid_rate_limiting import HybridRateLimitMiddleware
+from core.middleware.security import SecurityMiddleware
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = get_logger(__name__)
+
+DEFAULT_LOG_EXCLUDE_PATHS = ("/health", "/healthz", "/ready", "/readyz", "/live", "/livez")
+
+
+class RequestContext:
+    """Per-request data computed once and shared by all pipeline phases."""
+
+    __slots__ = ("correlation_id", "method", "path", "query_string", "headers", "client_ip",
+                 "client_id", "start", "route", "status_code", "response_bytes", "response_head")
+
+    def __init__(self, scope: Scope):
+        headers: Dict[str, str] = {}
+        for name, value in scope.get("headers", ()):
+            headers.setdefault(name.decode("latin-1"), value.decode("latin-1"))
+
+        self.headers = headers
+        self.method: str = scope.get("method", "GET")
+        self.path: str = scope.get("path", "")
+        self.query_string = scope.get("query_string", b"").decode("latin-1")
+        self.correlation_id = headers.get("x-correlation-id") or str(uuid.uuid4())
+        self.client_ip = (
+            headers.get("x-forwarded-for", "").split(",")[0].strip()
+            or headers.get("x-real-ip")
+            or (scope.get("client") or ("unknown",))[0]
+        )
+        api_key = headers.get("x-api-key")
+        self.client_id = f"key:{api_key}" if api_key else f"ip:{self.client_ip}"
+        self.start = time.perf_counter()
+        # Шаблон маршрута известен только после роутинга (scope["route"])
+        self.route = self.path
+        self.status_code = 0
+        self.response_bytes = 0
+        # Первый чанк тела ответа (ссылка, без копии) - для превью в логе
+        self.response_head: Optional[bytes] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+
+class _StreamEncoder:
+    """Incremental gzip / deflate / brotli encoder for chunked responses."""
+
+    def __init__(self, algorithm: str, level: int):
+        if algorithm == "br":
+            self._compressor = brotli.Compressor(quality=level)
+            self._compress, self._flush = self._compressor.process, self._compressor.finish
+        else:
+            wbits = 16 + zlib.MAX_WBITS if algorithm == "gzip" else zlib.MAX_WBITS
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+            self._compress, self._flush = self._compressor.compress, self._compressor.flush
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compress(chunk) if chunk else b""
+
+    def flush(self) -> bytes:
+        return self._flush()
+
+
+def get_request_context(request: Any) -> Optional[RequestContext]:
+    """RequestContext of the current request (None if the pipeline is not installed)."""
+    return request.scope.get("state", {}).get("request_context")
+
+
+class FusedMiddlewarePipeline:
+    """
+    Security, rate limit, compression and request logging in one pure ASGI middleware.
+
+    Каждая фаза отключается передачей None вместо ее конфигурации; параметры
+    совпадают с SecurityMiddleware, HybridRateLimitMiddleware,
+    CompressionMiddleware и BodyCacheMiddleware.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        security: Optional[Dict[str, Any]] = None,
+        rate_limit: Optional[Dict[str, Any]] = None,
+        compression: Optional[Dict[str, Any]] = None,
+        body_cache: Optional[Dict[str, Any]] = None,
+        log_requests: bool = True,
+        log_exclude_paths: Optional[List[str]] = None,
+        request_logger: Optional[SampledRequestLogger] = None,
+    ):
+        """
+        Args:
+            app: Следующее ASGI приложение
+            security: Параметры SecurityMiddleware
+            rate_limit: Параметры HybridRateLimitMiddleware (redis_client, лимиты, lease_size, ...)
+            compression: minimum_size, maximum_size, compression_level, enable_brotli,
+                exclude_content_types, exclude_paths
+            body_cache: Параметры BodyCacheMiddleware
+            log_requests: Писать запросы в лог после ответа
+            log_exclude_paths: Префиксы путей без записи в лог (health checks)
+            request_logger: Логгер запросов (по умолчанию get_sampled_request_logger())
+        """
+        self.app = BodyCacheMiddleware(app, **body_cache) if body_cache is not None else app
+        self.security = SecurityMiddleware(None, **security) if security is not None else None
+        self.rate_limiter = HybridRateLimitMiddleware(None, **rate_limit) if rate_limit is not None else None
+        self.request_logger = (request_logger or get_sampled_request_logger()) if log_requests else None
+        self._preview_response = bool(self.request_logger and self.request_logger.preview_limit)
+        self.log_exclude_paths = tuple(log_exclude_paths if log_exclude_paths is not None else DEFAULT_LOG_EXCLUDE_PATHS)
+
+        # Статические заголовки безопасности кодируются один раз
+        self._security_headers: List[Tuple[bytes, bytes]] = []
+        if self.security is not None and self.security.enable_security_headers:
+            self._security_headers = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in self.security.security_headers().items()
+            ]
+
+        self.compression = compression is not None
+        compression = compression or {}
+        self.minimum_size = compression.get("minimum_size", 1024)
+        self.maximum_size = compression.get("maximum_size", 10 * 1024 * 1024)
+        self.compression_level = compression.get("compression_level", 6)
+        self.brotli_enabled = brotli is not None and compression.get("enable_brotli", True)
+        self.exclude_content_types = frozenset(compression.get("exclude_content_types") or DEFAULT_EXCLUDED_CONTENT_TYPES)
+        self.compression_exclude_paths = frozenset(compression.get("exclude_paths") or ())
+
+        self.stats = {
+            "requests": 0, "security_rejected": 0, "rate_limited": 0, "errors": 0,
+            "compressed": 0, "bytes_original": 0, "bytes_compressed": 0,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.stats["requests"] += 1
+        ctx = RequestContext(scope)
+        state = scope.setdefault("state", {})
+        state["correlation_id"] = ctx.correlation_id
+        state["request_context"] = ctx
+        set_correlation_id(ctx.correlation_id)
+
+        extra_headers = self._security_headers + [
+            (b"x-request-id", ctx.correlation_id.encode("latin-1")),
+            (b"x-correlation-id", ctx.correlation_id.encode("latin-1")),
+        ]
+        algorithm = self._select_algorithm(ctx)
+        pending_start: Optional[Message] = None
+        encoder: Optional[_StreamEncoder] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal pending_start, encoder
+            message_type = message["type"]
+
+            if message_type == "http.response.start":
+                ctx.status_code = message["status"]
+                # Заголовки пайплайна заменяют одноименные заголовки приложения (Server, X-Powered-By)
+                extra_names = {name for name, _ in extra_headers}
+                headers = [
+                    (name, value) for name, value in message.get("headers", ()) if name.lower() not in extra_names
+                ] + extra_headers
+                message = {**message, "headers": headers}
+                if algorithm is not None and self._compressible(headers):
+                    # Решение о сжатии - по первому чанку тела
+                    pending_start = message
+                    return
+
+            elif message_type == "http.response.body":
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if self._preview_response and ctx.response_head is None and body:
+                    ctx.response_head = body
+
+                if pending_start is not None:
+                    start, pending_start = pending_start, None
+                    if more_body:
+                        encoder = _StreamEncoder(algorithm, self.compression_level)
+                        self._set_encoding(start, algorithm, None)
+                        message = {**message, "body": encoder.compress(body)}
+                        self.stats["compressed"] += 1
+                    elif self.minimum_size <= len(body) <= self.maximum_size:
+                        compressed = self._compress(body, algorithm)
+                        self._set_encoding(start, algorithm, len(compressed))
+                        message = {**message, "body": compressed}
+                        self.stats["compressed"] += 1
+                        self.stats["bytes_original"] += len(body)
+                        self.stats["bytes_compressed"] += len(compressed)
+                    await send(start)
+
+                elif encoder is not None:
+                    chunk = encoder.compress(body)
+                    if not more_body:
+                        chunk += encoder.flush()
+                    message = {**message, "body": chunk}
+
+                ctx.response_bytes += len(message.get("body", b""))
+
+            await send(message)
+
+        try:
+            if await self._admit(ctx, send_wrapper, extra_headers):
+                await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            self.stats["errors"] += 1
+            ctx.status_code = 500
+            self._log_request(ctx, scope, e)
+            raise
+        self._log_request(ctx, scope)
+
+    async def _admit(self, ctx: RequestContext, send: Send, extra_headers: List[Tuple[bytes, bytes]]) -> bool:
+        """Security and rate limit phases; False - rejection already sent."""
+        if self.security is not None:
+            rejection = self.security.check_request_line(ctx.method, ctx.path, ctx.query_string, ctx.headers)
+            if rejection is not None:
+                status_code, content, incident_type = rejection
+                self.stats["security_rejected"] += 1
+                self._log_security_incident(ctx, incident_type)
+                await self._send_json(send, status_code, content)
+                return False
+
+        if self.rate_limiter is not None:
+            allowed, info = await self.rate_limiter.check(ctx.client_id, ctx.path)
+            if not allowed:
+                self.stats["rate_limited"] += 1
+                await self.rate_limiter.send_rejection(send, info)
+                return False
+            if self.rate_limiter.include_headers:
+                extra_headers.extend(self.rate_limiter.limit_headers(info))
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        if stats["bytes_original"]:
+            stats["average_compression_ratio"] = stats["bytes_compressed"] / stats["bytes_original"]
+        if self.rate_limiter is not None:
+            stats["rate_limiter"] = self.rate_limiter.get_stats()
+        return stats
+
+    async def cleanup(self) -> None:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.cleanup()
+
+    def _select_algorithm(self, ctx: RequestContext) -> Optional[str]:
+        """Best encoding accepted by the client (br > gzip > deflate)."""
+        if not self.compression or ctx.path in self.compression_exclude_paths:
+            return None
+        accept_encoding = ctx.headers.get("accept-encoding", "").lower()
+        if self.brotli_enabled and "br" in accept_encoding:
+            return "br"
+        if "gzip" in accept_encoding:
+            return "gzip"
+        if "deflate" in accept_encoding:
+            return "deflate"
+        return None
+
+    def _compressible(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                if value.decode("latin-1").split(";")[0].strip() in self.exclude_content_types:
+                    return False
+            elif name == b"content-length":
+                if not self.minimum_size <= int(value) <= self.maximum_size:
+                    return False
+        return True
+
+    def _compress(self, body: bytes, algorithm: str) -> bytes:
+        if algorithm == "gzip":
+            return gzip.compress(body, compresslevel=self.compression_level)
+        if algorithm == "br":
+            return brotli.compress(body, quality=self.compression_level)
+        return zlib.compress(body, level=self.compression_level)
+
+    @staticmethod
+    def _set_encoding(message: Message, algorithm: str, content_length: Optional[int]) -> None:
+        headers = [(name, value) for name, value in message["headers"] if name != b"content-length"]
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        headers += [(b"content-encoding", algorithm.encode()), (b"vary", b"Accept-Encoding")]
+        message["headers"] = headers
+
+    @staticmethod
+    async def _send_json(send: Send, status_code: int, content: Dict[str, Any]) -> None:
+        body = json.dumps(content).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _log_request(self, ctx: RequestContext, scope: Scope, error: Optional[Exception] = None) -> None:
+        """Hand the finished request to the sampled request logger."""
+        route = scope.get("route")
+        ctx.route = getattr(route, "path", None) or ctx.path
+        if self.request_logger is None or ctx.path.startswith(self.log_exclude_paths):
+            return
+        cached_body = scope.get("_cached_body")
+        self.request_logger.log(
+            ctx.method,
+            ctx.route,
+            ctx.status_code,
+            ctx.duration_ms,
+            correlation_id=ctx.correlation_id,
+            client_ip=ctx.client_ip,
+            path=ctx.path,
+            response_bytes=ctx.response_bytes,
+            request_body=cached_body["bytes"] if cached_body and cached_body.get("available") else None,
+            response_body=ctx.response_head,
+            error=error,
+        )
+
+    def _log_security_incident(self, ctx: RequestContext, incident_type: str) -> None:
+        logger.warning(f"Security incident: {incident_type}", extra={
+            "event": "security_incident",
+            "incident_type": incident_type,
+            "client_ip": ctx.client_ip,
+            "user_agent": ctx.headers.get("user-agent", "Unknown"),
+            "path": ctx.path,
+            "method": ctx.method,
+            "query_string": ctx.query_string,
+            "correlation_id": ctx.correlation_id,
+        })
@@ -6,7 +6,7 @@ Includes request size limits, security headers, and input validation.
 import re
 import time
 from core.logging import get_logger
-from typing import Dict, List, Optional, Callable, Any
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 from urllib.parse import unquote
 
 from fastapi import Request, Response
@@ -17,6 +17,17 @@ from core.config import settings
 
 logger = get_logger(__name__)
 
+# Upload endpoints and content types accepted by them
+UPLOAD_PATHS = ("/api/v1/prices/upload", "/api/v1/materials/upload")
+ALLOWED_UPLOAD_CONTENT_TYPES = (
+    "application/json",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.ms-excel",
+    "text/csv",
+    "application/csv",
+    "multipart/form-data",
+)
+
 
 class SecurityMiddleware(BaseHTTPMiddleware):
     """
@@ -209,25 +220,59 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     def _check_file_extension(self, request: Request) -> bool:
         """Check file extension for upload endpoints."""
         # Only check specific upload endpoints
-        upload_paths = ["/api/v1/prices/upload", "/api/v1/materials/upload"]
-        
-        if not any(request.url.path.startswith(path) for path in upload_paths):
+        if not any(request.url.path.startswith(path) for path in UPLOAD_PATHS):
             return True  # Allow non-upload endpoints
         
         # Check Content-Type header
         content_type = request.headers.get("content-type", "")
-        
-        # Allow specific content types
-        allowed_types = [
-            "application/json",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "application/vnd.ms-excel",
-            "text/csv",
-            "application/csv",
-            "multipart/form-data"
-        ]
-        
-        return any(allowed_type in content_type for allowed_type in allowed_types)
+        return any(allowed_type in content_type for allowed_type in ALLOWED_UPLOAD_CONTENT_TYPES)
+
+    def check_request_line(
+        self,
+        method: str,
+        path: str,
+        query_string: str,
+        headers: Mapping[str, str],
+    ) -> Optional[Tuple[int, Dict[str, str], str]]:
+        """
+        Header, path and query checks on pre-parsed request data.
+
+        Те же проверки, что в _perform_security_checks, но без Request и
+        без тела запроса - для pure ASGI пайплайна.
+
+        Returns:
+            (status_code, response content, incident type) или None
+        """
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_request_size:
+            return 413, {
+                "error": "Request too large",
+                "message": f"Request size exceeds {self.max_request_size / (1024*1024):.1f}MB limit"
+            }, "request_size_exceeded"
+
+        user_agent = headers.get("user-agent", "").lower()
+        if any(blocked_agent in user_agent for blocked_agent in self.blocked_user_agents):
+            return 403, {"error": "Forbidden", "message": "Access denied"}, "blocked_user_agent"
+
+        decoded_query = unquote(query_string)
+        if self.enable_path_traversal_protection:
+            decoded_path = unquote(path)
+            if any(pattern.search(decoded_path) or pattern.search(decoded_query) for pattern in self.path_regex):
+                return 400, {"error": "Bad request", "message": "Invalid path"}, "path_traversal_attempt"
+
+        if method in ("POST", "PUT") and any(path.startswith(upload) for upload in UPLOAD_PATHS):
+            content_type = headers.get("content-type", "")
+            if not any(allowed_type in content_type for allowed_type in ALLOWED_UPLOAD_CONTENT_TYPES):
+                return 400, {"error": "Bad request", "message": "Invalid file type"}, "invalid_file_extension"
+
+        if self.enable_input_validation and decoded_query:
+            invalid = {"error": "Bad request", "message": "Invalid input detected"}
+            if self.enable_sql_injection_protection and self._check_sql_injection(decoded_query):
+                return 400, invalid, "sql_injection_attempt"
+            if self.enable_xss_protection and self._check_xss(decoded_query):
+                return 400, invalid, "xss_query"
+
+        return None
 
     async def _validate_input(self, request: Request) -> Optional[Response]:
         """Validate input for SQL injection and XSS."""
@@ -329,9 +374,14 @@ class SecurityMiddleware(BaseHTTPMiddleware):
 
     def _add_security_headers(self, response: Response, request: Request):
         """Add security headers to response."""
+        response.headers.update(self.security_headers())
+        response.headers["X-Request-ID"] = getattr(request.state, "correlation_id", "unknown")
+
+    def security_headers(self) -> Dict[str, str]:
+        """Static security headers for the current environment (без X-Request-ID)."""
         # Security headers for production
         if settings.ENVIRONMENT == "production":
-            response.headers.update({
+            headers = {
                 # HSTS (HTTP Strict Transport Security)
                 "Strict-Transport-Security": "max-age=31536000; includeSubDomains; preload",
                 
@@ -371,22 +421,22 @@ class SecurityMiddleware(BaseHTTPMiddleware):
                     "gyroscope=(), "
                     "accelerometer=()"
                 ),
-            })
+            }
         else:
             # Development headers (less restrictive)
-            response.headers.update({
+            headers = {
                 "X-Content-Type-Options": "nosniff",
                 "X-Frame-Options": "SAMEORIGIN",
                 "X-XSS-Protection": "1; mode=block",
-            })
+            }
         
         # Always add these headers
-        response.headers.update({
+        headers.update({
             "X-Powered-By": "",  # Hide server information
             "Server": "",        # Hide server information
             "X-Content-Security": "protected",
-            "X-Request-ID": getattr(request.state, "correlation_id", "unknown"),
         })
+        return headers
 
     async def _log_security_incident(
         self, 
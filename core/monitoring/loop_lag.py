@@ -0,0 +1,104 @@
+"""
+Event loop lag monitor.
+
+Измеряет задержку event loop: корутина засыпает на ``interval`` и фиксирует,
+насколько позже она проснулась. Блокирующая CPU-работа в loop проявляется
+как рост лага у всех запросов процесса. Значения публикуются гистограммой
+``event_loop.lag_ms`` в общий metrics collector.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LoopLagMonitor:
+    """Периодический замер лага event loop."""
+
+    def __init__(self, interval: float = 0.1, window: int = 600, publish: bool = True):
+        """
+        Args:
+            interval: Период замера в секундах
+            window: Сколько последних замеров хранить для перцентилей
+            publish: Публиковать замеры в metrics collector
+        """
+        self.interval = interval
+        self.publish = publish
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Запустить замеры в текущем event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить замеры."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self) -> None:
+        """Сбросить накопленные замеры."""
+        self.samples.clear()
+        self.max_lag_ms = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Перцентили лага в миллисекундах по окну замеров."""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"samples": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        def percentile(p: float) -> float:
+            return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+        return {
+            "samples": len(ordered),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": self.max_lag_ms,
+        }
+
+    async def _run(self) -> None:
+        collector = None
+        if self.publish:
+            from core.monitoring.metrics import get_metrics_collector
+            collector = get_metrics_collector()
+
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max((time.perf_counter() - started - self.interval) * 1000, 0.0)
+
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if collector is not None:
+                try:
+                    collector.record_histogram("event_loop.lag_ms", lag_ms)
+                except Exception as e:
+                    logger.debug(f"Failed to publish loop lag: {e}")
+
+
+# Singleton instance
+_loop_lag_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    """Получить общий монитор лага event loop."""
+    global _loop_lag_monitor
+
+    if _loop_lag_monitor is None:
+        _loop_lag_monitor = LoopLagMonitor()
+
+    return _loop_lag_monitor
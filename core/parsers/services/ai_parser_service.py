@@ -32,6 +32,7 @@ from ..interfaces import (
     OutputType
 )
 from ..interfaces.ai_parser_interface import MaterialParseData, AIParseResult
+from .parse_cache import ParseResultCache, REUSED_FIELDS
 
 print("DEBUG: core/parsers/services/ai_parser_service.py loaded")
 
@@ -78,6 +79,15 @@ class AIParserService:
         # Cache for parsed results
         self.cache: Dict[str, AIParseResult[MaterialParseData]] = {}
         
+        # Near-duplicate-aware cache of parse results keyed by canonical name+unit
+        self.parse_cache = ParseResultCache(
+            namespace=self.config.models.openai_model,
+            similarity_cutoff=self.config.cache.near_duplicate_cutoff,
+            max_entries=self.config.cache.cache_size_limit,
+            ttl_seconds=self.config.cache.persistent_cache_ttl,
+            cache_db=self._create_persistent_cache_db()
+        )
+        
         # Service metadata
         self._service_name = "ai_parser_service"
         self._version = "2.0.0"
@@ -95,6 +105,18 @@ class AIParserService:
             self.logger.error(f"Failed to initialize OpenAI client: {e}")
             raise
     
+    def _create_persistent_cache_db(self):
+        """Create cache database for persistent parse cache if enabled"""
+        if not (self.config.cache.enable_caching and self.config.cache.enable_persistent_cache):
+            return None
+        
+        try:
+            from core.database.factories import DatabaseFactory
+            return DatabaseFactory.create_cache_database()
+        except Exception as e:
+            self.logger.warning(f"Persistent parse cache unavailable, using in-process cache only: {e}")
+            return None
+    
     @property
     def service_name(self) -> str:
         """Get service name"""
@@ -135,6 +157,7 @@ class AIParserService:
             "client_available": self.client is not None,
             "config_available": self.config is not None,
             "cache_size": len(self.cache),
+            "parse_cache": self.parse_cache.get_stats(),
             "metrics": None  # Simplified for production deployment
         }
     
@@ -223,20 +246,27 @@ class AIParserService:
         # Parse material (extract name, unit, price from input)
         parsed_input = self._parse_input_data(request.input_data)
         
-        # Get AI response
-        ai_response = await self._get_ai_response_async(
-            parsed_input["name"],
-            parsed_input["unit"],
-            context
-        )
+        # Reuse parse of the same or near-duplicate material
+        result = await self._get_parse_from_cache(request, parsed_input, context)
         
-        # Create result
-        result = self._create_parse_result(
-            request=request,
-            parsed_input=parsed_input,
-            ai_response=ai_response,
-            context=context
-        )
+        if result is None:
+            # Get AI response
+            ai_response = await self._get_ai_response_async(
+                parsed_input["name"],
+                parsed_input["unit"],
+                context
+            )
+            
+            # Create result
+            result = self._create_parse_result(
+                request=request,
+                parsed_input=parsed_input,
+                ai_response=ai_response,
+                context=context
+            )
+            
+            if self.config.cache.enable_caching and result.status == ParseStatus.SUCCESS:
+                await self.parse_cache.store(parsed_input["name"], parsed_input["unit"], result.data)
         
         # Generate embeddings if enabled
         if request.options.get("enable_embeddings", False):
@@ -248,6 +278,59 @@ class AIParserService:
         
         return result
     
+    async def _get_parse_from_cache(
+        self,
+        request: AIParseRequest[str],
+        parsed_input: Dict[str, Any],
+        context: AIParseContext
+    ) -> Optional[AIParseResult[MaterialParseData]]:
+        """
+        Build parse result from cached parse of the same or near-duplicate material.
+        
+        Args:
+            request: Parse request
+            parsed_input: Parsed input data
+            context: Parse context
+            
+        Returns:
+            AIParseResult or None on cache miss
+        """
+        if not self.config.cache.enable_caching:
+            return None
+        
+        cached = await self.parse_cache.lookup(parsed_input["name"], parsed_input["unit"])
+        if cached is None:
+            return None
+        
+        cached_data, match_kind = cached
+        self.logger.debug(f"Parse cache {match_kind} hit for: {parsed_input['name']}")
+        
+        material_data = MaterialParseData(
+            name=parsed_input["name"],
+            original_unit=parsed_input["unit"],
+            original_price=parsed_input["price"],
+            unit=parsed_input["unit"],
+            price=parsed_input["price"],
+            parsing_method=cached_data.parsing_method,
+            **{field: getattr(cached_data, field) for field in REUSED_FIELDS}
+        )
+        price_coefficient = material_data.price_coefficient
+        material_data.price_parsed = (
+            parsed_input["price"] / price_coefficient
+            if price_coefficient and parsed_input["price"] != 0
+            else parsed_input["price"]
+        )
+        
+        return AIParseResult(
+            success=True,
+            status=ParseStatus.SUCCESS,
+            data=material_data,
+            confidence=material_data.confidence,
+            processing_time=context.get_elapsed_time(),
+            request_id=request.correlation_id,
+            metadata={"parse_cache": match_kind}
+        )
+    
     def _parse_input_data(self, input_data: str) -> Dict[str, Any]:
         """
         Parse input data to extract name, unit, and price.
@@ -593,13 +676,15 @@ class AIParserService:
             "total_cached": len(self.cache),
             "successful_parses": successful,
             "success_rate": successful / len(self.cache) if self.cache else 0.0,
+            "parse_cache": self.parse_cache.get_stats(),
             "health_status": self.get_health_details(),
-            "ai_metrics": self.metrics.get_ai_metrics()
+            "ai_metrics": self.metrics.get_ai_metrics() if self.metrics else None
         }
     
     def clear_cache(self) -> None:
         """Clear result cache"""
         self.cache.clear()
+        self.parse_cache.clear()
         self.logger.info("Cache cleared")
     
     def get_cache_size(self) -> int:
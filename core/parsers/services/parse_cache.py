@@ -0,0 +1,304 @@
+"""
+Parse Result Cache
+
+Near-duplicate-aware cache of AI parse results. Material names are reduced to a
+canonical form (case, whitespace, quote styles and word order are ignored), exact
+canonical matches are served directly and close variants are found through a
+64-bit SimHash with banded lookup. Results can be persisted to the cache database
+so they survive restarts and are shared between workers.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.logging import get_logger
+
+from ..interfaces.ai_parser_interface import MaterialParseData
+
+SIMHASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = SIMHASH_BITS // BAND_COUNT
+MAX_BUCKET_SIZE = 64
+
+# Fields reused from a cached parse; input-specific fields come from the new request
+REUSED_FIELDS = ("unit_parsed", "price_coefficient", "color", "confidence", "category", "specifications")
+
+_QUOTES_RE = re.compile(r"[«»“”„‟\"'`´‘’]")
+_DIGIT_LETTER_RE = re.compile(r"(?<=\d)(?=[^\d\s.,])|(?<=[^\d\s.,])(?=\d)")
+_SEPARATORS_RE = re.compile(r"[^\w.,]+")
+_NUMBER_RE = re.compile(r"^\d+(?:[.,]\d+)?$")
+
+
+def canonicalize_material(name: str, unit: str = "") -> Tuple[List[str], str]:
+    """
+    Reduce material name and unit to a canonical token form.
+
+    Returns:
+        Sorted name tokens and normalized unit
+    """
+    text = _QUOTES_RE.sub(" ", name.lower().replace("ё", "е"))
+    text = _DIGIT_LETTER_RE.sub(" ", text)
+    tokens = [token.strip(".,") for token in _SEPARATORS_RE.split(text)]
+    tokens = sorted(token.replace(",", ".") if _NUMBER_RE.match(token) else token for token in tokens if token)
+
+    normalized_unit = " ".join(_SEPARATORS_RE.split(unit.lower().replace("ё", "е"))).strip()
+    return tokens, normalized_unit
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash over word tokens and character trigrams."""
+    text = " ".join(tokens)
+    features = tokens + [text[i:i + 3] for i in range(max(len(text) - 2, 0))]
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(fingerprint: int) -> List[str]:
+    mask = (1 << BAND_BITS) - 1
+    return [f"{band}:{fingerprint >> (band * BAND_BITS) & mask:x}" for band in range(BAND_COUNT)]
+
+
+@dataclass
+class ParseCacheEntry:
+    """Cached parse result with its near-duplicate fingerprint."""
+    fingerprint: int
+    guard: str
+    data: Dict[str, Any]
+    expires_at: float
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {"fingerprint": self.fingerprint, "guard": self.guard, "data": self.data}
+
+
+class ParseResultCache:
+    """
+    Cache of MaterialParseData keyed by canonical name+unit form.
+
+    Near-duplicate candidates must share the unit and every number of the name
+    (sizes, grades, package weights), so "Цемент М500 50кг" never reuses the
+    parse of "Цемент М500 25кг". Lookup is banded SimHash: BAND_COUNT bands of
+    BAND_BITS bits, so variants within BAND_COUNT - 1 differing bits are always
+    found and lower cutoffs are matched on a best-effort basis.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        similarity_cutoff: float = 0.95,
+        max_entries: int = 10000,
+        ttl_seconds: int = 30 * 86400,
+        cache_db: Optional[Any] = None,
+    ):
+        """
+        Args:
+            namespace: Key namespace (model name), parses of other models are not reused
+            similarity_cutoff: Minimum SimHash similarity (1 - hamming / 64) for reuse
+            max_entries: Local in-process entry limit
+            ttl_seconds: Entry time-to-live
+            cache_db: Optional cache database for persistent storage
+        """
+        self.namespace = namespace
+        self.similarity_cutoff = similarity_cutoff
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_db = cache_db
+        self.logger = get_logger(__name__)
+
+        self._entries: "OrderedDict[str, ParseCacheEntry]" = OrderedDict()
+        self._buckets: Dict[str, Set[str]] = {}
+
+        self.stats = {"exact_hits": 0, "near_hits": 0, "persistent_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    @property
+    def max_distance(self) -> int:
+        """Maximum Hamming distance accepted by the similarity cutoff."""
+        return int((1.0 - self.similarity_cutoff) * SIMHASH_BITS)
+
+    async def lookup(self, name: str, unit: str = "") -> Optional[Tuple[MaterialParseData, str]]:
+        """
+        Find cached parse for the material or its near duplicate.
+
+        Returns:
+            Cached parse data and match kind ("exact" or "near"), None on miss
+        """
+        key, fingerprint, guard = self._fingerprint(name, unit)
+
+        entry = self._get_local(key)
+        if entry is not None:
+            self.stats["exact_hits"] += 1
+            return MaterialParseData(**entry.data), "exact"
+
+        match = self._find_near_local(fingerprint, guard)
+        if match is None and self.cache_db is not None:
+            match = await self._lookup_persistent(key, fingerprint, guard)
+
+        if match is None:
+            self.stats["misses"] += 1
+            return None
+
+        entry, kind = match
+        self.stats["near_hits" if kind == "near" else "exact_hits"] += 1
+        return MaterialParseData(**entry.data), kind
+
+    async def store(self, name: str, unit: str, data: MaterialParseData) -> None:
+        """Store successful parse result."""
+        key, fingerprint, guard = self._fingerprint(name, unit)
+        entry = ParseCacheEntry(
+            fingerprint=fingerprint,
+            guard=guard,
+            data=data.model_dump(exclude={"embeddings", "color_embedding", "unit_embedding"}),
+            expires_at=time.time() + self.ttl_seconds,
+        )
+        self._put_local(key, entry)
+        self.stats["stores"] += 1
+
+        if self.cache_db is not None:
+            try:
+                await self._store_persistent(key, entry)
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.logger.warning(f"Failed to persist parse cache entry: {e}")
+
+    def clear(self) -> None:
+        """Clear local entries (persistent entries expire by TTL)."""
+        self._entries.clear()
+        self._buckets.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rates of the parse cache."""
+        hits = self.stats["exact_hits"] + self.stats["near_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "similarity_cutoff": self.similarity_cutoff,
+            "persistent": self.cache_db is not None,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "near_hit_rate": self.stats["near_hits"] / lookups if lookups else 0.0,
+        }
+
+    def _fingerprint(self, name: str, unit: str) -> Tuple[str, int, str]:
+        tokens, normalized_unit = canonicalize_material(name, unit)
+        numbers = [token for token in tokens if _NUMBER_RE.match(token)]
+        guard = f"{normalized_unit}|{' '.join(numbers)}"
+        canonical = f"{self.namespace}|{' '.join(tokens)}|{normalized_unit}"
+        key = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+        return key, simhash(tokens), guard
+
+    def _get_local(self, key: str) -> Optional[ParseCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove_local(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _put_local(self, key: str, entry: ParseCacheEntry) -> None:
+        if key in self._entries:
+            self._remove_local(key)
+        while len(self._entries) >= self.max_entries:
+            self._remove_local(next(iter(self._entries)))
+
+        self._entries[key] = entry
+        for band in _bands(entry.fingerprint):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def _remove_local(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for band in _bands(entry.fingerprint):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _find_near_local(self, fingerprint: int, guard: str) -> Optional[Tuple[ParseCacheEntry, str]]:
+        candidates = set()
+        for band in _bands(fingerprint):
+            candidates.update(self._buckets.get(band, ()))
+
+        best = self._best_candidate(
+            fingerprint, guard, ((key, self._get_local(key)) for key in candidates)
+        )
+        return (best, "near") if best is not None else None
+
+    def _best_candidate(self, fingerprint: int, guard: str, candidates) -> Optional[ParseCacheEntry]:
+        best_entry, best_distance = None, self.max_distance + 1
+        for _, entry in candidates:
+            if entry is None or entry.guard != guard:
+                continue
+            distance = bin(entry.fingerprint ^ fingerprint).count("1")
+            if distance < best_distance:
+                best_entry, best_distance = entry, distance
+        return best_entry
+
+    async def _lookup_persistent(
+        self, key: str, fingerprint: int, guard: str
+    ) -> Optional[Tuple[ParseCacheEntry, str]]:
+        try:
+            payload = await self.cache_db.get(self._entry_key(key))
+            if payload:
+                entry = self._entry_from_payload(payload)
+                self._put_local(key, entry)
+                return entry, "exact"
+
+            buckets = await asyncio.gather(*[
+                self.cache_db.get(self._bucket_key(band)) for band in _bands(fingerprint)
+            ])
+            candidate_keys = sorted({candidate for bucket in buckets if bucket for candidate in bucket})
+            payloads = await asyncio.gather(*[
+                self.cache_db.get(self._entry_key(candidate)) for candidate in candidate_keys
+            ])
+            candidates = [
+                (candidate, self._entry_from_payload(payload))
+                for candidate, payload in zip(candidate_keys, payloads) if payload
+            ]
+
+            best = self._best_candidate(fingerprint, guard, candidates)
+            if best is None:
+                return None
+
+            self.stats["persistent_hits"] += 1
+            return best, "near"
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.logger.warning(f"Persistent parse cache lookup failed: {e}")
+            return None
+
+    async def _store_persistent(self, key: str, entry: ParseCacheEntry) -> None:
+        await self.cache_db.set(self._entry_key(key), entry.to_payload(), self.ttl_seconds)
+
+        for band in _bands(entry.fingerprint):
+            bucket_key = self._bucket_key(band)
+            bucket = await self.cache_db.get(bucket_key) or []
+            if key not in bucket:
+                bucket = (bucket + [key])[-MAX_BUCKET_SIZE:]
+                await self.cache_db.set(bucket_key, bucket, self.ttl_seconds)
+
+    def _entry_from_payload(self, payload: Dict[str, Any]) -> ParseCacheEntry:
+        return ParseCacheEntry(
+            fingerprint=int(payload["fingerprint"]),
+            guard=payload["guard"],
+            data=payload["data"],
+            expires_at=time.time() + self.ttl_seconds,
+        )
+
+    def _entry_key(self, key: str) -> str:
+        return f"parse_cache:entry:{key}"
+
+    def _bucket_key(self, band: str) -> str:
+        return f"parse_cache:{self.namespace}:band:{band}"
@@ -3,11 +3,28 @@
 Абстракции и реализации репозиториев для мульти-БД архитектуры.
 """
 
+from importlib import import_module
+from typing import Any
+
 from .interfaces import IMaterialsRepository, ICategoriesRepository, IUnitsRepository
 from .base import BaseRepository
-from .redis_materials import RedisMaterialsRepository
-from .hybrid_materials import HybridMaterialsRepository
-from .cached_materials import CachedMaterialsRepository
+
+# Реализации загружаются лениво: они импортируют адаптеры БД и их клиенты
+_LAZY_EXPORTS = {
+    "RedisMaterialsRepository": "redis_materials",
+    "HybridMaterialsRepository": "hybrid_materials",
+    "CachedMaterialsRepository": "cached_materials",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "IMaterialsRepository",
@@ -233,6 +233,10 @@ class BaseRepository(ABC):
                 )
                 return response.data[0].embedding
             
+            # Local embedding worker (AI_PROVIDER=huggingface)
+            elif hasattr(self.ai_client, 'embed'):
+                return await self.ai_client.embed(text)
+            
             # No valid AI client interface
             else:
                 raise DatabaseError(
@@ -257,6 +261,13 @@ class BaseRepository(ABC):
         Returns:
             List of embeddings
         """
+        # Локальный воркер кодирует все тексты батчами
+        if hasattr(self.ai_client, 'embed_many'):
+            try:
+                return await self.ai_client.embed_many(texts)
+            except Exception as e:
+                raise DatabaseError(message="Failed to generate embeddings", details=str(e))
+        
         embeddings = []
         for text in texts:
             embedding = await self.get_embedding(text)
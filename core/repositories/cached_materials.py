@@ -5,6 +5,7 @@
 
 import json
 import hashlib
+import time
 from core.logging import get_logger
 from typing import Any, Dict, List, Optional
 from datetime import datetime
@@ -34,6 +35,9 @@ class CachedMaterialsRepository:
     Репозиторий материалов с интеллектуальным Redis кешированием и cache-aside pattern.
     """
     
+    # Redis counter embedded in every search cache key (search:g<N>:...)
+    SEARCH_GENERATION_KEY = "search_generation"
+    
     def __init__(
         self,
         hybrid_repository: HybridMaterialsRepository,
@@ -52,6 +56,8 @@ class CachedMaterialsRepository:
                 - batch_size: Batch processing size (default: 100)
                 - enable_write_through: Enable write-through caching (default: False)
                 - cache_miss_threshold: Cache miss threshold for warming (default: 0.3)
+                - generation_local_ttl: How long the local copy of the search
+                  generation is trusted before re-reading Redis (default: 2.0s)
         """
         self.hybrid_repo = hybrid_repository
         self.cache_db = cache_db
@@ -64,6 +70,11 @@ class CachedMaterialsRepository:
         self.batch_size = config.get("batch_size", 100)
         self.enable_write_through = config.get("enable_write_through", False)
         self.cache_miss_threshold = config.get("cache_miss_threshold", 0.3)
+        self.generation_local_ttl = config.get("generation_local_ttl", 2.0)
+        
+        # Search namespace generation (local copy of Redis counter)
+        self._search_generation: Optional[int] = None
+        self._search_generation_checked_at = 0.0
         
         # Cache statistics
         self.stats = {
@@ -71,6 +82,7 @@ class CachedMaterialsRepository:
             "cache_misses": 0,
             "cache_writes": 0,
             "cache_errors": 0,
+            "generation_bumps": 0,
             "last_reset": datetime.utcnow()
         }
         
@@ -97,7 +109,7 @@ class CachedMaterialsRepository:
         """
         try:
             # Generate cache key from search parameters
-            cache_key = self._generate_search_cache_key(request)
+            cache_key = await self._generate_search_cache_key(request)
             
             # Try cache first if enabled
             if use_cache:
@@ -150,7 +162,8 @@ class CachedMaterialsRepository:
         """
         try:
             # Generate cache key
-            cache_key = f"vector_search:{self._hash_query(query)}:{limit}:{threshold}"
+            generation = await self._get_search_generation()
+            cache_key = f"vector_search:g{generation}:{self._hash_query(query)}:{limit}:{threshold}"
             
             # Try cache first
             if use_cache:
@@ -197,7 +210,8 @@ class CachedMaterialsRepository:
         """
         try:
             # Generate cache key
-            cache_key = f"sql_search:{self._hash_query(query)}:{limit}"
+            generation = await self._get_search_generation()
+            cache_key = f"sql_search:g{generation}:{self._hash_query(query)}:{limit}"
             
             # Try cache first
             if use_cache:
@@ -611,6 +625,7 @@ class CachedMaterialsRepository:
                     "total_misses": self.stats["cache_misses"],
                     "total_writes": self.stats["cache_writes"],
                     "total_errors": self.stats["cache_errors"],
+                    "generation_bumps": self.stats["generation_bumps"],
                     "stats_since": self.stats["last_reset"].isoformat()
                 },
                 "cache_configuration": {
@@ -618,7 +633,9 @@ class CachedMaterialsRepository:
                     "material_ttl": self.material_ttl,
                     "health_ttl": self.health_ttl,
                     "batch_size": self.batch_size,
-                    "write_through_enabled": self.enable_write_through
+                    "write_through_enabled": self.enable_write_through,
+                    "search_generation": self._search_generation,
+                    "generation_local_ttl": self.generation_local_ttl
                 },
                 "redis_status": redis_health,
                 "timestamp": datetime.utcnow().isoformat()
@@ -638,6 +655,7 @@ class CachedMaterialsRepository:
             "cache_misses": 0,
             "cache_writes": 0,
             "cache_errors": 0,
+            "generation_bumps": 0,
             "last_reset": datetime.utcnow()
         }
         logger.info("Cache statistics reset")
@@ -715,7 +733,7 @@ class CachedMaterialsRepository:
     
     # === Private helper methods ===
     
-    def _generate_search_cache_key(self, request: MaterialSearchRequest) -> str:
+    async def _generate_search_cache_key(self, request: MaterialSearchRequest) -> str:
         """Generate cache key for search request."""
         # Create a deterministic hash of search parameters
         key_data = {
@@ -728,8 +746,9 @@ class CachedMaterialsRepository:
         
         key_string = json.dumps(key_data, sort_keys=True, default=str)
         key_hash = hashlib.md5(key_string.encode()).hexdigest()
+        generation = await self._get_search_generation()
         
-        return f"search:{key_hash}"
+        return f"search:g{generation}:{key_hash}"
     
     def _hash_query(self, query: str) -> str:
         """Generate hash for query string."""
@@ -819,35 +838,56 @@ class CachedMaterialsRepository:
         except Exception as e:
             logger.warning(f"Failed to cache materials list: {e}")
     
-    async def _invalidate_search_caches(self, query_hint: str) -> None:
-        """Invalidate search caches related to query."""
+    async def _get_search_generation(self) -> int:
+        """Get current search namespace generation.
+        
+        Local copy is reused for ``generation_local_ttl`` seconds, so hot search
+        paths do not pay an extra Redis round-trip. Other workers observe a bump
+        at most ``generation_local_ttl`` seconds later.
+        """
+        now = time.monotonic()
+        if (
+            self._search_generation is not None
+            and now - self._search_generation_checked_at < self.generation_local_ttl
+        ):
+            return self._search_generation
+        
         try:
-            # Invalidate search caches that might contain this material
-            patterns = [
-                "search:*",  # All search results
-                f"vector_search:*{self._hash_query(query_hint)}*",
-                f"sql_search:*{self._hash_query(query_hint)}*"
-            ]
-            
-            for pattern in patterns:
-                try:
-                    await self.cache_db.delete_pattern(pattern)
-                except Exception as e:
-                    logger.warning(f"Failed to invalidate cache pattern '{pattern}': {e}")
-                    
+            value = await self.cache_db.get(
+                self.SEARCH_GENERATION_KEY, deserialize=False, default=None
+            )
+            self._search_generation = int(value) if value is not None else 0
         except Exception as e:
-            logger.warning(f"Failed to invalidate search caches: {e}")
+            logger.warning(f"Failed to read search cache generation: {e}")
+            if self._search_generation is None:
+                self._search_generation = 0
+        
+        self._search_generation_checked_at = now
+        return self._search_generation
     
-    async def _invalidate_all_search_caches(self) -> None:
-        """Invalidate all search caches."""
+    async def _bump_search_generation(self) -> None:
+        """Move search caches to a new namespace with a single INCR.
+        
+        Entries under previous generations become unreachable and age out via
+        ``search_ttl`` instead of being SCANned and deleted.
+        """
         try:
-            patterns = ["search:*", "vector_search:*", "sql_search:*"]
-            
-            for pattern in patterns:
-                try:
-                    await self.cache_db.delete_pattern(pattern)
-                except Exception as e:
-                    logger.warning(f"Failed to invalidate cache pattern '{pattern}': {e}")
-                    
+            self._search_generation = await self.cache_db.incr(self.SEARCH_GENERATION_KEY)
+            self._search_generation_checked_at = time.monotonic()
+            self.stats["generation_bumps"] += 1
+            logger.debug(f"Search cache generation bumped to {self._search_generation}")
         except Exception as e:
-            logger.warning(f"Failed to invalidate all search caches: {e}") 
\ No newline at end of file
+            logger.warning(f"Failed to bump search cache generation: {e}")
+    
+    async def _invalidate_search_caches(self, query_hint: str) -> None:
+        """Invalidate search caches related to query.
+        
+        Any search result may contain the changed material, so the whole search
+        namespace is invalidated; ``query_hint`` is kept for logging only.
+        """
+        logger.debug(f"Invalidating search caches for '{query_hint}'")
+        await self._bump_search_generation()
+    
+    async def _invalidate_all_search_caches(self) -> None:
+        """Invalidate all search caches."""
+        await self._bump_search_generation()
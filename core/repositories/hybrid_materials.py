@@ -13,6 +13,7 @@ from core.repositories.base import BaseRepository
 from core.repositories.interfaces import IMaterialsRepository
 from core.database.interfaces import IVectorDatabase, IRelationalDatabase
 from core.database.exceptions import DatabaseError
+from core.database.pgvector import to_vector_literal
 from core.schemas.materials import Material, MaterialCreate, MaterialUpdate
 from core.logging import DatabaseLogger
 from core.logging.metrics import get_metrics_collector
@@ -179,30 +180,45 @@ class HybridMaterialsRepository(BaseRepository, IMaterialsRepository):
         
         with self.performance_tracker.time_operation("hybrid", "search_hybrid"):
             try:
-                # Run both searches concurrently
-                vector_task = self._search_vector_db(query, limit * 2, min_vector_score)
-                sql_task = self._search_relational_db(query, limit * 2, min_sql_similarity)
+                final_results = None
+                if self._uses_pgvector_search():
+                    # Векторные и текстовые кандидаты ранжируются одним SQL запросом
+                    try:
+                        final_results = await self._search_pgvector_hybrid(
+                            query, limit, vector_weight, sql_weight, min_vector_score
+                        )
+                        vector_results = [r for r in final_results if r.get('vector_score', 0.0) > 0]
+                        sql_results = [r for r in final_results if r.get('text_score', 0.0) > 0]
+                    except Exception as e:
+                        # Нет расширения/миграции 006 или не получен эмбеддинг: поиск по обеим БД
+                        logger.warning(f"pgvector hybrid search failed, falling back to vector + SQL search: {e}")
+                        final_results = None
                 
-                vector_results, sql_results = await asyncio.gather(
-                    vector_task, sql_task, return_exceptions=True
-                )
-                
-                # Handle exceptions
-                if isinstance(vector_results, Exception):
-                    logger.warning(f"Vector search failed: {vector_results}")
-                    vector_results = []
-                
-                if isinstance(sql_results, Exception):
-                    logger.warning(f"SQL search failed: {sql_results}")
-                    sql_results = []
-                
-                # Combine and rank results
-                combined_results = self._combine_search_results(
-                    vector_results, sql_results, vector_weight, sql_weight
-                )
-                
-                # Deduplicate and limit results
-                final_results = self._deduplicate_results(combined_results)[:limit]
+                if final_results is None:
+                    # Run both searches concurrently
+                    vector_task = self._search_vector_db(query, limit * 2, min_vector_score)
+                    sql_task = self._search_relational_db(query, limit * 2, min_sql_similarity)
+                    
+                    vector_results, sql_results = await asyncio.gather(
+                        vector_task, sql_task, return_exceptions=True
+                    )
+                    
+                    # Handle exceptions
+                    if isinstance(vector_results, Exception):
+                        logger.warning(f"Vector search failed: {vector_results}")
+                        vector_results = []
+                    
+                    if isinstance(sql_results, Exception):
+                        logger.warning(f"SQL search failed: {sql_results}")
+                        sql_results = []
+                    
+                    # Combine and rank results
+                    combined_results = self._combine_search_results(
+                        vector_results, sql_results, vector_weight, sql_weight
+                    )
+                    
+                    # Deduplicate and limit results
+                    final_results = self._deduplicate_results(combined_results)[:limit]
                 
                 logger.info(
                     f"Hybrid search completed: {len(vector_results)} vector + "
@@ -728,6 +744,38 @@ class HybridMaterialsRepository(BaseRepository, IMaterialsRepository):
         
         return materials
     
+    def _uses_pgvector_search(self) -> bool:
+        """Relational DB ranks vector and text candidates itself (pgvector)."""
+        return (
+            getattr(self.relational_db, "pgvector_search", False) is True
+            and hasattr(self.relational_db, "search_hybrid")
+        )
+    
+    async def _search_pgvector_hybrid(
+        self,
+        query: str,
+        limit: int,
+        vector_weight: float,
+        text_weight: float,
+        min_vector_score: float
+    ) -> List[Dict[str, Any]]:
+        """Single-query hybrid search in PostgreSQL (pgvector + pg_trgm)."""
+        query_embedding = await self.get_embedding(query)
+        results = await self.relational_db.search_hybrid(
+            query,
+            query_embedding,
+            limit=limit,
+            vector_weight=vector_weight,
+            text_weight=text_weight,
+            min_vector_score=min_vector_score
+        )
+        
+        for result in results:
+            result['combined_score'] = result['hybrid_score']
+            result['search_type'] = 'hybrid'
+        
+        return results
+    
     async def _search_relational_db(
         self, 
         query: str, 
@@ -822,6 +870,11 @@ class HybridMaterialsRepository(BaseRepository, IMaterialsRepository):
             set_clauses.append(f"{key} = :{key}")
             params[key] = value
         
+        if update_data.get('embedding') is not None:
+            # pgvector копия эмбеддинга для HNSW индекса
+            set_clauses.append("embedding_vector = CAST(:embedding_vector AS vector)")
+            params['embedding_vector'] = to_vector_literal(update_data['embedding'])
+        
         if set_clauses:
             query = f"UPDATE materials SET {', '.join(set_clauses)} WHERE id = :id"
             await self.relational_db.execute_command(query, params)
@@ -239,6 +239,46 @@ class IBatchProcessingRepository(ABC):
             True if update successful
         """
 
+    async def update_processing_statuses(self, request_id: str, material_ids: List[str], status: str) -> bool:
+        """Set one status for several materials of a batch.
+        
+        Реализация по умолчанию обновляет записи по одной; хранилища с
+        массовым обновлением переопределяют метод.
+        
+        Args:
+            request_id: Request identifier
+            material_ids: Material identifiers
+            status: New status
+        
+        Returns:
+            True if all updates successful
+        """
+        results = [await self.update_processing_status(request_id, material_id, status) for material_id in material_ids]
+        return all(results)
+
+    async def update_processing_results(self, request_id: str, updates: List[Dict[str, Any]]) -> bool:
+        """Store processing results of several materials of a batch.
+
+        Каждый элемент updates - словарь с material_id, status, error и
+        дополнительными полями (sku, similarity_score, ...). Реализация по
+        умолчанию обновляет записи по одной; хранилища с массовым обновлением
+        переопределяют метод.
+
+        Args:
+            request_id: Request identifier
+            updates: Per-material status updates
+
+        Returns:
+            True if all updates successful
+        """
+        results = []
+        for update in updates:
+            fields = {key: value for key, value in update.items() if key not in ('material_id', 'status', 'error')}
+            results.append(await self.update_processing_status(
+                request_id, update['material_id'], update['status'], update.get('error'), **fields
+            ))
+        return all(results)
+
     @abstractmethod
     async def get_processing_progress(self, request_id: str) -> Any:
         """Get processing progress for a batch request.
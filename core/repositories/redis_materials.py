@@ -3,6 +3,7 @@
 Реализация репозитория материалов с использованием Redis.
 """
 
+import hashlib
 import json
 from core.logging import get_logger
 from typing import List, Optional, Dict, Any
@@ -49,24 +50,12 @@ class RedisMaterialsRepository(IMaterialsRepository):
             Created material
         """
         try:
-            # Generate ID for the material
-            material_id = f"{material.name}_{hash(material.description)}"
-            
-            # Create Material object
-            material_obj = Material(
-                id=material_id,
-                name=material.name,
-                description=material.description,
-                category=material.category,
-                unit=material.unit,
-                price=material.price,
-                metadata=material.metadata or {}
-            )
+            material_obj = self._build_material(material)
+            material_id = material_obj.id
             
             # Cache the material
-            cache_key = f"{self.key_prefix}{material_id}"
             await self.cache_db.set(
-                key=cache_key,
+                key=self._material_key(material_id),
                 value=material_obj.model_dump_json(),
                 ttl=self.default_ttl
             )
@@ -99,7 +88,7 @@ class RedisMaterialsRepository(IMaterialsRepository):
             Material or None if not found
         """
         try:
-            cache_key = f"{self.key_prefix}{material_id}"
+            cache_key = self._material_key(material_id)
             cached_data = await self.cache_db.get(cache_key)
             
             if cached_data:
@@ -112,6 +101,34 @@ class RedisMaterialsRepository(IMaterialsRepository):
             logger.error(f"Failed to get material from cache: {e}")
             return None
     
+    async def get_many(self, material_ids: List[str]) -> List[Material]:
+        """Get multiple materials by ID with a single MGET.
+        
+        Args:
+            material_ids: Material identifiers
+            
+        Returns:
+            Found materials in the order of material_ids (missing ones skipped)
+        """
+        if not material_ids:
+            return []
+        
+        try:
+            cached_values = await self.cache_db.mget(
+                [self._material_key(material_id) for material_id in material_ids]
+            )
+            
+            materials = []
+            for cached_data in cached_values:
+                if cached_data:
+                    materials.append(Material(**json.loads(cached_data)))
+            
+            return materials
+            
+        except Exception as e:
+            logger.error(f"Failed to get materials from cache: {e}")
+            return []
+    
     async def update(self, material_id: str, material_update: MaterialUpdate) -> Optional[Material]:
         """Update material in cache.
         
@@ -134,7 +151,7 @@ class RedisMaterialsRepository(IMaterialsRepository):
                 setattr(existing_material, field, value)
             
             # Cache updated material
-            cache_key = f"{self.key_prefix}{material_id}"
+            cache_key = self._material_key(material_id)
             await self.cache_db.set(
                 key=cache_key,
                 value=existing_material.model_dump_json(),
@@ -158,7 +175,7 @@ class RedisMaterialsRepository(IMaterialsRepository):
             True if deleted successfully
         """
         try:
-            cache_key = f"{self.key_prefix}{material_id}"
+            cache_key = self._material_key(material_id)
             deleted = await self.cache_db.delete(cache_key)
             
             if deleted:
@@ -221,19 +238,9 @@ class RedisMaterialsRepository(IMaterialsRepository):
             List of matching materials from cache
         """
         try:
-            # Try to get cached search results
-            search_key = f"{self.search_prefix}semantic:{hash(query)}"
-            cached_results = await self.cache_db.get(search_key)
+            materials = await self._get_cached_search_results("semantic", query, limit)
             
-            if cached_results:
-                material_ids = json.loads(cached_results)
-                materials = []
-                
-                for material_id in material_ids[:limit]:
-                    material = await self.get_by_id(material_id)
-                    if material:
-                        materials.append(material)
-                
+            if materials is not None:
                 logger.info(f"Returned {len(materials)} cached search results for: {query}")
                 return materials
             
@@ -255,19 +262,9 @@ class RedisMaterialsRepository(IMaterialsRepository):
             List of matching materials from cache
         """
         try:
-            # Try to get cached search results
-            search_key = f"{self.search_prefix}text:{hash(query)}"
-            cached_results = await self.cache_db.get(search_key)
+            materials = await self._get_cached_search_results("text", query, limit)
             
-            if cached_results:
-                material_ids = json.loads(cached_results)
-                materials = []
-                
-                for material_id in material_ids[:limit]:
-                    material = await self.get_by_id(material_id)
-                    if material:
-                        materials.append(material)
-                
+            if materials is not None:
                 logger.info(f"Returned {len(materials)} cached text search results for: {query}")
                 return materials
             
@@ -294,17 +291,16 @@ class RedisMaterialsRepository(IMaterialsRepository):
             created_count = 0
             failed_count = 0
             
-            # Process in batches
+            # Process in batches: one pipelined MSET+EXPIRE round-trip per batch
             for i in range(0, total_materials, batch_size):
                 batch = materials[i:i + batch_size]
                 
-                for material in batch:
-                    try:
-                        await self.create(material)
-                        created_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to create material in batch: {e}")
-                        failed_count += 1
+                try:
+                    await self._cache_materials([self._build_material(material) for material in batch])
+                    created_count += len(batch)
+                except Exception as e:
+                    logger.error(f"Failed to create material batch: {e}")
+                    failed_count += len(batch)
             
             result = {
                 "total_processed": total_materials,
@@ -336,17 +332,16 @@ class RedisMaterialsRepository(IMaterialsRepository):
             upserted_count = 0
             failed_count = 0
             
-            # Process in batches
+            # Process in batches: one pipelined MSET+EXPIRE round-trip per batch
             for i in range(0, total_materials, batch_size):
                 batch = materials[i:i + batch_size]
                 
-                for material in batch:
-                    try:
-                        await self.upsert(material)
-                        upserted_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to upsert material in batch: {e}")
-                        failed_count += 1
+                try:
+                    await self._cache_materials([self._build_material(material) for material in batch])
+                    upserted_count += len(batch)
+                except Exception as e:
+                    logger.error(f"Failed to upsert material batch: {e}")
+                    failed_count += len(batch)
             
             result = {
                 "total_processed": total_materials,
@@ -367,6 +362,10 @@ class RedisMaterialsRepository(IMaterialsRepository):
                                   material_ids: List[str], ttl: int = None) -> bool:
         """Cache search results for future use.
         
+        Под ключом поиска хранятся только ID: материалы читаются при попадании
+        (GET + MGET одним Lua скриптом), поэтому измененные и удаленные материалы
+        сразу видны в результатах поиска.
+        
         Args:
             query: Search query
             search_type: Type of search ('semantic' or 'text')
@@ -377,13 +376,15 @@ class RedisMaterialsRepository(IMaterialsRepository):
             True if cached successfully
         """
         try:
-            search_key = f"{self.search_prefix}{search_type}:{hash(query)}"
+            search_key = self._search_key(search_type, query)
             ttl = ttl or self.default_ttl
             
+            # JSON без сериализации адаптера: список ID читает Lua скрипт
             await self.cache_db.set(
                 key=search_key,
                 value=json.dumps(material_ids),
-                ttl=ttl
+                ttl=ttl,
+                serialize=False
             )
             
             logger.info(f"Cached {search_type} search results for query: {query}")
@@ -416,4 +417,50 @@ class RedisMaterialsRepository(IMaterialsRepository):
             
         except Exception as e:
             logger.error(f"Failed to clear cache: {e}")
-            return 0 
\ No newline at end of file
+            return 0 
+    
+    def _build_material(self, material: MaterialCreate) -> Material:
+        """Build cached Material with a process-stable ID."""
+        material_id = f"{material.name}_{self._digest(material.description or '')[:16]}"
+        return Material(id=material_id, **material.model_dump())
+    
+    async def _cache_materials(self, materials: List[Material]) -> None:
+        """Cache materials with one pipelined MSET+EXPIRE."""
+        await self.cache_db.mset(
+            {self._material_key(material.id): material.model_dump_json() for material in materials},
+            ttl=self.default_ttl
+        )
+    
+    async def _get_cached_search_results(
+        self, search_type: str, query: str, limit: int
+    ) -> Optional[List[Material]]:
+        """Resolve cached search results: IDs and materials in one round-trip (GET + MGET in Lua).
+        
+        Returns:
+            Materials or None if there are no cached results for the query
+        """
+        cached_values = await self.cache_db.get_referenced(
+            self._search_key(search_type, query), self.key_prefix, limit
+        )
+        if cached_values is None:
+            return None
+        
+        # Удаленные и истекшие материалы пропускаются
+        return [Material(**json.loads(cached_data)) for cached_data in cached_values if cached_data]
+    
+    def _material_key(self, material_id: str) -> str:
+        """Build cache key for material."""
+        return f"{self.key_prefix}{material_id}"
+    
+    def _search_key(self, search_type: str, query: str) -> str:
+        """Build cache key for search results.
+        
+        Uses a stable digest instead of built-in hash(), which is randomized
+        per process, so results are shared between workers and restarts.
+        """
+        return f"{self.search_prefix}{search_type}:{self._digest(query)}"
+    
+    @staticmethod
+    def _digest(value: str) -> str:
+        """Stable hex digest of a string."""
+        return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
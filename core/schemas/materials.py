@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Literal
 from pydantic import BaseModel, Field, ConfigDict, field_serializer
 from datetime import datetime, date
 from decimal import Decimal
@@ -326,6 +326,10 @@ class PaginationOptions(BaseModel):
         }
     )
 
+# Поля фасетов: счетчики значений по результату поиска
+FacetField = Literal["use_category", "unit", "normalized_color", "supplier_id"]
+
+
 class AdvancedSearchQuery(BaseModel):
     """Advanced search query with comprehensive filtering and sorting.
     
@@ -371,11 +375,29 @@ class AdvancedSearchQuery(BaseModel):
         description="Fuzzy search similarity threshold"
     )
     
+    # Quantized vector search (Qdrant int8/binary collection profiles)
+    oversampling: Optional[float] = Field(
+        default=None,
+        ge=1.0,
+        le=16.0,
+        description="Quantized candidates fetched per result before rescoring (default: collection profile)"
+    )
+    
+    rescore: Optional[bool] = Field(
+        default=None,
+        description="Re-score quantized candidates with original vectors (default: collection profile)"
+    )
+    
     include_suggestions: bool = Field(
         default=False,
         description="Include search suggestions in response"
     )
     
+    facets: Optional[List[FacetField]] = Field(
+        default=None,
+        description="Facet fields to count over the result set (before pagination)"
+    )
+    
     highlight_matches: bool = Field(
         default=False,
         description="Highlight matching text in results"
@@ -506,6 +528,10 @@ class SearchResponse(BaseModel):
         None,
         description="Cursor for next page (cursor-based pagination)"
     )
+    facets: Optional[Dict[str, Dict[str, int]]] = Field(
+        None,
+        description="Value counts per requested facet field over the result set"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -426,6 +426,13 @@ class PipelineConfiguration(BaseModel):
     enable_caching: bool = Field(True, description="Enable result caching")
     cache_ttl: int = Field(3600, description="Cache TTL in seconds")
     
+    # Staged batch processing settings
+    stage_queue_size: int = Field(100, ge=1, description="Capacity of the queue between batch pipeline stages")
+    embedding_batch_size: int = Field(64, ge=1, description="Materials per embedding API request")
+    sku_search_batch_size: int = Field(64, ge=1, description="Materials per batched SKU vector search")
+    database_save_batch_size: int = Field(100, ge=1, description="Materials per bulk reference upsert")
+    batch_wait_time: float = Field(0.05, ge=0, description="Seconds a stage waits to fill a micro-batch")
+    
     # Logging settings
     detailed_logging: bool = Field(True, description="Enable detailed logging")
     log_performance_metrics: bool = Field(True, description="Log performance metrics")
@@ -591,6 +598,7 @@ class CombinedEmbeddingConfig(BaseModel):
     cache_enabled: bool = True
     cache_ttl_seconds: int = 86400  # 24 hours
     max_cache_size: int = 1000
+    max_cache_bytes: int = 64 * 1024 * 1024  # float32 vectors, ~6 KB each
     batch_size: int = 10
     text_format: str = "{name} {normalized_unit} {normalized_color}"
     embedding_model: str = "text-embedding-3-small"
@@ -689,5 +697,7 @@ class SKUSearchConfig(BaseModel):
     strict_unit_matching: bool = Field(True, description="Require exact unit match")
     flexible_color_matching: bool = Field(True, description="Allow None color to match any color")
     reference_collection: str = Field("materials", description="Reference materials collection name")
+    batch_size: int = Field(64, ge=1, description="Queries per vector search_batch call")
     cache_enabled: bool = Field(True, description="Enable search result caching")
-    cache_ttl: int = Field(3600, description="Cache TTL in seconds") 
\ No newline at end of file
+    cache_ttl: int = Field(3600, description="Cache TTL in seconds") 
+    max_cache_entries: int = Field(1000, ge=1, description="Maximum cached search results")
\ No newline at end of file
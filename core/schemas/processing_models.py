@@ -206,6 +206,7 @@ class ProcessingJobConfig(BaseModel):
     max_materials_per_request: int = Field(10000, description="Максимум материалов в запросе")
     batch_processing_size: int = Field(50, description="Размер одного batch для обработки")
     max_concurrent_batches: int = Field(5, description="Максимум параллельных batch'ей")
+    max_concurrent_materials: int = Field(5, description="Параллельных AI парсингов материалов внутри запроса")
     request_timeout: int = Field(30, description="Timeout для API response (секунды)")
     processing_timeout: int = Field(3600, description="Timeout для background processing (секунды)")
     similarity_threshold: float = Field(0.70, description="Порог сходства для поиска SKU")
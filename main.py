@@ -80,6 +80,54 @@ async def startup_event():
     metrics = get_metrics_collector()
     metrics.increment_counter("app_starts")
     
+    # Measure event loop lag
+    from core.monitoring.loop_lag import get_loop_lag_monitor
+
+    await get_loop_lag_monitor().start()
+    
+    # Batch writer of the sampled request log
+    from core.logging.specialized.http.sampled_request_logger import get_sampled_request_logger
+
+    await get_sampled_request_logger().start()
+    
+    # Start task manager and in-process job worker
+    try:
+        from core.background.task_manager import initialize_task_manager
+
+        await initialize_task_manager()
+    except Exception as e:
+        logger.error(f"Error starting task manager: {e}")
+    
+    # Build fuzzy search index in background
+    if settings.FUZZY_INDEX_ENABLED:
+        from services.fuzzy_index import start_fuzzy_index
+
+        await start_fuzzy_index(settings.FUZZY_INDEX_REBUILD_INTERVAL)
+    
+    # Build facet counts in background
+    if settings.FACET_INDEX_ENABLED:
+        from services.facet_index import start_facet_index
+
+        await start_facet_index(settings.FACET_INDEX_REBUILD_INTERVAL)
+    
+    # Create and verify payload indexes for filtered searches
+    if settings.ENSURE_PAYLOAD_INDEXES:
+        try:
+            from services.materials import ensure_material_payload_indexes
+
+            await ensure_material_payload_indexes()
+        except Exception as e:
+            logger.error(f"Error ensuring payload indexes: {e}")
+    
+    # Reconcile batch progress counters with processing records
+    try:
+        from core.background.progress_counters import get_progress_counters
+        from core.database.factories import get_fallback_manager
+
+        await get_progress_counters().start(settings.PROGRESS_RECONCILE_INTERVAL, get_fallback_manager)
+    except Exception as e:
+        logger.error(f"Error starting progress counters reconciliation: {e}")
+    
     # Initialize SSH tunnel
     if settings.ENABLE_SSH_TUNNEL:
         try:
@@ -99,6 +147,51 @@ async def shutdown_event():
     """Actions on application shutdown."""
     logger.info("🛑 Shutting down RAG Construction Materials API")
     
+    # Stop loop lag monitor and CPU process pool
+    from core.background.process_pool import shutdown_cpu_executor
+    from core.monitoring.loop_lag import get_loop_lag_monitor
+
+    await get_loop_lag_monitor().stop()
+    shutdown_cpu_executor()
+    
+    # Stop local embedding worker (AI_PROVIDER=huggingface)
+    from core.background.embedding_worker import shutdown_local_embedding_worker
+
+    await shutdown_local_embedding_worker()
+    
+    # Stop fuzzy index rebuilds
+    from services.fuzzy_index import stop_fuzzy_index
+
+    await stop_fuzzy_index()
+    
+    # Stop facet index rebuilds
+    from services.facet_index import stop_facet_index
+
+    await stop_facet_index()
+    
+    # Stop progress counters reconciliation
+    from core.background.progress_counters import get_progress_counters
+
+    await get_progress_counters().close()
+    
+    # Close the shared result feed of the NDJSON streams
+    from core.background.progress import get_result_feed
+
+    await get_result_feed().close()
+    
+    # Flush the sampled request log
+    from core.logging.specialized.http.sampled_request_logger import get_sampled_request_logger
+
+    await get_sampled_request_logger().stop()
+    
+    # Stop job worker: unfinished jobs are returned to the queue
+    try:
+        from core.background.task_manager import shutdown_task_manager
+
+        await shutdown_task_manager()
+    except Exception as e:
+        logger.error(f"Error stopping task manager: {e}")
+    
     # Stop SSH tunnel
     if settings.ENABLE_SSH_TUNNEL:
         try:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+"""
+Перевод существующих коллекций Qdrant на профиль хранения (float32 / int8 / binary)
+
+Точки и индексы payload копируются в новую коллекцию с квантизацией, оригинальными
+векторами на диске и параметрами HNSW профиля; прежнее имя переключается на нее через alias.
+
+    python scripts/migrate_collection_profile.py materials --profile int8
+    python scripts/migrate_collection_profile.py materials supplier_42_prices --profile binary --batch-size 512
+    python scripts/migrate_collection_profile.py materials --profile int8 --dry-run
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from core.database.collection_profiles import COLLECTION_PROFILES, get_collection_profile
+from core.database.factories import DatabaseFactory
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:,.0f} MB"
+
+
+async def migrate(collections, profile_name: str, batch_size: int, dry_run: bool) -> int:
+    """Мигрировать коллекции; возвращает код выхода"""
+
+    print(f"🔄 МИГРАЦИЯ КОЛЛЕКЦИЙ НА ПРОФИЛЬ '{profile_name}'")
+    print("=" * 60)
+
+    vector_db = DatabaseFactory.create_vector_database()
+    if not hasattr(vector_db, "migrate_collection_profile"):
+        print(f"❌ Профили коллекций поддерживаются только Qdrant (адаптер: {type(vector_db).__name__})")
+        return 1
+
+    profile = vector_db.resolve_collection_profile(profile_name)
+    failed = 0
+    for name in collections:
+        if not await vector_db.collection_exists(name):
+            print(f"❌ {name}: коллекция не найдена")
+            failed += 1
+            continue
+
+        points = await vector_db.count(name)
+        before = get_collection_profile("float32").estimate_memory(points, vector_db.vector_size)
+        after = profile.estimate_memory(points, vector_db.vector_size)
+        print(f"📋 {name}: {points} точек, RAM ~{_mb(before['ram_bytes'])} -> ~{_mb(after['ram_bytes'])} "
+              f"(на диске {_mb(after['disk_bytes'])})")
+        if dry_run:
+            continue
+
+        start = time.time()
+        try:
+            summary = await vector_db.migrate_collection_profile(name, profile, batch_size=batch_size)
+        except Exception as e:
+            print(f"❌ {name}: ошибка миграции: {e}")
+            failed += 1
+            continue
+        unverified = [field for field, ok in summary["payload_indexes"].items() if not ok]
+        print(f"✅ {name} -> {summary['target']}: {summary['points']} точек за {time.time() - start:.1f} с")
+        if unverified:
+            print(f"⚠️  {name}: индексы payload не подтверждены: {', '.join(unverified)}")
+
+    if hasattr(vector_db, "close"):
+        await vector_db.close()
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-create Qdrant collections under a storage profile")
+    parser.add_argument("collections", nargs="+", help="Collection names")
+    parser.add_argument("--profile", required=True, choices=list(COLLECTION_PROFILES), help="Target profile")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per scroll/upsert request")
+    parser.add_argument("--dry-run", action="store_true", help="Only print point counts and memory estimates")
+    args = parser.parse_args()
+    return asyncio.run(migrate(args.collections, args.profile, args.batch_size, args.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
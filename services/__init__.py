@@ -3,19 +3,36 @@
 Модуль сервисов для RAG Construction Materials API.
 """
 
-from .embedding_comparison import EmbeddingComparisonService
-from .collection_initializer import CollectionInitializerService
-from .enhanced_parser_integration import EnhancedParserIntegrationService
-from .material_processing_pipeline import MaterialProcessingPipeline
+from importlib import import_module
+from typing import Any
 
-# Combined embedding service (STAGE 5)
-from .combined_embedding_service import CombinedEmbeddingService, get_combined_embedding_service
+# Сервисы загружаются лениво (PEP 562): импорт пакета services не тянет
+# openai, qdrant-client и парсеры, пока соответствующий сервис не нужен
+_LAZY_EXPORTS = {
+    "EmbeddingComparisonService": "embedding_comparison",
+    "CollectionInitializerService": "collection_initializer",
+    "EnhancedParserIntegrationService": "enhanced_parser_integration",
+    "MaterialProcessingPipeline": "material_processing_pipeline",
+    # Combined embedding service (STAGE 5)
+    "CombinedEmbeddingService": "combined_embedding_service",
+    "get_combined_embedding_service": "combined_embedding_service",
+    # SKU search service (STAGE 6)
+    "SKUSearchService": "sku_search_service",
+    "get_sku_search_service": "sku_search_service",
+    # Batch processing service
+    "BatchProcessingService": "batch_processing_service",
+    "get_batch_processing_service": "batch_processing_service",
+}
 
-# SKU search service (STAGE 6)  
-from .sku_search_service import SKUSearchService, get_sku_search_service
 
-# Batch processing service
-from .batch_processing_service import BatchProcessingService, get_batch_processing_service
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "MaterialsService",
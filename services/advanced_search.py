@@ -18,17 +18,22 @@ from base64 import b64encode
 from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from difflib import SequenceMatcher
 from core.logging import get_logger
 
 from core.schemas.materials import (
-    AdvancedSearchQuery, MaterialFilterOptions, SortOption, PaginationOptions,
+    Material, AdvancedSearchQuery, MaterialFilterOptions, SortOption, PaginationOptions,
     SearchResponse, MaterialSearchResult, SearchSuggestion, SearchHighlight,
     SearchAnalytics
 )
 from core.repositories.cached_materials import CachedMaterialsRepository
 from core.database.adapters.redis_adapter import RedisDatabase
 from core.database.exceptions import DatabaseError, ValidationError
+from core.background.cpu_tasks import (
+    jaro_winkler_similarity, levenshtein_distance, levenshtein_similarity, sequence_matcher_similarity
+)
+from services.fuzzy_index import get_fuzzy_index
+from services.facet_index import get_facet_index
+from services.materials import MaterialsService, compile_material_filters
 
 logger = get_logger(__name__)
 
@@ -43,11 +48,14 @@ class AdvancedSearchService:
         self,
         materials_repo: CachedMaterialsRepository,
         redis_db: RedisDatabase,
-        analytics_enabled: bool = True
+        analytics_enabled: bool = True,
+        materials_service: Optional[MaterialsService] = None
     ):
         self.materials_repo = materials_repo
         self.redis_db = redis_db
         self.analytics_enabled = analytics_enabled
+        # Векторный поиск с фильтрами, выполняемыми в векторной БД (по умолчанию создается при первом поиске)
+        self.materials_service = materials_service
         
         # Search configuration
         self.fuzzy_algorithms = {
@@ -79,17 +87,29 @@ class AdvancedSearchService:
         fallback_manager = get_fallback_manager()
         try:
             # Perform search based on type
-            if query.search_type == "vector":
+            pushed_down = False
+            if query.search_type == "vector" and self._get_materials_service() is not None:
+                # Фильтры и min_similarity - в запросе к векторной БД: один запрос, строк ровно на нужные страницы
+                raw_results = await self.materials_service.search_vector_scored(
+                    query.query, query.pagination.page * query.pagination.page_size, query.filters,
+                    oversampling=query.oversampling, rescore=query.rescore
+                )
+                pushed_down = True
+            elif query.search_type == "vector":
                 raw_results = await fallback_manager.vector_search(query.query, query.pagination.page_size * 5, query.fuzzy_threshold or 0.7)
             elif query.search_type == "sql":
                 raw_results = await fallback_manager.sql_search(query.query, query.pagination.page_size * 5)
             elif query.search_type == "fuzzy":
-                raw_results = await fallback_manager.fuzzy_search(query.query, query.pagination.page_size * 5, query.fuzzy_threshold or 0.8)
+                if get_fuzzy_index().ready:
+                    raw_results = self._indexed_fuzzy_search(query.query, query.pagination.page_size * 5, query.fuzzy_threshold or 0.8)
+                else:
+                    raw_results = await fallback_manager.fuzzy_search(query.query, query.pagination.page_size * 5, query.fuzzy_threshold or 0.8)
             else:  # hybrid
                 raw_results = await fallback_manager.hybrid_search(query.query, query.pagination.page_size * 5, query.fuzzy_threshold or 0.7)
-            # Apply filters, sorting, pagination, highlights, suggestions (без изменений)
-            filtered_results = await self._apply_filters(raw_results, query.filters)
+            # Apply filters, sorting, pagination, highlights, suggestions
+            filtered_results = raw_results if pushed_down else await self._apply_filters(raw_results, query.filters)
             sorted_results = await self._apply_sorting(filtered_results, query.sort_by)
+            facets = self._count_facets(filtered_results, query.facets)
             paginated_results, pagination_info = await self._apply_pagination(sorted_results, query.pagination)
             if query.highlight_matches and query.query:
                 paginated_results = await self._add_highlights(paginated_results, query.query)
@@ -106,7 +126,8 @@ class AdvancedSearchService:
                 search_time_ms=search_time_ms,
                 suggestions=suggestions,
                 filters_applied=self._summarize_filters(query.filters),
-                next_cursor=pagination_info.get('next_cursor')
+                next_cursor=pagination_info.get('next_cursor'),
+                facets=facets
             )
             logger.info(
                 f"Advanced search completed: query='{query.query}', "
@@ -117,8 +138,46 @@ class AdvancedSearchService:
             logger.error(f"All databases unavailable for advanced search: {e.errors}")
             raise
     
+    def _get_materials_service(self) -> Optional[MaterialsService]:
+        """MaterialsService for vector search with pushed-down filters (created on first use)."""
+        if self.materials_service is None:
+            try:
+                self.materials_service = MaterialsService()
+            except DatabaseError as e:
+                logger.warning(f"Vector search service unavailable, using fallback manager: {e}")
+        return self.materials_service
+    
     # Удаляю _vector_search, _sql_search, _fuzzy_search, _hybrid_search — теперь только через fallback manager
     
+    def _indexed_fuzzy_search(self, query: str, limit: int, threshold: float) -> List[Dict[str, Any]]:
+        """Fuzzy search over the in-memory trigram index (без обращения к БД)."""
+        results = []
+        for match in get_fuzzy_index().search(query, limit=limit, threshold=threshold):
+            payload = match.payload
+            try:
+                material = Material(
+                    id=match.id,
+                    **{field: value for field, value in payload.items() if field in Material.model_fields and field != "id"}
+                )
+            except Exception as e:
+                logger.debug(f"Skipping fuzzy index hit {match.id}: {e}")
+                continue
+            results.append({'material': material, 'score': match.score, 'search_type': 'fuzzy'})
+        return results
+    
+    def _count_facets(
+        self,
+        results: List[Dict[str, Any]],
+        fields: Optional[List[str]]
+    ) -> Optional[Dict[str, Dict[str, int]]]:
+        """Facet counts over the result set from the in-memory facet index (None until it is built)."""
+        if not fields:
+            return None
+        facet_index = get_facet_index()
+        if not facet_index.ready:
+            return None
+        return facet_index.count_ids((result['material'].id for result in results), fields)
+    
     def _combine_search_results(
         self,
         vector_results: List[Dict[str, Any]],
@@ -186,55 +245,21 @@ class AdvancedSearchService:
         results: List[Dict[str, Any]],
         filters: Optional[MaterialFilterOptions]
     ) -> List[Dict[str, Any]]:
-        """Apply advanced filters to search results."""
+        """Apply advanced filters to search results.
+        
+        Для источников без фильтрации в БД (SQL, fuzzy, hybrid): те же условия,
+        что компилируются в фильтр векторной БД, проверяются по полям Material.
+        """
         if not filters:
             return results
         
-        filtered_results = []
-        
-        for result in results:
-            material = result['material']
-            
-            # Category filter
-            if filters.categories:
-                if material.use_category not in filters.categories:
-                    continue
-            
-            # Unit filter
-            if filters.units:
-                if material.unit not in filters.units:
-                    continue
-            
-            # SKU pattern filter
-            if filters.sku_pattern and material.sku:
-                if not self._match_pattern(material.sku, filters.sku_pattern):
-                    continue
-            
-            # Date filters
-            if filters.created_after:
-                if material.created_at < filters.created_after:
-                    continue
-            
-            if filters.created_before:
-                if material.created_at > filters.created_before:
-                    continue
-            
-            if filters.updated_after:
-                if material.updated_at < filters.updated_after:
-                    continue
-            
-            if filters.updated_before:
-                if material.updated_at > filters.updated_before:
-                    continue
-            
-            # Similarity threshold filter
-            if filters.min_similarity:
-                if result['score'] < filters.min_similarity:
-                    continue
-            
-            filtered_results.append(result)
-        
-        return filtered_results
+        spec = compile_material_filters(filters)
+        min_similarity = filters.min_similarity
+        return [
+            result for result in results
+            if (not min_similarity or result['score'] >= min_similarity)
+            and (spec is None or spec.matches(vars(result['material'])))
+        ]
     
     async def _apply_sorting(
         self,
@@ -554,60 +579,19 @@ class AdvancedSearchService:
     # Utility methods for fuzzy search
     def _levenshtein_similarity(self, s1: str, s2: str) -> float:
         """Calculate Levenshtein similarity."""
-        if not s1 or not s2:
-            return 0.0
-        
-        max_len = max(len(s1), len(s2))
-        if max_len == 0:
-            return 1.0
-        
-        distance = self._levenshtein_distance(s1, s2)
-        return 1.0 - (distance / max_len)
+        return levenshtein_similarity(s1, s2)
     
     def _levenshtein_distance(self, s1: str, s2: str) -> int:
         """Calculate Levenshtein distance."""
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-        
-        if len(s2) == 0:
-            return len(s1)
-        
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        
-        return previous_row[-1]
+        return levenshtein_distance(s1, s2)
     
     def _jaro_winkler_similarity(self, s1: str, s2: str) -> float:
         """Calculate Jaro-Winkler similarity."""
-        # Simplified implementation
-        if not s1 or not s2:
-            return 0.0
-        
-        if s1 == s2:
-            return 1.0
-        
-        # Use SequenceMatcher as approximation
-        return SequenceMatcher(None, s1, s2).ratio()
+        return jaro_winkler_similarity(s1, s2)
     
     def _sequence_matcher_similarity(self, s1: str, s2: str) -> float:
         """Calculate similarity using SequenceMatcher."""
-        if not s1 or not s2:
-            return 0.0
-        
-        return SequenceMatcher(None, s1, s2).ratio()
-    
-    def _match_pattern(self, text: str, pattern: str) -> bool:
-        """Match text against pattern with wildcards."""
-        # Convert shell-style wildcards to regex
-        regex_pattern = pattern.replace('*', '.*').replace('?', '.')
-        return bool(re.match(f"^{regex_pattern}$", text, re.IGNORECASE))
+        return sequence_matcher_similarity(s1, s2)
     
     async def _validate_search_query(self, query: AdvancedSearchQuery):
         """Validate search query parameters."""
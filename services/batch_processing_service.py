@@ -21,16 +21,19 @@ from core.schemas.pipeline_models import MaterialProcessRequest, ProcessingResul
 from core.database.repositories.processing_repository import ProcessingRepository
 from core.logging import get_logger
 from core.config.base import get_settings
+from core.background.job_queue import register_job_handler
 
 # Импорт всех компонентов pipeline (этапы 1-7)
 from services.material_processing_pipeline import MaterialProcessingPipeline
-from services.combined_embedding_service import CombinedEmbeddingService
-from services.sku_search_service import SKUSearchService
 from services.materials import MaterialsService
 from core.database.factories import get_fallback_manager, AllDatabasesUnavailableError
+from core.background.progress import get_result_feed
+from core.background.progress_counters import counts_from_statistics, get_progress_counters
 
 logger = get_logger(__name__)
 
+BATCH_PROCESSING_JOB = "batch_processing"
+
 
 class BatchProcessingService:
     """
@@ -44,8 +47,6 @@ class BatchProcessingService:
         
         # Компоненты pipeline
         self.pipeline = MaterialProcessingPipeline()
-        self.combined_embedding_service = CombinedEmbeddingService()
-        self.sku_search_service = SKUSearchService()
         self.materials_service = MaterialsService()
         
         # Активные задачи
@@ -92,18 +93,15 @@ class BatchProcessingService:
                 )
                 return False
             
+            # Лента результатов открывается сразу: стрим, открытый после запуска, ждет строки
+            await self.start_result_feed(request_id)
+            
             # Создаем задачу для background processing
-            task = asyncio.create_task(
-                self._process_materials_batch(request_id, materials)
-            )
+            task = asyncio.create_task(self._run_job(request_id, materials))
             
             # Добавляем в активные задачи
             self.active_jobs[request_id] = task
             
-            # Обновляем статистику
-            self.stats['total_jobs'] += 1
-            self.stats['active_jobs'] += 1
-            
             self.logger.info(f"Started batch processing job for request {request_id} with {len(materials)} materials")
             return True
             
@@ -111,6 +109,21 @@ class BatchProcessingService:
             self.logger.error(f"Error starting processing job: {str(e)}")
             return False
     
+    async def _run_job(self, request_id: str, materials: List[MaterialInput]) -> None:
+        """
+        Выполнить задачу с учетом в статистике сервиса.
+        
+        Общая точка входа для фоновых задач (start_processing_job) и задач
+        очереди (run_batch_processing_job): total_jobs/active_jobs считаются здесь.
+        """
+        self.stats['total_jobs'] += 1
+        self.stats['active_jobs'] += 1
+        try:
+            await self._process_materials_batch(request_id, materials)
+        finally:
+            self.active_jobs.pop(request_id, None)
+            self.stats['active_jobs'] -= 1
+    
     async def _process_materials_batch(
         self, 
         request_id: str, 
@@ -119,6 +132,10 @@ class BatchProcessingService:
         """
         Основная логика batch обработки материалов.
         
+        Повторный запуск для того же request_id (retry задачи или рестарт
+        воркера) продолжает обработку: записи не создаются заново, обрабатываются
+        материалы в статусах pending и processing.
+        
         Args:
             request_id: Идентификатор запроса
             materials: Список материалов для обработки
@@ -130,7 +147,10 @@ class BatchProcessingService:
             
             # 1. Инициализация - создание записей в БД
             self.logger.info(f"Step 1: Initializing processing records for request {request_id}")
-            await self._initialize_processing_records(request_id, materials)
+            if await self._has_processing_records(request_id):
+                self.logger.info(f"Resuming request {request_id} with existing processing records")
+            else:
+                await self._initialize_processing_records(request_id, materials)
             
             # 2. Batch обработка по частям
             self.logger.info(f"Step 2: Starting batch processing for request {request_id}")
@@ -140,16 +160,24 @@ class BatchProcessingService:
             self.logger.info(f"Step 3: Finalizing processing for request {request_id}")
             await self._finalize_processing(request_id, start_time)
             
+        except AllDatabasesUnavailableError as e:
+            # Временная недоступность БД: задача очереди будет повторена
+            self.logger.error(f"Databases unavailable for request {request_id}: {str(e)}")
+            raise
+            
         except Exception as e:
             self.logger.error(f"Error in batch processing for request {request_id}: {str(e)}")
             await self._mark_job_failed(request_id, str(e))
         
         finally:
-            # Очищаем активные задачи
-            if request_id in self.active_jobs:
-                del self.active_jobs[request_id]
-            
-            self.stats['active_jobs'] -= 1
+            try:
+                await get_result_feed().finish(request_id)
+            except Exception as e:
+                self.logger.warning(f"Result feed not finished for request {request_id}: {e}")
+            try:
+                await get_progress_counters().finish(request_id)
+            except Exception as e:
+                self.logger.warning(f"Progress counters not finished for request {request_id}: {e}")
     
     async def _initialize_processing_records(
         self, 
@@ -172,48 +200,97 @@ class BatchProcessingService:
             ]
             record_ids = await fallback_manager.create_processing_records(request_id, material_dicts)
             self.logger.info(f"Created {len(record_ids)} processing records for request {request_id}")
+            try:
+                await get_progress_counters().init_request(request_id, record_ids)
+            except Exception as e:
+                self.logger.warning(f"Progress counters not initialized for request {request_id}: {e}")
         except Exception as e:
             self.logger.error(f"Error initializing processing records: {str(e)}")
             raise
 
+    async def _has_processing_records(self, request_id: str) -> bool:
+        """Проверить, созданы ли уже записи обработки для запроса."""
+        progress = await self.get_processing_progress(request_id)
+        return bool(progress and progress.get('total'))
+
     async def _process_in_batches(self, request_id: str) -> None:
         """
-        Обработать материалы по batch'ам через fallback manager.
+        Обработать материалы через поэтапный pipeline (записи - через fallback manager).
         """
         try:
             self.logger.info(f"Starting batch processing for request {request_id}")
             fallback_manager = get_fallback_manager()
-            batch_size = self.config.batch_processing_size
             
             # Получаем все записи для данного request_id
             all_records = await fallback_manager.get_processing_results(request_id)
             self.logger.info(f"Retrieved {len(all_records)} total records for request {request_id}")
             
+            # 'processing' - материалы, прерванные предыдущей попыткой
             pending_materials = [
                 record for record in all_records 
-                if record.get('status') == 'pending'
+                if record.get('status') in ('pending', 'processing')
             ]
             
             self.logger.info(f"Found {len(pending_materials)} pending materials for request {request_id}")
             
+            # Лента результатов для NDJSON (обычно уже открыта при постановке задачи);
+            # счетчики прогресса (SSE) - только если их нет, например после
+            # перезапуска процесса со счетчиками в памяти
+            await self.start_result_feed(request_id)
+            try:
+                counters = get_progress_counters()
+                if await counters.get_counts(request_id) is None:
+                    await counters.repair_request(request_id, all_records)
+            except Exception as e:
+                self.logger.warning(f"Progress counters not restored for request {request_id}: {e}")
+            
             if not pending_materials:
                 self.logger.warning(f"No pending materials found for request {request_id}")
                 return
             
-            # Обрабатываем материалы по batch'ам
-            for i in range(0, len(pending_materials), batch_size):
-                batch = pending_materials[i:i + batch_size]
-                self.logger.info(f"Processing batch {i//batch_size + 1} with {len(batch)} materials")
-                
-                # Обрабатываем каждый материал в batch
-                for material_record in batch:
-                    self.logger.info(f"Processing material {material_record.get('material_id')} from record")
-                    await self._process_single_material_from_record(request_id, material_record)
+            # Материалы идут через поэтапный pipeline; последний этап сохраняет
+            # результаты каждого micro-batch одним массовым обновлением
+            await self._update_materials_status(
+                request_id,
+                [record.get('material_id') for record in pending_materials],
+                ProcessingStatus.PROCESSING
+            )
+            
+            pipeline_requests = [self._build_pipeline_request(record) for record in pending_materials]
+            async for processing_result in self.pipeline.stream_batch_materials(
+                pipeline_requests,
+                max_workers=self.config.max_concurrent_materials,
+                on_results=lambda results: self._store_results(request_id, results)
+            ):
+                self.logger.info(
+                    f"Pipeline completed for material {processing_result.request_id}, "
+                    f"success: {processing_result.overall_success}"
+                )
+            
+            self.logger.info(f"Pipeline stage statistics for request {request_id}: {self.pipeline.stage_statistics}")
                 
         except Exception as e:
             self.logger.error(f"Error in batch processing: {str(e)}")
             raise
     
+    def _build_pipeline_request(self, material_record: dict) -> MaterialProcessRequest:
+        """
+        Создать запрос pipeline из записи материала в БД.
+        
+        Args:
+            material_record: Запись материала из БД
+        """
+        return MaterialProcessRequest(
+            id=material_record.get('material_id'),
+            name=material_record.get('original_name', 'Unknown Material'),
+            unit=material_record.get('original_unit', 'шт'),
+            price=0.0,  # Добавляем обязательное поле price
+            enable_color_extraction=True,
+            enable_unit_normalization=True,
+            enable_sku_search=True,
+            parsing_method="ai_gpt"  # Исправлено!
+        )
+    
     async def _process_single_material_from_record(self, request_id: str, material_record: dict) -> None:
         """
         Обработать один материал из записи в БД.
@@ -224,39 +301,24 @@ class BatchProcessingService:
         """
         material_id = material_record.get('material_id')
         self.logger.info(f"Starting processing for material {material_id}")
-        self.logger.debug(f"Material record for processing: {material_record}")
         try:
             # Обновляем статус на "processing"
-            self.logger.info(f"Updating status to PROCESSING for material {material_id}")
             await self._update_material_status(
                 material_id, 
-                ProcessingStatus.PROCESSING
-            )
-            
-            # Создаем запрос для pipeline
-            pipeline_request = MaterialProcessRequest(
-                id=material_id,
-                name=material_record.get('original_name', 'Unknown Material'),
-                unit=material_record.get('original_unit', 'шт'),
-                price=0.0,  # Добавляем обязательное поле price
-                enable_color_extraction=True,
-                enable_unit_normalization=True,
-                enable_sku_search=True,
-                parsing_method="ai_gpt"  # Исправлено!
+                ProcessingStatus.PROCESSING,
+                request_id=request_id
             )
-            self.logger.info(f"Created pipeline request for material {material_id}: {pipeline_request.name}")
-            self.logger.debug(f"Pipeline request: {pipeline_request.dict()}")
             
             # Проходим через полный pipeline
-            self.logger.info(f"Starting pipeline processing for material {material_id}")
-            processing_result = await self.pipeline.process_material(pipeline_request)
+            processing_result = await self.pipeline.process_material(self._build_pipeline_request(material_record))
             self.logger.info(f"Pipeline completed for material {material_id}, success: {processing_result.overall_success}")
             
             # Обрабатываем результат
             await self._handle_processing_result(
                 material_id, 
                 material_id, 
-                processing_result
+                processing_result,
+                request_id=request_id
             )
             
         except Exception as e:
@@ -265,14 +327,16 @@ class BatchProcessingService:
             await self._handle_processing_error(
                 material_id, 
                 material_id, 
-                str(e)
+                str(e),
+                request_id=request_id
             )
     
     async def _handle_processing_result(
         self, 
         record_id: str, 
         material_id: str, 
-        result: ProcessingResult
+        result: ProcessingResult,
+        request_id: Optional[str] = None
     ) -> None:
         """
         Обработать результат pipeline обработки.
@@ -281,24 +345,23 @@ class BatchProcessingService:
             record_id: ID записи в БД
             material_id: ID материала
             result: Результат обработки
+            request_id: Идентификатор запроса
         """
         try:
             if result.overall_success:
-                # Ищем SKU для материала
-                sku = await self._find_material_sku(result)
-                
-                # Обновляем статус на "completed"
+                # SKU уже найден этапом SKU search pipeline
                 await self._update_material_status(
                     record_id,
                     ProcessingStatus.COMPLETED,
-                    sku=sku,
-                    similarity_score=getattr(result, 'similarity_score', None),
-                    normalized_color=getattr(result, 'normalized_color', None),
-                    normalized_unit=getattr(result, 'normalized_unit', None),
-                    unit_coefficient=getattr(result, 'unit_coefficient', None)
+                    request_id=request_id,
+                    sku=result.sku,
+                    similarity_score=result.sku_search.similarity_score,
+                    normalized_color=result.rag_normalization.normalized_color,
+                    normalized_unit=result.rag_normalization.normalized_unit,
+                    unit_coefficient=result.ai_parsing.unit_coefficient
                 )
                 
-                self.logger.debug(f"Successfully processed material {material_id} with SKU: {sku}")
+                self.logger.debug(f"Successfully processed material {material_id} with SKU: {result.sku}")
                 
             else:
                 # Обработка неуспешна
@@ -306,54 +369,66 @@ class BatchProcessingService:
                 await self._update_material_status(
                     record_id,
                     ProcessingStatus.FAILED,
+                    request_id=request_id,
                     error_message=error_msg
                 )
                 
                 self.logger.warning(f"Processing failed for material {material_id}: {error_msg}")
                 
         except Exception as e:
-            await self._handle_processing_error(record_id, material_id, str(e))
+            await self._handle_processing_error(record_id, material_id, str(e), request_id=request_id)
     
-    async def _find_material_sku(self, result: ProcessingResult) -> Optional[str]:
+    async def _store_results(self, request_id: str, results: List[ProcessingResult]) -> None:
         """
-        Найти SKU для материала через SKU search service.
+        Сохранить результаты micro-batch pipeline одним массовым обновлением.
         
         Args:
-            result: Результат pipeline обработки
-            
-        Returns:
-            SKU или None если не найден
+            request_id: Идентификатор запроса
+            results: Результаты обработки (request_id результата - ID материала)
         """
-        try:
-            # Генерируем комбинированный embedding
-            embedding_result = await self.combined_embedding_service.generate_material_embedding(
-                name=result.name,
-                normalized_unit=getattr(result, 'normalized_unit', ''),
-                normalized_color=getattr(result, 'normalized_color', None)
-            )
-            
-            if not embedding_result.success:
-                return None
-            
-            # Ищем SKU через двухэтапный поиск
-            sku_result = await self.sku_search_service.find_sku_by_material_data(
-                material_embedding=embedding_result.embedding,
-                normalized_unit=getattr(result, 'normalized_unit', ''),
-                normalized_color=getattr(result, 'normalized_color', None),
-                similarity_threshold=self.config.similarity_threshold
-            )
-            
-            return sku_result.sku if sku_result and sku_result.sku else None
-            
-        except Exception as e:
-            self.logger.error(f"Error finding material SKU: {str(e)}")
-            return None
+        updates = []
+        for result in results:
+            if result.overall_success:
+                updates.append({
+                    'material_id': result.request_id,
+                    'status': ProcessingStatus.COMPLETED.value,
+                    'error': None,
+                    'sku': result.sku,
+                    'similarity_score': result.sku_search.similarity_score,
+                    'normalized_color': result.rag_normalization.normalized_color,
+                    'normalized_unit': result.rag_normalization.normalized_unit,
+                    'unit_coefficient': result.ai_parsing.unit_coefficient
+                })
+            else:
+                self.logger.warning(f"Processing failed for material {result.request_id}")
+                updates.append({
+                    'material_id': result.request_id,
+                    'status': ProcessingStatus.FAILED.value,
+                    'error': "Pipeline processing failed: overall_success=False"
+                })
+        
+        await get_fallback_manager().update_processing_results(request_id, updates)
+        await self._publish_results(request_id, [
+            {
+                **{key: value for key, value in update.items() if key != 'error'},
+                'error_message': update['error']
+            }
+            for update in updates
+        ])
+        counters = get_progress_counters()
+        for update in updates:
+            try:
+                await counters.transition(request_id, update['material_id'], update['status'])
+            except Exception as e:
+                # Расхождение исправит периодический reconcile
+                self.logger.warning(f"Progress counters not updated for {update['material_id']}: {e}")
     
     async def _handle_processing_error(
         self, 
         record_id: str, 
         material_id: str, 
-        error_message: str
+        error_message: str,
+        request_id: Optional[str] = None
     ) -> None:
         """
         Обработать ошибку при обработке материала.
@@ -362,6 +437,7 @@ class BatchProcessingService:
             record_id: ID записи в БД
             material_id: ID материала
             error_message: Сообщение об ошибке
+            request_id: Идентификатор запроса
         """
         try:
             self.logger.error(f"_handle_processing_error called for material {material_id} with error: {error_message}")
@@ -369,6 +445,7 @@ class BatchProcessingService:
             await self._update_material_status(
                 record_id,
                 ProcessingStatus.FAILED,
+                request_id=request_id,
                 error_message=error_message
             )
             
@@ -381,10 +458,13 @@ class BatchProcessingService:
         self, 
         record_id: str, 
         status: ProcessingStatus, 
+        request_id: Optional[str] = None,
         **kwargs
     ) -> None:
         """
         Обновить статус материала в БД через fallback manager.
+        
+        Если известен request_id, изменение применяется и к счетчикам прогресса.
         """
         try:
             self.logger.info(f"_update_material_status called for {record_id} to {status}")
@@ -408,16 +488,69 @@ class BatchProcessingService:
             assert record_id is not None and isinstance(record_id, str), f"material_id (record_id) must be str, got {record_id} ({type(record_id)})"
             self.logger.debug(f"Calling update_processing_status with material_id={record_id} (type={type(record_id)}), status={status}, additional_fields={additional_fields}")
             await fallback_manager.update_processing_status(
-                record_id,  # request_id
+                request_id or record_id,  # request_id
                 record_id,  # material_id
                 status.value,
                 kwargs.get('error_message', None),
                 **additional_fields
             )
+            if request_id:
+                await self._publish_results(request_id, [{
+                    'material_id': record_id,
+                    'status': status.value,
+                    **additional_fields,
+                    'error_message': kwargs.get('error_message')
+                }])
+                try:
+                    await get_progress_counters().transition(request_id, record_id, status.value)
+                except Exception as e:
+                    # Расхождение исправит периодический reconcile
+                    self.logger.warning(f"Progress counters not updated for {record_id}: {e}")
         except Exception as e:
             self.logger.error(f"Error updating material status: {str(e)}")
             raise
     
+    async def _update_materials_status(
+        self,
+        request_id: str,
+        record_ids: List[str],
+        status: ProcessingStatus
+    ) -> None:
+        """
+        Обновить статус нескольких материалов запроса одним массовым обновлением.
+        """
+        if not record_ids:
+            return
+        await get_fallback_manager().update_processing_statuses(request_id, record_ids, status.value)
+        await self._publish_results(request_id, [
+            {'material_id': record_id, 'status': status.value} for record_id in record_ids
+        ])
+        counters = get_progress_counters()
+        for record_id in record_ids:
+            try:
+                await counters.transition(request_id, record_id, status.value)
+            except Exception as e:
+                # Расхождение исправит периодический reconcile
+                self.logger.warning(f"Progress counters not updated for {record_id}: {e}")
+    
+    async def start_result_feed(self, request_id: str) -> None:
+        """
+        Открыть ленту результатов запроса (NDJSON-стрим) при постановке задачи.
+        
+        Ошибка ленты не мешает обработке: стрим тогда отдает сохраненные результаты.
+        """
+        try:
+            await get_result_feed().start(request_id)
+        except Exception as e:
+            self.logger.warning(f"Result feed not started for request {request_id}: {e}")
+    
+    async def _publish_results(self, request_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Добавить строки завершенных материалов в ленту результатов."""
+        try:
+            await get_result_feed().extend(request_id, rows)
+        except Exception as e:
+            self.logger.warning(f"Result feed not updated for request {request_id}: {e}")
+    
     async def _finalize_processing(
         self, 
         request_id: str, 
@@ -428,8 +561,7 @@ class BatchProcessingService:
         """
         try:
             processing_time = (datetime.utcnow() - start_time).total_seconds()
-            fallback_manager = get_fallback_manager()
-            progress = await fallback_manager.get_processing_progress(request_id)
+            progress = await self.get_processing_progress(request_id)
             self.stats['completed_jobs'] += 1
             self.logger.info(
                 f"Completed batch processing for request {request_id}. "
@@ -465,10 +597,26 @@ class BatchProcessingService:
         Raises:
             AllDatabasesUnavailableError: если все БД недоступны
         """
+        # Прогресс берется из инкрементальных счетчиков без пересчета записей
+        counters = get_progress_counters()
+        try:
+            progress = await counters.get_progress(request_id)
+            if progress is not None:
+                return progress
+        except Exception as e:
+            self.logger.warning(f"Progress counters unavailable, counting records: {e}")
+            counters = None
+        
         fallback_manager = get_fallback_manager()
         try:
-            progress = await fallback_manager.get_processing_progress(request_id)
-            return progress
+            if counters is None:
+                return await fallback_manager.get_processing_progress(request_id)
+            # Запрос неизвестен счетчикам (создан до их включения) - пересчитать один раз
+            records = await fallback_manager.get_processing_results(request_id)
+            if not records:
+                return await fallback_manager.get_processing_progress(request_id)
+            await counters.repair_request(request_id, records)
+            return await counters.get_progress(request_id)
         except Exception as e:
             self.logger.error(f"Error getting processing progress: {str(e)}")
             if isinstance(e, AllDatabasesUnavailableError):
@@ -510,10 +658,25 @@ class BatchProcessingService:
         Raises:
             AllDatabasesUnavailableError: если все БД недоступны
         """
+        counters = get_progress_counters()
+        try:
+            statistics = await counters.get_statistics()
+            if statistics is not None:
+                return statistics
+        except Exception as e:
+            self.logger.warning(f"Progress counters unavailable, counting records: {e}")
+        
         fallback_manager = get_fallback_manager()
         try:
             # Предполагается, что sql_client.get_processing_statistics асинхронный
             result = await fallback_manager.get_processing_statistics()
+            # Первый подсчет по записям становится исходным значением счетчиков
+            global_counts = counts_from_statistics(result)
+            if global_counts is not None:
+                try:
+                    await counters.set_global(global_counts)
+                except Exception as e:
+                    self.logger.warning(f"Progress counters not seeded: {e}")
             return result
         except AllDatabasesUnavailableError as e:
             self.logger.error(f"All databases unavailable for service statistics: {e.errors}")
@@ -573,7 +736,14 @@ class BatchProcessingService:
         """
         try:
             fallback_manager = get_fallback_manager()
-            return await fallback_manager.cleanup_old_records(days_old)
+            deleted = await fallback_manager.cleanup_old_records(days_old)
+            if deleted:
+                # Глобальные счетчики пересчитываются по оставшимся записям
+                try:
+                    await get_progress_counters().invalidate_global()
+                except Exception as e:
+                    self.logger.warning(f"Progress counters not invalidated: {e}")
+            return deleted
                 
         except Exception as e:
             self.logger.error(f"Error cleaning up old records: {str(e)}")
@@ -602,6 +772,19 @@ class BatchProcessingService:
         }
 
 
+@register_job_handler(BATCH_PROCESSING_JOB)
+async def run_batch_processing_job(payload: Dict[str, Any]) -> None:
+    """
+    Обработчик задачи очереди batch обработки.
+    
+    Args:
+        payload: {"request_id": ..., "materials": [MaterialInput dict, ...]}
+    """
+    service = get_batch_processing_service()
+    materials = [MaterialInput(**material) for material in payload["materials"]]
+    await service._run_job(payload["request_id"], materials)
+
+
 # Singleton instance
 _batch_processing_service: Optional[BatchProcessingService] = None
 
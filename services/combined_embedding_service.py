@@ -11,22 +11,21 @@ import asyncio
 import hashlib
 import logging
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from functools import lru_cache
 
-import openai
-
+from core.caching.bounded_cache import BoundedTTLCache
 from core.config.base import Settings
 from core.schemas.pipeline_models import (
     CombinedEmbeddingRequest,
     CombinedEmbeddingResult,
     BatchEmbeddingRequest,
     BatchEmbeddingResponse,
-    EmbeddingCacheEntry,
     CombinedEmbeddingConfig
 )
 
+if TYPE_CHECKING:
+    import openai
 
 logger = logging.getLogger(__name__)
 
@@ -43,17 +42,25 @@ class CombinedEmbeddingService:
         """Initialize Combined Embedding Service"""
         self.config = config or CombinedEmbeddingConfig()
         self.ai_settings = Settings()
-        self._client: Optional[openai.AsyncOpenAI] = None
+        self._client: Optional["openai.AsyncOpenAI"] = None
         
-        # In-memory cache for embeddings
-        self.embedding_cache: Dict[str, EmbeddingCacheEntry] = {}
+        # In-memory cache for embeddings (float32 vectors, O(1) LRU eviction)
+        self.embedding_cache = BoundedTTLCache(
+            max_entries=self.config.max_cache_size,
+            max_bytes=self.config.max_cache_bytes,
+            ttl_seconds=self.config.cache_ttl_seconds,
+            name="combined_embeddings"
+        )
         
         logger.info("✅ Combined Embedding Service initialized successfully")
 
     @property
-    def client(self) -> openai.AsyncOpenAI:
+    def client(self) -> "openai.AsyncOpenAI":
         """Get or create OpenAI async client"""
         if self._client is None:
+            # openai импортируется при первом обращении к клиенту, не при старте
+            import openai
+
             self._client = openai.AsyncOpenAI(
                 api_key=self.ai_settings.OPENAI_API_KEY,
                 timeout=self.ai_settings.OPENAI_TIMEOUT,
@@ -98,53 +105,20 @@ class CombinedEmbeddingService:
         if not self.config.cache_enabled:
             return None
         
-        if cache_key not in self.embedding_cache:
-            return None
-        
-        cache_entry = self.embedding_cache[cache_key]
-        
-        # Check expiration (convert seconds to timedelta)
-        if cache_entry.created_at + timedelta(seconds=self.config.cache_ttl_seconds) < datetime.utcnow():
-            del self.embedding_cache[cache_key]
-            return None
-        
-        # Update access statistics
-        cache_entry.access_count += 1
-        cache_entry.last_accessed = datetime.utcnow()
-        
-        return cache_entry.embedding
+        return self.embedding_cache.get_vector(cache_key)
     
     def _cache_embedding(self, cache_key: str, embedding: List[float]) -> None:
         """Cache embedding with LRU eviction"""
         if not self.config.cache_enabled:
             return
         
-        # LRU eviction if cache is full
-        if len(self.embedding_cache) >= self.config.max_cache_size:
-            # Remove oldest entries (by created_at)
-            oldest_keys = sorted(
-                self.embedding_cache.keys(),
-                key=lambda k: self.embedding_cache[k].created_at
-            )[:self.config.max_cache_size // 4]  # Remove 25%
-            
-            for old_key in oldest_keys:
-                del self.embedding_cache[old_key]
-        
-        # Cache new embedding
-        cache_entry = EmbeddingCacheEntry(
-            embedding=embedding,
-            created_at=datetime.utcnow(),
-            access_count=1,
-            last_accessed=datetime.utcnow()
-        )
-        self.embedding_cache[cache_key] = cache_entry
+        self.embedding_cache.put_vector(cache_key, embedding)
         
         logger.debug(f"Cached embedding for {cache_key}, cache size: {len(self.embedding_cache)}")
     
     def _clear_cache_entry(self, cache_key: str) -> None:
         """Remove specific cache entry"""
-        if cache_key in self.embedding_cache:
-            del self.embedding_cache[cache_key]
+        self.embedding_cache.delete(cache_key)
 
     async def generate_material_embedding(
         self, 
@@ -281,6 +255,39 @@ class CombinedEmbeddingService:
             logger.error(f"❌ Failed to generate SKU embedding for {name}: {str(e)}")
             raise
 
+    async def generate_material_embeddings_for_sku(
+        self,
+        materials: List[Tuple[str, str, Optional[str]]]
+    ) -> List[List[float]]:
+        """
+        Generate SKU search embeddings for several materials in one API request.
+        
+        Пакетный вариант generate_material_embedding_for_sku: один запрос
+        embeddings.create со списком текстов вместо запроса на материал.
+        
+        Args:
+            materials: (name, parsed_unit, color) tuples
+            
+        Returns:
+            Embeddings in input order
+        """
+        if not materials:
+            return []
+        
+        texts = [f"{name} {parsed_unit} {color if color else 'без_цвета'}" for name, parsed_unit, color in materials]
+        response = await self.client.embeddings.create(
+            model=self.config.embedding_model,
+            input=texts,
+            encoding_format="float"
+        )
+        
+        if len(response.data) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings from OpenAI, received {len(response.data)}")
+        
+        logger.info(f"✅ Generated {len(texts)} SKU embeddings in one request")
+        
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
     async def generate_batch_embeddings(
         self, 
         materials: List[CombinedEmbeddingRequest],
@@ -364,12 +371,20 @@ class CombinedEmbeddingService:
         if not self.config.cache_enabled:
             return {"caching": "disabled"}
         
+        self.embedding_cache.publish_metrics()
+        cache_stats = self.embedding_cache.get_stats()
+        
         return {
             "cache_enabled": True,
-            "cache_size": len(self.embedding_cache),
+            "cache_size": cache_stats["entries"],
             "max_cache_size": self.config.max_cache_size,
+            "cache_size_bytes": cache_stats["size_bytes"],
+            "max_cache_bytes": self.config.max_cache_bytes,
             "cache_ttl_seconds": self.config.cache_ttl_seconds,
-            "total_access_count": sum(entry.access_count for entry in self.embedding_cache.values())
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "evictions": cache_stats["evictions"],
+            "hit_rate": cache_stats["hit_rate"]
         }
 
     async def clear_cache(self) -> None:
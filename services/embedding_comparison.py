@@ -11,6 +11,7 @@ from core.database.interfaces import IVectorDatabase
 from core.database.collections.colors import ColorCollection
 from core.config.base import get_settings
 from core.database.factories import get_fallback_manager
+from core.background.cpu_tasks import best_alias_match
 
 logger = get_logger(__name__)
 
@@ -156,61 +157,8 @@ class EmbeddingComparisonService:
         Выполнить нечеткое сопоставление для нормализации цвета.
         """
         try:
-            from difflib import SequenceMatcher
-            
-            best_match = None
-            best_score = 0.0
-            all_matches = []
-            
-            # Check against all colors and aliases
-            for color_info in ColorCollection.BASE_COLORS:
-                color_name = color_info["name"]
-                
-                # Check main name
-                score = SequenceMatcher(None, color_text, color_name.lower()).ratio()
-                if score > best_score:
-                    best_score = score
-                    best_match = color_name
-                
-                all_matches.append((color_name, score))
-                
-                # Check aliases
-                for alias in color_info["aliases"]:
-                    score = SequenceMatcher(None, color_text, alias.lower()).ratio()
-                    if score > best_score:
-                        best_score = score
-                        best_match = color_name
-                    
-                    all_matches.append((color_name, score))
-            
-            # Sort by score and get top suggestions
-            all_matches.sort(key=lambda x: x[1], reverse=True)
-            suggestions = []
-            seen = set()
-            for name, score in all_matches:
-                if name not in seen and len(suggestions) < 5:
-                    suggestions.append(name)
-                    seen.add(name)
-            
-            if best_score >= threshold:
-                return {
-                    "original_text": color_text,
-                    "normalized_color": best_match,
-                    "similarity_score": best_score,
-                    "suggestions": suggestions,
-                    "success": True,
-                    "method": "fuzzy_match"
-                }
-            
-            return {
-                "original_text": color_text,
-                "normalized_color": None,
-                "similarity_score": best_score,
-                "suggestions": suggestions,
-                "success": False,
-                "method": "fuzzy_below_threshold"
-            }
-            
+            match = best_alias_match(color_text, self._color_candidates())
+            return self._fuzzy_result("normalized_color", color_text, match, threshold)
         except Exception as e:
             self.logger.error(f"Fuzzy matching error for color: {e}")
             return {"success": False, "method": "fuzzy_error"}
@@ -221,67 +169,47 @@ class EmbeddingComparisonService:
         Выполнить нечеткое сопоставление для нормализации единицы.
         """
         try:
-            from difflib import SequenceMatcher
-            
-            # Get unit mappings from existing logic
-            unit_mappings = self._get_unit_mappings()
-            
-            best_match = None
-            best_score = 0.0
-            all_matches = []
-            
-            # Check against all units and aliases
-            for standard_unit, aliases in unit_mappings.items():
-                
-                # Check standard unit name
-                score = SequenceMatcher(None, unit_text, standard_unit.lower()).ratio()
-                if score > best_score:
-                    best_score = score
-                    best_match = standard_unit
-                
-                all_matches.append((standard_unit, score))
-                
-                # Check aliases
-                for alias in aliases:
-                    score = SequenceMatcher(None, unit_text, alias.lower()).ratio()
-                    if score > best_score:
-                        best_score = score
-                        best_match = standard_unit
-                    
-                    all_matches.append((standard_unit, score))
-            
-            # Sort by score and get top suggestions
-            all_matches.sort(key=lambda x: x[1], reverse=True)
-            suggestions = []
-            seen = set()
-            for name, score in all_matches:
-                if name not in seen and len(suggestions) < 5:
-                    suggestions.append(name)
-                    seen.add(name)
-            
-            if best_score >= threshold:
-                return {
-                    "original_text": unit_text,
-                    "normalized_unit": best_match,
-                    "similarity_score": best_score,
-                    "suggestions": suggestions,
-                    "success": True,
-                    "method": "fuzzy_match"
-                }
-            
-            return {
-                "original_text": unit_text,
-                "normalized_unit": None,
-                "similarity_score": best_score,
-                "suggestions": suggestions,
-                "success": False,
-                "method": "fuzzy_below_threshold"
-            }
-            
+            match = best_alias_match(unit_text, self._unit_candidates())
+            return self._fuzzy_result("normalized_unit", unit_text, match, threshold)
         except Exception as e:
             self.logger.error(f"Fuzzy matching error for unit: {e}")
             return {"success": False, "method": "fuzzy_error"}
     
+    def _color_candidates(self) -> Tuple[Tuple[str, str], ...]:
+        """(canonical color, alias) pairs for fuzzy matching."""
+        return tuple(
+            (color_info["name"], alias)
+            for color_info in ColorCollection.BASE_COLORS
+            for alias in [color_info["name"], *color_info["aliases"]]
+        )
+    
+    def _unit_candidates(self) -> Tuple[Tuple[str, str], ...]:
+        """(canonical unit, alias) pairs for fuzzy matching."""
+        return tuple(
+            (standard_unit, alias)
+            for standard_unit, aliases in self._get_unit_mappings().items()
+            for alias in [standard_unit, *aliases]
+        )
+    
+    def _fuzzy_result(
+        self,
+        result_field: str,
+        text: str,
+        match: Tuple[Optional[str], float, List[str]],
+        threshold: float
+    ) -> Dict[str, Any]:
+        """Build normalization response from a fuzzy match."""
+        best_match, best_score, suggestions = match
+        success = best_score >= threshold
+        return {
+            "original_text": text,
+            result_field: best_match if success else None,
+            "similarity_score": best_score,
+            "suggestions": suggestions,
+            "success": success,
+            "method": "fuzzy_match" if success else "fuzzy_below_threshold"
+        }
+    
     def _exact_match_unit(self, unit_text: str) -> Optional[str]:
         """Find exact match for unit text.
         
@@ -0,0 +1,354 @@
+"""
+Facet counts over material payload fields.
+
+Счетчики фасетов (категория, единица, цвет, поставщик) без агрегации по всей коллекции:
+
+1. Значение поля каждого документа хранится кодом в array('i') по слоту документа
+   (-1 - значения нет); словарь значение -> код общий для поля.
+2. Общие счетчики по значениям обновляются инкрементально при add/remove.
+3. Счетчики для результата поиска считаются по списку ID кандидатов:
+   коды слотов выбираются numpy-индексацией и считаются ``np.bincount``.
+
+Индекс обновляется при изменениях материалов (apply_add/apply_remove) и первично
+загружается из коллекции materials порциями; изменения, пришедшие во время
+загрузки, применяются после нее. ``build_facet_index`` перестраивает его по
+запросу, а периодическая перестройка (FACET_INDEX_REBUILD_INTERVAL) подхватывает
+изменения, сделанные другими воркерами.
+"""
+
+import asyncio
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, get_args
+
+import numpy as np
+
+from core.logging import get_logger
+from core.schemas.materials import FacetField
+
+logger = get_logger(__name__)
+
+# Поля payload материалов, по которым считаются фасеты
+FACET_FIELDS = get_args(FacetField)
+
+# Справочные записи в коллекции материалов (категории, единицы) - не материалы
+REFERENCE_TYPES = frozenset({"category", "unit"})
+
+
+def facet_value(value: Any) -> Optional[str]:
+    """Facet key of a payload value (None for missing/empty values)."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+class FacetIndex:
+    """
+    Per-field value codes by document slot with incremental counts.
+
+    Документы адресуются слотами, как в FuzzyIndex: обновление документа - новый
+    слот и tombstone старого; слоты уплотняются, когда мертвых становится больше
+    ``compact_ratio``.
+    """
+
+    def __init__(self, fields: Sequence[str] = FACET_FIELDS, compact_ratio: float = 0.25):
+        """
+        Args:
+            fields: Payload fields to count
+            compact_ratio: Доля мертвых слотов, после которой слоты уплотняются
+        """
+        self.fields = tuple(fields)
+        self.compact_ratio = compact_ratio
+        self.ready = False
+        # Изменения, пришедшие во время load (None - загрузка не идет)
+        self._pending: Optional[List[Tuple[str, Optional[Dict[str, Any]]]]] = None
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slot_by_id
+
+    def add(self, doc_id: str, payload: Dict[str, Any]) -> None:
+        """Add or replace document."""
+        if doc_id in self._slot_by_id:
+            self._kill(self._slot_by_id[doc_id])
+
+        slot = len(self._ids)
+        self._ids.append(doc_id)
+        self._alive.append(1)
+        self._slot_by_id[doc_id] = slot
+
+        for field in self.fields:
+            value = facet_value(payload.get(field))
+            code = -1 if value is None else self._code(field, value)
+            self._slot_codes[field].append(code)
+            if code >= 0:
+                self._counts[field][code] += 1
+
+    def add_many(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Add (id, payload) documents, return number added."""
+        count = 0
+        for doc_id, payload in documents:
+            self.add(doc_id, payload)
+            count += 1
+        return count
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove document by ID."""
+        slot = self._slot_by_id.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._kill(slot)
+        self._maybe_compact()
+        return True
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self._reset()
+
+    def apply_add(self, doc_id: str, payload: Dict[str, Any]) -> None:
+        """
+        Reflect an upserted material.
+
+        Готовый индекс обновляется сразу; во время загрузки изменение еще и
+        запоминается, чтобы не потеряться при замене содержимого индекса.
+        """
+        if self._pending is not None:
+            self._pending.append((doc_id, payload))
+        if self.ready:
+            self.add(doc_id, payload)
+
+    def apply_remove(self, doc_id: str) -> None:
+        """Reflect a deleted material (see ``apply_add``)."""
+        if self._pending is not None:
+            self._pending.append((doc_id, None))
+        if self.ready:
+            self.remove(doc_id)
+
+    def counts(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Counts over the whole collection.
+
+        Args:
+            fields: Facet fields (default: all indexed fields)
+            limit: Maximum values per field, most frequent first
+
+        Returns:
+            Field -> {value: count}, most frequent first
+        """
+        return {
+            field: self._top(np.frombuffer(self._counts[field], dtype=np.int64), field, limit)
+            for field in self._check_fields(fields)
+        }
+
+    def count_ids(
+        self,
+        doc_ids: Iterable[str],
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Counts over a result set given by document IDs.
+
+        Args:
+            doc_ids: Candidate IDs (unknown IDs are skipped, duplicates counted once)
+            fields: Facet fields (default: all indexed fields)
+            limit: Maximum values per field, most frequent first
+
+        Returns:
+            Field -> {value: count}, most frequent first
+        """
+        fields = self._check_fields(fields)
+        slot_by_id = self._slot_by_id
+        slots = np.unique(np.fromiter(
+            (slot_by_id[doc_id] for doc_id in map(str, doc_ids) if doc_id in slot_by_id), dtype=np.int64
+        ))
+
+        facets = {}
+        for field in fields:
+            codes = np.frombuffer(self._slot_codes[field], dtype=np.int32)[slots]
+            codes = codes[codes >= 0]
+            facets[field] = self._top(np.bincount(codes, minlength=len(self._values[field])), field, limit)
+        return facets
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size metrics."""
+        return {
+            "documents": len(self._slot_by_id),
+            "slots": len(self._ids),
+            "dead_slots": self._dead,
+            "values": {field: int(np.count_nonzero(np.frombuffer(self._counts[field], dtype=np.int64)))
+                       for field in self.fields},
+            "ready": self.ready,
+        }
+
+    async def load(
+        self,
+        vector_db: Any,
+        collection_name: str = "materials",
+        yield_every: int = 5000
+    ) -> int:
+        """
+        Build (or rebuild) index from a vector database collection.
+
+        Записи добавляются порциями с уступкой event loop между ними в новое
+        содержимое индекса; до замены счетчики отдаются по прежнему. Читаются
+        только поля фасетов (и type для отсева справочных записей). Изменения,
+        пришедшие через apply_add/apply_remove во время загрузки, применяются
+        поверх прочитанных записей.
+
+        Returns:
+            Number of indexed documents
+        """
+        self._pending = []
+        try:
+            records = await vector_db.scroll_all(
+                collection_name, with_payload=True, with_vectors=False, fields=[*self.fields, "type"]
+            )
+            fresh = FacetIndex(self.fields, self.compact_ratio)
+            for start in range(0, len(records), yield_every):
+                for record in records[start:start + yield_every]:
+                    payload = record.get("payload") or {}
+                    if payload.get("type") not in REFERENCE_TYPES:
+                        fresh.add(str(record["id"]), payload)
+                await asyncio.sleep(0)
+
+            for doc_id, payload in self._pending:
+                if payload is None:
+                    fresh.remove(doc_id)
+                else:
+                    fresh.add(doc_id, payload)
+        finally:
+            self._pending = None
+
+        self._adopt(fresh)
+        self.ready = True
+        logger.info(f"Facet index built from '{collection_name}': {len(self)} documents")
+        return len(self)
+
+    def _check_fields(self, fields: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        if fields is None:
+            return self.fields
+        unknown = [field for field in fields if field not in self._slot_codes]
+        if unknown:
+            raise ValueError(f"Unknown facet fields: {', '.join(unknown)}")
+        return tuple(fields)
+
+    def _top(self, counts: np.ndarray, field: str, limit: Optional[int]) -> Dict[str, int]:
+        codes = np.flatnonzero(counts)
+        codes = codes[np.argsort(-counts[codes], kind="stable")][:limit]
+        values = self._values[field]
+        return {values[code]: int(counts[code]) for code in codes}
+
+    def _code(self, field: str, value: str) -> int:
+        codes = self._codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._values[field])
+            self._values[field].append(value)
+            self._counts[field].append(0)
+        return code
+
+    def _kill(self, slot: int) -> None:
+        self._alive[slot] = 0
+        self._dead += 1
+        for field in self.fields:
+            code = self._slot_codes[field][slot]
+            if code >= 0:
+                self._counts[field][code] -= 1
+
+    def _maybe_compact(self) -> None:
+        if self._dead > 1000 and self._dead > self.compact_ratio * len(self._ids):
+            slots = np.fromiter(self._slot_by_id.values(), dtype=np.int64)
+            ids = [self._ids[slot] for slot in slots]
+            for field in self.fields:
+                self._slot_codes[field] = array("i", np.frombuffer(self._slot_codes[field], dtype=np.int32)[slots])
+            self._ids = ids
+            self._alive = array("b", [1] * len(ids))
+            self._slot_by_id = {doc_id: slot for slot, doc_id in enumerate(ids)}
+            self._dead = 0
+
+    def _adopt(self, other: "FacetIndex") -> None:
+        """Take over documents and counts of another index."""
+        self._ids, self._alive, self._slot_by_id, self._dead = other._ids, other._alive, other._slot_by_id, other._dead
+        self._values, self._codes = other._values, other._codes
+        self._counts, self._slot_codes = other._counts, other._slot_codes
+
+    def _reset(self) -> None:
+        self._ids: List[str] = []
+        self._alive = array("b")
+        self._slot_by_id: Dict[str, int] = {}
+        self._dead = 0
+        self._values: Dict[str, List[str]] = {field: [] for field in self.fields}
+        self._codes: Dict[str, Dict[str, int]] = {field: {} for field in self.fields}
+        self._counts: Dict[str, array] = {field: array("q") for field in self.fields}
+        self._slot_codes: Dict[str, array] = {field: array("i") for field in self.fields}
+
+
+# Singleton instance
+_facet_index: Optional[FacetIndex] = None
+_rebuild_task: Optional[asyncio.Task] = None
+
+
+def get_facet_index() -> FacetIndex:
+    """Получить общий индекс фасетов материалов."""
+    global _facet_index
+
+    if _facet_index is None:
+        _facet_index = FacetIndex()
+
+    return _facet_index
+
+
+async def build_facet_index(collection_name: str = "materials") -> int:
+    """
+    Загрузить (перестроить) индекс фасетов из коллекции материалов.
+
+    Ошибки логируются: до готовности индекса ответы поиска приходят без фасетов.
+    """
+    from core.database.factories import get_vector_database
+
+    try:
+        return await get_facet_index().load(get_vector_database(), collection_name)
+    except Exception as e:
+        logger.warning(f"Facet index build failed, search responses stay without facets: {e}")
+        return 0
+
+
+async def start_facet_index(rebuild_interval: float = 0.0, collection_name: str = "materials") -> None:
+    """
+    Построить индекс фасетов в фоне и перестраивать его каждые ``rebuild_interval`` секунд.
+
+    Каждый воркер держит свои счетчики и видит только свои изменения; перестройка
+    подхватывает материалы, измененные другими воркерами (0 - не перестраивать).
+    """
+    global _rebuild_task
+
+    if _rebuild_task is None:
+        _rebuild_task = asyncio.create_task(_rebuild_loop(rebuild_interval, collection_name))
+
+
+async def stop_facet_index() -> None:
+    """Остановить фоновую перестройку индекса фасетов."""
+    global _rebuild_task
+
+    if _rebuild_task is not None:
+        _rebuild_task.cancel()
+        try:
+            await _rebuild_task
+        except asyncio.CancelledError:
+            pass
+        _rebuild_task = None
+
+
+async def _rebuild_loop(rebuild_interval: float, collection_name: str) -> None:
+    await build_facet_index(collection_name)
+    while rebuild_interval > 0:
+        await asyncio.sleep(rebuild_interval)
+        await build_facet_index(collection_name)
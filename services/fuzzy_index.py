@@ -0,0 +1,377 @@
+"""
+Fuzzy index over material names.
+
+Нечеткий поиск по названиям материалов без полного перебора каталога:
+
+1. Названия нормализуются и разбиваются на символьные триграммы; для каждой
+   триграммы хранится inverted list номеров документов (array('i'), append O(1)).
+2. Запрос отбирает кандидатов по числу общих триграмм (коэффициент Дайса,
+   numpy bincount по спискам триграмм запроса) - ``max_candidates`` лучших.
+3. Кандидаты оцениваются пакетно C-реализацией rapidfuzz (``process.cdist``).
+
+Индекс обновляется инкрементально (apply_add/apply_remove) при изменениях
+материалов и первично загружается из коллекции materials порциями; изменения,
+пришедшие во время загрузки, применяются после нее. Изменения, сделанные другими
+воркерами, подхватываются периодической перестройкой
+(FUZZY_INDEX_REBUILD_INTERVAL).
+"""
+
+import asyncio
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import Indel, JaroWinkler, Levenshtein
+
+from core.logging import get_logger
+
+logger = get_logger(__name__)
+
+NGRAM_SIZE = 3
+
+# algorithm -> (rapidfuzz scorer, max score)
+SCORERS = {
+    "wratio": (fuzz.WRatio, 100.0),
+    "token_set": (fuzz.token_set_ratio, 100.0),
+    "levenshtein": (Levenshtein.normalized_similarity, 1.0),
+    "jaro_winkler": (JaroWinkler.normalized_similarity, 1.0),
+    "sequence_matcher": (Indel.normalized_similarity, 1.0),
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, ё -> е and collapse whitespace."""
+    return _WHITESPACE_RE.sub(" ", text.lower().replace("ё", "е")).strip()
+
+
+def char_ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    """Set of padded character n-grams of normalized text."""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+@dataclass
+class FuzzyMatch:
+    """Fuzzy search hit."""
+    id: str
+    name: str
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+class FuzzyIndex:
+    """
+    Trigram inverted index with batch rapidfuzz scoring.
+
+    Документы адресуются слотами (позиция в массивах). Обновление документа -
+    новый слот и tombstone старого; индекс перестраивается, когда мертвых
+    слотов становится больше ``compact_ratio``.
+    """
+
+    def __init__(self, max_candidates: int = 2000, compact_ratio: float = 0.25, workers: int = 1):
+        """
+        Args:
+            max_candidates: Сколько кандидатов после отбора по триграммам оценивать rapidfuzz
+            compact_ratio: Доля мертвых слотов, после которой индекс перестраивается
+            workers: Потоки rapidfuzz cdist (-1 - все ядра)
+        """
+        self.max_candidates = max_candidates
+        self.compact_ratio = compact_ratio
+        self.workers = workers
+        self.ready = False
+        # Изменения, пришедшие во время load (None - загрузка не идет)
+        self._pending: Optional[List[Tuple[str, Optional[Tuple[str, Dict[str, Any]]]]]] = None
+        self._reset()
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slot_by_id
+
+    def add(self, doc_id: str, name: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        """Add or replace document."""
+        if doc_id in self._slot_by_id:
+            self._kill(self._slot_by_id[doc_id])
+
+        text = normalize_text(name or "")
+        grams = char_ngrams(text)
+        slot = len(self._ids)
+
+        self._ids.append(doc_id)
+        self._names.append(text)
+        self._payloads.append(payload or {})
+        self._alive.append(1)
+        self._gram_counts.append(len(grams))
+        self._slot_by_id[doc_id] = slot
+
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("i")
+            postings.append(slot)
+
+    def add_many(self, documents: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]]) -> int:
+        """Add (id, name, payload) documents, return number added."""
+        count = 0
+        for doc_id, name, payload in documents:
+            self.add(doc_id, name, payload)
+            count += 1
+        return count
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove document by ID."""
+        slot = self._slot_by_id.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._alive[slot] = 0
+        self._dead += 1
+        self._maybe_compact()
+        return True
+
+    def clear(self) -> None:
+        """Remove all documents."""
+        self._reset()
+
+    def apply_add(self, doc_id: str, name: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Reflect an upserted material.
+
+        Готовый индекс обновляется сразу; во время загрузки изменение еще и
+        запоминается, чтобы не потеряться при замене содержимого индекса.
+        """
+        if self._pending is not None:
+            self._pending.append((doc_id, (name, payload or {})))
+        if self.ready:
+            self.add(doc_id, name, payload)
+
+    def apply_remove(self, doc_id: str) -> None:
+        """Reflect a deleted material (see ``apply_add``)."""
+        if self._pending is not None:
+            self._pending.append((doc_id, None))
+        if self.ready:
+            self.remove(doc_id)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        threshold: float = 0.0,
+        algorithm: str = "wratio"
+    ) -> List[FuzzyMatch]:
+        """
+        Find documents whose names are most similar to the query.
+
+        Args:
+            query: Query text
+            limit: Maximum results
+            threshold: Minimum similarity 0..1
+            algorithm: Key of SCORERS
+
+        Returns:
+            Matches ordered by similarity
+        """
+        if algorithm not in SCORERS:
+            raise ValueError(f"Unknown fuzzy algorithm: {algorithm}")
+
+        text = normalize_text(query or "")
+        candidates = self._shortlist(text)
+        if candidates.size == 0:
+            return []
+
+        scorer, max_score = SCORERS[algorithm]
+        choices = [self._names[slot] for slot in candidates]
+        scores = process.cdist(
+            [text], choices, scorer=scorer, score_cutoff=threshold * max_score,
+            dtype=np.float32, workers=self.workers
+        )[0] / max_score
+
+        ranked = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            FuzzyMatch(
+                id=self._ids[candidates[i]],
+                name=self._names[candidates[i]],
+                score=float(scores[i]),
+                payload=self._payloads[candidates[i]],
+            )
+            for i in ranked
+            if scores[i] > 0 and scores[i] >= threshold
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size metrics."""
+        return {
+            "documents": len(self._slot_by_id),
+            "slots": len(self._ids),
+            "dead_slots": self._dead,
+            "ngrams": len(self._postings),
+            "ready": self.ready,
+            "max_candidates": self.max_candidates,
+        }
+
+    async def load(
+        self,
+        vector_db: Any,
+        collection_name: str = "materials",
+        yield_every: int = 5000
+    ) -> int:
+        """
+        Build (or rebuild) index from a vector database collection.
+
+        Записи добавляются порциями с уступкой event loop между ними в новое
+        содержимое индекса; до замены поиск работает по прежнему. Изменения,
+        пришедшие через apply_add/apply_remove во время загрузки, применяются
+        поверх прочитанных записей.
+
+        Returns:
+            Number of indexed documents
+        """
+        self._pending = []
+        try:
+            records = await vector_db.scroll_all(collection_name, with_payload=True, with_vectors=False)
+            fresh = FuzzyIndex(self.max_candidates, self.compact_ratio, self.workers)
+            for start in range(0, len(records), yield_every):
+                for record in records[start:start + yield_every]:
+                    payload = record.get("payload") or {}
+                    if payload.get("name"):
+                        fresh.add(str(record["id"]), payload["name"], payload)
+                await asyncio.sleep(0)
+
+            for doc_id, document in self._pending:
+                if document is None:
+                    fresh.remove(doc_id)
+                else:
+                    fresh.add(doc_id, *document)
+        finally:
+            self._pending = None
+
+        self._adopt(fresh)
+        self.ready = True
+        logger.info(f"Fuzzy index built from '{collection_name}': {len(self)} documents, {len(self._postings)} n-grams")
+        return len(self)
+
+    def _shortlist(self, text: str) -> np.ndarray:
+        """Slots with the highest n-gram overlap (Dice coefficient) with the query."""
+        grams = char_ngrams(text)
+        postings = [
+            np.frombuffer(self._postings[gram], dtype=np.int32)
+            for gram in grams if gram in self._postings
+        ]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+
+        shared = np.bincount(np.concatenate(postings), minlength=len(self._ids))
+        slots = np.flatnonzero(shared)
+        slots = slots[np.frombuffer(self._alive, dtype=np.int8)[slots] == 1]
+        if slots.size == 0:
+            return slots
+
+        gram_counts = np.frombuffer(self._gram_counts, dtype=np.int32)[slots]
+        dice = 2.0 * shared[slots] / (len(grams) + gram_counts)
+        if slots.size > self.max_candidates:
+            top = np.argpartition(-dice, self.max_candidates - 1)[:self.max_candidates]
+            slots = slots[top]
+        return slots
+
+    def _kill(self, slot: int) -> None:
+        self._alive[slot] = 0
+        self._dead += 1
+
+    def _maybe_compact(self) -> None:
+        if self._dead > 1000 and self._dead > self.compact_ratio * len(self._ids):
+            documents = [
+                (self._ids[slot], self._names[slot], self._payloads[slot])
+                for slot in self._slot_by_id.values()
+            ]
+            ready = self.ready
+            self._reset()
+            self.add_many(documents)
+            self.ready = ready
+
+    def _adopt(self, other: "FuzzyIndex") -> None:
+        """Take over documents of another index."""
+        self._ids, self._names, self._payloads = other._ids, other._names, other._payloads
+        self._alive, self._gram_counts = other._alive, other._gram_counts
+        self._slot_by_id, self._postings, self._dead = other._slot_by_id, other._postings, other._dead
+
+    def _reset(self) -> None:
+        self._ids: List[str] = []
+        self._names: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._alive = array("b")
+        self._gram_counts = array("i")
+        self._slot_by_id: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._dead = 0
+
+
+# Singleton instance
+_fuzzy_index: Optional[FuzzyIndex] = None
+_rebuild_task: Optional[asyncio.Task] = None
+
+
+def get_fuzzy_index() -> FuzzyIndex:
+    """Получить общий fuzzy индекс материалов."""
+    global _fuzzy_index
+
+    if _fuzzy_index is None:
+        from core.config import get_settings
+
+        _fuzzy_index = FuzzyIndex(max_candidates=get_settings().FUZZY_INDEX_MAX_CANDIDATES)
+
+    return _fuzzy_index
+
+
+async def build_fuzzy_index(collection_name: str = "materials") -> int:
+    """
+    Загрузить fuzzy индекс из коллекции материалов.
+
+    Ошибки логируются: до готовности индекса fuzzy поиск идет через fallback manager.
+    """
+    from core.database.factories import get_vector_database
+
+    try:
+        return await get_fuzzy_index().load(get_vector_database(), collection_name)
+    except Exception as e:
+        logger.warning(f"Fuzzy index build failed, fuzzy search stays on database fallback: {e}")
+        return 0
+
+
+async def start_fuzzy_index(rebuild_interval: float = 0.0, collection_name: str = "materials") -> None:
+    """
+    Построить fuzzy индекс в фоне и перестраивать его каждые ``rebuild_interval`` секунд.
+
+    Каждый воркер держит свой индекс и видит только свои изменения; перестройка
+    подхватывает материалы, измененные другими воркерами (0 - не перестраивать).
+    """
+    global _rebuild_task
+
+    if _rebuild_task is None:
+        _rebuild_task = asyncio.create_task(_rebuild_loop(rebuild_interval, collection_name))
+
+
+async def stop_fuzzy_index() -> None:
+    """Остановить фоновую перестройку fuzzy индекса."""
+    global _rebuild_task
+
+    if _rebuild_task is not None:
+        _rebuild_task.cancel()
+        try:
+            await _rebuild_task
+        except asyncio.CancelledError:
+            pass
+        _rebuild_task = None
+
+
+async def _rebuild_loop(rebuild_interval: float, collection_name: str) -> None:
+    await build_fuzzy_index(collection_name)
+    while rebuild_interval > 0:
+        await asyncio.sleep(rebuild_interval)
+        await build_fuzzy_index(collection_name)
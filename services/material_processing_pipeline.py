@@ -7,13 +7,15 @@ id, name, unit → AI_parser → RAG нормализация → Поиск SKU
 
 import asyncio
 import time
-from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator, Awaitable, Callable, Iterable
 from datetime import datetime
 from pathlib import Path
 import sys
 
 from core.logging import get_logger
 from core.config.base import get_settings
+from core.background.staged_pipeline import PipelineStage, StagedPipeline
 from core.database.interfaces import IVectorDatabase
 from core.schemas.pipeline_models import (
     MaterialProcessRequest,
@@ -23,6 +25,8 @@ from core.schemas.pipeline_models import (
     AIParsingResult,
     RAGNormalizationResult,
     SKUSearchResult,
+    SKUSearchRequest,
+    SKUSearchResponse,
     DatabaseSaveResult,
     ProcessingStage,
     ProcessingStatus,
@@ -43,6 +47,19 @@ from core.database.collections.units import UnitsCollection
 logger = get_logger(__name__)
 
 
+@dataclass
+class _StagedMaterial:
+    """Material travelling through the staged batch pipeline"""
+    index: int
+    request: MaterialProcessRequest
+    result: ProcessingResult
+    start_time: float
+    normalized_unit: Optional[str] = None
+    normalized_color: Optional[str] = None
+    embedding: Optional[List[float]] = None
+    final: Optional[ProcessingResult] = None
+
+
 class MaterialProcessingPipeline:
     """
     Main service for material processing pipeline according to diagram:
@@ -78,6 +95,7 @@ class MaterialProcessingPipeline:
         self.statistics = PipelineStatistics(
             statistics_updated_at=datetime.utcnow()
         )
+        self.stage_statistics: Dict[str, Dict[str, float]] = {}
         
         self.logger.info("Material Processing Pipeline initialized")
     
@@ -92,12 +110,33 @@ class MaterialProcessingPipeline:
             Complete processing result
         """
         start_time = time.time()
-        started_at = datetime.utcnow()
         
         self.logger.info(f"Starting processing for material: {request.id} - {request.name}")
         
-        # Initialize result with default values
-        result = ProcessingResult(
+        result = self._create_initial_result(request)
+        
+        try:
+            # Stages 1-2: AI Parsing and RAG Normalization
+            finished = await self._run_pre_sku_stages(request, result, start_time)
+            if finished is not None:
+                return finished
+            
+            # Stage 3: SKU Search
+            if self.config.sku_search_enabled:
+                sku_result = await self._sku_search_stage(
+                    request, result.ai_parsing, result.rag_normalization
+                )
+                self._apply_sku_result(result, sku_result)
+            
+            # Stage 4: Database Save
+            return await self._run_post_sku_stages(request, result, start_time)
+            
+        except Exception as e:
+            return self._fail_result(request, result, e, start_time)
+    
+    def _create_initial_result(self, request: MaterialProcessRequest) -> ProcessingResult:
+        """Create processing result with default values for all stages"""
+        return ProcessingResult(
             request_id=request.id,
             material_name=request.name,
             original_unit=request.unit,
@@ -122,53 +161,76 @@ class MaterialProcessingPipeline:
             current_stage=ProcessingStage.AI_PARSING,
             processing_status=ProcessingStatus.IN_PROGRESS,
             total_processing_time=0.0,
-            started_at=started_at,
+            started_at=datetime.utcnow(),
             completed_at=None
         )
+    
+    async def _run_pre_sku_stages(
+        self,
+        request: MaterialProcessRequest,
+        result: ProcessingResult,
+        start_time: float
+    ) -> Optional[ProcessingResult]:
+        """
+        Run AI parsing and RAG normalization stages
         
-        try:
-            # Stage 1: AI Parsing
-            if self.config.ai_parser_enabled:
-                result.ai_parsing = await self._ai_parsing_stage(request)
-                result.current_stage = ProcessingStage.RAG_NORMALIZATION
-                
-                if not result.ai_parsing.success:
-                    return self._finalize_result(result, ProcessingStatus.FAILED, start_time)
-            
-            # Stage 2: RAG Normalization
-            if self.config.rag_normalization_enabled:
-                result.rag_normalization = await self._rag_normalization_stage(
-                    request, result.ai_parsing
-                )
-                result.current_stage = ProcessingStage.SKU_SEARCH
-                
-                if not result.rag_normalization.success:
-                    return self._finalize_result(result, ProcessingStatus.PARTIAL_SUCCESS, start_time)
-            
-            # Stage 3: SKU Search (placeholder for now)
-            if self.config.sku_search_enabled:
-                result.sku_search = await self._sku_search_stage(
-                    request, result.ai_parsing, result.rag_normalization
-                )
-                result.current_stage = ProcessingStage.DATABASE_SAVE
-                
-                # Set SKU from search result
-                result.sku = result.sku_search.sku
-            
-            # Stage 4: Database Save (placeholder for now)
-            if self.config.database_save_enabled:
-                result.database_save = await self._database_save_stage(
-                    request, result
-                )
-                result.current_stage = ProcessingStage.COMPLETED
+        Returns:
+            Finalized result if processing stops before SKU search, None otherwise
+        """
+        # Stage 1: AI Parsing
+        if self.config.ai_parser_enabled:
+            result.ai_parsing = await self._ai_parsing_stage(request)
+            result.current_stage = ProcessingStage.RAG_NORMALIZATION
             
-            # Finalize result
-            return self._finalize_result(result, ProcessingStatus.SUCCESS, start_time)
+            if not result.ai_parsing.success:
+                return self._finalize_result(result, ProcessingStatus.FAILED, start_time)
+        
+        # Stage 2: RAG Normalization
+        if self.config.rag_normalization_enabled:
+            result.rag_normalization = await self._rag_normalization_stage(
+                request, result.ai_parsing
+            )
+            result.current_stage = ProcessingStage.SKU_SEARCH
             
-        except Exception as e:
-            self.logger.error(f"Error processing material {request.id}: {e}")
-            result.ai_parsing.error_message = str(e)
-            return self._finalize_result(result, ProcessingStatus.FAILED, start_time)
+            if not result.rag_normalization.success:
+                return self._finalize_result(result, ProcessingStatus.PARTIAL_SUCCESS, start_time)
+        
+        return None
+    
+    def _apply_sku_result(self, result: ProcessingResult, sku_result: SKUSearchResult) -> None:
+        """Store SKU search stage result and advance the stage"""
+        result.sku_search = sku_result
+        result.current_stage = ProcessingStage.DATABASE_SAVE
+        result.sku = sku_result.sku
+    
+    async def _run_post_sku_stages(
+        self,
+        request: MaterialProcessRequest,
+        result: ProcessingResult,
+        start_time: float
+    ) -> ProcessingResult:
+        """Run database save stage and finalize result"""
+        # Stage 4: Database Save
+        if self.config.database_save_enabled:
+            result.database_save = await self._database_save_stage(
+                request, result
+            )
+            result.current_stage = ProcessingStage.COMPLETED
+        
+        # Finalize result
+        return self._finalize_result(result, ProcessingStatus.SUCCESS, start_time)
+    
+    def _fail_result(
+        self,
+        request: MaterialProcessRequest,
+        result: ProcessingResult,
+        error: BaseException,
+        start_time: float
+    ) -> ProcessingResult:
+        """Finalize result as failed after unexpected error"""
+        self.logger.error(f"Error processing material {request.id}: {error}")
+        result.ai_parsing.error_message = str(error)
+        return self._finalize_result(result, ProcessingStatus.FAILED, start_time)
     
     async def _ai_parsing_stage(self, request: MaterialProcessRequest) -> AIParsingResult:
         """
@@ -450,32 +512,11 @@ class MaterialProcessingPipeline:
                 normalized_color=normalized_color
             )
             
-            # Convert response to SKU search result
-            sku_result = SKUSearchResult(
-                success=sku_response.search_successful,
-                sku=sku_response.found_sku,
-                similarity_score=sku_response.best_match.similarity_score if sku_response.best_match else None,
-                combined_embedding=material_embedding,
-                embedding_similarity=sku_response.best_match.similarity_score if sku_response.best_match else None,
-                embedding_text=f"{request.name} {normalized_unit} {normalized_color or 'без_цвета'}",
-                search_method=sku_response.search_method,
-                candidates_found=sku_response.candidates_evaluated,
-                processing_time=time.time() - stage_start,
-                error_message=sku_response.error_message
+            sku_result = self._build_sku_search_result(
+                request, sku_response, material_embedding,
+                normalized_unit, normalized_color, stage_start
             )
             
-            if sku_result.success:
-                self.logger.info(
-                    f"✅ SKU found for {request.name}: {sku_result.sku} "
-                    f"(similarity: {sku_result.similarity_score:.3f}, "
-                    f"candidates: {sku_result.candidates_found})"
-                )
-            else:
-                self.logger.warning(
-                    f"❌ SKU not found for {request.name}: "
-                    f"candidates evaluated: {sku_result.candidates_found}"
-                )
-            
             return sku_result
             
         except Exception as e:
@@ -486,6 +527,137 @@ class MaterialProcessingPipeline:
                 error_message=str(e)
             )
     
+    async def _embedding_stage_batch(self, items: List[_StagedMaterial]) -> List[_StagedMaterial]:
+        """
+        Stage 3a for a micro-batch: SKU search embeddings in one API request
+        
+        Этап 3a для micro-batch: эмбеддинги всех материалов одним запросом;
+        при ошибке пакетного запроса - поштучно, чтобы ошибка одного материала
+        не затрагивала остальные.
+        """
+        active = [item for item in items if item.final is None]
+        if not active or not self.config.sku_search_enabled:
+            return items
+        
+        from services.combined_embedding_service import get_combined_embedding_service
+        
+        embedding_service = get_combined_embedding_service()
+        stage_start = time.time()
+        
+        for item in active:
+            item.normalized_unit = (
+                item.result.rag_normalization.normalized_unit or item.result.ai_parsing.parsed_unit or item.request.unit
+            )
+            item.normalized_color = item.result.rag_normalization.normalized_color or item.result.ai_parsing.color
+        
+        try:
+            embeddings = await embedding_service.generate_material_embeddings_for_sku(
+                [(item.request.name, item.normalized_unit, item.normalized_color) for item in active]
+            )
+        except Exception as e:
+            self.logger.warning(f"Batch SKU embedding failed for {len(active)} materials, retrying one by one: {e}")
+            embeddings = await asyncio.gather(*[
+                embedding_service.generate_material_embedding_for_sku(
+                    name=item.request.name,
+                    parsed_unit=item.normalized_unit,
+                    color=item.normalized_color
+                )
+                for item in active
+            ], return_exceptions=True)
+        
+        for item, embedding in zip(active, embeddings):
+            if isinstance(embedding, Exception):
+                self.logger.error(f"Error generating SKU embedding for {item.request.name}: {embedding}")
+                self._apply_sku_result(item.result, SKUSearchResult(
+                    success=False,
+                    processing_time=time.time() - stage_start,
+                    error_message=str(embedding)
+                ))
+            else:
+                item.embedding = embedding
+        
+        return items
+    
+    async def _sku_search_stage_batch(self, items: List[_StagedMaterial]) -> List[_StagedMaterial]:
+        """
+        Stage 3b for a micro-batch: one batched SKU resolution
+        
+        Этап 3b: поиск SKU одним пакетным запросом к векторной БД вместо N запросов.
+        """
+        active = [item for item in items if item.final is None and item.embedding is not None]
+        if not active:
+            return items
+        
+        stage_start = time.time()
+        search_requests = [
+            SKUSearchRequest(
+                material_name=item.request.name,
+                normalized_unit=item.normalized_unit,
+                normalized_color=item.normalized_color,
+                material_embedding=item.embedding,
+                similarity_threshold=self.sku_search_service.config.similarity_threshold,
+                max_candidates=self.sku_search_service.config.max_candidates
+            )
+            for item in active
+        ]
+        
+        try:
+            sku_responses = await self.sku_search_service.find_skus_batch(search_requests)
+        except Exception as e:
+            self.logger.error(f"Error in batch SKU search stage: {e}")
+            for item in active:
+                self._apply_sku_result(item.result, SKUSearchResult(
+                    success=False,
+                    processing_time=time.time() - stage_start,
+                    error_message=str(e)
+                ))
+            return items
+        
+        for item, search_request, sku_response in zip(active, search_requests, sku_responses):
+            self._apply_sku_result(item.result, self._build_sku_search_result(
+                item.request, sku_response, search_request.material_embedding,
+                search_request.normalized_unit, search_request.normalized_color, stage_start
+            ))
+        
+        return items
+    
+    def _build_sku_search_result(
+        self,
+        request: MaterialProcessRequest,
+        sku_response: SKUSearchResponse,
+        material_embedding: List[float],
+        normalized_unit: str,
+        normalized_color: Optional[str],
+        stage_start: float
+    ) -> SKUSearchResult:
+        """Convert SKU search service response to pipeline stage result"""
+        sku_result = SKUSearchResult(
+            success=sku_response.search_successful,
+            sku=sku_response.found_sku,
+            similarity_score=sku_response.best_match.similarity_score if sku_response.best_match else None,
+            combined_embedding=material_embedding,
+            embedding_similarity=sku_response.best_match.similarity_score if sku_response.best_match else None,
+            embedding_text=f"{request.name} {normalized_unit} {normalized_color or 'без_цвета'}",
+            search_method=sku_response.search_method,
+            candidates_found=sku_response.candidates_evaluated,
+            processing_time=time.time() - stage_start,
+            error_message=sku_response.error_message
+        )
+        
+        if sku_result.success and sku_result.sku:
+            self.logger.info(
+                f"✅ SKU found for {request.name}: {sku_result.sku} "
+                f"(similarity: {sku_result.similarity_score:.3f}, "
+                f"candidates: {sku_result.candidates_found})"
+            )
+        else:
+            self.logger.warning(
+                f"❌ SKU not found for {request.name}: "
+                f"candidates evaluated: {sku_result.candidates_found}"
+            )
+        
+        return sku_result
+    
     async def _database_save_stage(
         self,
         request: MaterialProcessRequest,
@@ -571,6 +743,62 @@ class MaterialProcessingPipeline:
                 error_message=str(e)
             )
     
+    async def _database_save_stage_batch(self, items: List[_StagedMaterial]) -> List[_StagedMaterial]:
+        """
+        Stage 4 for a micro-batch: one bulk upsert to the reference database, then finalize
+        
+        Этап 4 для micro-batch: проверки как в _database_save_stage, сохранение
+        одним upsert, финализация результатов.
+        """
+        active = [item for item in items if item.final is None]
+        
+        if active and self.config.database_save_enabled:
+            from core.database.collections.materials_reference import MaterialsReferenceCollection
+            
+            stage_start = time.time()
+            to_save = []
+            for item in active:
+                result = item.result
+                if not result.sku:
+                    error_message = "No SKU found for database save"
+                elif not result.sku_search.combined_embedding:
+                    error_message = "No combined embedding found for database save"
+                else:
+                    to_save.append(item)
+                    continue
+                result.database_save = DatabaseSaveResult(
+                    success=False,
+                    processing_time=time.time() - stage_start,
+                    error_message=error_message
+                )
+            
+            if to_save:
+                save_success = await MaterialsReferenceCollection().save_material_references([
+                    {
+                        "sku": item.result.sku,
+                        "name": item.request.name,
+                        "unit": item.result.rag_normalization.normalized_unit or item.request.unit,
+                        "color": item.result.rag_normalization.normalized_color,
+                        "embedding": item.result.sku_search.combined_embedding
+                    }
+                    for item in to_save
+                ])
+                for item in to_save:
+                    item.result.database_save = DatabaseSaveResult(
+                        success=save_success,
+                        saved_id=item.result.sku if save_success else None,
+                        processing_time=time.time() - stage_start,
+                        error_message=None if save_success else "Failed to save material to reference database"
+                    )
+            
+            for item in active:
+                item.result.current_stage = ProcessingStage.COMPLETED
+        
+        for item in active:
+            item.final = self._finalize_result(item.result, ProcessingStatus.SUCCESS, item.start_time)
+        
+        return items
+    
     def _finalize_result(
         self,
         result: ProcessingResult,
@@ -672,7 +900,7 @@ class MaterialProcessingPipeline:
         
         # Process materials
         if request.parallel_processing and len(request.materials) > 1:
-            results = await self._process_batch_parallel(
+            results = await self._process_batch_staged(
                 request.materials,
                 request.max_workers
             )
@@ -703,81 +931,124 @@ class MaterialProcessingPipeline:
         
         return response
     
-    async def _process_batch_parallel(
+    async def stream_batch_materials(
         self,
         materials: List[MaterialProcessRequest],
-        max_workers: int
-    ) -> List[ProcessingResult]:
-        """Process materials in parallel"""
+        max_workers: int = 5,
+        on_results: Optional[Callable[[List[ProcessingResult]], Awaitable[None]]] = None
+    ) -> AsyncIterator[ProcessingResult]:
+        """
+        Process materials through the staged pipeline, yielding results as they complete
         
-        # Create semaphore to limit concurrent requests
-        semaphore = asyncio.Semaphore(max_workers)
+        Обработка материалов поэтапным пайплайном с выдачей результатов по мере
+        готовности (порядок завершения, а не порядок входа):
         
-        async def process_with_semaphore(material):
-            async with semaphore:
-                return await self.process_material(material)
+        parse (AI парсинг + RAG, max_workers параллельно) → embed (один запрос
+        эмбеддингов на micro-batch) → sku (один пакетный поиск на micro-batch)
+        → save (один upsert на micro-batch). Этапы связаны ограниченными
+        очередями, поэтому быстрый этап ждет медленный, а не копит материалы в памяти.
         
-        # Execute all tasks concurrently
-        tasks = [process_with_semaphore(material) for material in materials]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        on_results добавляет последний этап: обработчик получает результаты
+        micro-batch целиком (например, для одного массового обновления статусов).
         
-        # Handle exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                self.logger.error(f"Error processing material {materials[i].id}: {result}")
-                
-                # Create error result
-                error_result = ProcessingResult(
-                    request_id=materials[i].id,
-                    material_name=materials[i].name,
-                    original_unit=materials[i].unit,
-                    sku=None,
-                    ai_parsing=AIParsingResult(
-                        success=False,
-                        processing_time=0.0,
-                        error_message=str(result)
-                    ),
-                    rag_normalization=RAGNormalizationResult(
-                        success=False,
-                        processing_time=0.0
-                    ),
-                    sku_search=SKUSearchResult(
-                        success=False,
-                        processing_time=0.0
-                    ),
-                    database_save=DatabaseSaveResult(
-                        success=False,
-                        processing_time=0.0
-                    ),
-                    overall_success=False,
-                    current_stage=ProcessingStage.AI_PARSING,
-                    processing_status=ProcessingStatus.FAILED,
-                    total_processing_time=0.0,
-                    started_at=datetime.utcnow(),
-                    completed_at=datetime.utcnow()
-                )
-                processed_results.append(error_result)
-            else:
-                processed_results.append(result)
+        Args:
+            materials: Materials to process
+            max_workers: Concurrent AI parsing / normalization calls
+            on_results: Optional async handler for each micro-batch of final results
+        """
+        async for item in self._stream_staged(materials, max_workers, on_results):
+            yield item.final
+    
+    async def _stream_staged(
+        self,
+        materials: Iterable[MaterialProcessRequest],
+        max_workers: int,
+        on_results: Optional[Callable[[List[ProcessingResult]], Awaitable[None]]] = None
+    ) -> AsyncIterator[_StagedMaterial]:
+        """Run materials through batch stages, yielding finished items"""
+        start_time = time.time()
+        stages = self._build_batch_stages(max_workers)
+        if on_results is not None:
+            stages.append(self._build_results_stage(on_results))
+        pipeline = StagedPipeline(stages, queue_size=self.config.stage_queue_size)
+        items = (
+            _StagedMaterial(index=index, request=material, result=self._create_initial_result(material), start_time=start_time)
+            for index, material in enumerate(materials)
+        )
         
-        return processed_results
+        try:
+            async for item in pipeline.stream(items):
+                yield item
+        finally:
+            self.stage_statistics = pipeline.get_stats()
+    
+    def _build_batch_stages(self, max_workers: int) -> List[PipelineStage]:
+        """Stage definitions for staged batch processing"""
+        config = self.config
+        
+        def fail(item: _StagedMaterial, error: BaseException) -> _StagedMaterial:
+            if item.final is None:
+                item.final = self._fail_result(item.request, item.result, error, item.start_time)
+            return item
+        
+        return [
+            PipelineStage("parse", self._pre_sku_stage_batch, concurrency=max_workers, on_error=fail),
+            PipelineStage(
+                "embed", self._embedding_stage_batch, concurrency=2,
+                batch_size=config.embedding_batch_size, batch_timeout=config.batch_wait_time, on_error=fail
+            ),
+            PipelineStage(
+                "sku", self._sku_search_stage_batch, concurrency=2,
+                batch_size=config.sku_search_batch_size, batch_timeout=config.batch_wait_time, on_error=fail
+            ),
+            PipelineStage(
+                "save", self._database_save_stage_batch, concurrency=1,
+                batch_size=config.database_save_batch_size, batch_timeout=config.batch_wait_time, on_error=fail
+            ),
+        ]
+    
+    def _build_results_stage(
+        self,
+        on_results: Callable[[List[ProcessingResult]], Awaitable[None]]
+    ) -> PipelineStage:
+        """Final stage passing each micro-batch of results to on_results"""
+        async def handle(items: List[_StagedMaterial]) -> List[_StagedMaterial]:
+            await on_results([item.final for item in items])
+            return items
+        
+        def keep(item: _StagedMaterial, error: BaseException) -> _StagedMaterial:
+            # Результат уже готов, ошибка обработчика лишь залогирована
+            return item
+        
+        config = self.config
+        return PipelineStage(
+            "results", handle, concurrency=1,
+            batch_size=config.database_save_batch_size, batch_timeout=config.batch_wait_time, on_error=keep
+        )
+    
+    async def _pre_sku_stage_batch(self, items: List[_StagedMaterial]) -> List[_StagedMaterial]:
+        """Stages 1-2 for staged processing (one material per call)"""
+        for item in items:
+            item.final = await self._run_pre_sku_stages(item.request, item.result, item.start_time)
+        return items
+    
+    async def _process_batch_staged(
+        self,
+        materials: List[MaterialProcessRequest],
+        max_workers: int
+    ) -> List[ProcessingResult]:
+        """Process materials through the staged pipeline, results in request order"""
+        results: List[Optional[ProcessingResult]] = [None] * len(materials)
+        async for item in self._stream_staged(materials, max_workers):
+            results[item.index] = item.final
+        return results
     
     async def _process_batch_sequential(
         self,
         materials: List[MaterialProcessRequest]
     ) -> List[ProcessingResult]:
         """Process materials sequentially"""
-        
-        results = []
-        for material in materials:
-            result = await self.process_material(material)
-            results.append(result)
-            
-            # Small delay to avoid overwhelming external services
-            await asyncio.sleep(0.1)
-        
-        return results
+        return [await self.process_material(material) for material in materials]
     
     def get_statistics(self) -> PipelineStatistics:
         """
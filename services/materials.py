@@ -3,7 +3,7 @@
 Консолидированный сервис материалов - лучшее из всех версий.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Union
 from core.logging import get_logger, with_correlation_context, get_correlation_id
 from core.logging.managers.unified import get_unified_logging_manager
 from core.logging import log_database_operation_decorator  # Новый декоратор для логирования операций с БД
@@ -15,18 +15,114 @@ from datetime import datetime
 
 from core.schemas.materials import (
     Material, MaterialCreate, MaterialUpdate, MaterialBatchResponse, MaterialImportItem,
-    Category, CategoryCreate, Unit
+    Category, CategoryCreate, Unit, MaterialFilterOptions
 )
 from core.schemas.colors import ColorReference, ColorCreate
 from core.database.interfaces import IVectorDatabase
+from core.database.filters import (
+    RESIDUAL_OVERFETCH, AnyCondition, FilterSpec, MatchCondition, PatternCondition, RangeCondition,
+    normalize_keyword
+)
 from core.database.exceptions import DatabaseError
 from core.repositories.base import BaseRepository
 from core.logging.metrics import get_metrics_collector
+from services.fuzzy_index import get_fuzzy_index
+from services.facet_index import get_facet_index
 
 
 logger = get_logger(__name__)
 unified_manager = get_unified_logging_manager()
 
+# Поля Material, хранящиеся в payload Qdrant (id - ключ точки, embedding - вектор)
+MATERIAL_PAYLOAD_FIELDS = (
+    "name", "use_category", "unit", "sku", "description", "color", "normalized_color",
+    "normalized_parsed_unit", "unit_coefficient", "created_at", "updated_at",
+)
+# Обязательные поля схемы Material - читаются при любой проекции
+REQUIRED_MATERIAL_FIELDS = ("name", "use_category", "unit")
+MATERIAL_FIELDS = ("id", "embedding") + MATERIAL_PAYLOAD_FIELDS
+
+
+def parse_material_fields(fields: Optional[Union[str, Iterable[str]]]) -> Optional[List[str]]:
+    """Normalize a field projection (``"name,unit"`` or a list).
+
+    Проекция полей Material: None - все поля, иначе только перечисленные (и id).
+
+    Raises:
+        ValueError: If a field is not a Material field
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    names = [name.strip() for name in fields if name and name.strip()]
+    unknown = [name for name in names if name not in MATERIAL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown material fields: {', '.join(unknown)} (allowed: {', '.join(MATERIAL_FIELDS)})")
+    return list(dict.fromkeys(names)) or None
+
+
+def material_payload_fields(fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+    """Payload keys to fetch for a projection (required schema fields included)."""
+    if fields is None:
+        return None
+    return list(REQUIRED_MATERIAL_FIELDS) + [
+        name for name in fields if name in MATERIAL_PAYLOAD_FIELDS and name not in REQUIRED_MATERIAL_FIELDS
+    ]
+
+
+# Фильтруемые поля payload и типы их индексов (создаются и проверяются при старте)
+MATERIAL_PAYLOAD_INDEXES = {
+    "use_category": "keyword",
+    "unit": "keyword",
+    "unit_key": "keyword",  # единица без пробелов и регистра (поиск SKU)
+    "sku": "keyword_prefix",  # точные SKU и шаблоны "CEM*"
+    "created_at": "datetime",
+    "updated_at": "datetime",
+}
+
+
+def compile_material_filters(filters: Optional[MaterialFilterOptions]) -> Optional[FilterSpec]:
+    """Typed filter over the indexed material fields.
+
+    Компилирует MaterialFilterOptions в FilterSpec; min_similarity не входит
+    в фильтр - это score_threshold поиска.
+    """
+    if filters is None:
+        return None
+    conditions = []
+    for field, values in (("use_category", filters.categories), ("unit", filters.units)):
+        if values:
+            values = tuple(dict.fromkeys(values))
+            conditions.append(MatchCondition(field, values[0]) if len(values) == 1 else AnyCondition(field, values))
+    if filters.sku_pattern:
+        conditions.append(PatternCondition("sku", filters.sku_pattern))
+    for field, gte, lte in (
+        ("created_at", filters.created_after, filters.created_before),
+        ("updated_at", filters.updated_after, filters.updated_before),
+    ):
+        if gte is not None or lte is not None:
+            conditions.append(RangeCondition(field, gte, lte))
+    return FilterSpec(tuple(conditions)) if conditions else None
+
+
+async def ensure_material_payload_indexes(vector_db: Optional[IVectorDatabase] = None,
+                                          collection_name: str = "materials") -> Dict[str, bool]:
+    """Create and verify payload indexes on the filterable material fields."""
+    if vector_db is None:
+        from core.database.factories import get_vector_database
+        vector_db = get_vector_database()
+    if not await vector_db.collection_exists(collection_name):
+        logger.info(f"Collection {collection_name} does not exist yet, payload indexes skipped")
+        return {}
+    return await vector_db.ensure_payload_indexes(collection_name, MATERIAL_PAYLOAD_INDEXES)
+
+
+def dump_materials(materials: Sequence[Material], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    """JSON-ready materials limited to the projected fields (id always included)."""
+    include = {"id", *fields} if fields else None
+    return [material.model_dump(mode="json", include=include) for material in materials]
+
 
 class MaterialsService(BaseRepository):
     """Consolidated Materials Service with best features from all versions.
@@ -111,7 +207,7 @@ class MaterialsService(BaseRepository):
             # Check if collection exists (using adapter method)
             if not await self.vector_db.collection_exists(self.collection_name):
                 logger.info(f"Creating collection: {self.collection_name}")
-                # Create collection using adapter
+                # Create collection using adapter (Qdrant: under QDRANT_COLLECTION_PROFILE)
                 await self.vector_db.create_collection(
                     name=self.collection_name,
                     vector_size=1536,
@@ -170,6 +266,7 @@ class MaterialsService(BaseRepository):
                         "name": material.name,
                         "use_category": material.use_category,
                         "unit": material.unit,
+                        "unit_key": normalize_keyword(material.unit),
                         "sku": material.sku,
                         "description": material.description,
                         # Enhanced fields for parsing and normalization
@@ -187,6 +284,7 @@ class MaterialsService(BaseRepository):
                     collection_name=self.collection_name,
                     vectors=[vector_data]
                 )
+                self._index_materials([vector_data])
                 
                 logger.info(f"Material created successfully: {material.name} (ID: {material_id})")
                 
@@ -212,11 +310,14 @@ class MaterialsService(BaseRepository):
                 await self._handle_database_error("create_material", e)
     
     @with_correlation_context
-    async def get_material(self, material_id: str) -> Optional[Material]:
+    async def get_material(self, material_id: str, fields: Optional[Sequence[str]] = None,
+                           with_vectors: bool = False) -> Optional[Material]:
         """Get material by ID.
         
         Args:
             material_id: Material identifier
+            fields: Material fields to read (None - all); see parse_material_fields
+            with_vectors: Read the embedding (also implied by "embedding" in fields)
             
         Returns:
             Material if found, None otherwise
@@ -232,7 +333,8 @@ class MaterialsService(BaseRepository):
             
             result = await self.vector_db.get_by_id(
                 collection_name=self.collection_name,
-                vector_id=material_id
+                vector_id=material_id,
+                **self._projection(fields, with_vectors)
             )
             
             if not result:
@@ -290,6 +392,7 @@ class MaterialsService(BaseRepository):
                     "name": updated_data["name"],
                     "use_category": updated_data["use_category"],
                     "unit": updated_data["unit"],
+                    "unit_key": normalize_keyword(updated_data["unit"]),
                     "sku": updated_data.get("sku"),
                     "description": updated_data.get("description"),
                     "created_at": updated_data["created_at"].isoformat(),
@@ -302,6 +405,7 @@ class MaterialsService(BaseRepository):
                 collection_name=self.collection_name,
                 vectors=[vector_data]
             )
+            self._index_materials([vector_data])
             
             logger.info(f"Material updated successfully: {material_id}")
             
@@ -329,7 +433,8 @@ class MaterialsService(BaseRepository):
             # Check if material exists directly via vector DB (more efficient)
             existing_data = await self.vector_db.get_by_id(
                 collection_name=self.collection_name,
-                vector_id=material_id
+                vector_id=material_id,
+                fields=[]
             )
             
             if not existing_data:
@@ -342,6 +447,9 @@ class MaterialsService(BaseRepository):
                 vector_id=material_id
             )
             
+            get_fuzzy_index().apply_remove(material_id)
+            get_facet_index().apply_remove(material_id)
+            
             logger.info(f"Material deleted successfully: {material_id}")
             return True
             
@@ -353,21 +461,62 @@ class MaterialsService(BaseRepository):
     
     @with_correlation_context
     @log_database_operation_decorator("qdrant", "search_materials")
-    async def search_materials(self, query: str, limit: int = 10) -> List[Material]:
-        """Search materials using centralized fallback manager (vector → SQL LIKE)."""
+    async def search_materials(self, query: str, limit: int = 10,
+                               filters: Optional[MaterialFilterOptions] = None,
+                               oversampling: Optional[float] = None,
+                               rescore: Optional[bool] = None) -> List[Material]:
+        """Search materials using centralized fallback manager (vector → SQL LIKE).
+        
+        С фильтрами или параметрами квантованного поиска (``oversampling``/``rescore``)
+        поиск идет в векторную БД одним запросом (``search_vector_scored``); если
+        векторная БД недоступна, фильтр проверяется на результатах fallback manager.
+        """
         from core.database.factories import get_fallback_manager, AllDatabasesUnavailableError
         get_correlation_id()
+        spec = compile_material_filters(filters)
         with self.performance_tracker.time_operation("materials_service", "search_materials", limit):
+            if (spec is not None or (filters is not None and filters.min_similarity)
+                    or oversampling is not None or rescore is not None):
+                try:
+                    return [result["material"] for result in await self.search_vector_scored(
+                        query, limit, filters, oversampling=oversampling, rescore=rescore
+                    )]
+                except DatabaseError as e:
+                    logger.warning(f"Filtered vector search failed, falling back to post-filtering: {e}")
             fallback_manager = get_fallback_manager()
             try:
-                results = await fallback_manager.search_materials(query, limit)
-                return results
+                if spec is None:
+                    return await fallback_manager.search_materials(query, limit)
+                results = await fallback_manager.search_materials(query, limit * RESIDUAL_OVERFETCH)
+                return [material for material in results if spec.matches(vars(material))][:limit]
             except AllDatabasesUnavailableError as e:
                 logger.error(f"All databases unavailable for search_materials: {e.errors}")
                 raise
     
-    async def _search_vector(self, query: str, limit: int) -> List[Material]:
+    async def _search_vector(self, query: str, limit: int, fields: Optional[Sequence[str]] = None,
+                             with_vectors: bool = False,
+                             filters: Optional[MaterialFilterOptions] = None) -> List[Material]:
         """Perform vector semantic search."""
+        return [result["material"] for result in await self.search_vector_scored(
+            query, limit, filters, fields=fields, with_vectors=with_vectors
+        )]
+    
+    async def search_vector_scored(self, query: str, limit: int,
+                                   filters: Optional[MaterialFilterOptions] = None,
+                                   fields: Optional[Sequence[str]] = None,
+                                   with_vectors: bool = False,
+                                   oversampling: Optional[float] = None,
+                                   rescore: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Vector search with filters pushed down to the vector database.
+        
+        Фильтры и min_similarity выполняются в базе одним запросом: возвращается
+        до ``limit`` подходящих материалов без over-fetch и фильтрации в Python.
+        ``oversampling``/``rescore`` переопределяют параметры профиля квантованной
+        коллекции (None - значения профиля).
+        
+        Returns:
+            ``{"material", "score", "search_type"}`` dicts, best first
+        """
         try:
             # Get query embedding
             query_embedding = await self.get_embedding(query)
@@ -376,17 +525,22 @@ class MaterialsService(BaseRepository):
             results = await self.vector_db.search(
                 collection_name=self.collection_name,
                 query_vector=query_embedding,
-                limit=limit
+                limit=limit,
+                filter_conditions=compile_material_filters(filters),
+                score_threshold=filters.min_similarity if filters else None,
+                **self._projection(fields, with_vectors),
+                **{key: value for key, value in (("oversampling", oversampling), ("rescore", rescore))
+                   if value is not None}
             )
             
             # Convert results to Material objects (adapter already returns proper format)
-            materials = []
+            scored = []
             for result in results:
                 material = self._convert_vector_result_to_material(result)
                 if material:
-                    materials.append(material)
+                    scored.append({"material": material, "score": result.get("score", 0.0), "search_type": "vector"})
             
-            return materials
+            return scored
             
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
@@ -395,13 +549,16 @@ class MaterialsService(BaseRepository):
                 details=str(e)
             )
     
-    async def get_materials(self, skip: int = 0, limit: int = 100, category: Optional[str] = None) -> List[Material]:
+    async def get_materials(self, skip: int = 0, limit: int = 100, category: Optional[str] = None,
+                            fields: Optional[Sequence[str]] = None, with_vectors: bool = False) -> List[Material]:
         """Get all materials with optional category filter.
         
         Args:
             skip: Number of materials to skip
             limit: Maximum number of materials to return
             category: Optional category filter
+            fields: Material fields to read (None - all)
+            with_vectors: Read embeddings (also implied by "embedding" in fields)
             
         Returns:
             List of materials
@@ -425,7 +582,8 @@ class MaterialsService(BaseRepository):
                     collection_name=self.collection_name,
                     query_vector=[0.0] * 1536,  # Dummy vector for getting all
                     limit=limit + skip,
-                    filter_conditions=filter_conditions
+                    filter_conditions=filter_conditions,
+                    **self._projection(fields, with_vectors)
                 )
                 
                 # Apply skip and convert to Material objects
@@ -530,6 +688,7 @@ class MaterialsService(BaseRepository):
                                 "name": material.name,
                                 "use_category": material.use_category,
                                 "unit": material.unit,
+                                "unit_key": normalize_keyword(material.unit),
                                 "sku": material.sku,
                                 "description": material.description,
                                 # Enhanced fields
@@ -579,6 +738,7 @@ class MaterialsService(BaseRepository):
                             collection_name=self.collection_name,
                             vectors=vectors
                         )
+                        self._index_materials(vectors)
                         successful_creates += len(vectors)
                         logger.debug(f"Successfully created batch of {len(vectors)} materials")
                     except Exception as e:
@@ -678,6 +838,23 @@ class MaterialsService(BaseRepository):
         
         return f"{material.name} {unit_text} {color_text} {material.description or ''}".strip()
     
+    def _index_materials(self, vectors: List[Dict[str, Any]]) -> None:
+        """Keep fuzzy and facet indexes in sync with upserted materials."""
+        fuzzy_index = get_fuzzy_index()
+        for vector in vectors:
+            fuzzy_index.apply_add(str(vector["id"]), vector["payload"]["name"], vector["payload"])
+        facet_index = get_facet_index()
+        for vector in vectors:
+            facet_index.apply_add(str(vector["id"]), vector["payload"])
+    
+    @staticmethod
+    def _projection(fields: Optional[Sequence[str]], with_vectors: bool) -> Dict[str, Any]:
+        """Vector DB read options for a Material field projection."""
+        return {
+            "with_vectors": with_vectors or (fields is not None and "embedding" in fields),
+            "fields": material_payload_fields(fields),
+        }
+
     def _convert_vector_result_to_material(self, result: Dict[str, Any]) -> Optional[Material]:
         """Convert vector database result to Material object."""
         try:
@@ -825,7 +1002,8 @@ class MaterialsService(BaseRepository):
                 collection_name=self.collection_name,
                 query_vector=[0.0] * 1536,  # dummy
                 limit=1,
-                filter_conditions=filter_conditions
+                filter_conditions=filter_conditions,
+                fields=[]
             )
             return bool(results)
         except Exception as exc:
@@ -12,7 +12,10 @@ import uuid
 from core.logging import get_logger
 import numpy as np
 from core.config import settings, get_vector_db_client, get_ai_client
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import PointStruct
+from core.database.collection_profiles import get_collection_profile
+from core.background import cpu_tasks
+from core.background.process_pool import get_cpu_executor
 
 logger = get_logger(__name__)
 
@@ -24,6 +27,13 @@ class PriceProcessor:
         
         # Get configuration
         self.db_config = settings.get_vector_db_config()
+        # Профиль хранения коллекций прайсов (квантизация, векторы на диске, HNSW)
+        self.collection_profile = get_collection_profile(
+            settings.QDRANT_PRICE_COLLECTION_PROFILE or settings.QDRANT_COLLECTION_PROFILE,
+            hnsw_m=settings.QDRANT_HNSW_M,
+            hnsw_ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT,
+            hnsw_ef=settings.QDRANT_HNSW_EF,
+        )
         
         # Required columns for basic price processing (backward compatibility)
         self.required_columns = ["name", "use_category", "unit", "price"]
@@ -113,9 +123,8 @@ class PriceProcessor:
                     )
                 return response.data[0].embedding
             elif settings.AI_PROVIDER.value == "huggingface":
-                # For HuggingFace, client is SentenceTransformer
-                embedding = self.ai_client.encode([text])
-                return embedding[0].tolist()
+                # For HuggingFace, client is the local embedding worker (batched across requests)
+                return await self.ai_client.embed(text)
             else:
                 raise ValueError(f"Unsupported AI provider: {settings.AI_PROVIDER}")
         except Exception as e:
@@ -129,12 +138,9 @@ class PriceProcessor:
             if not any(c.name == collection_name for c in collections.collections):
                 self.qdrant_client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=VectorParams(
-                        size=self.db_config["vector_size"], 
-                        distance=Distance.COSINE
-                    ),
+                    **self.collection_profile.collection_kwargs(self.db_config["vector_size"]),
                 )
-                logger.info(f"Created collection: {collection_name}")
+                logger.info(f"Created collection: {collection_name} (profile: {self.collection_profile.name})")
         except Exception as e:
             logger.error(f"Error ensuring collection exists: {e}")
             raise
@@ -150,23 +156,7 @@ class PriceProcessor:
     def read_price_file(self, file_path: str) -> pd.DataFrame:
         """Read price file (CSV or Excel) and return DataFrame"""
         try:
-            if file_path.lower().endswith('.csv'):
-                # Try different encodings for CSV
-                encodings = ['utf-8', 'cp1251', 'latin1']
-                for encoding in encodings:
-                    try:
-                        df = pd.read_csv(file_path, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    raise ValueError("Could not read CSV file with any encoding")
-            elif file_path.lower().endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(file_path)
-            else:
-                raise ValueError("Unsupported file format")
-            
-            return df
+            return cpu_tasks.read_price_file(file_path)
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
             raise
@@ -185,12 +175,10 @@ class PriceProcessor:
     def is_raw_product_format(self, df: pd.DataFrame) -> bool:
         """Detect if DataFrame is in new raw product format"""
         # Check if it has the key raw product columns
-        raw_product_indicators = ['unit_price', 'calc_unit', 'sku']
-        has_raw_indicators = any(col in df.columns for col in raw_product_indicators)
+        has_raw_indicators = any(col in df.columns for col in cpu_tasks.RAW_PRODUCT_INDICATORS)
         
         # Check if it has old format columns
-        old_format_indicators = ['price', 'category']
-        has_old_indicators = any(col in df.columns for col in old_format_indicators)
+        has_old_indicators = any(col in df.columns for col in cpu_tasks.LEGACY_FORMAT_INDICATORS)
         
         return has_raw_indicators and not has_old_indicators
 
@@ -228,54 +216,7 @@ class PriceProcessor:
     def clean_raw_product_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and validate raw product data"""
         try:
-            # Remove rows with empty names
-            df = df.dropna(subset=['name'])
-            
-            # Clean unit_price column (main price field)
-            if 'unit_price' in df.columns:
-                df['unit_price'] = pd.to_numeric(df['unit_price'], errors='coerce')
-                df = df.dropna(subset=['unit_price'])
-                df = df[df['unit_price'] >= 0]
-            
-            # Clean other numeric price columns
-            price_columns = ['unit_calc_price', 'buy_price', 'sale_price']
-            for col in price_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    df.loc[df[col] < 0, col] = None
-            
-            # Clean count column
-            if 'count' in df.columns:
-                df['count'] = pd.to_numeric(df['count'], errors='coerce')
-                df['count'] = df['count'].fillna(1)
-                df.loc[df['count'] < 0, 'count'] = 1
-            
-            # Fill missing optional columns with defaults
-            for col, default_value in self.raw_product_optional_columns.items():
-                if col not in df.columns:
-                    df[col] = default_value
-                else:
-                    if col.endswith('_currency'):
-                        df[col] = df[col].fillna('RUB')
-                    elif col == 'use_category':
-                        df[col] = df[col].fillna('Общая категория')
-                    elif col == 'count':
-                        df[col] = df[col].fillna(1)
-            
-            # Clean text columns
-            text_columns = ['name', 'sku', 'use_category', 'calc_unit']
-            for col in text_columns:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).str.strip()
-                    # Replace 'nan' strings with None for optional fields
-                    if col != 'name':  # name is required
-                        df.loc[df[col] == 'nan', col] = None
-            
-            # Handle date_price_change
-            if 'date_price_change' in df.columns:
-                df['date_price_change'] = pd.to_datetime(df['date_price_change'], errors='coerce')
-            
-            return df
+            return cpu_tasks.clean_raw_product_data(df, self.raw_product_optional_columns)
         except Exception as e:
             logger.error(f"Error cleaning raw product data: {e}")
             raise
@@ -283,15 +224,17 @@ class PriceProcessor:
     async def process_price_list(self, file_path: str, supplier_id: str, pricelistid: Optional[int] = None) -> Dict[str, Any]:
         """Process price list file and store in vector database (supports only new raw product format)."""
         try:
-            # Read and validate file
-            df = self.read_price_file(file_path)
+            # Read, validate and clean file in the CPU process pool (one round trip)
+            df, is_raw_product, missing_columns = await get_cpu_executor().run(
+                cpu_tasks.load_raw_price_file,
+                file_path,
+                self.raw_product_required_columns,
+                self.raw_product_optional_columns
+            )
 
             # Detect format (raw product format is required)
-            is_raw_product = self.is_raw_product_format(df)
-
             if is_raw_product:
                 # New raw product format
-                missing_columns = self.validate_raw_product_columns(df)
                 if missing_columns:
                     raise ValueError(f"Missing required columns for raw products: {', '.join(missing_columns)}")
 
@@ -299,7 +242,6 @@ class PriceProcessor:
                 if pricelistid is None:
                     pricelistid = int(datetime.utcnow().timestamp())
 
-                df = self.clean_raw_product_data(df)
                 return await self._process_raw_products(df, supplier_id, pricelistid)
             else:
                 # Legacy format is no longer supported – explicitly inform the caller
@@ -713,10 +655,7 @@ class PriceProcessor:
                 # Create new collection for supplier
                 self.qdrant_client.create_collection(
                     collection_name=collection_name,
-                    vectors_config=VectorParams(
-                        size=1536,
-                        distance=Distance.COSINE
-                    )
+                    **self.collection_profile.collection_kwargs(1536)
                 )
                 
                 # Create payload index for date field
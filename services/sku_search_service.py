@@ -12,11 +12,12 @@ import asyncio
 import hashlib
 import logging
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Any
 from functools import lru_cache
 
+from core.caching.bounded_cache import BoundedTTLCache
 from core.config.base import Settings
+from core.database.filters import normalize_keyword
 from core.database.interfaces import IVectorDatabase
 from core.schemas.pipeline_models import (
     SKUSearchRequest,
@@ -28,6 +29,58 @@ from services.combined_embedding_service import get_combined_embedding_service
 
 logger = logging.getLogger(__name__)
 
+# Словарь нормализации единиц (синоним -> каноническая единица)
+_UNIT_SYNONYMS = {
+    # Вес
+    "кг": "кг",
+    "килограмм": "кг", 
+    "килограммы": "кг",
+    "килограммов": "кг",
+    "kg": "кг",
+    "кило": "кг",
+    
+    # Объем  
+    "м³": "м³",
+    "куб": "м³",
+    "кубометр": "м³",
+    "кубометры": "м³", 
+    "кубометров": "м³",
+    "м3": "м³",
+    "куб.м": "м³",
+    "кубический метр": "м³",
+    
+    # Площадь
+    "м²": "м²",
+    "кв.м": "м²",
+    "м2": "м²",
+    "квадратный метр": "м²",
+    "квадратные метры": "м²",
+    "квадратных метров": "м²",
+    
+    # Штуки
+    "шт": "шт",
+    "штука": "шт",
+    "штуки": "шт",
+    "штук": "шт",
+    "pcs": "шт",
+    "pc": "шт",
+    
+    # Метры
+    "м": "м",
+    "метр": "м",
+    "метры": "м",
+    "метров": "м",
+    "meter": "м",
+    
+    # Литры
+    "л": "л",
+    "литр": "л",
+    "литры": "л",
+    "литров": "л",
+    "liter": "л",
+    "l": "л"
+}
+
 
 class SKUSearchService:
     """
@@ -73,8 +126,17 @@ class SKUSearchService:
         # Get combined embedding service
         self.embedding_service = get_combined_embedding_service()
         
-        # In-memory cache for search results
-        self.search_cache: Dict[str, Tuple[SKUSearchResponse, datetime]] = {}
+        # In-memory cache for search results (O(1) LRU eviction)
+        self.search_cache = BoundedTTLCache(
+            max_entries=self.config.max_cache_entries,
+            ttl_seconds=self.config.cache_ttl,
+            name="sku_search"
+        )
+        
+        # Batch search state
+        self._unit_index_ensured = False
+        self.batch_search_calls = 0
+        self.batch_search_queries = 0
         
         self.logger.info("SKU Search Service initialized")
     
@@ -241,6 +303,159 @@ class SKUSearchService:
                 error_message=str(e)
             )
     
+    async def find_skus_batch(self, requests: List[SKUSearchRequest]) -> List[SKUSearchResponse]:
+        """
+        Batch SKU search: one vector search_batch call per unit group chunk.
+        
+        Пакетный поиск SKU: материалы группируются по нормализованной единице,
+        ограничение по единице передается в Qdrant как payload-фильтр по
+        индексированному полю 'unit_key', поэтому перевыборка кандидатов не нужна.
+        Ответы берутся из кэша поиска и кладутся в него так же, как в
+        find_sku_by_material_data.
+        
+        Args:
+            requests: SKU search requests with pre-computed material_embedding
+            
+        Returns:
+            SKU search responses in the order of requests
+        """
+        start_time = time.time()
+        responses: List[Optional[SKUSearchResponse]] = [None] * len(requests)
+        
+        if not self.vector_db:
+            return [self._create_error_response("Vector database not available", start_time) for _ in requests]
+        
+        await self._ensure_unit_index()
+        
+        # Group by canonical unit so every chunk shares one payload filter
+        unit_groups: Dict[str, List[int]] = {}
+        cache_keys: Dict[int, str] = {}
+        cache_hits = 0
+        for index, request in enumerate(requests):
+            if not request.material_embedding:
+                responses[index] = self._create_error_response(
+                    "Material embedding is required for batch SKU search", start_time
+                )
+                continue
+            if self.config.cache_enabled:
+                cache_keys[index] = self._generate_cache_key(
+                    request.material_name, request.normalized_unit,
+                    request.normalized_color, request.similarity_threshold
+                )
+                cached_result = self._get_cached_result(cache_keys[index])
+                if cached_result:
+                    responses[index] = cached_result
+                    cache_hits += 1
+                    continue
+            canonical_unit = self._normalize_unit_for_comparison(request.normalized_unit)
+            unit_groups.setdefault(canonical_unit, []).append(index)
+        
+        for canonical_unit, indices in unit_groups.items():
+            unit_filter = self._unit_filter(canonical_unit)
+            
+            for chunk_start in range(0, len(indices), self.config.batch_size):
+                chunk = indices[chunk_start:chunk_start + self.config.batch_size]
+                chunk_start_time = time.time()
+                
+                try:
+                    batch_results = await self.vector_db.search_batch(
+                        collection_name=self.config.reference_collection,
+                        query_vectors=[requests[i].material_embedding for i in chunk],
+                        limit=max(requests[i].max_candidates for i in chunk),
+                        filter_conditions=unit_filter
+                    )
+                    self.batch_search_calls += 1
+                    self.batch_search_queries += len(chunk)
+                except Exception as e:
+                    self.logger.error(f"Batch SKU search failed for unit '{canonical_unit}': {e}")
+                    for i in chunk:
+                        responses[i] = self._create_error_response(str(e), chunk_start_time)
+                    continue
+                
+                for i, search_results in zip(chunk, batch_results):
+                    responses[i] = self._build_batch_response(
+                        requests[i], search_results, chunk_start_time
+                    )
+                    if i in cache_keys:
+                        self._cache_result(cache_keys[i], responses[i])
+        
+        found = sum(1 for response in responses if response and response.found_sku)
+        self.logger.info(
+            f"✅ Batch SKU search: {found}/{len(requests)} SKUs found, "
+            f"{cache_hits} from cache, {len(unit_groups)} unit groups, {time.time() - start_time:.2f}s"
+        )
+        return responses
+    
+    def _build_batch_response(
+        self,
+        request: SKUSearchRequest,
+        search_results: List[Dict[str, Any]],
+        start_time: float
+    ) -> SKUSearchResponse:
+        """Build SKU response for one query of a batch search."""
+        candidates = []
+        for result in search_results:
+            if result.get("score", 0.0) < request.similarity_threshold:
+                continue
+            candidate = self._convert_vector_result_to_candidate(result)
+            if candidate:
+                candidates.append(candidate)
+        
+        # Unit filter is already applied by the database, this re-check is cheap
+        matching_candidates = self._phase2_attribute_filtering(
+            candidates[:request.max_candidates], request.normalized_unit, request.normalized_color
+        )
+        best_match = self._select_best_match(matching_candidates)
+        
+        return SKUSearchResponse(
+            found_sku=best_match.sku if best_match else None,
+            search_successful=True,
+            candidates_evaluated=len(candidates),
+            matching_candidates=len(matching_candidates),
+            best_match=best_match,
+            search_method="batch_combined_embedding_search",
+            processing_time=time.time() - start_time,
+            all_candidates=candidates
+        )
+    
+    async def _ensure_unit_index(self) -> None:
+        """Create keyword payload indexes on 'unit_key' and 'unit' once per service instance."""
+        if self._unit_index_ensured:
+            return
+        for field_name in ("unit_key", "unit"):
+            try:
+                await self.vector_db.create_payload_index(
+                    self.config.reference_collection, field_name, "keyword"
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to ensure '{field_name}' payload index: {e}")
+        self._unit_index_ensured = True
+    
+    def _unit_filter(self, canonical_unit: str) -> Dict[str, Any]:
+        """
+        Payload-фильтр по единице: нормализованное поле 'unit_key' или, для точек,
+        записанных до его появления, исходное поле 'unit'.
+        """
+        keys = self._unit_filter_values(canonical_unit)
+        legacy_values = sorted({variant for key in keys for variant in (key, key.upper(), key.capitalize())})
+        return {
+            "should": [
+                {"key": "unit_key", "match": {"any": keys}},
+                {"key": "unit", "match": {"any": legacy_values}},
+            ]
+        }
+    
+    def _unit_filter_values(self, canonical_unit: str) -> List[str]:
+        """
+        Все варианты записи единицы, которые нормализуются в canonical_unit.
+        
+        Payload-фильтр сравнивает строки точно, поэтому синонимы раскрываются
+        заранее и приводятся к виду поля 'unit_key' (normalize_keyword).
+        """
+        synonyms = {unit for unit, canonical in _UNIT_SYNONYMS.items() if canonical == canonical_unit}
+        synonyms.add(canonical_unit)
+        return sorted({normalize_keyword(synonym) for synonym in synonyms})
+    
     async def _phase1_vector_search(
         self, 
         query_embedding: List[float], 
@@ -380,61 +595,9 @@ class SKUSearchService:
         if not unit:
             return ""
         
-        unit_clean = unit.lower().strip()
-        
-        # Словарь нормализации единиц
-        unit_mappings = {
-            # Вес
-            "кг": "кг",
-            "килограмм": "кг", 
-            "килограммы": "кг",
-            "килограммов": "кг",
-            "kg": "кг",
-            "кило": "кг",
-            
-            # Объем  
-            "м³": "м³",
-            "куб": "м³",
-            "кубометр": "м³",
-            "кубометры": "м³", 
-            "кубометров": "м³",
-            "м3": "м³",
-            "куб.м": "м³",
-            "кубический метр": "м³",
-            
-            # Площадь
-            "м²": "м²",
-            "кв.м": "м²",
-            "м2": "м²",
-            "квадратный метр": "м²",
-            "квадратные метры": "м²",
-            "квадратных метров": "м²",
-            
-            # Штуки
-            "шт": "шт",
-            "штука": "шт",
-            "штуки": "шт",
-            "штук": "шт",
-            "pcs": "шт",
-            "pc": "шт",
-            
-            # Метры
-            "м": "м",
-            "метр": "м",
-            "метры": "м",
-            "метров": "м",
-            "meter": "м",
-            
-            # Литры
-            "л": "л",
-            "литр": "л",
-            "литры": "л",
-            "литров": "л",
-            "liter": "л",
-            "l": "л"
-        }
+        unit_clean = normalize_keyword(unit)
         
-        return unit_mappings.get(unit_clean, unit_clean)
+        return _UNIT_SYNONYMS.get(unit_clean, unit_clean)
     
     def _check_color_compatibility(
         self, 
@@ -570,29 +733,11 @@ class SKUSearchService:
     
     def _get_cached_result(self, cache_key: str) -> Optional[SKUSearchResponse]:
         """Get cached search result if not expired"""
-        if cache_key not in self.search_cache:
-            return None
-        
-        result, cached_at = self.search_cache[cache_key]
-        if datetime.utcnow() - cached_at > timedelta(seconds=self.config.cache_ttl):
-            del self.search_cache[cache_key]
-            return None
-        
-        return result
+        return self.search_cache.get(cache_key)
     
     def _cache_result(self, cache_key: str, response: SKUSearchResponse) -> None:
         """Cache search result"""
-        # Simple cache size management
-        if len(self.search_cache) > 1000:  # Max 1000 cached results
-            # Remove oldest 20%
-            sorted_cache = sorted(
-                self.search_cache.items(),
-                key=lambda x: x[1][1]  # Sort by timestamp
-            )
-            for key, _ in sorted_cache[:200]:
-                del self.search_cache[key]
-        
-        self.search_cache[cache_key] = (response, datetime.utcnow())
+        self.search_cache.put(cache_key, response)
     
     def _create_error_response(self, error_message: str, start_time: float) -> SKUSearchResponse:
         """Create error response"""
@@ -634,8 +779,13 @@ class SKUSearchService:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get service statistics"""
+        self.search_cache.publish_metrics()
+        
         return {
             "cache_size": len(self.search_cache),
+            "cache": self.search_cache.get_stats(),
+            "batch_search_calls": self.batch_search_calls,
+            "batch_search_queries": self.batch_search_queries,
             "config": self.config.model_dump(),
             "vector_db_available": self.vector_db is not None
         }
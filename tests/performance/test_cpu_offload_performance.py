@@ -0,0 +1,88 @@
+"""
+Event loop lag under mixed upload and fuzzy search load
+Лаг event loop при смешанной нагрузке: загрузка прайс-листов и fuzzy поиск
+
+The same workload (price file parsing + fuzzy scoring of a candidate list) runs
+inline on the event loop and through CPUTaskExecutor while LoopLagMonitor
+measures how late a 10 ms ticker wakes up - i.e. the latency every other
+request on the worker would see.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+
+from core.background import cpu_tasks
+from core.background.process_pool import CPUTaskExecutor
+from core.monitoring.loop_lag import LoopLagMonitor
+
+ROWS = 20000
+CANDIDATES = 4000
+ROUNDS = 3
+REQUIRED = ["name", "unit_price", "calc_unit"]
+OPTIONAL = {"sku": None, "use_category": "Общая категория", "count": 1}
+
+
+def _write_price_file(path) -> str:
+    lines = ["name,unit_price,calc_unit,sku"]
+    lines += [f"Материал {i} М{i % 500},{i % 997}.5,шт,SKU-{i}" for i in range(ROWS)]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return str(path)
+
+
+def _candidates():
+    return [f"Цемент портландский М{i % 700} Д{i % 20} {i % 50}кг" for i in range(CANDIDATES)]
+
+
+async def _inline_workload(file_path, candidates):
+    for _ in range(ROUNDS):
+        cpu_tasks.load_raw_price_file(file_path, REQUIRED, OPTIONAL)
+        await asyncio.sleep(0)
+        cpu_tasks.score_texts(candidates, "цемент м500 д0 50кг", "levenshtein")
+        await asyncio.sleep(0)
+
+
+async def _offloaded_workload(executor, file_path, candidates):
+    for _ in range(ROUNDS):
+        await asyncio.gather(
+            executor.run(cpu_tasks.load_raw_price_file, file_path, REQUIRED, OPTIONAL),
+            executor.map_chunks(cpu_tasks.score_texts, candidates, "цемент м500 д0 50кг", "levenshtein"),
+        )
+
+
+async def _measure(workload):
+    monitor = LoopLagMonitor(interval=0.01, publish=False)
+    await monitor.start()
+    start = time.perf_counter()
+    await workload
+    duration = time.perf_counter() - start
+    await monitor.stop()
+    return duration, monitor.get_stats()
+
+
+class TestCPUOffloadPerformance:
+    """Loop lag comparison for inline vs process pool execution."""
+
+    @pytest.mark.performance
+    async def test_process_pool_keeps_loop_responsive(self, tmp_path):
+        file_path = _write_price_file(tmp_path / "prices.csv")
+        candidates = _candidates()
+
+        executor = CPUTaskExecutor(max_workers=max(2, min(os.cpu_count() or 2, 4)), chunk_size=500)
+        try:
+            # Warm up worker processes (start-up and imports are not part of the comparison)
+            await executor.map_chunks(cpu_tasks.score_texts, candidates[:8], "x", chunk_size=1)
+            await executor.run(cpu_tasks.load_raw_price_file, file_path, REQUIRED, OPTIONAL)
+
+            inline_time, inline_lag = await _measure(_inline_workload(file_path, candidates))
+            pool_time, pool_lag = await _measure(_offloaded_workload(executor, file_path, candidates))
+        finally:
+            executor.shutdown()
+
+        print(f"\nWorkload: {ROUNDS} x ({ROWS} price rows + {CANDIDATES} fuzzy candidates)")
+        print(f"Inline:       {inline_time:.2f}s, loop lag p99 {inline_lag['p99_ms']:.1f} ms, max {inline_lag['max_ms']:.1f} ms")
+        print(f"Process pool: {pool_time:.2f}s, loop lag p99 {pool_lag['p99_ms']:.1f} ms, max {pool_lag['max_ms']:.1f} ms "
+              f"({executor.max_workers} workers)")
+
+        assert pool_lag["max_ms"] < inline_lag["max_ms"] / 2
@@ -0,0 +1,103 @@
+"""
+Local embedding throughput: per-request encode vs the batching worker
+Пропускная способность локальных эмбеддингов: encode на запрос против воркера с батчами
+
+CLIENTS concurrent coroutines each embed TEXTS_PER_CLIENT price-list texts of
+mixed length (short names plus some long descriptions):
+
+- per request: ``model.encode([text])`` in the event loop, which is what
+  PriceProcessor did with a SentenceTransformer client;
+- worker: ``LocalEmbeddingWorker.embed`` with cross-request batching in the
+  worker thread.
+
+A ticker coroutine measures how long the event loop stays blocked in each
+mode. The model is a tiny BERT built locally, so absolute numbers are far
+below a real model. The ratio shows the per-call overhead that batching
+removes.
+"""
+import asyncio
+import random
+import time
+
+import pytest
+
+from core.background.embedding_worker import LocalEmbeddingWorker
+from tests.unit.test_embedding_worker import build_tiny_model
+
+CLIENTS = 64
+TEXTS_PER_CLIENT = 16
+
+
+def _texts(count):
+    rng = random.Random(3)
+    names = ["цемент м500 серый мешок 50 кг", "кирпич облицовочный красный", "песок речной мытый", "арматура а500с 12 мм"]
+    return [
+        rng.choice(names) + (" описание материала для строительства" * rng.randint(4, 10) if i % 8 == 0 else "")
+        for i in range(count)
+    ]
+
+
+async def _max_loop_stall(work):
+    """Run ``work`` and return (elapsed seconds, max event loop stall in ms)."""
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append((time.perf_counter() - started) * 1000)
+
+    ticking = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticking
+    return elapsed, max(stalls, default=0.0)
+
+
+class TestEmbeddingWorkerPerformance:
+    """Cross-request batching of a local embedding model."""
+
+    @pytest.mark.performance
+    async def test_batching_throughput(self, tmp_path):
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(build_tiny_model(tmp_path), device="cpu")
+        texts = _texts(CLIENTS * TEXTS_PER_CLIENT)
+        chunks = [texts[i::CLIENTS] for i in range(CLIENTS)]
+        model.encode(texts[:8])
+        model.encode(texts[:1])
+
+        async def per_request_client(chunk):
+            for text in chunk:
+                model.encode([text])[0].tolist()
+                await asyncio.sleep(0)
+
+        async def per_request():
+            await asyncio.gather(*(per_request_client(chunk) for chunk in chunks))
+
+        worker = LocalEmbeddingWorker(model, max_batch_size=64, max_latency_ms=5, publish=False)
+
+        async def worker_client(chunk):
+            for text in chunk:
+                await worker.embed(text)
+
+        async def batched():
+            await asyncio.gather(*(worker_client(chunk) for chunk in chunks))
+
+        baseline_s, baseline_stall = await _max_loop_stall(per_request)
+        worker_s, worker_stall = await _max_loop_stall(batched)
+        stats = worker.get_stats()
+        await worker.close()
+
+        print(f"\n{len(texts)} texts from {CLIENTS} concurrent clients")
+        print(f"per-request encode: {len(texts) / baseline_s:8.0f} texts/s, max loop stall {baseline_stall:.1f} ms")
+        print(f"batching worker:    {len(texts) / worker_s:8.0f} texts/s, max loop stall {worker_stall:.1f} ms")
+        print(f"batches: {stats['batches']}, avg size {stats['avg_batch_size']:.1f}, "
+              f"queue delay p50 {stats['queue_delay_p50_ms']:.1f} ms / p95 {stats['queue_delay_p95_ms']:.1f} ms")
+        print(f"speedup: {baseline_s / worker_s:.1f}x")
+
+        assert stats["texts"] == len(texts)
+        assert worker_s * 2 < baseline_s
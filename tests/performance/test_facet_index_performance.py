@@ -0,0 +1,79 @@
+"""
+Facet counts on a large catalog
+Счетчики фасетов на большом каталоге
+
+Counts for a search result set (candidate ID list -> slot codes -> bincount)
+and for the whole catalog (incremental counters) compared with aggregating
+payloads of the full collection in Python, which is what building filter
+panels from get_categories()/get_units()-style scans amounts to.
+"""
+import random
+import time
+from collections import Counter
+
+import pytest
+
+from services.facet_index import FacetIndex
+
+CATALOG_SIZE = 200_000
+CANDIDATES = 1000
+FIELDS = ("use_category", "unit", "normalized_color", "supplier_id")
+
+
+def _catalog():
+    rng = random.Random(42)
+    categories = [f"Категория {i}" for i in range(300)]
+    units = ["шт", "кг", "т", "м", "м²", "м³", "мешок", "рулон", "л", "упак"]
+    colors = ["белый", "серый", "черный", "красный", "коричневый", None]
+    return [
+        (str(i), {
+            "use_category": rng.choice(categories), "unit": rng.choice(units),
+            "normalized_color": rng.choice(colors), "supplier_id": rng.randint(1, 50),
+        })
+        for i in range(CATALOG_SIZE)
+    ]
+
+
+def _ms(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+class TestFacetIndexPerformance:
+    """Indexed facet counts vs full-collection aggregation."""
+
+    @pytest.mark.performance
+    def test_facets_on_200k_catalog(self):
+        catalog = _catalog()
+        payloads = dict(catalog)
+
+        start = time.perf_counter()
+        index = FacetIndex()
+        index.add_many(catalog)
+        build_time = time.perf_counter() - start
+
+        candidates = [doc_id for doc_id, _ in random.Random(7).sample(catalog, CANDIDATES)]
+        result_ms, facets = _ms(lambda: index.count_ids(candidates))
+        global_ms, counts = _ms(lambda: index.counts())
+        scan_ms, scanned = _ms(
+            lambda: {field: Counter(str(p[field]) for p in payloads.values() if p[field] is not None)
+                     for field in FIELDS},
+            repeat=2
+        )
+        start = time.perf_counter()
+        for i in range(10_000):
+            index.add(str(i), {**payloads[str(i)], "unit": "шт"})
+        update_us = (time.perf_counter() - start) / 10_000 * 1e6
+
+        print(f"\nFacet index over {CATALOG_SIZE} materials built in {build_time:.2f} s")
+        print(f"result set of {CANDIDATES} IDs: {result_ms:.2f} ms")
+        print(f"whole catalog (incremental counters): {global_ms:.2f} ms")
+        print(f"whole catalog (payload scan): {scan_ms:.1f} ms")
+        print(f"incremental update: {update_us:.1f} us per material")
+
+        assert sum(facets["unit"].values()) == CANDIDATES
+        assert counts["use_category"] == dict(scanned["use_category"].most_common())
+        assert result_ms < scan_ms / 10
+        assert global_ms < scan_ms / 10
@@ -0,0 +1,105 @@
+"""
+Filter pushdown vs over-fetch and Python post-filtering
+Фильтрация в Qdrant против over-fetch и фильтрации в Python
+
+The "post-filter" path is what AdvancedSearchService did: fetch page_size * 5
+candidates, build Material objects and drop the ones failing the category, SKU
+and date filters in Python. The "pushdown" path compiles the same
+MaterialFilterOptions to a Qdrant Filter and asks for page_size rows. With a
+selective filter (2% of the collection) the post-filter path returns a short
+page; filling it takes a x100 over-fetch, while pushdown returns a full page
+from a single query. Local in-memory Qdrant has no payload indexes and checks
+the filter in Python for every point, so its pushdown timing is a worst case;
+the server answers the same Filter from the payload indexes.
+"""
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+from core.schemas.materials import MaterialFilterOptions
+from services.advanced_search import AdvancedSearchService
+from services.materials import MaterialsService, compile_material_filters
+
+VECTOR_SIZE = 128
+POINTS = 5000
+PAGE_SIZE = 20
+QUERIES = 20
+
+
+def _points():
+    points = []
+    for i in range(POINTS):
+        rare = i % 50 == 0  # 2% коллекции
+        points.append({
+            "id": str(uuid.UUID(int=i + 1)),
+            "vector": [((i * 31 + j * 7) % 97) / 97.0 for j in range(VECTOR_SIZE)],
+            "payload": {
+                "name": f"Материал {i}",
+                "use_category": "Гидроизоляция" if rare else "Цемент",
+                "unit": "м²" if rare else "мешок",
+                "sku": f"{'HYD' if rare else 'CEM'}-{i:05d}",
+                "created_at": f"2025-{i % 12 + 1:02d}-01T00:00:00",
+                "updated_at": "2025-06-16T16:46:29",
+            },
+        })
+    return points
+
+
+class TestFilterPushdownPerformance:
+    """Selective filters: full pages from one query instead of short over-fetched ones."""
+
+    @pytest.mark.performance
+    async def test_pushdown_vs_post_filter(self):
+        vector_db = AsyncQdrantVectorDatabase({"location": ":memory:", "collection_name": "materials"})
+        await vector_db.create_collection("materials", VECTOR_SIZE)
+        points = _points()
+        await vector_db.upsert_many("materials", points)
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        advanced = AdvancedSearchService(MagicMock(), MagicMock(), analytics_enabled=False, materials_service=service)
+        filters = MaterialFilterOptions(
+            categories=["Гидроизоляция"], sku_pattern="HYD*", created_after=datetime(2025, 2, 1), min_similarity=0.0,
+        )
+        spec = compile_material_filters(filters)
+        queries = [points[i * 13 + 1]["vector"] for i in range(QUERIES)]
+
+        async def post_filter(query, overfetch=5):
+            results = await vector_db.search("materials", query, limit=PAGE_SIZE * overfetch)
+            candidates = [
+                {"material": service._convert_vector_result_to_material(result), "score": result["score"]}
+                for result in results
+            ]
+            return (await advanced._apply_filters(candidates, filters))[:PAGE_SIZE], len(results)
+
+        async def post_filter_full_page(query):
+            return await post_filter(query, overfetch=100)
+
+        async def pushdown(query):
+            results = await vector_db.search("materials", query, limit=PAGE_SIZE, filter_conditions=spec)
+            return results, len(results)
+
+        stats = {}
+        for name, run in (("post-filter (x5 over-fetch)", post_filter),
+                          ("post-filter (x100 over-fetch)", post_filter_full_page),
+                          ("pushdown", pushdown)):
+            await run(queries[0])  # прогрев
+            rows = fetched = 0
+            start = time.perf_counter()
+            for query in queries:
+                page, count = await run(query)
+                rows += len(page)
+                fetched += count
+            stats[name] = ((time.perf_counter() - start) / QUERIES * 1000, rows / QUERIES, fetched // QUERIES)
+        await vector_db.close()
+
+        print(f"\n{QUERIES} searches, page of {PAGE_SIZE}, filter matches 2% of {POINTS} materials")
+        for name, (ms, rows, fetched) in stats.items():
+            print(f"{name:>29}: {ms:6.2f} ms per search, {fetched:5d} rows fetched, {rows:5.1f} rows per page")
+
+        post, post_full, pushed = stats.values()
+        assert pushed[1] == PAGE_SIZE
+        assert post[1] < PAGE_SIZE / 2
+        assert pushed[2] * 50 < post_full[2]
@@ -0,0 +1,59 @@
+"""
+Fuzzy search latency on a large catalog
+Задержка fuzzy поиска на большом каталоге
+
+Trigram shortlist + rapidfuzz cdist against a 200k material catalog compared
+with the previous approach of scoring every name in Python.
+"""
+import random
+import time
+
+import pytest
+
+from core.background import cpu_tasks
+from services.fuzzy_index import FuzzyIndex
+
+CATALOG_SIZE = 200_000
+QUERIES = ["цемент портландски м500", "кирпичь керамический 250", "гипсокартон влагостойкй 12.5",
+           "профиль направляющий 27x28", "краска фасадная белая 10л"]
+PRODUCTS = ["Цемент портландский М{}", "Кирпич керамический полнотелый {}", "Гипсокартон влагостойкий {} мм",
+            "Профиль направляющий {}x28", "Краска фасадная акриловая {} л", "Плитка керамогранит {}x600",
+            "Утеплитель минеральная вата {} мм", "Саморез по металлу 4.2x{}"]
+
+
+def _catalog():
+    rng = random.Random(42)
+    return [(str(i), rng.choice(PRODUCTS).format(rng.randint(1, 999)), None) for i in range(CATALOG_SIZE)]
+
+
+class TestFuzzyIndexPerformance:
+    """Indexed fuzzy search vs full Python scan."""
+
+    @pytest.mark.performance
+    def test_indexed_search_on_200k_catalog(self):
+        catalog = _catalog()
+
+        start = time.perf_counter()
+        index = FuzzyIndex()
+        index.add_many(catalog)
+        build_time = time.perf_counter() - start
+
+        latencies = []
+        for query in QUERIES * 4:
+            start = time.perf_counter()
+            matches = index.search(query, limit=20, threshold=0.6)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert matches
+        latencies.sort()
+
+        names = [name for _, name, _ in catalog[:20_000]]
+        start = time.perf_counter()
+        cpu_tasks.score_texts(names, QUERIES[0], "sequence_matcher")
+        scan_ms = (time.perf_counter() - start) * 1000 * CATALOG_SIZE / len(names)
+
+        print(f"\nCatalog: {CATALOG_SIZE} materials, index built in {build_time:.1f}s "
+              f"({index.get_stats()['ngrams']} trigrams)")
+        print(f"Indexed fuzzy search: p50 {latencies[len(latencies) // 2]:.1f} ms, max {latencies[-1]:.1f} ms")
+        print(f"Full Python scan (extrapolated): {scan_ms:.0f} ms per query")
+
+        assert latencies[len(latencies) // 2] < 100
@@ -0,0 +1,147 @@
+"""
+Hybrid rate limiter vs Redis round-trip per request
+Гибридный rate limiter против round-trip в Redis на каждый запрос
+
+Redis is fakeredis behind a proxy adding a fixed network round-trip latency
+to every pipeline. Traffic is skewed: one hot client sends half of the
+requests, the rest is spread over many cold clients; requests are spread
+round-robin over several workers (limiter instances sharing one Redis).
+"""
+import asyncio
+import random
+import time
+
+import fakeredis
+import pytest
+
+from core.middleware.hybrid_rate_limiting import HybridRateLimitMiddleware
+from core.middleware.rate_limiting import RateLimitMiddleware
+
+RTT = 0.0005
+REQUESTS = 3000
+WORKERS = 4
+HOT_LIMIT = 100
+COLD_CLIENTS = 300
+
+
+class _SlowPipeline:
+    def __init__(self, pipe, latency):
+        self._pipe = pipe
+        self._latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self._pipe, name)
+
+    async def execute(self):
+        await asyncio.sleep(self._latency)
+        return await self._pipe.execute()
+
+
+class _SlowRedis:
+    def __init__(self, client, latency):
+        self._client = client
+        self._latency = latency
+
+    def pipeline(self, transaction=True):
+        return _SlowPipeline(self._client.pipeline(transaction=transaction), self._latency)
+
+
+async def _endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _traffic():
+    rng = random.Random(7)
+    ips = []
+    for _ in range(REQUESTS):
+        cold = rng.randrange(COLD_CLIENTS)
+        ips.append("10.0.0.1" if rng.random() < 0.5 else f"10.1.{cold // 250}.{cold % 250 + 1}")
+    return ips
+
+
+async def _run(apps, ips):
+    statuses = {}
+    latencies = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    for index, ip in enumerate(ips):
+        scope = {
+            "type": "http", "method": "GET", "path": "/items", "raw_path": b"/items", "query_string": b"",
+            "root_path": "", "scheme": "http", "http_version": "1.1", "server": ("test", 80),
+            "client": (ip, 1234), "headers": [(b"host", b"test")],
+        }
+        status = {}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        start = time.perf_counter()
+        await apps[index % len(apps)](scope, receive, send)
+        latencies.append(time.perf_counter() - start)
+        statuses.setdefault(ip, []).append(status["code"])
+    latencies.sort()
+    return statuses, latencies
+
+
+def _summary(latencies, baseline):
+    mean = sum(latencies) / len(latencies) - baseline
+    return mean * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+class TestHybridRateLimitPerformance:
+    """Per-request overhead and accuracy under skewed clients."""
+
+    @pytest.mark.performance
+    async def test_hybrid_vs_round_trip_per_request(self):
+        ips = _traffic()
+        _, base_latencies = await _run([_endpoint], ips)
+        baseline = sum(base_latencies) / len(base_latencies)
+
+        redis_client = _SlowRedis(fakeredis.FakeAsyncRedis(), RTT)
+        current = []
+        for _ in range(WORKERS):
+            limiter = RateLimitMiddleware(
+                _endpoint, default_requests_per_minute=HOT_LIMIT, default_requests_per_hour=100000,
+                enable_burst_protection=False,
+            )
+            limiter._redis = redis_client
+            current.append(limiter)
+        current_statuses, current_latencies = await _run(current, ips)
+
+        hybrid_redis = _SlowRedis(fakeredis.FakeAsyncRedis(), RTT)
+        hybrid = [
+            HybridRateLimitMiddleware(
+                _endpoint, redis_client=hybrid_redis, default_requests_per_minute=HOT_LIMIT,
+                default_requests_per_hour=100000, enable_burst_protection=False, lease_size=10,
+                endpoint_limits={},
+            )
+            for _ in range(WORKERS)
+        ]
+        hybrid_statuses, hybrid_latencies = await _run(hybrid, ips)
+
+        def admitted(statuses, ip):
+            return statuses[ip].count(200)
+
+        cold = [ip for ip in current_statuses if ip != "10.0.0.1"]
+        current_cold_rejected = sum(len(current_statuses[ip]) - admitted(current_statuses, ip) for ip in cold)
+        hybrid_cold_rejected = sum(len(hybrid_statuses[ip]) - admitted(hybrid_statuses, ip) for ip in cold)
+        leases = sum(limiter.stats["leases"] for limiter in hybrid)
+        current_mean, current_p99 = _summary(current_latencies, baseline)
+        hybrid_mean, hybrid_p99 = _summary(hybrid_latencies, baseline)
+
+        print(f"\n{REQUESTS} requests, {WORKERS} workers, simulated Redis RTT {RTT * 1000:.1f} ms, "
+              f"hot client {len(current_statuses['10.0.0.1'])} requests (limit {HOT_LIMIT}/min), {len(cold)} cold clients")
+        print(f"Current (round-trip per request): overhead {current_mean:.0f} us/req, p99 {current_p99:.0f} us, "
+              f"Redis calls/req 1.00, hot admitted {admitted(current_statuses, '10.0.0.1')}, cold rejected {current_cold_rejected}")
+        print(f"Hybrid (lease 10):                overhead {hybrid_mean:.0f} us/req, p99 {hybrid_p99:.0f} us, "
+              f"Redis calls/req {leases / REQUESTS:.2f}, hot admitted {admitted(hybrid_statuses, '10.0.0.1')}, "
+              f"cold rejected {hybrid_cold_rejected}")
+
+        assert admitted(current_statuses, "10.0.0.1") == HOT_LIMIT
+        assert HOT_LIMIT - WORKERS * 10 <= admitted(hybrid_statuses, "10.0.0.1") <= HOT_LIMIT
+        assert hybrid_cold_rejected == 0
+        assert hybrid_mean < current_mean / 2
@@ -0,0 +1,100 @@
+"""
+Vector-free reads and field projection vs full search results
+Чтение без векторов и проекция полей против полных результатов поиска
+
+Local in-memory Qdrant with 1536-dim materials. The "full" path is what search
+did before: vectors and the whole payload fetched, the vector copied into every
+Material (pydantic validates 1536 floats each) and the response serialized. The
+"default" path skips vectors; "projected" also fetches only name/unit/sku and
+serializes only those fields. Local mode has no network, so the fetched size
+(results as JSON) stands in for the wire transfer from a Qdrant server.
+"""
+import json
+import time
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+from services.materials import MaterialsService, dump_materials, parse_material_fields
+
+VECTOR_SIZE = 1536
+POINTS = 500
+LIMIT = 50
+QUERIES = 30
+
+
+def _points():
+    return [
+        {
+            "id": str(uuid.UUID(int=i + 1)),
+            "vector": [((i * 31 + j * 7) % 97) / 97.0 for j in range(VECTOR_SIZE)],
+            "payload": {
+                "name": f"Цемент М{400 + i % 200} Д{i % 20}",
+                "use_category": "Цемент",
+                "unit": "мешок",
+                "sku": f"CEM-{i:05d}",
+                "description": "Портландцемент для монолитных работ " * 5,
+                "color": "серый",
+                "created_at": "2025-06-16T16:46:29",
+                "updated_at": "2025-06-16T16:46:29",
+            },
+        }
+        for i in range(POINTS)
+    ]
+
+
+async def _run(service, vector_db, queries, fields=None, with_vectors=False):
+    projection = service._projection(fields, with_vectors)
+    fetch = convert = serialize = 0.0
+    fetched_bytes = response_bytes = 0
+    for query in queries:
+        start = time.perf_counter()
+        results = await vector_db.search("materials", query, limit=LIMIT, **projection)
+        fetch += time.perf_counter() - start
+        fetched_bytes += len(json.dumps(results, ensure_ascii=False).encode())
+
+        start = time.perf_counter()
+        materials = [service._convert_vector_result_to_material(result) for result in results]
+        convert += time.perf_counter() - start
+
+        start = time.perf_counter()
+        body = json.dumps(dump_materials(materials, fields), ensure_ascii=False).encode()
+        serialize += time.perf_counter() - start
+        response_bytes += len(body)
+    count = len(queries)
+    return (fetch / count * 1000, fetched_bytes // count,
+            convert / count * 1000, serialize / count * 1000, response_bytes // count)
+
+
+class TestMaterialProjectionPerformance:
+    """Search responses without vectors and unused payload keys."""
+
+    @pytest.mark.performance
+    async def test_projection_vs_full_results(self):
+        vector_db = AsyncQdrantVectorDatabase({"location": ":memory:", "collection_name": "materials"})
+        await vector_db.create_collection("materials", VECTOR_SIZE)
+        points = _points()
+        await vector_db.upsert_many("materials", points)
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        queries = [points[i * 7]["vector"] for i in range(QUERIES)]
+
+        await _run(service, vector_db, queries[:3], with_vectors=True)  # прогрев
+        results = {
+            "full (vectors)": await _run(service, vector_db, queries, with_vectors=True),
+            "default (no vectors)": await _run(service, vector_db, queries),
+            "projected name,unit,sku": await _run(service, vector_db, queries, parse_material_fields("name,unit,sku")),
+        }
+        await vector_db.close()
+
+        print(f"\n{QUERIES} searches, top {LIMIT} of {POINTS} materials ({VECTOR_SIZE}-dim)")
+        for name, (fetch, fetched, convert, serialize, size) in results.items():
+            print(f"{name:>24}: fetch {fetch:6.2f} ms ({fetched:6d} B), Material {convert:6.2f} ms, "
+                  f"serialize {serialize:5.2f} ms, response {size:6d} B")
+
+        full, default, projected = results.values()
+        assert default[1] < full[1] / 10
+        assert projected[1] < default[1] / 2
+        assert default[2] < full[2] / 3
+        assert projected[4] < default[4] / 2
@@ -0,0 +1,130 @@
+"""
+Fused pure-ASGI pipeline vs stacked BaseHTTPMiddleware layers
+Единый pure ASGI пайплайн против стека BaseHTTPMiddleware
+
+Framework overhead per request on a no-op endpoint: the same application
+without middleware, with the stacked layers (logging, body cache, compression,
+security, hybrid rate limit) and with the fused pipeline. Both stacks are built
+by MiddlewareFactory from the same settings; Redis is fakeredis.
+"""
+import asyncio
+import logging
+import time
+
+import fakeredis
+import pytest
+from fastapi import FastAPI
+
+from core.config import get_settings
+from core.middleware.factory import MiddlewareFactory
+
+REQUESTS = 2000
+WARMUP = 200
+
+
+def _noop_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/noop")
+    async def noop():
+        return {"ok": True}
+
+    return app
+
+
+def _with_middleware(mode: str) -> FastAPI:
+    settings = get_settings().model_copy(update={
+        "MIDDLEWARE_PIPELINE": mode,
+        "ENABLE_RATE_LIMITING": True,
+        "RATE_LIMIT_MODE": "hybrid",
+        "RATE_LIMIT_RPM": 10 ** 6,
+        "RATE_LIMIT_RPH": 10 ** 7,
+        "RATE_LIMIT_BURST": 10 ** 6,
+        "RATE_LIMIT_LEASE_SIZE": 1000,
+    })
+    app = _noop_app()
+    redis_client = fakeredis.FakeAsyncRedis()
+    for middleware_class, config in reversed(MiddlewareFactory(settings).create_middleware_stack()):
+        config = dict(config or {})
+        if "default_requests_per_minute" in config:
+            config["redis_client"] = redis_client
+        if config.get("rate_limit"):
+            config["rate_limit"] = {**config["rate_limit"], "redis_client": redis_client}
+        app.add_middleware(middleware_class, **config)
+    return app
+
+
+async def _run(app, count: int):
+    scope_template = {
+        "type": "http", "method": "GET", "path": "/api/v1/noop", "raw_path": b"/api/v1/noop",
+        "query_string": b"", "root_path": "", "scheme": "http", "http_version": "1.1",
+        "server": ("test", 80), "client": ("10.0.0.1", 1234),
+        "headers": [(b"host", b"test"), (b"accept-encoding", b"gzip"), (b"user-agent", b"perf")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    latencies = []
+    for _ in range(count):
+        status = {}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        start = time.perf_counter()
+        await app(dict(scope_template), receive, send)
+        latencies.append(time.perf_counter() - start)
+        assert status["code"] == 200
+    latencies.sort()
+    return latencies
+
+
+class TestMiddlewarePipelinePerformance:
+    """Per-request framework overhead on a no-op endpoint."""
+
+    @pytest.mark.performance
+    async def test_fused_vs_stacked_overhead(self):
+        apps = {"bare": _noop_app(), "stack": _with_middleware("stack"), "fused": _with_middleware("fused")}
+        results = {}
+        tasks = {}
+        loop = asyncio.get_running_loop()
+        default_factory = loop.get_task_factory()
+        # Накладные расходы фреймворка без вывода access log
+        request_logger = logging.getLogger("request")
+        level = request_logger.level
+        request_logger.setLevel(logging.WARNING)
+        try:
+            for name, app in apps.items():
+                await _run(app, WARMUP)
+                created = 0
+
+                def counting_factory(loop, coro, **kwargs):
+                    nonlocal created
+                    created += 1
+                    return asyncio.Task(coro, loop=loop, **kwargs)
+
+                loop.set_task_factory(counting_factory)
+                try:
+                    latencies = await _run(app, REQUESTS)
+                finally:
+                    loop.set_task_factory(default_factory)
+                tasks[name] = created / REQUESTS
+                results[name] = (sum(latencies) / len(latencies) * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6)
+        finally:
+            request_logger.setLevel(level)
+
+        bare_mean = results["bare"][0]
+        print(f"\n{REQUESTS} requests to a no-op endpoint")
+        for name in ("bare", "stack", "fused"):
+            mean, p99 = results[name]
+            print(f"{name:>5}: {mean:7.0f} us/req (overhead {mean - bare_mean:6.0f} us), p99 {p99:6.0f} us, "
+                  f"tasks/req {tasks[name]:.2f}")
+
+        stack_overhead = results["stack"][0] - bare_mean
+        fused_overhead = results["fused"][0] - bare_mean
+        # Фоновая аренда квоты rate limiter - одна задача на lease_size запросов
+        assert tasks["fused"] < 0.01
+        assert tasks["stack"] > tasks["fused"]
+        assert fused_overhead < stack_overhead / 2
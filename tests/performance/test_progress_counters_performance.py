@@ -0,0 +1,77 @@
+"""
+Progress and statistics latency vs number of processed records
+Время ответа прогресса и статистики в зависимости от числа обработанных записей
+
+Record scan (как в QdrantVectorDatabase.get_processing_progress / statistics)
+grows with every job ever run; incremental counters answer in constant time.
+"""
+import time
+
+import fakeredis
+import pytest
+
+from core.background.progress_counters import InMemoryProgressCounters, RedisProgressCounters
+
+JOB_SIZE = 100
+HISTORY_SIZES = (100, 1000)
+QUERIES = 200
+
+
+def _scan_progress(records, request_id):
+    counts = {"completed": 0, "failed": 0, "pending": 0}
+    batch = [payload for payload in records if payload["request_id"] == request_id]
+    for payload in batch:
+        status = payload["status"]
+        counts[status if status in counts else "pending"] += 1
+    return {"total": len(batch), **counts}
+
+
+async def _fill(counters, jobs):
+    records = []
+    for job in range(jobs):
+        request_id = f"req-{job}"
+        statuses = {f"{request_id}-m{i}": "completed" for i in range(JOB_SIZE)}
+        await counters.rebuild_request(request_id, statuses)
+        records += [{"request_id": request_id, "material_id": m, "status": s} for m, s in statuses.items()]
+    await counters.set_global({"batches": jobs, "records": len(records), "completed": len(records)})
+    return records
+
+
+async def _time_async(call, *args):
+    start = time.perf_counter()
+    for _ in range(QUERIES):
+        await call(*args)
+    return (time.perf_counter() - start) / QUERIES * 1000
+
+
+class TestProgressCountersPerformance:
+    """Scan cost grows with history, counter cost does not."""
+
+    @pytest.mark.performance
+    async def test_progress_constant_time(self):
+        print(f"\nJob size {JOB_SIZE} materials, mean over {QUERIES} queries (ms)")
+        print(f"{'jobs':>6} {'records':>8} {'scan':>9} {'memory':>9} {'redis':>9}")
+
+        memory_times = []
+        scan_times = []
+        for jobs in HISTORY_SIZES:
+            memory = InMemoryProgressCounters()
+            redis_counters = RedisProgressCounters(fakeredis.FakeAsyncRedis(decode_responses=True))
+            records = await _fill(memory, jobs)
+            await _fill(redis_counters, jobs)
+
+            start = time.perf_counter()
+            for _ in range(QUERIES):
+                _scan_progress(records, "req-0")
+            scan_ms = (time.perf_counter() - start) / QUERIES * 1000
+            memory_ms = await _time_async(memory.get_progress, "req-0")
+            redis_ms = await _time_async(redis_counters.get_progress, "req-0")
+
+            assert await memory.get_progress("req-0") == _scan_progress(records, "req-0")
+            assert await redis_counters.get_progress("req-0") == _scan_progress(records, "req-0")
+            scan_times.append(scan_ms)
+            memory_times.append(memory_ms)
+            print(f"{jobs:>6} {len(records):>8} {scan_ms:>9.3f} {memory_ms:>9.4f} {redis_ms:>9.4f}")
+
+        assert scan_times[-1] > scan_times[0] * 5
+        assert memory_times[-1] < memory_times[0] * 5
@@ -0,0 +1,103 @@
+"""
+Performance comparison of thread-wrapped and native async Qdrant adapters
+Сравнение производительности sync (asyncio.to_thread) и async адаптеров Qdrant
+
+Both adapters run against a local in-memory Qdrant stand-in that adds a fixed
+round-trip latency to each search, so the benchmark measures how many requests
+each adapter keeps in flight rather than raw in-process search speed.
+"""
+import asyncio
+import time
+import uuid
+from unittest.mock import patch
+
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from core.database.adapters.qdrant_adapter import QdrantVectorDatabase
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+
+VECTOR_SIZE = 64
+POINTS = 2000
+CONCURRENT_REQUESTS = 200
+ROUND_TRIP_SECONDS = 0.01
+
+
+def _vector(seed: int):
+    return [float((seed * 7 + i) % 13) + 1.0 for i in range(VECTOR_SIZE)]
+
+
+def _points():
+    return [
+        PointStruct(id=str(uuid.UUID(int=i + 1)), vector=_vector(i), payload={"name": f"m{i}"})
+        for i in range(POINTS)
+    ]
+
+
+class LatentSyncClient:
+    """In-memory sync client with simulated network latency."""
+
+    def __init__(self, *args, **kwargs):
+        self._client = QdrantClient(location=":memory:")
+        self._client.create_collection(
+            "materials", vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE)
+        )
+        self._client.upsert("materials", points=_points())
+
+    def query_points(self, *args, **kwargs):
+        time.sleep(ROUND_TRIP_SECONDS)
+        return self._client.query_points(*args, **kwargs)
+
+
+class LatentAsyncClient:
+    """In-memory async client with simulated network latency."""
+
+    def __init__(self):
+        self._client = AsyncQdrantClient(location=":memory:")
+
+    async def prepare(self):
+        await self._client.create_collection(
+            "materials", vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE)
+        )
+        await self._client.upsert("materials", points=_points())
+
+    async def query_points(self, *args, **kwargs):
+        await asyncio.sleep(ROUND_TRIP_SECONDS)
+        return await self._client.query_points(*args, **kwargs)
+
+
+async def _measure_qps(vector_db) -> float:
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        vector_db.search("materials", _vector(i), limit=10)
+        for i in range(CONCURRENT_REQUESTS)
+    ])
+    duration = time.perf_counter() - start
+
+    assert all(len(result) == 10 for result in results)
+    return CONCURRENT_REQUESTS / duration
+
+
+class TestQdrantAdapterConcurrency:
+    """Search QPS under 200 concurrent requests."""
+
+    @pytest.mark.performance
+    async def test_async_adapter_search_qps(self):
+        """Native async adapter is not capped by the default thread pool."""
+        with patch("core.database.adapters.qdrant_adapter.QdrantClient", LatentSyncClient):
+            sync_db = QdrantVectorDatabase({"url": "http://stand-in:6333", "vector_size": VECTOR_SIZE})
+
+        async_db = AsyncQdrantVectorDatabase({"location": ":memory:", "vector_size": VECTOR_SIZE})
+        latent_client = LatentAsyncClient()
+        await latent_client.prepare()
+        async_db.client = latent_client
+
+        sync_qps = await _measure_qps(sync_db)
+        async_qps = await _measure_qps(async_db)
+
+        print(f"Thread-wrapped adapter: {sync_qps:.0f} QPS")
+        print(f"Native async adapter: {async_qps:.0f} QPS")
+        print(f"Speedup: {async_qps / sync_qps:.1f}x at {CONCURRENT_REQUESTS} concurrent requests")
+
+        assert async_qps > sync_qps
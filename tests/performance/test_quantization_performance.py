@@ -0,0 +1,147 @@
+"""
+Recall vs latency of quantized collection profiles at catalog size
+Recall и задержка профилей с квантизацией на размере реального каталога
+
+200 000 materials with 1536-dim embeddings, clustered like product families
+(neighbours at cosine ~0.8). Local in-memory Qdrant keeps every vector as a
+Python list and ignores quantization, so the stand-in models what the server
+does per query with numpy: scan the quantized vectors (int8 codes or packed
+sign bits with XOR + popcount), keep ``oversampling * limit`` candidates and
+re-score them with the original float32 vectors. Recall@10 is measured
+against the exact float32 top 10; RAM is ``CollectionProfile.estimate_memory``.
+Timings are numpy brute-force scans (the int8 scan converts codes to float32
+in chunks, so it is not faster than float32 here; Qdrant scans int8 with SIMD
+and reads 4x less memory). The recall/oversampling trade-off and the memory
+savings are the numbers to compare: int8 reaches recall ~0.99 at x2, binary
+only at x8 (x3 gives ~0.67 here), hence the profile defaults.
+"""
+import time
+
+import numpy as np
+import pytest
+
+from core.database.collection_profiles import get_collection_profile
+
+CATALOG_SIZE = 200_000
+VECTOR_SIZE = 1536
+CLUSTERS = 2000
+CHUNK = 20_000
+QUERIES = 30
+LIMIT = 10
+
+
+def _catalog(rng):
+    """Normalized float32 embeddings: cluster center + noise, generated in chunks."""
+    centers = rng.standard_normal((CLUSTERS, VECTOR_SIZE), dtype=np.float32)
+    vectors = np.empty((CATALOG_SIZE, VECTOR_SIZE), dtype=np.float32)
+    for start in range(0, CATALOG_SIZE, CHUNK):
+        chunk = vectors[start:start + CHUNK]
+        chunk[:] = centers[rng.integers(0, CLUSTERS, len(chunk))]
+        chunk += 0.75 * rng.standard_normal(chunk.shape, dtype=np.float32)
+        chunk /= np.linalg.norm(chunk, axis=1, keepdims=True)
+    return vectors
+
+
+def _top(scores, count):
+    if count >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, count)[:count]
+    return top[np.argsort(-scores[top])]
+
+
+class ScalarIndex:
+    """int8 scalar quantization: values clipped to the 0.99 quantile, 256 levels."""
+
+    def __init__(self, vectors, quantile=0.99):
+        sample = vectors[::50].ravel()
+        self.low, high = np.quantile(sample, [(1 - quantile) / 2, (1 + quantile) / 2])
+        self.step = (high - self.low) / 255
+        self.codes = np.empty(vectors.shape, dtype=np.uint8)
+        for start in range(0, len(vectors), CHUNK):
+            self.codes[start:start + CHUNK] = self._quantize(vectors[start:start + CHUNK])
+        # dot(x, q) ~ step^2 * (u_x . u_q) + low * step * (sum u_x + sum u_q) + const
+        self.row_terms = self.codes.sum(axis=1, dtype=np.float32) * (self.low / self.step)
+
+    def _quantize(self, values):
+        return np.clip(np.rint((values - self.low) / self.step), 0, 255).astype(np.uint8)
+
+    def scores(self, query):
+        query_codes = self._quantize(query).astype(np.float32)
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), CHUNK):
+            scores[start:start + CHUNK] = self.codes[start:start + CHUNK].astype(np.float32) @ query_codes
+        return scores + self.row_terms
+
+
+class BinaryIndex:
+    """Binary quantization: one sign bit per dimension, score = matching bits."""
+
+    def __init__(self, vectors):
+        self.codes = np.packbits(vectors > 0, axis=1).view(np.uint64)
+
+    def scores(self, query):
+        query_code = np.packbits(query > 0).view(np.uint64)
+        return -np.bitwise_count(self.codes ^ query_code).sum(axis=1, dtype=np.int32)
+
+
+def _search(vectors, index, query, oversampling, rescore):
+    candidates = _top(index.scores(query), int(LIMIT * oversampling))
+    if not rescore:
+        return candidates[:LIMIT]
+    exact = vectors[candidates] @ query
+    return candidates[_top(exact, LIMIT)]
+
+
+def _measure(search, queries, truth):
+    search(queries[0])  # прогрев
+    found, start = 0, time.perf_counter()
+    for query, expected in zip(queries, truth):
+        found += len(np.intersect1d(search(query), expected))
+    return (time.perf_counter() - start) / len(queries) * 1000, found / (len(queries) * LIMIT)
+
+
+class TestQuantizationPerformance:
+    """int8 and binary profiles: recall@10 after rescoring vs RAM and scan time."""
+
+    @pytest.mark.performance
+    def test_recall_vs_latency(self):
+        rng = np.random.default_rng(42)
+        start = time.perf_counter()
+        vectors = _catalog(rng)
+        queries = vectors[rng.choice(CATALOG_SIZE, QUERIES, replace=False)]
+        queries = queries + 0.5 * rng.standard_normal(queries.shape, dtype=np.float32) / np.sqrt(VECTOR_SIZE)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        exact_scores = vectors @ queries.T
+        truth = [_top(exact_scores[:, i], LIMIT) for i in range(QUERIES)]
+        del exact_scores
+        scalar, binary = ScalarIndex(vectors), BinaryIndex(vectors)
+        print(f"\nCatalog {CATALOG_SIZE} x {VECTOR_SIZE} prepared in {time.perf_counter() - start:.1f} s")
+
+        runs = {"float32 exact": ("float32", lambda q: _top(vectors @ q, LIMIT))}
+        sweeps = (
+            ("int8", scalar, ((1.0, False), (2.0, True), (3.0, True))),
+            ("binary", binary, ((1.0, False), (2.0, True), (3.0, True), (5.0, True), (8.0, True))),
+        )
+        for profile, index, settings in sweeps:
+            for oversampling, rescore in settings:
+                label = f"{profile} x{oversampling:g}{' rescore' if rescore else ''}"
+                runs[label] = (profile, lambda q, i=index, o=oversampling, r=rescore: _search(vectors, i, q, o, r))
+
+        stats = {}
+        for label, (profile, search) in runs.items():
+            ms, recall = _measure(search, queries, truth)
+            memory = get_collection_profile(profile).estimate_memory(CATALOG_SIZE, VECTOR_SIZE)
+            stats[label] = (ms, recall, memory["ram_bytes"] / 2**20, memory["disk_bytes"] / 2**20)
+
+        print(f"{QUERIES} queries, top {LIMIT}; RAM/disk = vectors + HNSW graph per profile")
+        for label, (ms, recall, ram, disk) in stats.items():
+            print(f"{label:>22}: {ms:7.1f} ms, recall@{LIMIT} {recall:5.3f}, RAM {ram:6.0f} MB, disk {disk:6.0f} MB")
+
+        # Параметры поиска профилей по умолчанию
+        int8, binary = (stats[f"{name} x{get_collection_profile(name).oversampling:g} rescore"]
+                        for name in ("int8", "binary"))
+        float32 = stats["float32 exact"]
+        assert int8[1] >= 0.95 and binary[1] >= 0.95
+        assert binary[1] > stats["binary x1"][1] + 0.3
+        assert int8[2] < float32[2] / 3
+        assert binary[2] < float32[2] / 10
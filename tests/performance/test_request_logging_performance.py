@@ -0,0 +1,108 @@
+"""
+Request logging overhead: rich per-request logging vs tail-sampled JSON lines
+Накладные расходы логирования запросов: подробный лог каждого запроса против выборки и готовых JSON строк
+
+One second of traffic at 2k RPS (1% server errors). The current path does what
+RequestLoggingMiddleware does per request: copies headers, parses request and
+response bodies, masks headers and formats two records through the request
+logger. The sampled path hands references to SampledRequestLogger, which keeps
+errors and slow requests plus a 10% sample and queues pre-encoded lines for the
+batch worker. Both write to in-memory streams.
+"""
+import io
+import json
+import logging
+import random
+import time
+
+import pytest
+
+from core.logging.optimized.async_logging import BatchProcessor, LoggingQueue
+from core.logging.specialized.http import AsyncRequestLogger, SampledRequestLogger, TailSampler
+
+RPS = 2000
+HEADERS = [
+    ("host", "api.example.com"), ("user-agent", "Mozilla/5.0"), ("accept", "application/json"),
+    ("accept-encoding", "gzip, br"), ("content-type", "application/json"), ("authorization", "Bearer token"),
+    ("x-api-key", "secret"), ("x-forwarded-for", "203.0.113.5"), ("x-correlation-id", "c-1"), ("cookie", "a=b"),
+]
+REQUEST_BODY = json.dumps({"name": "Цемент М500 Д0", "unit": "мешок", "items": list(range(150))}, ensure_ascii=False).encode()
+RESPONSE_BODY = json.dumps({"id": "m-1", "results": [{"name": "Цемент", "score": 0.97}] * 40}, ensure_ascii=False).encode()
+
+
+def _statuses():
+    rng = random.Random(3)
+    return [500 if rng.random() < 0.01 else 200 for _ in range(RPS)]
+
+
+def _logger_to(name: str, stream: io.StringIO, level: int) -> None:
+    logger = logging.getLogger(name)
+    logger.handlers = [logging.StreamHandler(stream)]
+    logger.propagate = False
+    logger.setLevel(level)
+
+
+async def _current_path(level: int) -> float:
+    _logger_to("bench.rich", io.StringIO(), level)
+    request_logger = AsyncRequestLogger("bench.rich", level=level)
+    start = time.perf_counter()
+    for status_code in _statuses():
+        headers = dict(HEADERS)
+        context = await request_logger.alog_incoming_request(
+            method="POST", path="/api/v1/materials/m-1", request_headers=headers,
+            request_body=json.loads(REQUEST_BODY), query_params={}, client_host="10.0.0.1", correlation_id="c-1",
+        )
+        context["correlation_id"] = "c-1"
+        await request_logger.alog_incoming_response(
+            request_context=context, status_code=status_code,
+            response_headers={"content-type": "application/json", "content-length": str(len(RESPONSE_BODY))},
+            response_body=json.loads(RESPONSE_BODY),
+        )
+    return time.perf_counter() - start
+
+
+async def _sampled_path(level: int):
+    stream = io.BytesIO()
+    _logger_to("bench.sampled", io.StringIO(), level)
+    processor = BatchProcessor(queue=LoggingQueue(max_size=10000), encoded_stream=stream, flush_interval=10.0)
+    request_logger = SampledRequestLogger(
+        "bench.sampled", sampler=TailSampler(sample_rate=0.1, random_func=random.Random(5).random),
+        processor=processor,
+    )
+    await request_logger.start()
+    start = time.perf_counter()
+    for status_code in _statuses():
+        request_logger.log(
+            "POST", "/api/v1/materials/{material_id}", status_code, 4.2, correlation_id="c-1",
+            client_ip="10.0.0.1", path="/api/v1/materials/m-1", response_bytes=len(RESPONSE_BODY),
+            request_body=REQUEST_BODY, response_body=RESPONSE_BODY,
+        )
+    request_path = time.perf_counter() - start
+    start = time.perf_counter()
+    await request_logger.stop()
+    worker = time.perf_counter() - start
+    return request_path, worker, request_logger.get_stats(), len(stream.getvalue().splitlines())
+
+
+class TestRequestLoggingPerformance:
+    """Logging cost of one second of 2k RPS traffic."""
+
+    @pytest.mark.performance
+    async def test_sampled_vs_rich_logging(self):
+        await _current_path(logging.INFO)  # прогрев
+        current_info = await _current_path(logging.INFO)
+        current_filtered = await _current_path(logging.ERROR)
+        sampled_info, worker, stats, lines = await _sampled_path(logging.INFO)
+        sampled_filtered, _, _, _ = await _sampled_path(logging.CRITICAL)
+
+        print(f"\n{RPS} requests (1 s at {RPS} RPS), 1% server errors")
+        print(f"Current (rich, every request): {current_info * 1000:7.1f} ms/s  "
+              f"{current_info / RPS * 1e6:6.1f} us/req; level filtered: {current_filtered / RPS * 1e6:6.1f} us/req")
+        print(f"Sampled (tail 10%, JSON lines): {sampled_info * 1000:7.1f} ms/s  "
+              f"{sampled_info / RPS * 1e6:6.1f} us/req; level filtered: {sampled_filtered / RPS * 1e6:6.1f} us/req; "
+              f"batch writer {worker * 1000:.1f} ms, kept {stats['kept']} (errors {stats['error']}), lines {lines}")
+
+        assert lines == stats["kept"]
+        assert stats["error"] == _statuses().count(500)
+        assert sampled_info < current_info / 5
+        assert sampled_filtered < current_filtered / 5
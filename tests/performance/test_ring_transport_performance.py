@@ -0,0 +1,107 @@
+"""
+Ring buffer log transport vs the asyncio logging queue
+Кольцевой буфер логов с потоком записи против asyncio очереди логов
+
+Hot path cost of emitting one record: a bare deque.append of a tuple (the
+floor), RingBufferTransport.emit with the writer idle and running (the writer
+serializes on the same GIL, so its share shows up in the producer's wall time)
+and BatchProcessor.process_sync. Then end to end: 100k records emitted from the
+event loop and written by the writer thread, and LoggingQueue drained in
+batches on a deque vs the old list drained with pop(0).
+"""
+import asyncio
+import io
+import logging
+import time
+from collections import deque
+
+import pytest
+
+from core.logging.optimized.async_logging import (
+    BatchProcessor,
+    LoggingQueue,
+    RingBufferTransport,
+)
+
+RECORDS = 100_000
+
+
+def _per_call_ns(func, count: int = RECORDS) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        func(i)
+    return (time.perf_counter() - start) / count * 1e9
+
+
+class _PopFrontList(list):
+    def popleft(self):
+        return self.pop(0)
+
+
+class _ListQueue(LoggingQueue):
+    """LoggingQueue as it was: a list drained with pop(0)."""
+
+    def __init__(self, max_size: int):
+        super().__init__(max_size)
+        self._queue = _PopFrontList()
+
+
+class TestRingTransportPerformance:
+    """Emitting a log line should cost about as much as appending a tuple."""
+
+    @pytest.mark.performance
+    async def test_emit_cost_and_throughput(self):
+        floor = deque()
+        now = time.time()
+        results = {"deque.append(tuple)": _per_call_ns(lambda i: floor.append((now, "INFO", "app", "line", None)))}
+
+        transport = RingBufferTransport(io.BytesIO(), capacity=RECORDS * 2, batch_size=1000)
+        results["transport.emit(tuple), writer idle"] = _per_call_ns(
+            lambda i: transport.emit((now, "INFO", "app", "line", None))
+        )
+        transport = RingBufferTransport(io.BytesIO(), capacity=RECORDS * 2, batch_size=1000)
+        transport.start()
+        results["transport.emit(tuple), writer running"] = _per_call_ns(
+            lambda i: transport.emit((now, "INFO", "app", "line", None))
+        )
+        transport.stop()
+
+        processor = BatchProcessor(queue=LoggingQueue(max_size=RECORDS * 2))
+        results["BatchProcessor.process_sync(dict)"] = _per_call_ns(
+            lambda i: processor.process_sync({"level": logging.INFO, "message": "line", "args": ()})
+        )
+
+        # Сквозная запись: выдача из event loop + фоновая запись всех записей
+        stream = io.BytesIO()
+        transport = RingBufferTransport(stream, capacity=RECORDS * 2, batch_size=1000, flush_interval=0.01)
+        transport.start()
+        start = time.perf_counter()
+        for i in range(RECORDS):
+            transport.emit((now, "INFO", "app", "line", {"n": i}))
+        ring_emit = time.perf_counter() - start
+        await asyncio.to_thread(transport.stop)
+        ring_total = time.perf_counter() - start
+        stats = transport.get_stats()
+
+        drained = {}
+        for name, queue in (("LoggingQueue (deque)", LoggingQueue(RECORDS * 2)),
+                            ("LoggingQueue (list)", _ListQueue(RECORDS * 2))):
+            for i in range(RECORDS):
+                queue.put_nowait({"n": i})
+            start = time.perf_counter()
+            while queue.size():
+                await queue.get_batch(100)
+            drained[name] = time.perf_counter() - start
+
+        print(f"\nPer record emit cost ({RECORDS} records)")
+        for name, ns in results.items():
+            print(f"{name:>40}: {ns:7.0f} ns")
+        print(f"Ring transport end to end: emit {ring_emit * 1000:.1f} ms, written {stats['written']} lines "
+              f"in {stats['writes']} writes, total {ring_total * 1000:.1f} ms")
+        for name, seconds in drained.items():
+            print(f"{name:>24} drain in batches of 100: {seconds * 1000:.1f} ms")
+
+        assert stats["written"] == RECORDS and stats["dropped"] == 0
+        assert stats["writes"] <= RECORDS / 1000 * 2
+        assert results["transport.emit(tuple), writer idle"] < results["deque.append(tuple)"] * 3
+        assert drained["LoggingQueue (deque)"] < drained["LoggingQueue (list)"]
@@ -0,0 +1,75 @@
+"""
+Staged pipeline throughput with simulated stage latencies
+Пропускная способность поэтапного пайплайна с имитацией задержек этапов
+
+Each external resource costs a fixed latency per call (LLM parse per item,
+embedding / vector search / upsert per request regardless of batch size).
+Per-item end-to-end processing under one semaphore pays every latency for
+every material; the staged pipeline pays the batched ones once per micro-batch.
+"""
+import asyncio
+import time
+
+import pytest
+
+from core.background.staged_pipeline import PipelineStage, StagedPipeline
+
+MATERIALS = 200
+WORKERS = 10
+LATENCY = {"parse": 0.02, "embed": 0.05, "sku": 0.03, "save": 0.02}
+
+
+def _stage(name):
+    async def handler(items):
+        await asyncio.sleep(LATENCY[name])
+        return items
+    return handler
+
+
+async def _per_item():
+    semaphore = asyncio.Semaphore(WORKERS)
+
+    async def process(item):
+        async with semaphore:
+            for name in LATENCY:
+                await _stage(name)([item])
+
+    await asyncio.gather(*[process(i) for i in range(MATERIALS)])
+
+
+async def _staged():
+    pipeline = StagedPipeline([
+        PipelineStage("parse", _stage("parse"), concurrency=WORKERS),
+        PipelineStage("embed", _stage("embed"), concurrency=2, batch_size=64, batch_timeout=0.01),
+        PipelineStage("sku", _stage("sku"), concurrency=2, batch_size=64, batch_timeout=0.01),
+        PipelineStage("save", _stage("save"), batch_size=100, batch_timeout=0.01),
+    ])
+    first_result = None
+    start = time.perf_counter()
+    async for _ in pipeline.stream(range(MATERIALS)):
+        if first_result is None:
+            first_result = time.perf_counter() - start
+    return first_result, pipeline.get_stats()
+
+
+class TestStagedPipelinePerformance:
+    """Per-item vs staged batch processing."""
+
+    @pytest.mark.performance
+    async def test_staged_throughput(self):
+        start = time.perf_counter()
+        await _per_item()
+        per_item_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        first_result, stats = await _staged()
+        staged_time = time.perf_counter() - start
+
+        print(f"\n{MATERIALS} materials, {WORKERS} workers, stage latencies {LATENCY}")
+        print(f"Per-item end-to-end: {per_item_time:.2f}s ({MATERIALS / per_item_time:.0f} materials/s)")
+        print(f"Staged pipeline:     {staged_time:.2f}s ({MATERIALS / staged_time:.0f} materials/s), "
+              f"first result after {first_result * 1000:.0f} ms")
+        for name, stage in stats.items():
+            print(f"  {name:<6} batches={stage['batches']:<4.0f} avg_batch={stage['avg_batch_size']:.1f}")
+
+        assert staged_time < per_item_time / 2
@@ -0,0 +1,106 @@
+"""
+Application startup time budget
+Бюджет времени старта приложения
+
+Each measurement runs in a fresh interpreter, as a new worker or an autoscaled
+replica would:
+
+- ``python -X importtime -c "import main"``: the report is parsed and the
+  slowest imports are printed;
+- time-to-first-request: interpreter start -> ``import main`` -> first
+  ``GET /api/v1/health`` through the ASGI app.
+
+Deployments load only the configured adapter and AI provider. pandas is loaded
+only by the price routes. The budgets catch regressions where a module-level
+import drags an unused client library back into startup. Override them with
+STARTUP_IMPORT_BUDGET_S / STARTUP_FIRST_REQUEST_BUDGET_S on slow CI runners.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+RUNS = 3
+IMPORT_BUDGET_S = float(os.getenv("STARTUP_IMPORT_BUDGET_S", "3.0"))
+FIRST_REQUEST_BUDGET_S = float(os.getenv("STARTUP_FIRST_REQUEST_BUDGET_S", "4.0"))
+
+# Библиотеки, которые не должны загружаться при старте (Qdrant + OpenAI по умолчанию)
+LAZY_MODULES = ("pandas", "openai", "weaviate", "pinecone", "sentence_transformers")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+FIRST_REQUEST_SCRIPT = """
+import asyncio, json, sys, time
+import httpx
+import main
+
+async def first_request():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/api/v1/health")
+
+response = asyncio.run(first_request())
+print(json.dumps({
+    "status": response.status_code,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def _run(*args):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_ROOT, env=os.environ.copy(),
+        capture_output=True, text=True, timeout=120
+    )
+    elapsed = time.perf_counter() - start
+    assert result.returncode == 0, result.stderr[-2000:]
+    return elapsed, result
+
+
+def _importtime_report(stderr):
+    """Imported modules -> (nesting depth, cumulative seconds)."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            modules[name] = ((len(indent) - 1) // 2, int(cumulative) / 1e6)
+    return modules
+
+
+class TestStartupTime:
+    """Import budget and time-to-first-request of a fresh worker."""
+
+    @pytest.mark.performance
+    def test_import_time_budget(self):
+        reports = [_importtime_report(_run("-X", "importtime", "-c", "import main")[1].stderr) for _ in range(RUNS)]
+        report = min(reports, key=lambda modules: modules["main"][1])
+        total = report["main"][1]
+        direct = [(name, seconds) for name, (depth, seconds) in report.items() if depth == 1]
+
+        print(f"\nimport main: {total:.2f} s (best of {RUNS}, budget {IMPORT_BUDGET_S:.1f} s)")
+        for name, seconds in sorted(direct, key=lambda item: -item[1])[:10]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+        assert not {name.split(".")[0] for name in report} & set(LAZY_MODULES)
+        assert total < IMPORT_BUDGET_S
+
+    @pytest.mark.performance
+    def test_time_to_first_request(self):
+        runs = [_run("-c", FIRST_REQUEST_SCRIPT) for _ in range(RUNS)]
+        elapsed, result = min(runs, key=lambda run: run[0])
+        outcome = json.loads(result.stdout.strip().splitlines()[-1])
+
+        print(f"\ntime to first request: {elapsed:.2f} s (best of {RUNS}, budget {FIRST_REQUEST_BUDGET_S:.1f} s)")
+        print(f"lazy modules loaded: {outcome['loaded'] or 'none'}")
+
+        assert outcome["status"] == 200
+        assert outcome["loaded"] == []
+        assert elapsed < FIRST_REQUEST_BUDGET_S
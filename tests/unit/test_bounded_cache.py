@@ -0,0 +1,78 @@
+"""
+Unit tests for BoundedTTLCache
+Unit тесты для ограниченного TTL/LRU кэша
+"""
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from core.caching.bounded_cache import BoundedTTLCache
+
+
+class TestBoundedTTLCache:
+    """Tests for LRU eviction, TTL and byte budget."""
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used(self):
+        """Reading an entry protects it from the next eviction."""
+        cache = BoundedTTLCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+
+        cache.put("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    @pytest.mark.unit
+    def test_ttl_expiration_counts_as_miss(self):
+        """Expired entries are dropped lazily on access."""
+        cache = BoundedTTLCache(ttl_seconds=10)
+        with patch("core.caching.bounded_cache.time.monotonic", return_value=100.0):
+            cache.put("key", "value")
+        with patch("core.caching.bounded_cache.time.monotonic", return_value=111.0):
+            assert cache.get("key") is None
+
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["expirations"] == 1
+        assert stats["entries"] == 0
+
+    @pytest.mark.unit
+    def test_byte_budget_bounds_size(self):
+        """Entries are evicted until the new value fits the byte budget."""
+        cache = BoundedTTLCache(max_entries=100, max_bytes=20_000)
+        for i in range(10):
+            cache.put_vector(f"v{i}", [float(i)] * 1536)
+
+        stats = cache.get_stats()
+        assert stats["size_bytes"] <= 20_000
+        assert stats["entries"] == 3
+        assert cache.get_vector("v9") == [9.0] * 1536
+
+    @pytest.mark.unit
+    def test_vectors_stored_as_float32(self):
+        """Cached vectors take ~8x less memory than Python float lists."""
+        vector = list(np.random.default_rng(0).random(1536))
+        list_bytes = sys.getsizeof(vector) + sum(sys.getsizeof(value) for value in vector)
+
+        cache = BoundedTTLCache()
+        cache.put_vector("key", vector)
+
+        assert cache.get("key").dtype == np.float32
+        assert cache.get_stats()["size_bytes"] * 6 < list_bytes
+        assert cache.get_vector("key") == pytest.approx(vector, rel=1e-6)
+
+    @pytest.mark.unit
+    def test_hit_rate(self):
+        """Hit rate reflects hits and misses."""
+        cache = BoundedTTLCache()
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        assert cache.get_stats()["hit_rate"] == pytest.approx(0.5)
@@ -0,0 +1,109 @@
+"""
+Unit tests for COPY-based bulk loads in PostgreSQLAdapter
+Unit тесты массовой загрузки: COPY во временную таблицу, upsert по ключам, изоляция ошибок пачек
+"""
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.database.adapters.postgresql_adapter import PostgreSQLAdapter
+
+
+def _adapter(copy_side_effect=None, **settings):
+    """Adapter whose sessions share one mocked asyncpg connection."""
+    adapter = PostgreSQLAdapter(SimpleNamespace(**settings))
+    driver = MagicMock(copy_records_to_table=AsyncMock(side_effect=copy_side_effect))
+    sessions = []
+
+    @asynccontextmanager
+    async def get_session():
+        raw_connection = MagicMock(driver_connection=driver)
+        session = MagicMock(
+            execute=AsyncMock(return_value=MagicMock(rowcount=0)),
+            connection=AsyncMock(return_value=MagicMock(get_raw_connection=AsyncMock(return_value=raw_connection))),
+            commit=AsyncMock(),
+        )
+        sessions.append(session)
+        yield session
+
+    adapter.get_session = get_session
+    return adapter, driver, sessions
+
+
+def _products(count):
+    return [
+        {"name": f"Цемент М{i}", "sku": f"CEM-{i}" if i % 2 else None, "calc_unit": "мешок",
+         "supplier_id": 7, "pricelistid": 3, "unit_price": 350.5 + i}
+        for i in range(count)
+    ]
+
+
+def _statements(session):
+    return [call.args[0].text for call in session.execute.await_args_list]
+
+
+class TestBulkUpsert:
+    """COPY + one INSERT ... ON CONFLICT per upsert key, per chunk."""
+
+    @pytest.mark.unit
+    async def test_chunks_and_progress(self):
+        adapter, driver, sessions = _adapter()
+        progress = []
+
+        summary = await adapter.bulk_upsert_raw_products(
+            _products(25), chunk_size=10, progress_callback=lambda done, total: progress.append((done, total))
+        )
+
+        assert summary == {"total": 25, "upserted": 0, "failed": 0, "errors": []}
+        assert progress == [(10, 25), (20, 25), (25, 25)]
+        assert len(sessions) == 3 and all(session.commit.await_count == 1 for session in sessions)
+        assert [len(call.kwargs["records"]) for call in driver.copy_records_to_table.await_args_list] == [10, 10, 5]
+
+        create, by_sku, by_name = _statements(sessions[0])
+        assert create.startswith("CREATE TEMP TABLE _bulk_raw_products (LIKE raw_products, _ord integer)")
+        assert "ON CONFLICT (supplier_id, pricelistid, sku) WHERE sku IS NOT NULL DO UPDATE" in by_sku
+        assert "ON CONFLICT (supplier_id, pricelistid, name, (COALESCE(calc_unit, ''))) WHERE sku IS NULL" in by_name
+        assert "id = EXCLUDED.id" not in by_sku and "created = EXCLUDED.created" not in by_sku
+        assert "unit_price = EXCLUDED.unit_price" in by_sku
+
+    @pytest.mark.unit
+    async def test_records_defaults_and_order(self):
+        adapter, driver, _ = _adapter()
+
+        await adapter.bulk_upsert_raw_products(_products(2))
+
+        call = driver.copy_records_to_table.await_args
+        columns, records = call.kwargs["columns"], call.kwargs["records"]
+        first = dict(zip(columns, records[0]))
+        assert call.args == ("_bulk_raw_products",)
+        assert columns[-1] == "_ord" and [record[-1] for record in records] == [0, 1]
+        assert first["unit_price"] == Decimal("350.5") and first["unit_price_currency"] == "RUB"
+        assert first["is_processed"] is False and first["id"] and first["created"]
+
+    @pytest.mark.unit
+    async def test_failed_chunk_is_isolated(self):
+        adapter, _, sessions = _adapter(copy_side_effect=[None, ValueError("invalid input"), None])
+
+        summary = await adapter.bulk_upsert_raw_products(_products(30), chunk_size=10)
+
+        assert summary["failed"] == 10
+        assert summary["errors"] == [{"offset": 10, "rows": 10, "error": "invalid input"}]
+        assert [session.commit.await_count for session in sessions] == [1, 0, 1]
+
+    @pytest.mark.unit
+    async def test_materials_keys_and_derived_columns(self):
+        adapter, driver, sessions = _adapter(POSTGRESQL_COPY_CHUNK_SIZE=50_000)
+        materials = ({"name": f"Кирпич {i}", "use_category": "Кирпич", "unit": "шт"} for i in range(100_000))
+
+        summary = await adapter.bulk_upsert_materials(materials)
+
+        assert summary["total"] == 100_000 and len(sessions) == 2
+        _, by_sku, by_name = _statements(sessions[0])
+        assert "ON CONFLICT (sku) WHERE sku IS NOT NULL" in by_sku
+        assert "ON CONFLICT (name, unit) WHERE sku IS NULL" in by_name
+        assert "embedding::vector" in by_name and "search_vector" not in by_name
+        copied = driver.copy_records_to_table.await_args.kwargs["columns"]
+        assert "embedding_vector" not in copied and "search_vector" not in copied
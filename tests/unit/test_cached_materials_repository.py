@@ -0,0 +1,107 @@
+"""
+Unit tests for CachedMaterialsRepository search cache generations
+Unit тесты для версионирования поискового кеша CachedMaterialsRepository
+"""
+import pytest
+from unittest.mock import AsyncMock
+
+from core.repositories.cached_materials import CachedMaterialsRepository
+from core.schemas.materials import Material, MaterialCreate
+
+
+class FakeCacheDB:
+    """Minimal in-memory stand-in for RedisDatabase."""
+
+    def __init__(self):
+        self.data = {}
+        self.get_calls = 0
+        self.delete_pattern = AsyncMock(return_value=0)
+
+    async def get(self, key, deserialize=True, default=None):
+        self.get_calls += 1
+        return self.data.get(key, default)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+        return True
+
+    async def incr(self, key, amount=1):
+        self.data[key] = int(self.data.get(key, 0)) + amount
+        return self.data[key]
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+
+def _material(material_id: str = "m-1") -> Material:
+    return Material(id=material_id, name="Цемент М500", use_category="Цемент", unit="мешок")
+
+
+@pytest.fixture
+def hybrid_repo():
+    repo = AsyncMock()
+    repo.sql_search.return_value = [_material()]
+    repo.create_material.return_value = _material("m-2")
+    return repo
+
+
+@pytest.fixture
+def cache_db():
+    return FakeCacheDB()
+
+
+@pytest.fixture
+def repository(hybrid_repo, cache_db):
+    return CachedMaterialsRepository(hybrid_repo, cache_db, {"generation_local_ttl": 60})
+
+
+class TestSearchCacheGenerations:
+    """Tests for namespace-generation based invalidation."""
+
+    @pytest.mark.unit
+    async def test_search_keys_embed_generation(self, repository, cache_db):
+        """Search cache keys are written under the current generation."""
+        await repository.sql_search("цемент", limit=5)
+
+        keys = [key for key in cache_db.data if key.startswith("sql_search:")]
+        assert len(keys) == 1
+        assert keys[0].startswith("sql_search:g0:")
+
+    @pytest.mark.unit
+    async def test_write_invalidates_with_single_incr(self, repository, hybrid_repo, cache_db):
+        """Material writes bump the generation instead of scanning keys."""
+        await repository.sql_search("цемент", limit=5)
+        await repository.sql_search("цемент", limit=5)
+        assert hybrid_repo.sql_search.await_count == 1
+
+        await repository.create_material(
+            MaterialCreate(name="Кирпич", use_category="Кирпич", unit="шт")
+        )
+
+        assert cache_db.data[CachedMaterialsRepository.SEARCH_GENERATION_KEY] == 1
+        cache_db.delete_pattern.assert_not_awaited()
+
+        await repository.sql_search("цемент", limit=5)
+        assert hybrid_repo.sql_search.await_count == 2
+        assert any(key.startswith("sql_search:g1:") for key in cache_db.data)
+
+    @pytest.mark.unit
+    async def test_local_generation_copy_is_reused(self, repository, cache_db):
+        """Generation is read from Redis once per local TTL window."""
+        await repository._get_search_generation()
+        await repository._get_search_generation()
+        generation_reads = cache_db.get_calls
+
+        assert generation_reads == 1
+
+    @pytest.mark.unit
+    async def test_other_worker_bump_seen_after_local_ttl(self, hybrid_repo, cache_db):
+        """Bumps from another worker are picked up once the local copy expires."""
+        repository = CachedMaterialsRepository(
+            hybrid_repo, cache_db, {"generation_local_ttl": 0}
+        )
+        assert await repository._get_search_generation() == 0
+
+        await cache_db.incr(CachedMaterialsRepository.SEARCH_GENERATION_KEY)
+
+        assert await repository._get_search_generation() == 1
@@ -0,0 +1,194 @@
+"""
+Unit tests for Qdrant collection profiles
+Unit тесты для профилей коллекций: квантизация, HNSW, параметры поиска, миграция коллекций
+"""
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from qdrant_client import models
+
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+from core.database.collection_profiles import get_collection_profile
+from core.database.exceptions import DatabaseError
+from services.materials import MaterialsService
+
+VECTOR_SIZE = 8
+POINTS = 300
+
+
+def _points(count=POINTS):
+    return [
+        {
+            "id": str(uuid.UUID(int=i + 1)),
+            "vector": [1.0, (i % 17) / 17, (i % 5) / 5] + [0.1] * (VECTOR_SIZE - 3),
+            "payload": {"name": f"Цемент {i}", "sku": f"CEM-{i:04d}"},
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+async def vector_db():
+    db = AsyncQdrantVectorDatabase({"location": ":memory:", "collection_name": "materials"})
+    await db.create_collection("materials", VECTOR_SIZE)
+    await db.upsert_many("materials", _points())
+    yield db
+    await db.close()
+
+
+async def _snapshot(db, name):
+    records = await db.scroll_all(name, with_vectors=True)
+    return {record["id"]: (record["payload"], record["vector"]) for record in records}
+
+
+class TestProfiles:
+    """Profile -> create_collection / search parameters."""
+
+    @pytest.mark.unit
+    def test_collection_kwargs(self):
+        float32 = get_collection_profile().collection_kwargs(1536)
+        int8 = get_collection_profile("int8").collection_kwargs(1536)
+        binary = get_collection_profile("binary", hnsw_m=32).collection_kwargs(1536)
+
+        assert set(float32) == {"vectors_config"} and not float32["vectors_config"].on_disk
+        assert int8["vectors_config"].on_disk is True
+        assert int8["quantization_config"].scalar.type == models.ScalarType.INT8
+        assert int8["quantization_config"].scalar.always_ram is True
+        assert int8["hnsw_config"] == models.HnswConfigDiff(m=16, ef_construct=128)
+        assert isinstance(binary["quantization_config"], models.BinaryQuantization)
+        assert binary["hnsw_config"].m == 32
+
+    @pytest.mark.unit
+    def test_search_params_defaults_and_overrides(self):
+        int8 = get_collection_profile("int8")
+
+        assert get_collection_profile().search_params() is None
+        assert int8.search_params().quantization == models.QuantizationSearchParams(oversampling=2.0, rescore=True)
+        assert int8.search_params(oversampling=4.0, rescore=False).quantization.oversampling == 4.0
+        assert get_collection_profile(hnsw_ef=128).search_params().hnsw_ef == 128
+
+    @pytest.mark.unit
+    def test_unknown_profile_and_memory_estimate(self):
+        with pytest.raises(ValueError, match="Unknown collection profile"):
+            get_collection_profile("float16")
+
+        float32 = get_collection_profile().estimate_memory(200_000, 1536)
+        int8 = get_collection_profile("int8").estimate_memory(200_000, 1536)
+        binary = get_collection_profile("binary").estimate_memory(200_000, 1536)
+        assert int8["ram_bytes"] < float32["ram_bytes"] / 3
+        assert binary["ram_bytes"] < int8["ram_bytes"] / 4
+        assert int8["disk_bytes"] == 200_000 * 1536 * 4
+
+
+class TestAdapter:
+    """Adapters create collections under the configured profile and pass search parameters."""
+
+    @pytest.mark.unit
+    async def test_configured_profile_and_search_params(self):
+        db = AsyncQdrantVectorDatabase({
+            "location": ":memory:", "collection_profile": "int8", "hnsw_m": 24,
+        })
+        db.client = MagicMock(create_collection=AsyncMock(), query_points=AsyncMock(return_value=MagicMock(points=[])))
+
+        await db.create_collection("materials", VECTOR_SIZE)
+        await db.search("materials", [0.1] * VECTOR_SIZE, limit=5)
+        await db.search("materials", [0.1] * VECTOR_SIZE, limit=5, oversampling=3.0, rescore=False)
+
+        create_kwargs = db.client.create_collection.await_args.kwargs
+        assert create_kwargs["hnsw_config"].m == 24
+        assert create_kwargs["quantization_config"].scalar.type == models.ScalarType.INT8
+        default, explicit = [call.kwargs["search_params"] for call in db.client.query_points.await_args_list]
+        assert default.quantization == models.QuantizationSearchParams(oversampling=2.0, rescore=True)
+        assert explicit.quantization == models.QuantizationSearchParams(oversampling=3.0, rescore=False)
+
+    @pytest.mark.unit
+    async def test_materials_service_passes_search_options(self):
+        vector_db = MagicMock(search=AsyncMock(return_value=[]))
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        service.get_embedding = AsyncMock(return_value=[0.1] * VECTOR_SIZE)
+
+        await service.search_vector_scored("цемент", 10)
+        await service.search_vector_scored("цемент", 10, oversampling=4.0, rescore=True)
+
+        plain, tuned = [call.kwargs for call in vector_db.search.await_args_list]
+        assert "oversampling" not in plain and "rescore" not in plain
+        assert tuned["oversampling"] == 4.0 and tuned["rescore"] is True
+
+    @pytest.mark.unit
+    async def test_advanced_search_passes_search_options(self, monkeypatch):
+        from api.routes import search_unified
+        from core.schemas.materials import AdvancedSearchQuery
+
+        vector_db = MagicMock(search=AsyncMock(return_value=[]))
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        service.get_embedding = AsyncMock(return_value=[0.1] * VECTOR_SIZE)
+        monkeypatch.setattr(search_unified, "MaterialsService", lambda: service)
+
+        await search_unified.professional_search(AdvancedSearchQuery(query="цемент", oversampling=4.0, rescore=False))
+
+        kwargs = vector_db.search.await_args.kwargs
+        assert kwargs["oversampling"] == 4.0 and kwargs["rescore"] is False
+
+
+class TestMigration:
+    """Collections are copied under a profile and switched over by alias without losing points."""
+
+    @pytest.mark.unit
+    async def test_migration_keeps_points(self, vector_db):
+        before = await _snapshot(vector_db, "materials")
+
+        summary = await vector_db.migrate_collection_profile("materials", "int8", batch_size=64)
+
+        info = await vector_db.client.get_collection("materials")
+        assert summary["points"] == POINTS and summary["profile"] == "int8"
+        assert info.config.params.vectors.on_disk is True
+        assert await vector_db._get_aliases() == {"materials": summary["target"]}
+        after = await _snapshot(vector_db, "materials")
+        assert after.keys() == before.keys()
+        for point_id, (payload, vector) in before.items():
+            assert after[point_id][0] == payload
+            assert after[point_id][1] == pytest.approx(vector, abs=1e-5)  # cosine: повторная нормализация
+
+    @pytest.mark.unit
+    async def test_second_migration_switches_alias(self, vector_db):
+        first = await vector_db.migrate_collection_profile("materials", "int8")
+        await vector_db.upsert("materials", _points(POINTS + 1)[-1:])
+
+        second = await vector_db.migrate_collection_profile("materials", "binary")
+
+        assert second["points"] == POINTS + 1
+        assert await vector_db._get_aliases() == {"materials": second["target"]}
+        assert await vector_db._collection_names() == [second["target"]]
+        assert first["target"] != second["target"]
+
+    @pytest.mark.unit
+    async def test_recovers_interrupted_switch(self, vector_db):
+        # Сбой после удаления исходной коллекции до создания alias: полная копия осталась
+        await vector_db.create_collection("materials__int8_1", VECTOR_SIZE, profile="int8")
+        await vector_db.upsert_many("materials__int8_1", _points())
+        await vector_db.create_collection("materials__int8_2", VECTOR_SIZE, profile="int8")
+        await vector_db.upsert_many("materials__int8_2", _points(40))
+        await vector_db.delete_collection("materials")
+
+        summary = await vector_db.migrate_collection_profile("materials", "int8")
+
+        assert summary["points"] == POINTS
+        assert await vector_db.count("materials") == POINTS
+        assert await vector_db._collection_names() == [summary["target"]]
+
+    @pytest.mark.unit
+    async def test_incomplete_copy_keeps_original(self, vector_db):
+        upsert_points = vector_db._upsert_points
+
+        async def lossy_upsert(collection_name, points):
+            await upsert_points(collection_name, points[:-1])
+
+        vector_db._upsert_points = lossy_upsert
+
+        with pytest.raises(DatabaseError, match="incomplete"):
+            await vector_db.migrate_collection_profile("materials", "binary", batch_size=100)
+
+        assert await vector_db.count("materials") == POINTS
+        assert await vector_db._collection_names() == ["materials"]
+        assert await vector_db._get_aliases() == {}
@@ -0,0 +1,123 @@
+"""
+Unit tests for the local embedding worker
+Unit тесты воркера локальных эмбеддингов: склейка запросов в батчи, корзины длины, ошибки
+
+The model is a tiny randomly initialised BERT built in a temporary directory,
+so the tests run offline.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from core.background import embedding_worker
+from core.background.embedding_worker import LocalEmbeddingWorker
+from core.database.factories import AIClientFactory
+from core.repositories.base import BaseRepository
+
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *"абвгдеёжзийклмнопрстуфхцчшщъыьэюя0123456789"]
+
+
+def build_tiny_model(path):
+    """Save a 2-layer BERT with a character vocabulary to ``path``."""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    (path / "vocab.txt").write_text("\n".join(VOCAB), encoding="utf-8")
+    BertTokenizerFast(vocab_file=str(path / "vocab.txt")).save_pretrained(str(path))
+    BertModel(BertConfig(
+        vocab_size=len(VOCAB), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=512,
+    )).save_pretrained(str(path))
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    return build_tiny_model(tmp_path_factory.mktemp("tiny_bert"))
+
+
+@pytest.fixture(scope="module")
+def model(model_path):
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_path, device="cpu")
+
+
+class RecordingModel:
+    """Model wrapper recording the texts of each encode call."""
+
+    def __init__(self, model, fail_on=None):
+        self.model = model
+        self.fail_on = fail_on
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        if self.fail_on in texts:
+            raise RuntimeError("encode failed")
+        return self.model.encode(texts, **kwargs)
+
+
+class TestLocalEmbeddingWorker:
+    """Concurrent requests share padded batches; long texts go to their own batch."""
+
+    @pytest.mark.unit
+    async def test_concurrent_requests_are_batched(self, model):
+        recording = RecordingModel(model)
+        worker = LocalEmbeddingWorker(recording, max_batch_size=16, max_latency_ms=20, publish=False)
+        texts = [f"цемент м{i}00" for i in range(20)]
+
+        vectors = await asyncio.gather(*(worker.embed(text) for text in texts))
+        await worker.close()
+
+        assert [len(call) for call in recording.calls] == [16, 4]
+        np.testing.assert_allclose(vectors, model.encode(texts), atol=1e-5)
+        stats = worker.get_stats()
+        assert stats["requests"] == 20 and stats["texts"] == 20 and stats["batches"] == 2
+        assert stats["avg_batch_size"] == 10 and stats["batches_per_sec"] > 0
+
+    @pytest.mark.unit
+    async def test_length_buckets(self, model):
+        recording = RecordingModel(model)
+        worker = LocalEmbeddingWorker(recording, length_buckets=(16, 64), max_latency_ms=20, publish=False)
+        short, medium, long = "кирпич", "кирпич облицовочный красный полнотелый", "кирпич " * 20
+
+        vectors = await worker.embed_many([short, long, medium, short])
+        await worker.close()
+
+        assert recording.calls == [[short, short], [medium], [long]]
+        assert len(vectors) == 4 and vectors[0] == vectors[3]
+
+    @pytest.mark.unit
+    async def test_failed_batch_does_not_stop_worker(self, model):
+        worker = LocalEmbeddingWorker(RecordingModel(model, fail_on="сбой"), max_latency_ms=1, publish=False)
+
+        with pytest.raises(RuntimeError, match="encode failed"):
+            await worker.embed("сбой")
+        assert len(await worker.embed("песок")) == 32
+        assert worker.get_stats()["errors"] == 1
+        await worker.close()
+
+
+class TestHuggingFaceProvider:
+    """AI_PROVIDER=huggingface clients share one worker."""
+
+    @pytest.mark.unit
+    async def test_factory_and_repository(self, model_path, monkeypatch):
+        monkeypatch.setattr(embedding_worker, "_local_embedding_worker", None)
+        config = {"model": model_path, "device": "cpu", "max_batch_size": 8, "max_latency_ms": 1.0}
+
+        worker = AIClientFactory._create_huggingface_client(config)
+        try:
+            assert AIClientFactory._create_huggingface_client(config) is worker
+            assert worker.max_batch_size == 8
+
+            repository = BaseRepository(ai_client=worker)
+            single = await repository.get_embedding("цемент")
+            batch = await repository.get_embeddings_batch(["цемент", "песок"])
+
+            assert batch[0] == pytest.approx(single, abs=1e-5)
+            assert embedding_worker.get_local_embedding_worker_stats()["texts"] == 3
+        finally:
+            await embedding_worker.shutdown_local_embedding_worker()
+        assert embedding_worker.get_local_embedding_worker_stats() is None
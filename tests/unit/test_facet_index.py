@@ -0,0 +1,175 @@
+"""
+Unit tests for facet counts
+Unit тесты для счетчиков фасетов: инкрементальные обновления, счетчики по результату поиска, API
+"""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.routes.search_unified import router
+from core.schemas.materials import Material
+from services.facet_index import FacetIndex
+
+
+def _material(material_id, category, unit, color=None):
+    return {"use_category": category, "unit": unit, "normalized_color": color, "name": f"Материал {material_id}"}
+
+
+@pytest.fixture
+def index():
+    index = FacetIndex()
+    index.add_many([
+        ("1", _material(1, "Цемент", "мешок", "серый")),
+        ("2", _material(2, "Цемент", "кг", "белый")),
+        ("3", _material(3, "Кирпич", "шт", "красный")),
+        ("4", {**_material(4, "Кирпич", "шт"), "supplier_id": 42}),
+        ("5", _material(5, "Песок", "т", "  ")),
+    ])
+    index.ready = True
+    return index
+
+
+class TestFacetIndex:
+    """Global counts, result-set counts, incremental updates."""
+
+    @pytest.mark.unit
+    def test_counts(self, index):
+        counts = index.counts()
+
+        assert counts["use_category"] == {"Цемент": 2, "Кирпич": 2, "Песок": 1}
+        assert list(counts["unit"]) == ["шт", "мешок", "кг", "т"]
+        assert counts["normalized_color"] == {"серый": 1, "белый": 1, "красный": 1}
+        assert counts["supplier_id"] == {"42": 1}
+        assert index.counts(["unit"], limit=1) == {"unit": {"шт": 2}}
+
+    @pytest.mark.unit
+    def test_count_ids(self, index):
+        facets = index.count_ids(["1", "3", "4", "4", "missing"], ["use_category", "unit"])
+
+        assert facets == {"use_category": {"Кирпич": 2, "Цемент": 1}, "unit": {"шт": 2, "мешок": 1}}
+        assert index.count_ids([], ["unit"]) == {"unit": {}}
+        with pytest.raises(ValueError, match="Unknown facet fields: price"):
+            index.count_ids(["1"], ["price"])
+
+    @pytest.mark.unit
+    def test_update_and_remove(self, index):
+        index.add("2", _material(2, "Кирпич", "шт"))
+        assert index.remove("5") and not index.remove("5")
+
+        counts = index.counts(["use_category", "normalized_color"])
+        assert counts["use_category"] == {"Кирпич": 3, "Цемент": 1}
+        assert counts["normalized_color"] == {"серый": 1, "красный": 1}
+        assert index.count_ids(["2"], ["unit"]) == {"unit": {"шт": 1}}
+        assert len(index) == 4
+
+    @pytest.mark.unit
+    def test_compaction_keeps_counts(self):
+        index = FacetIndex(compact_ratio=0.1)
+        index.add_many((str(i), _material(i, f"Категория {i % 3}", "шт")) for i in range(3000))
+        for i in range(0, 3000, 2):
+            index.remove(str(i))
+
+        assert index.get_stats()["slots"] < 3000
+        assert sum(index.counts(["use_category"])["use_category"].values()) == 1500
+        assert index.count_ids(["1", "3", "5"], ["use_category"]) == {
+            "use_category": {"Категория 1": 1, "Категория 0": 1, "Категория 2": 1}
+        }
+
+    @pytest.mark.unit
+    async def test_load_skips_reference_records(self):
+        vector_db = AsyncMock()
+        vector_db.scroll_all.return_value = [
+            {"id": 1, "payload": _material(1, "Цемент", "мешок")},
+            {"id": 2, "payload": {"type": "category", "name": "Цемент"}},
+            {"id": 3, "payload": {"type": "unit", "name": "мешок"}},
+        ]
+        index = FacetIndex()
+
+        assert await index.load(vector_db) == 1
+        assert index.ready
+        assert index.counts(["use_category"]) == {"use_category": {"Цемент": 1}}
+        assert vector_db.scroll_all.await_args.kwargs["fields"] == [*index.fields, "type"]
+
+
+    @pytest.mark.unit
+    async def test_changes_during_load_are_replayed(self, index):
+        """Writes arriving while the collection is read survive the rebuild."""
+        scroll_started, release = asyncio.Event(), asyncio.Event()
+
+        async def scroll_all(*args, **kwargs):
+            scroll_started.set()
+            await release.wait()
+            return [{"id": "3", "payload": _material(3, "Кирпич", "шт")}, {"id": "4", "payload": _material(4, "Песок", "т")}]
+
+        vector_db = AsyncMock()
+        vector_db.scroll_all.side_effect = scroll_all
+        loading = asyncio.create_task(index.load(vector_db))
+        await scroll_started.wait()
+
+        index.apply_add("6", _material(6, "Щебень", "т"))
+        index.apply_remove("3")
+        assert index.counts(["use_category"])["use_category"]["Цемент"] == 2  # прежние счетчики до замены
+        release.set()
+
+        assert await loading == 2
+        assert index.counts(["use_category"]) == {"use_category": {"Песок": 1, "Щебень": 1}}
+
+
+class TestFacetRoutes:
+    """Search responses carry facet counts, /facets serves global counts."""
+
+    @pytest.mark.unit
+    async def test_search_and_facets_endpoints(self, index):
+        app = FastAPI()
+        app.include_router(router, prefix="/search")
+        results = [
+            Material(id=material_id, name="Материал", use_category="Цемент", unit="мешок")
+            for material_id in ("1", "2", "4")
+        ]
+
+        with patch("api.routes.search_unified.get_facet_index", return_value=index), \
+                patch("api.routes.search_unified.MaterialsService") as service:
+            service.return_value.search_materials = AsyncMock(return_value=results)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                search = await client.post("/search", json={"query": "цемент", "facets": ["use_category", "unit"]})
+                plain = await client.post("/search", json={"query": "цемент"})
+                invalid = await client.post("/search", json={"query": "цемент", "facets": ["price"]})
+                facets = await client.get("/search/facets", params={"fields": ["unit"], "limit": 2})
+                index.ready = False
+                not_ready = await client.get("/search/facets")
+
+        assert search.json()["facets"] == {
+            "use_category": {"Цемент": 2, "Кирпич": 1},
+            "unit": {"мешок": 1, "кг": 1, "шт": 1},
+        }
+        assert plain.json()["facets"] is None
+        assert invalid.status_code == 422
+        assert facets.json() == {"unit": {"шт": 2, "мешок": 1}}
+        assert not_ready.status_code == 503
+
+    @pytest.mark.unit
+    async def test_facets_count_candidates_beyond_the_page(self, index):
+        app = FastAPI()
+        app.include_router(router, prefix="/search")
+        candidates = [
+            Material(id=material_id, name="Материал", use_category="Цемент", unit="мешок")
+            for material_id in ("1", "2", "3", "4", "5")
+        ]
+
+        with patch("api.routes.search_unified.get_facet_index", return_value=index), \
+                patch("api.routes.search_unified.MaterialsService") as service:
+            service.return_value.search_materials = AsyncMock(return_value=candidates)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                search = await client.post("/search", json={"query": "цемент", "limit": 2, "facets": ["use_category"]})
+                categories = await client.get("/search/categories")
+                units = await client.get("/search/units")
+
+        assert [r["id"] for r in search.json()["results"]] == ["1", "2"]
+        assert search.json()["facets"] == {"use_category": {"Цемент": 2, "Кирпич": 2, "Песок": 1}}
+        assert service.return_value.search_materials.await_args.kwargs["limit"] == 500
+        assert categories.json() == ["Цемент", "Кирпич", "Песок"]
+        assert units.json() == ["шт", "мешок", "кг", "т"]
+        service.return_value.get_categories.assert_not_called()
@@ -0,0 +1,248 @@
+"""
+Unit tests for the filter DSL and filter pushdown
+Unit тесты для типизированных фильтров: компиляция в Qdrant/Weaviate/Pinecone, фильтрованный поиск, индексы payload
+"""
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from qdrant_client import QdrantClient, models
+
+from core.database.adapters.qdrant_adapter import QdrantVectorDatabase
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+from core.database.filters import FilterSpec, MatchCondition, PatternCondition, RangeCondition
+from core.schemas.materials import MaterialFilterOptions
+from services.advanced_search import AdvancedSearchService
+from services.materials import MATERIAL_PAYLOAD_INDEXES, MaterialsService, compile_material_filters
+
+VECTOR_SIZE = 8
+POINTS = 200
+
+
+def _points():
+    points = []
+    for i in range(POINTS):
+        brick = i % 20 == 0  # 5% коллекции
+        points.append({
+            "id": str(uuid.UUID(int=i + 1)),
+            # Кирпич дальше от запроса, чем любой цемент
+            "vector": [1.0, float(i % 7) / 10, 3.0 if brick else 0.0] + [0.1] * (VECTOR_SIZE - 3),
+            "payload": {
+                "name": f"{'Кирпич' if brick else 'Цемент'} {i}",
+                "use_category": "Кирпич" if brick else "Цемент",
+                "unit": "шт" if brick else "мешок",
+                "sku": f"{'BRK' if brick else 'CEM'}-{i:04d}",
+                "created_at": f"2025-{i % 12 + 1:02d}-01T00:00:00",
+                "updated_at": "2025-06-16T16:46:29",
+            },
+        })
+    return points
+
+
+QUERY = [1.0, 0.0, 0.0] + [0.1] * (VECTOR_SIZE - 3)
+
+
+@pytest.fixture
+async def vector_db():
+    db = AsyncQdrantVectorDatabase({"location": ":memory:", "collection_name": "materials"})
+    await db.create_collection("materials", VECTOR_SIZE)
+    await db.upsert_many("materials", _points())
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+async def sync_vector_db():
+    with patch("core.database.adapters.qdrant_adapter.QdrantClient", lambda **kwargs: QdrantClient(location=":memory:")):
+        db = QdrantVectorDatabase({"url": "http://stand-in:6333", "collection_name": "materials"})
+    await db.create_collection("materials", VECTOR_SIZE)
+    await db.upsert("materials", _points())
+    return db
+
+
+class TestCompile:
+    """MaterialFilterOptions -> FilterSpec -> native filters."""
+
+    @pytest.mark.unit
+    def test_material_options_to_qdrant(self):
+        spec = compile_material_filters(MaterialFilterOptions(
+            categories=["Цемент"], units=["кг", "мешок"], sku_pattern="CEM-00??",
+            created_after=datetime(2025, 3, 1),
+        ))
+
+        native, residual = spec.to_qdrant()
+
+        keys = [(condition.key, type(condition.match or condition.range).__name__) for condition in native.must]
+        assert keys == [("use_category", "MatchValue"), ("unit", "MatchAny"),
+                        ("sku", "MatchPrefix"), ("created_at", "DatetimeRange")]
+        assert native.must[2].match.prefix == "CEM-00"
+        assert residual == FilterSpec((PatternCondition("sku", "CEM-00??"),))
+        assert compile_material_filters(MaterialFilterOptions()) is None
+
+    @pytest.mark.unit
+    def test_literal_and_prefix_sku_are_exact(self):
+        literal, literal_residual = FilterSpec((PatternCondition("sku", "CEM-0001"),)).to_qdrant()
+        prefix, prefix_residual = FilterSpec((PatternCondition("sku", "CEM*"),)).to_qdrant()
+
+        assert literal.must[0].match == models.MatchValue(value="CEM-0001")
+        assert prefix.must[0].match == models.MatchPrefix(prefix="CEM")
+        assert literal_residual is None and prefix_residual is None
+
+    @pytest.mark.unit
+    def test_weaviate_and_pinecone(self):
+        spec = FilterSpec((
+            MatchCondition("use_category", "Цемент"),
+            PatternCondition("sku", "CEM*"),
+            RangeCondition("created_at", gte=datetime(2025, 1, 1)),
+        ))
+
+        where, weaviate_residual = spec.to_weaviate({"use_category": "category"}, ["category", "created_at"])
+        metadata_filter, pinecone_residual = spec.to_pinecone()
+
+        assert where == {"operator": "And", "operands": [
+            {"path": ["category"], "operator": "Equal", "valueText": "Цемент"},
+            {"path": ["created_at"], "operator": "GreaterThanEqual", "valueDate": "2025-01-01T00:00:00+00:00"},
+        ]}
+        assert weaviate_residual.fields == ["sku"]
+        assert metadata_filter == {"use_category": {"$eq": "Цемент"}}
+        assert pinecone_residual.fields == ["sku", "created_at"]
+
+    @pytest.mark.unit
+    def test_matches_payload_and_model_dates(self):
+        spec = FilterSpec((RangeCondition("created_at", gte=datetime(2025, 3, 1)), PatternCondition("sku", "CEM*")))
+
+        assert spec.matches({"created_at": "2025-04-01T00:00:00", "sku": "CEM-1"})
+        assert spec.matches({"created_at": datetime(2025, 4, 1), "sku": "CEM-1"})
+        assert not spec.matches({"created_at": "2025-01-01T00:00:00", "sku": "CEM-1"})
+        assert not spec.matches({"created_at": "2025-04-01T00:00:00", "sku": None})
+
+
+class TestFilteredSearch:
+    """Selective filters return exactly limit matching rows in one query."""
+
+    @pytest.mark.unit
+    async def test_selective_category_fills_limit(self, vector_db):
+        spec = compile_material_filters(MaterialFilterOptions(categories=["Кирпич"]))
+
+        unfiltered = await vector_db.search("materials", QUERY, limit=50)
+        results = await vector_db.search("materials", QUERY, limit=8, filter_conditions=spec)
+
+        assert not any(r["payload"]["use_category"] == "Кирпич" for r in unfiltered)
+        assert len(results) == 8
+        assert all(r["payload"]["use_category"] == "Кирпич" for r in results)
+
+    @pytest.mark.unit
+    async def test_date_range_and_score_threshold(self, vector_db):
+        spec = compile_material_filters(MaterialFilterOptions(
+            created_after=datetime(2025, 11, 1), min_similarity=None,
+        ))
+
+        results = await vector_db.search("materials", QUERY, limit=10, filter_conditions=spec)
+        close = await vector_db.search("materials", QUERY, limit=100, score_threshold=0.99)
+
+        assert len(results) == 10
+        assert all(r["payload"]["created_at"] >= "2025-11-01" for r in results)
+        assert close and all(r["score"] >= 0.99 for r in close)
+        assert len(close) < 100
+
+    @pytest.mark.unit
+    async def test_wildcard_residual_keeps_projection(self, vector_db):
+        spec = FilterSpec((PatternCondition("sku", "BRK-01?0"),))
+
+        results = await vector_db.search("materials", QUERY, limit=3, filter_conditions=spec, fields=["name"])
+
+        assert len(results) == 3
+        assert all(set(r["payload"]) == {"name"} for r in results)  # sku читался только для проверки
+        assert {r["payload"]["name"] for r in results} <= {f"Кирпич {i}" for i in (100, 120, 140, 160, 180)}
+
+    @pytest.mark.unit
+    async def test_sync_adapter_matches_async(self, vector_db, sync_vector_db):
+        spec = compile_material_filters(MaterialFilterOptions(categories=["Кирпич"], sku_pattern="BRK-01*"))
+
+        expected = await vector_db.search("materials", QUERY, limit=5, filter_conditions=spec)
+        results = await sync_vector_db.search("materials", QUERY, limit=5, filter_conditions=spec)
+
+        assert len(results) == 5
+        assert [r["id"] for r in results] == [r["id"] for r in expected]
+
+
+class TestServices:
+    """MaterialsService pushes filters down; AdvancedSearchService skips the Python pass."""
+
+    @pytest.mark.unit
+    async def test_materials_service_search_vector_scored(self, vector_db):
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        service.get_embedding = AsyncMock(return_value=QUERY)
+        filters = MaterialFilterOptions(categories=["Кирпич"], units=["шт"], sku_pattern="BRK-*", min_similarity=0.1)
+
+        results = await service.search_vector_scored("кирпич", 5, filters)
+
+        assert len(results) == 5
+        assert all(r["material"].use_category == "Кирпич" and r["search_type"] == "vector" for r in results)
+        assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+
+    @pytest.mark.unit
+    async def test_search_materials_pushes_filters_down(self, vector_db, monkeypatch):
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        service.get_embedding = AsyncMock(return_value=QUERY)
+        fallback = MagicMock(search_materials=AsyncMock(side_effect=AssertionError("post-filtered search")))
+        monkeypatch.setattr("core.database.factories.get_fallback_manager", lambda: fallback)
+        filters = MaterialFilterOptions(categories=["Кирпич"], created_before=datetime(2025, 6, 30))
+
+        materials = await service.search_materials("кирпич", 4, filters)
+
+        assert len(materials) == 4
+        assert all(m.use_category == "Кирпич" and m.created_at <= datetime(2025, 6, 30) for m in materials)
+
+    @pytest.mark.unit
+    async def test_apply_filters_uses_same_semantics(self, vector_db):
+        service = MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+        service.get_embedding = AsyncMock(return_value=QUERY)
+        advanced = AdvancedSearchService(MagicMock(), MagicMock(), analytics_enabled=False, materials_service=service)
+        filters = MaterialFilterOptions(categories=["Кирпич"], created_after=datetime(2025, 6, 1), min_similarity=0.0)
+
+        candidates = await service.search_vector_scored("кирпич", POINTS)
+        pushed = await service.search_vector_scored("кирпич", POINTS, filters)
+        filtered = await advanced._apply_filters(candidates, filters)
+
+        assert [r["material"].id for r in filtered] == [r["material"].id for r in pushed]
+
+
+class TestPayloadIndexes:
+    """Indexes are created for missing fields and verified."""
+
+    @pytest.mark.unit
+    async def test_missing_indexes_created_and_verified(self, vector_db):
+        schema = {"use_category": "keyword", "unit": "integer", "sku": "keyword"}
+        vector_db.get_payload_indexes = AsyncMock(side_effect=lambda name: dict(schema))
+
+        async def create(collection_name, field_name, field_type):
+            schema[field_name] = field_type
+            return True
+
+        vector_db.create_payload_index = AsyncMock(side_effect=create)
+
+        verified = await vector_db.ensure_payload_indexes("materials", MATERIAL_PAYLOAD_INDEXES)
+
+        created = [call.args[1] for call in vector_db.create_payload_index.await_args_list]
+        assert created == ["unit", "unit_key", "sku", "created_at", "updated_at"]
+        assert verified == {field: True for field in MATERIAL_PAYLOAD_INDEXES}
+
+    @pytest.mark.unit
+    async def test_local_mode_reports_unverified(self, vector_db):
+        verified = await vector_db.ensure_payload_indexes("materials", {"unit": "keyword"})
+
+        assert verified == {"unit": False}  # локальный Qdrant не хранит индексы
+
+    @pytest.mark.unit
+    def test_index_types_from_collection_info(self):
+        info = MagicMock(payload_schema={
+            "sku": models.PayloadIndexInfo(
+                data_type="keyword", params=models.KeywordIndexParams(type="keyword", prefix=True), points=0
+            ),
+            "created_at": models.PayloadIndexInfo(data_type="datetime", points=0),
+        })
+
+        assert AsyncQdrantVectorDatabase._payload_index_types(info) == {"sku": "keyword_prefix", "created_at": "datetime"}
+        assert isinstance(AsyncQdrantVectorDatabase._field_schema("keyword_prefix"), models.KeywordIndexParams)
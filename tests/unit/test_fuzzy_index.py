@@ -0,0 +1,142 @@
+"""
+Unit tests for trigram fuzzy index
+Unit тесты для триграммного fuzzy индекса
+"""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services import fuzzy_index
+from services.fuzzy_index import FuzzyIndex, char_ngrams, normalize_text
+
+
+@pytest.fixture
+def index():
+    index = FuzzyIndex(max_candidates=50)
+    index.add_many([
+        ("1", "Цемент портландский М500", {"name": "Цемент портландский М500", "unit": "мешок"}),
+        ("2", "Цемент М400 Д20", {"name": "Цемент М400 Д20", "unit": "мешок"}),
+        ("3", "Кирпич керамический полнотелый", {"name": "Кирпич керамический полнотелый", "unit": "шт"}),
+        ("4", "Песок речной мытый", {"name": "Песок речной мытый", "unit": "т"}),
+    ])
+    return index
+
+
+class TestFuzzyIndex:
+    """Candidate generation and scoring."""
+
+    @pytest.mark.unit
+    def test_normalization_and_ngrams(self):
+        """Text is lowercased, ё folded and padded before splitting into trigrams."""
+        assert normalize_text("  Щебёнка   ГРАНИТНАЯ ") == "щебенка гранитная"
+        assert char_ngrams("ab") == {" ab", "ab "}
+
+    @pytest.mark.unit
+    def test_typo_query_ranks_best_match_first(self, index):
+        """Misspelled query finds the right material with payload attached."""
+        matches = index.search("кирпичь керамичский", limit=3, threshold=0.5)
+
+        assert matches[0].id == "3"
+        assert matches[0].payload["unit"] == "шт"
+        assert all(m.score >= 0.5 for m in matches)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("algorithm", ["wratio", "levenshtein", "jaro_winkler", "sequence_matcher"])
+    def test_algorithms(self, index, algorithm):
+        """Every scorer returns normalized scores with the exact name on top."""
+        matches = index.search("цемент портландский м500", limit=2, algorithm=algorithm)
+
+        assert matches[0].id == "1"
+        assert matches[0].score == pytest.approx(1.0)
+
+    @pytest.mark.unit
+    def test_incremental_update_and_remove(self, index):
+        """Replaced and removed documents disappear from results."""
+        index.add("4", "Песок карьерный", {"name": "Песок карьерный"})
+        assert index.search("песок речной", threshold=0.9) == []
+        assert index.search("песок карьерный", limit=1)[0].id == "4"
+
+        assert index.remove("4") and not index.remove("4")
+        assert index.search("песок карьерный", threshold=0.5) == []
+        assert len(index) == 3
+
+    @pytest.mark.unit
+    def test_shortlist_limited_to_max_candidates(self):
+        """Only the best trigram-overlap candidates are scored."""
+        index = FuzzyIndex(max_candidates=5)
+        index.add_many((str(i), f"цемент м{i}", None) for i in range(100))
+
+        assert index._shortlist("цемент м42").size == 5
+        assert index.search("цемент м42", limit=1)[0].id == "42"
+
+    @pytest.mark.unit
+    def test_compaction_keeps_live_documents(self):
+        """Tombstoned slots are reclaimed once they exceed the compaction ratio."""
+        index = FuzzyIndex()
+        index.add_many((str(i), f"материал {i}", None) for i in range(3000))
+        for i in range(1500):
+            index.remove(str(i))
+
+        stats = index.get_stats()
+        assert stats["slots"] < 3000
+        assert stats["documents"] == 1500
+        assert index.search("материал 2999", limit=1)[0].id == "2999"
+
+    @pytest.mark.unit
+    async def test_load_from_vector_db(self):
+        """Index is built from scroll_all and marked ready."""
+        vector_db = AsyncMock()
+        vector_db.scroll_all.return_value = [
+            {"id": 1, "payload": {"name": "Гипсокартон влагостойкий"}},
+            {"id": 2, "payload": {}},
+        ]
+        index = FuzzyIndex()
+
+        assert await index.load(vector_db, yield_every=1) == 1
+        assert index.ready and "1" in index
+        vector_db.scroll_all.assert_awaited_once_with("materials", with_payload=True, with_vectors=False)
+
+    @pytest.mark.unit
+    async def test_changes_during_load_are_replayed(self, index):
+        """Writes arriving while the collection is read survive the rebuild."""
+        index.ready = True
+        scroll_started, release = asyncio.Event(), asyncio.Event()
+
+        async def scroll_all(*args, **kwargs):
+            scroll_started.set()
+            await release.wait()
+            return [
+                {"id": "3", "payload": {"name": "Кирпич керамический полнотелый"}},
+                {"id": "4", "payload": {"name": "Песок речной мытый"}},
+            ]
+
+        vector_db = AsyncMock()
+        vector_db.scroll_all.side_effect = scroll_all
+        loading = asyncio.create_task(index.load(vector_db))
+        await scroll_started.wait()
+
+        index.apply_add("5", "Щебень гранитный", {"name": "Щебень гранитный"})
+        index.apply_remove("4")
+        assert index.search("цемент м500", limit=1)[0].id == "1"  # прежнее содержимое до замены
+        release.set()
+
+        assert await loading == 2
+        assert "5" in index and "4" not in index and "1" not in index
+        assert index.search("щебень", limit=1)[0].id == "5"
+
+    @pytest.mark.unit
+    async def test_periodic_rebuild(self, monkeypatch):
+        """start_fuzzy_index builds the index and rebuilds it every interval."""
+        builds = []
+
+        async def build(collection_name="materials"):
+            builds.append(collection_name)
+            return 0
+
+        monkeypatch.setattr(fuzzy_index, "build_fuzzy_index", build)
+        await fuzzy_index.start_fuzzy_index(rebuild_interval=0.01)
+        await asyncio.sleep(0.05)
+        await fuzzy_index.stop_fuzzy_index()
+
+        assert len(builds) >= 2
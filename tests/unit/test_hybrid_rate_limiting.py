@@ -0,0 +1,180 @@
+"""
+Unit tests for hybrid rate limiting (local buckets + Redis leases)
+Unit тесты для гибридного rate limiting (локальные бакеты + аренда квоты в Redis, fakeredis)
+"""
+import asyncio
+
+import fakeredis
+import httpx
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from core.middleware.hybrid_rate_limiting import HybridRateLimitMiddleware
+
+
+async def _ok(request):
+    return JSONResponse({"ok": True})
+
+
+def _limiter(redis_client=None, **kwargs) -> HybridRateLimitMiddleware:
+    options = {
+        "redis_client": redis_client or fakeredis.FakeAsyncRedis(),
+        "default_requests_per_minute": 50,
+        "default_requests_per_hour": 1000,
+        "enable_burst_protection": False,
+        "lease_size": 10,
+        "endpoint_limits": {},
+    }
+    options.update(kwargs)
+    return HybridRateLimitMiddleware(Starlette(routes=[Route("/items", _ok)]), **options)
+
+
+class _BrokenRedis:
+    def pipeline(self, transaction=True):
+        raise RedisConnectionError("connection refused")
+
+
+async def _allowed(limiter, client_id, count):
+    results = [await limiter.check(client_id, "/items") for _ in range(count)]
+    await asyncio.sleep(0)  # фоновые аренды
+    return sum(1 for allowed, _ in results if allowed)
+
+
+class TestSharedQuota:
+    """Quota is shared between workers through Redis."""
+
+    @pytest.mark.unit
+    async def test_workers_never_exceed_limit(self):
+        """Two workers with one Redis admit at most the per-minute limit."""
+        redis_client = fakeredis.FakeAsyncRedis()
+        workers = [_limiter(redis_client), _limiter(redis_client)]
+
+        admitted = 0
+        for i in range(200):
+            allowed, _ = await workers[i % 2].check("ip:hot", "/items")
+            admitted += allowed
+            await asyncio.sleep(0)
+
+        assert 40 <= admitted <= 50
+
+    @pytest.mark.unit
+    async def test_redis_round_trips_amortized(self):
+        """One Redis round-trip per lease, not per request."""
+        limiter = _limiter(default_requests_per_minute=1000, lease_size=20)
+
+        assert await _allowed(limiter, "ip:1", 200) == 200
+        assert limiter.get_stats()["leases"] <= 12
+
+    @pytest.mark.unit
+    async def test_exhausted_client_does_not_hit_redis(self):
+        """After the window is exhausted requests are rejected locally."""
+        limiter = _limiter(default_requests_per_minute=5, lease_size=5)
+
+        assert await _allowed(limiter, "ip:1", 5) == 5
+        await _allowed(limiter, "ip:1", 3)
+        leases = limiter.get_stats()["leases"]
+        assert await _allowed(limiter, "ip:1", 50) == 0
+        assert limiter.get_stats()["leases"] == leases
+        assert await _allowed(limiter, "ip:2", 5) == 5
+
+    @pytest.mark.unit
+    async def test_burst_bucket(self):
+        """Burst tokens run out locally."""
+        limiter = _limiter(enable_burst_protection=True, default_burst_size=3)
+
+        results = [await limiter.check("ip:1", "/items") for _ in range(5)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False, False]
+        assert results[-1][1]["reason"] == "burst"
+
+
+class TestRedisFailure:
+    """Fail open or closed when Redis is unavailable."""
+
+    @pytest.mark.unit
+    async def test_fail_open(self):
+        limiter = _limiter(_BrokenRedis(), fail_open=True)
+
+        assert await _allowed(limiter, "ip:1", 5) == 5
+        # Повторное подключение не на каждом запросе
+        assert limiter.get_stats()["redis_errors"] == 1
+
+    @pytest.mark.unit
+    async def test_fail_closed_returns_503(self):
+        limiter = _limiter(_BrokenRedis(), fail_open=False)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=limiter), base_url="http://test") as client:
+            response = await client.get("/items")
+
+        assert response.status_code == 503
+        assert response.json()["reason"] == "unavailable"
+        assert "retry-after" in response.headers
+
+
+class TestASGI:
+    """Pure ASGI responses and headers."""
+
+    @pytest.mark.unit
+    async def test_headers_and_429(self):
+        limiter = _limiter(default_requests_per_minute=2, lease_size=2)
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=limiter), base_url="http://test") as client:
+            responses = [await client.get("/items", headers={"X-API-Key": "k1"}) for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert responses[0].headers["x-ratelimit-limit-rpm"] == "2"
+        assert responses[0].json() == {"ok": True}
+        assert responses[2].json()["error"] == "Rate limit exceeded"
+        assert int(responses[2].headers["retry-after"]) >= 1
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class TestLeaseAccounting:
+    """Windows are charged only for granted requests; unused leases are refunded."""
+
+    @pytest.mark.unit
+    async def test_spaced_traffic_not_denied_under_hourly_limit(self, monkeypatch):
+        """One request per minute for an hour stays within rph=100."""
+        from core.middleware import hybrid_rate_limiting
+
+        clock = _Clock(3600 * 1000)
+        monkeypatch.setattr(hybrid_rate_limiting, "time", clock)
+        redis_client = fakeredis.FakeAsyncRedis()
+        limiter = _limiter(redis_client, default_requests_per_minute=50, default_requests_per_hour=100)
+
+        denied = 0
+        for minute in range(60):
+            clock.now = 3600 * 1000 + minute * 60 + 1
+            allowed, _ = await limiter.check("ip:slow", "/items")
+            denied += not allowed
+            await asyncio.sleep(0)
+
+        assert denied == 0
+        hourly = int(await redis_client.get("rate_limit:hybrid:ip:slow:default:rph:1000"))
+        # 60 обслуженных запросов плюс неизрасходованный остаток последней аренды
+        assert 60 <= hourly <= 60 + limiter.lease_size
+
+    @pytest.mark.unit
+    async def test_windows_charged_only_for_granted(self, monkeypatch):
+        """rpm=5 grants 5 tokens; rph is charged 5, not the full lease."""
+        from core.middleware import hybrid_rate_limiting
+
+        clock = _Clock(3600 * 2000 + 1)
+        monkeypatch.setattr(hybrid_rate_limiting, "time", clock)
+        redis_client = fakeredis.FakeAsyncRedis()
+        limiter = _limiter(redis_client, default_requests_per_minute=5, default_requests_per_hour=50)
+
+        assert await _allowed(limiter, "ip:upload", 8) == 5
+        prefix = "rate_limit:hybrid:ip:upload:default"
+        assert int(await redis_client.get(f"{prefix}:rpm:{int(clock.now // 60)}")) == 5
+        assert int(await redis_client.get(f"{prefix}:rph:2000")) == 5
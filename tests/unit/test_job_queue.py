@@ -0,0 +1,233 @@
+"""
+Unit tests for the durable job queue
+Unit тесты для очереди фоновых задач (in-memory и Redis Streams через fakeredis)
+"""
+import asyncio
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+
+from core.background.job_queue import (
+    InMemoryJobQueue,
+    Job,
+    JobPriority,
+    RedisStreamsJobQueue,
+    register_job_handler,
+)
+from core.background.task_manager import TaskManager, TaskStatus
+from core.background.worker import JobWorker
+
+
+def _redis_queue(client=None, **kwargs) -> RedisStreamsJobQueue:
+    return RedisStreamsJobQueue(client or fakeredis.FakeAsyncRedis(decode_responses=True), **kwargs)
+
+
+async def _drain(queue, consumer="c1"):
+    jobs = []
+    while (job := await queue.dequeue(consumer)) is not None:
+        jobs.append(job)
+        await queue.ack(job)
+    return jobs
+
+
+@pytest.fixture(params=["memory", "redis"])
+def queue(request):
+    if request.param == "memory":
+        return InMemoryJobQueue(max_attempts=2)
+    return _redis_queue(max_attempts=2)
+
+
+class TestScheduling:
+    """Priority lanes and tenant fairness."""
+
+    @pytest.mark.unit
+    async def test_low_priority_not_starved(self, queue):
+        """Weighted lanes serve low priority while high priority is backlogged."""
+        for i in range(20):
+            await queue.enqueue(Job(name="j", payload={"i": i}, priority=JobPriority.HIGH))
+        await queue.enqueue(Job(name="j", payload={"low": True}, priority=JobPriority.LOW))
+
+        first_seven = [job.priority for job in (await _drain(queue))[:7]]
+
+        assert JobPriority.LOW in first_seven
+        assert first_seven.count(JobPriority.HIGH) == 6
+
+    @pytest.mark.unit
+    async def test_tenants_served_round_robin(self, queue):
+        """A large import of one tenant does not block other tenants."""
+        for i in range(10):
+            await queue.enqueue(Job(name="j", payload={"i": i}, tenant="big"))
+        await queue.enqueue(Job(name="j", tenant="small-a"))
+        await queue.enqueue(Job(name="j", tenant="small-b"))
+
+        tenants = [job.tenant for job in (await _drain(queue))[:3]]
+
+        assert sorted(tenants) == ["big", "small-a", "small-b"]
+
+
+class TestDelivery:
+    """Retries, dead-letter and recovery of unfinished jobs."""
+
+    @pytest.mark.unit
+    async def test_retry_then_dead_letter(self, queue):
+        """Failed jobs are retried until max_attempts, then dead-lettered."""
+        await queue.enqueue(Job(name="j", payload={"x": 1}))
+
+        job = await queue.dequeue("c1")
+        assert await queue.retry(job, "boom") is True
+
+        job = await queue.dequeue("c1")
+        assert job.attempts == 1 and job.payload == {"x": 1}
+        assert await queue.retry(job, "boom") is False
+
+        assert await queue.dequeue("c1") is None
+        assert queue.stats["dead_lettered"] == 1
+
+    @pytest.mark.unit
+    async def test_expired_job_reclaimed_by_other_worker(self):
+        """A job whose worker died is redelivered after the visibility timeout."""
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        queue = _redis_queue(client, visibility_timeout=0.05, reclaim_interval=0)
+        await queue.enqueue(Job(name="j", payload={"x": 1}))
+        crashed = await queue.dequeue("worker-a")
+
+        assert await queue.dequeue("worker-b") is None
+        await asyncio.sleep(0.1)
+        reclaimed = await queue.dequeue("worker-b")
+
+        assert reclaimed.id == crashed.id
+        assert reclaimed.attempts == 1
+        assert queue.stats["reclaimed"] == 1
+
+    @pytest.mark.unit
+    async def test_resume_claims_only_stale_jobs(self):
+        """On start a worker takes over jobs of dead workers, not jobs of live ones."""
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        await _redis_queue(client).enqueue(Job(name="j", payload={"x": 1}))
+        await _redis_queue(client).enqueue(Job(name="j", payload={"x": 2}))
+        crashed = await _redis_queue(client).dequeue("host-api-100")
+
+        await asyncio.sleep(0.1)
+        running = await _redis_queue(client).dequeue("host-api-101")
+
+        restarted = _redis_queue(client, visibility_timeout=0.05)
+        assert await restarted.resume("host-api-102") == 1
+        job = await restarted.dequeue("host-api-102")
+
+        assert job.id == crashed.id and job.id != running.id
+        assert job.attempts == 1
+        await restarted.ack(job)
+        consumers = {info["name"] for info in await client.xinfo_consumers(job.stream, "workers")}
+        assert "host-api-100" not in consumers and "host-api-101" in consumers
+
+    @pytest.mark.unit
+    def test_default_consumer_name_is_unique_per_process(self):
+        """uvicorn workers of one host get distinct consumer names."""
+        import os
+
+        from core.background.worker import default_consumer_name
+
+        assert default_consumer_name("api").endswith(f"-api-{os.getpid()}")
+
+
+class TestJobWorker:
+    """Worker execution and graceful shutdown."""
+
+    @pytest.mark.unit
+    async def test_worker_runs_handler_and_retries_failures(self):
+        """Handler exceptions are retried; successful runs are acknowledged."""
+        calls = []
+
+        @register_job_handler("test_flaky")
+        async def flaky(payload):
+            calls.append(payload["n"])
+            if len(calls) == 1:
+                raise RuntimeError("transient")
+
+        queue = InMemoryJobQueue()
+        await queue.enqueue(Job(name="test_flaky", payload={"n": 1}))
+        worker = JobWorker(queue, concurrency=1)
+
+        assert await worker.run_once() is True
+        assert await worker.run_once() is True
+
+        assert calls == [1, 1]
+        assert worker.stats["failed"] == 1 and worker.stats["processed"] == 1
+        assert queue.stats["acked"] == 1
+
+    @pytest.mark.unit
+    async def test_stop_returns_unfinished_job_to_queue(self):
+        """Jobs still running after the grace period go back to the queue."""
+        started = asyncio.Event()
+
+        @register_job_handler("test_slow")
+        async def slow(payload):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = InMemoryJobQueue()
+        await queue.enqueue(Job(name="test_slow"))
+        worker = JobWorker(queue, concurrency=1, poll_interval=0.01, shutdown_grace=0.01)
+
+        await worker.start()
+        await asyncio.wait_for(started.wait(), 1)
+        await worker.stop()
+
+        assert (await queue.depth())["normal"] == 1
+        assert queue.stats["released"] == 1
+
+
+class TestTaskManagerQueueing:
+    """TaskManager queues tasks instead of rejecting them."""
+
+    @pytest.mark.unit
+    async def test_tasks_over_limit_wait_for_slot(self):
+        """Tasks beyond max_concurrent_tasks stay pending and run later."""
+        manager = TaskManager(max_concurrent_tasks=1)
+        release = asyncio.Event()
+
+        assert await manager.create_task("a", "first", release.wait())
+        assert await manager.create_task("b", "second", asyncio.sleep(0))
+        await asyncio.sleep(0)
+
+        assert manager.get_task_info("b").status == TaskStatus.PENDING
+        release.set()
+        await manager.wait_for_task("b", timeout=1)
+
+        assert manager.get_task_info("b").status == TaskStatus.COMPLETED
+        assert manager.stats["queued_tasks"] == 0
+
+
+class TestBatchProcessingJobs:
+    """Direct and queued batch jobs share one job accounting."""
+
+    @pytest.mark.unit
+    async def test_queued_and_direct_jobs_counted(self, monkeypatch):
+        from services import batch_processing_service
+        from services.batch_processing_service import (
+            BatchProcessingService, ProcessingJobConfig, run_batch_processing_job
+        )
+
+        monkeypatch.setattr(BatchProcessingService, "__init__", lambda self: None)
+        service = BatchProcessingService()
+        service.config = ProcessingJobConfig()
+        service.logger = MagicMock()
+        service.active_jobs = {}
+        service.stats = {"total_jobs": 0, "active_jobs": 0}
+        monkeypatch.setattr(batch_processing_service, "_batch_processing_service", service)
+        processed = []
+
+        async def process(request_id, materials):
+            assert service.stats["active_jobs"] == 1
+            processed.append(request_id)
+
+        service._process_materials_batch = process
+
+        await run_batch_processing_job({"request_id": "queued", "materials": []})
+        assert await service.start_processing_job("direct", [])
+        await service.active_jobs["direct"]
+
+        assert processed == ["queued", "direct"]
+        assert service.stats["total_jobs"] == 2 and service.stats["active_jobs"] == 0
+        assert service.active_jobs == {}
@@ -0,0 +1,43 @@
+"""
+Unit tests for lazy adapter and AI provider loading
+Unit тесты реестров адаптеров и AI провайдеров с ленивой загрузкой
+"""
+import pytest
+
+import core.database.adapters as adapters
+from core.database import factories
+from core.database.exceptions import ConfigurationError
+from core.database.factories import AIClientFactory, register_ai_provider
+
+
+class TestRegistries:
+    """Factories dispatch through registries; adapters are resolved on access."""
+
+    @pytest.mark.unit
+    def test_ai_provider_registry(self, monkeypatch):
+        monkeypatch.setattr(factories, "AI_PROVIDER_REGISTRY", dict(factories.AI_PROVIDER_REGISTRY))
+        created = []
+        register_ai_provider("local_test", lambda config: created.append(config) or "client")
+
+        try:
+            assert AIClientFactory.create_ai_client("local_test") == "client"
+            assert len(created) == 1
+            with pytest.raises(ConfigurationError, match="Unsupported AI provider: missing"):
+                AIClientFactory.create_ai_client("missing")
+        finally:
+            AIClientFactory.clear_cache()
+
+    @pytest.mark.unit
+    def test_vector_database_registry_covers_database_types(self):
+        from core.config import DatabaseType
+
+        assert set(factories.VECTOR_DATABASE_REGISTRY) == {db_type.value for db_type in DatabaseType}
+
+    @pytest.mark.unit
+    def test_adapters_resolved_on_access(self):
+        from core.database.adapters.postgresql_adapter import PostgreSQLAdapter
+
+        assert adapters.PostgreSQLAdapter is PostgreSQLAdapter
+        assert set(adapters.__all__) == set(adapters.ADAPTER_MODULES)
+        with pytest.raises(AttributeError):
+            adapters.MongoAdapter
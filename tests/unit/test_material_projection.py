@@ -0,0 +1,136 @@
+"""
+Unit tests for field projection and vector-free reads
+Unit тесты для проекции полей и чтения без векторов (адаптер Qdrant, MaterialsService, роуты материалов)
+"""
+import uuid
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.routes.materials import get_materials_service, router
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+from services.materials import MaterialsService, parse_material_fields
+
+VECTOR_SIZE = 1536
+
+
+def _points(count: int):
+    return [
+        {
+            "id": str(uuid.UUID(int=i + 1)),
+            "vector": [float((i + j) % 7 + 1) for j in range(VECTOR_SIZE)],
+            "payload": {
+                "name": f"Цемент М{400 + i}",
+                "use_category": "Цемент",
+                "unit": "мешок",
+                "sku": f"CEM-{i:03d}",
+                "description": "Портландцемент " * 20,
+                "created_at": "2025-06-16T16:46:29",
+                "updated_at": "2025-06-16T16:46:29",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+async def vector_db():
+    db = AsyncQdrantVectorDatabase({"location": ":memory:", "collection_name": "materials", "vector_size": VECTOR_SIZE})
+    await db.create_collection("materials", VECTOR_SIZE)
+    await db.upsert_many("materials", _points(5))
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def service(vector_db):
+    return MaterialsService(vector_db=vector_db, ai_client=MagicMock())
+
+
+class TestAdapterProjection:
+    """Vectors and unused payload keys are not fetched by default."""
+
+    @pytest.mark.unit
+    async def test_search_without_vectors(self, vector_db):
+        query = _points(1)[0]["vector"]
+
+        default = await vector_db.search("materials", query, limit=2)
+        projected = await vector_db.search("materials", query, limit=2, fields=["name"])
+        with_vectors = await vector_db.search("materials", query, limit=2, with_vectors=True)
+
+        assert "vector" not in default[0] and "sku" in default[0]["payload"]
+        assert projected[0]["payload"] == {"name": "Цемент М400"}
+        assert len(with_vectors[0]["vector"]) == VECTOR_SIZE
+
+    @pytest.mark.unit
+    async def test_get_by_id_and_scroll_projection(self, vector_db):
+        point_id = _points(1)[0]["id"]
+
+        record = await vector_db.get_by_id("materials", point_id, fields=["sku"])
+        full = await vector_db.get_by_id("materials", point_id, with_vectors=True)
+        scrolled = await vector_db.scroll_all("materials", fields=["unit"])
+
+        assert record == {"id": point_id, "payload": {"sku": "CEM-000"}}
+        assert len(full["vector"]) == VECTOR_SIZE
+        assert all(item["payload"] == {"unit": "мешок"} for item in scrolled)
+
+    @pytest.mark.unit
+    async def test_update_vector_keeps_stored_vector(self, vector_db):
+        point_id = _points(1)[0]["id"]
+        stored = await vector_db.get_by_id("materials", point_id, with_vectors=True)
+
+        assert await vector_db.update_vector("materials", point_id, payload={"name": "Цемент М500"})
+
+        updated = await vector_db.get_by_id("materials", point_id, with_vectors=True)
+        assert updated["payload"]["name"] == "Цемент М500"
+        assert updated["vector"] == pytest.approx(stored["vector"])
+
+
+class TestServiceProjection:
+    """MaterialsService reads only the projected fields."""
+
+    @pytest.mark.unit
+    def test_parse_fields(self):
+        assert parse_material_fields("name, unit,name") == ["name", "unit"]
+        assert parse_material_fields(None) is None
+        assert parse_material_fields("") is None
+        with pytest.raises(ValueError):
+            parse_material_fields("name,price")
+
+    @pytest.mark.unit
+    async def test_get_material_without_embedding(self, service):
+        point_id = _points(1)[0]["id"]
+
+        material = await service.get_material(point_id, fields=["sku"])
+        with_embedding = await service.get_material(point_id, fields=["embedding"])
+
+        assert material.sku == "CEM-000"
+        assert material.name == "Цемент М400"  # обязательные поля схемы читаются всегда
+        assert material.description is None
+        assert material.embedding is None
+        assert len(with_embedding.embedding) == VECTOR_SIZE
+
+
+class TestRoutesProjection:
+    """fields= trims responses, unknown fields are rejected."""
+
+    @pytest.mark.unit
+    async def test_list_and_get_with_fields(self, service):
+        app = FastAPI()
+        app.include_router(router, prefix="/materials")
+        app.dependency_overrides[get_materials_service] = lambda: service
+        point_id = _points(1)[0]["id"]
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            listed = await client.get("/materials/", params={"fields": "name,unit", "limit": 3})
+            full = await client.get("/materials/", params={"limit": 3})
+            single = await client.get(f"/materials/{point_id}", params={"fields": "sku"})
+            invalid = await client.get("/materials/", params={"fields": "price"})
+
+        assert listed.status_code == 200
+        assert [set(item) for item in listed.json()] == [{"id", "name", "unit"}] * 3
+        assert len(listed.content) < len(full.content) / 3
+        assert single.json() == {"id": point_id, "sku": "CEM-000"}
+        assert invalid.status_code == 400
@@ -0,0 +1,77 @@
+"""
+Unit tests for full-text search of materials in PostgreSQL
+Unit тесты полнотекстового поиска: генерируемый tsvector, GIN индекс, запрос FTS ∪ триграммы
+"""
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from core.database.adapters.postgresql_adapter import MaterialModel, PostgreSQLAdapter
+
+
+def _adapter(rows):
+    adapter = PostgreSQLAdapter(SimpleNamespace())
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock(
+        mappings=MagicMock(return_value=MagicMock(all=MagicMock(return_value=rows)))
+    ))
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+
+    adapter.get_session = get_session
+    return adapter, session
+
+
+class TestSearchVectorColumn:
+    """search_vector is a weighted generated tsvector with a GIN index."""
+
+    @pytest.mark.unit
+    def test_ddl(self):
+        dialect = postgresql.dialect()
+        table = str(CreateTable(MaterialModel.__table__).compile(dialect=dialect))
+        index = next(i for i in MaterialModel.__table__.indexes if i.name == "idx_materials_search_vector")
+
+        assert "search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('russian'" in table
+        assert "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(sku, '')), 'A')" in table
+        assert "coalesce(description, '')), 'C')) STORED" in table
+        assert "USING gin (search_vector)" in str(CreateIndex(index).compile(dialect=dialect))
+
+
+class TestTextSearch:
+    """Text search is one indexed statement: FTS candidates ∪ trigram candidates."""
+
+    @pytest.mark.unit
+    async def test_single_indexed_query(self):
+        adapter, session = _adapter([{
+            "id": 5, "name": "Цемент М500", "fts_rank": 0.5, "name_similarity": 0.4,
+            "description_similarity": 0.1, "text_score": 0.37,
+        }])
+
+        results = await adapter.search_materials_hybrid("цементы", limit=10, similarity_threshold=0.25)
+
+        threshold, search = session.execute.await_args_list
+        assert "pg_trgm.similarity_threshold" in threshold.args[0].text
+        assert threshold.args[1] == {"threshold": "0.25"}
+        sql, params = search.args[0].text, search.args[1]
+        assert "search_vector @@ q.tsquery" in sql and "ts_rank_cd(m.search_vector, q.tsquery, 32)" in sql
+        assert "websearch_to_tsquery('russian', :query) || websearch_to_tsquery('simple', :query)" in sql
+        assert "name % :query OR description % :query" in sql and "UNION" in sql
+        assert "ILIKE" not in sql.upper()
+        assert params == {"query": "цементы", "candidates": 20, "limit": 10}
+        assert results[0]["id"] == "5" and results[0]["similarity_score"] == 0.37
+
+    @pytest.mark.unit
+    async def test_hybrid_shares_text_candidates(self):
+        adapter, session = _adapter([])
+
+        await adapter.search_hybrid("цемент", [0.1, 0.2], limit=5)
+
+        sql = session.execute.await_args.args[0].text
+        assert "search_vector @@ q.tsquery" in sql and "<=>" in sql
+        assert "ILIKE" not in sql.upper()
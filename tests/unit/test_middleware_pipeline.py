@@ -0,0 +1,223 @@
+"""
+Unit tests for the fused pure-ASGI middleware pipeline
+Unit тесты для единого pure ASGI пайплайна middleware (контекст запроса, безопасность, rate limit, сжатие, логирование)
+"""
+import asyncio
+import gzip
+import json
+import logging
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from core.config import get_settings
+from core.logging.specialized.http import SampledRequestLogger, TailSampler
+from core.middleware.factory import MiddlewareFactory
+from core.middleware.pipeline import FusedMiddlewarePipeline, get_request_context
+
+LARGE_TEXT = "цемент М500 " * 500
+
+
+def _app(**kwargs) -> FusedMiddlewarePipeline:
+    app = FastAPI()
+    seen = {}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int, request: Request):
+        ctx = get_request_context(request)
+        seen["task"] = asyncio.current_task()
+        return {
+            "item_id": item_id,
+            "client_ip": ctx.client_ip,
+            "client_id": ctx.client_id,
+            "correlation_id": request.state.correlation_id,
+        }
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE_TEXT)
+
+    @app.get("/branded")
+    async def branded():
+        return PlainTextResponse("ok", headers={"Server": "uvicorn", "X-Powered-By": "FastAPI"})
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(20):
+                yield LARGE_TEXT.encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/events")
+    async def events():
+        async def chunks():
+            for i in range(3):
+                yield f"data: {i}{' ' * 1000}\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    options = {
+        "security": {"enable_security_headers": True},
+        "compression": {"minimum_size": 1024},
+        "body_cache": {},
+    }
+    options.update(kwargs)
+    pipeline = FusedMiddlewarePipeline(app, **options)
+    pipeline.seen = seen
+    return pipeline
+
+
+def _client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestRequestContext:
+    """Context is computed once and shared with the endpoint."""
+
+    @pytest.mark.unit
+    async def test_context_in_endpoint_and_headers(self):
+        app = _app()
+        async with _client(app) as client:
+            response = await client.get(
+                "/items/7", headers={"X-Forwarded-For": "203.0.113.5, 10.0.0.1", "X-Correlation-ID": "req-1"}
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "item_id": 7, "client_ip": "203.0.113.5", "client_id": "ip:203.0.113.5", "correlation_id": "req-1",
+        }
+        assert response.headers["x-correlation-id"] == "req-1"
+        assert response.headers["x-request-id"] == "req-1"
+        assert response.headers["x-content-type-options"] == "nosniff"
+
+    @pytest.mark.unit
+    async def test_security_headers_replace_app_headers(self):
+        """Server/X-Powered-By set by the app are overridden, not sent twice."""
+        async with _client(_app()) as client:
+            response = await client.get("/branded")
+
+        assert response.headers.get_list("server") == [""]
+        assert response.headers.get_list("x-powered-by") == [""]
+
+    @pytest.mark.unit
+    async def test_endpoint_runs_in_caller_task(self):
+        """No per-layer tasks: the endpoint runs in the task that called the pipeline."""
+        app = _app()
+        async with _client(app) as client:
+            await client.get("/items/1")
+
+        assert app.seen["task"] is asyncio.current_task()
+
+    @pytest.mark.unit
+    async def test_access_log_uses_route_template(self, caplog):
+        app = _app(request_logger=SampledRequestLogger(sampler=TailSampler(sample_rate=1.0)))
+        with caplog.at_level(logging.INFO, logger="request"):
+            async with _client(app) as client:
+                await client.get("/items/42", headers={"X-Correlation-ID": "req-2"})
+
+        records = [json.loads(record.getMessage()) for record in caplog.records if record.name == "request"]
+        assert len(records) == 1
+        assert records[0]["route"] == "/items/{item_id}"
+        assert records[0]["path"] == "/items/42"
+        assert records[0]["status_code"] == 200
+        assert records[0]["correlation_id"] == "req-2"
+
+
+class TestSecurityPhase:
+    """Security checks before routing."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("url, headers, status_code", [
+        ("/items/1?file=../../etc/passwd", {}, 400),
+        ("/items/1?q=1%20union%20select%20password", {}, 400),
+        ("/items/1", {"User-Agent": "sqlmap/1.7"}, 403),
+        ("/items/1", {"Content-Length": str(100 * 1024 * 1024)}, 413),
+    ])
+    async def test_rejections(self, url, headers, status_code):
+        app = _app()
+        async with _client(app) as client:
+            response = await client.get(url, headers=headers)
+
+        assert response.status_code == status_code
+        assert "x-correlation-id" in response.headers
+        assert app.get_stats()["security_rejected"] == 1
+        assert "task" not in app.seen
+
+    @pytest.mark.unit
+    async def test_cyrillic_query_allowed(self):
+        app = _app()
+        async with _client(app) as client:
+            response = await client.get("/items/1", params={"q": "цемент; выбор марки"})
+
+        assert response.status_code == 200
+
+
+class TestRateLimitPhase:
+    """Hybrid rate limiter runs over the shared context."""
+
+    @pytest.mark.unit
+    async def test_limit_and_headers(self):
+        app = _app(rate_limit={
+            "redis_client": fakeredis.FakeAsyncRedis(), "default_requests_per_minute": 2,
+            "enable_burst_protection": False, "lease_size": 2, "endpoint_limits": {},
+        })
+        async with _client(app) as client:
+            responses = [await client.get("/items/1", headers={"X-API-Key": "k1"}) for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert responses[0].headers["x-ratelimit-limit-rpm"] == "2"
+        assert "x-correlation-id" in responses[2].headers
+        assert app.get_stats()["rate_limited"] == 1
+
+
+class TestCompressionPhase:
+    """Compression in the send wrapper without buffering streams."""
+
+    @pytest.mark.unit
+    async def test_single_body_compressed(self):
+        app = _app()
+        async with _client(app) as client:
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(LARGE_TEXT.encode())
+        assert response.text == LARGE_TEXT
+
+    @pytest.mark.unit
+    async def test_stream_compressed_incrementally(self):
+        app = _app()
+        async with _client(app) as client:
+            async with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw) == LARGE_TEXT.encode() * 20
+
+    @pytest.mark.unit
+    async def test_small_and_event_stream_not_compressed(self):
+        app = _app()
+        async with _client(app) as client:
+            small = await client.get("/items/1", headers={"Accept-Encoding": "gzip"})
+            events = await client.get("/events", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in events.headers
+        assert events.text.startswith("data: 0")
+
+
+class TestFactory:
+    """MIDDLEWARE_PIPELINE selects the fused pipeline or the stacked layers."""
+
+    @pytest.mark.unit
+    def test_fused_and_stack_modes(self):
+        settings = get_settings()
+        fused = MiddlewareFactory(settings.model_copy(update={"MIDDLEWARE_PIPELINE": "fused"})).create_middleware_stack()
+        stack = MiddlewareFactory(settings.model_copy(update={"MIDDLEWARE_PIPELINE": "stack"})).create_middleware_stack()
+
+        assert fused[0][0] is FusedMiddlewarePipeline
+        assert set(fused[0][1]) == {"security", "rate_limit", "compression", "body_cache"}
+        assert FusedMiddlewarePipeline not in [middleware for middleware, _ in stack]
+        assert len(stack) >= 4
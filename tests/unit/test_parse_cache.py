@@ -0,0 +1,107 @@
+"""
+Unit tests for ParseResultCache
+Unit тесты для кеша результатов AI парсинга с поиском почти-дубликатов
+"""
+import pytest
+
+from core.parsers.interfaces.ai_parser_interface import MaterialParseData
+from core.parsers.services.parse_cache import ParseResultCache, canonicalize_material
+
+
+class FakeCacheDB:
+    """Minimal in-memory stand-in for the cache database."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+        return True
+
+
+def _parsed(unit_parsed: str = "кг", coefficient: float = 50.0) -> MaterialParseData:
+    return MaterialParseData(
+        name="Цемент М500 Д0 50кг",
+        unit_parsed=unit_parsed,
+        price_coefficient=coefficient,
+        confidence=0.9,
+        parsing_method="ai_gpt",
+    )
+
+
+class TestCanonicalization:
+    """Tests for canonical material form."""
+
+    @pytest.mark.unit
+    def test_ignores_case_quotes_spacing_and_order(self):
+        """Trivial supplier variations share one canonical form."""
+        variants = [
+            'Цемент "М500" Д0 50кг',
+            "цемент  «м500»  д0 50 кг",
+            "Д0 50 кг Цемент М500",
+        ]
+
+        assert len({tuple(canonicalize_material(name)[0]) for name in variants}) == 1
+
+
+class TestParseResultCache:
+    """Tests for exact and near-duplicate lookups."""
+
+    @pytest.mark.unit
+    async def test_exact_canonical_hit(self):
+        """Reordered name is served as an exact hit."""
+        cache = ParseResultCache(namespace="gpt-4o-mini")
+        await cache.store("Цемент М500 Д0 50кг", "", _parsed())
+
+        data, kind = await cache.lookup("д0 50 КГ цемент «М500»", "")
+
+        assert kind == "exact"
+        assert data.price_coefficient == 50.0
+
+    @pytest.mark.unit
+    async def test_near_duplicate_hit(self):
+        """Name with a small spelling difference reuses the cached parse."""
+        cache = ParseResultCache(namespace="gpt-4o-mini", similarity_cutoff=0.85)
+        await cache.store("Цемент портландский М500 Д0 50кг мешок", "", _parsed())
+
+        data, kind = await cache.lookup("Цемент портланд. М500 Д0 50кг мешок", "")
+
+        assert kind == "near"
+        assert data.unit_parsed == "кг"
+        assert cache.get_stats()["near_hits"] == 1
+
+    @pytest.mark.unit
+    async def test_different_numbers_never_match(self):
+        """Package size differences are not treated as near duplicates."""
+        cache = ParseResultCache(namespace="gpt-4o-mini", similarity_cutoff=0.5)
+        await cache.store("Цемент портландский М500 Д0 50кг мешок", "", _parsed())
+
+        assert await cache.lookup("Цемент портландский М500 Д0 25кг мешок", "") is None
+        assert cache.get_stats()["misses"] == 1
+
+    @pytest.mark.unit
+    async def test_other_namespace_is_not_reused(self):
+        """Parses of other models are stored under a different key."""
+        cache_db = FakeCacheDB()
+        await ParseResultCache(namespace="model-a", cache_db=cache_db).store("Кирпич М150", "шт", _parsed("шт", 1.0))
+
+        assert await ParseResultCache(namespace="model-b", cache_db=cache_db).lookup("Кирпич М150", "шт") is None
+
+    @pytest.mark.unit
+    async def test_persistent_entries_shared_between_instances(self):
+        """Entries stored by one worker are found by another, including near duplicates."""
+        cache_db = FakeCacheDB()
+        await ParseResultCache(namespace="gpt-4o-mini", cache_db=cache_db).store(
+            "Цемент портландский М500 Д0 50кг мешок", "", _parsed()
+        )
+
+        other_worker = ParseResultCache(namespace="gpt-4o-mini", similarity_cutoff=0.85, cache_db=cache_db)
+        exact = await other_worker.lookup("цемент портландский м500 д0 50 кг мешок", "")
+        near = await other_worker.lookup("Цемент портланд. М500 Д0 50кг мешок", "")
+
+        assert exact[1] == "exact"
+        assert near[1] == "near"
+        assert other_worker.get_stats()["hit_rate"] == pytest.approx(1.0)
@@ -0,0 +1,167 @@
+"""
+Unit tests for pgvector search in PostgreSQL
+Unit тесты для pgvector: тип колонки, HNSW индекс, гибридный поиск одним запросом, цепочка миграций
+"""
+import re
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from core.database.adapters.postgresql_adapter import MaterialModel, PostgreSQLAdapter
+from core.database.pgvector import Vector, to_vector_literal
+from core.repositories.hybrid_materials import HybridMaterialsRepository
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "alembic" / "versions"
+
+
+def _row(material_id, vector_score, text_score, hybrid_score):
+    return {
+        "id": material_id, "name": "Цемент М500", "sku": "CEM-500",
+        "vector_score": vector_score, "text_score": text_score, "hybrid_score": hybrid_score,
+    }
+
+
+@pytest.fixture
+def repository_logging(monkeypatch):
+    # DatabaseLogger абстрактный: в unit тестах логирование операций не проверяется
+    monkeypatch.setattr("core.repositories.hybrid_materials.DatabaseLogger", MagicMock())
+
+
+def _adapter(rows, **settings):
+    """Adapter whose sessions are one mocked session."""
+    adapter = PostgreSQLAdapter(SimpleNamespace(**settings))
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=MagicMock(
+        mappings=MagicMock(return_value=MagicMock(all=MagicMock(return_value=rows)))
+    ))
+
+    @asynccontextmanager
+    async def get_session():
+        yield session
+
+    adapter.get_session = get_session
+    return adapter, session
+
+
+class TestVectorType:
+    """Vector column type and HNSW index DDL."""
+
+    @pytest.mark.unit
+    def test_literal_and_processors(self):
+        vector = Vector(3)
+        dialect = postgresql.dialect()
+
+        assert to_vector_literal([1, 0.5, -2]) == "[1.0,0.5,-2.0]"
+        assert vector.get_col_spec() == "VECTOR(3)"
+        assert vector.bind_processor(dialect)([0.25, 1, 0]) == "[0.25,1.0,0.0]"
+        assert vector.result_processor(dialect, None)("[0.25,1,0]") == [0.25, 1.0, 0.0]
+        assert vector.result_processor(dialect, None)(None) is None
+
+    @pytest.mark.unit
+    def test_ddl(self):
+        dialect = postgresql.dialect()
+        table = str(CreateTable(MaterialModel.__table__).compile(dialect=dialect))
+        index = next(i for i in MaterialModel.__table__.indexes if i.name == "idx_materials_embedding_hnsw")
+        index_ddl = str(CreateIndex(index).compile(dialect=dialect))
+
+        assert "embedding_vector VECTOR(1536)" in table
+        assert "USING hnsw (embedding_vector vector_cosine_ops)" in index_ddl
+        assert "m = 16" in index_ddl and "ef_construction = 64" in index_ddl
+
+
+class TestSearch:
+    """Vector and hybrid search run as single statements."""
+
+    @pytest.mark.unit
+    async def test_hybrid_is_one_statement(self):
+        adapter, session = _adapter([_row(7, 0.91, 0.4, 0.757)])
+
+        results = await adapter.search_hybrid("цемент", [0.1, 0.2], limit=5, vector_weight=0.7, text_weight=0.3)
+
+        session.execute.assert_awaited_once()
+        statement, params = session.execute.await_args.args
+        assert "<=>" in statement.text and "similarity(m.name, :query)" in statement.text
+        assert params["query_vector"] == "[0.1,0.2]" and params["candidates"] == 10
+        assert results == [{**_row("7", 0.91, 0.4, 0.757), "similarity_score": 0.757}]
+
+    @pytest.mark.unit
+    async def test_ef_search_and_min_score(self):
+        adapter, session = _adapter([], POSTGRESQL_HNSW_EF_SEARCH=80)
+
+        await adapter.search_vector([0.1, 0.2], limit=3, min_score=0.5)
+
+        set_local, search = [call.args for call in session.execute.await_args_list]
+        assert set_local[0].text == "SET LOCAL hnsw.ef_search = 80"
+        assert "vector_score >= :min_score" in search[0].text and search[1]["limit"] == 3
+
+    @pytest.mark.unit
+    async def test_repository_uses_single_query(self, repository_logging):
+        adapter, session = _adapter(
+            [_row(1, 0.9, 0.0, 0.63), _row(2, 0.0, 0.5, 0.15)], POSTGRESQL_PGVECTOR_SEARCH=True
+        )
+        vector_db = MagicMock(search=AsyncMock())
+        repository = HybridMaterialsRepository(vector_db=vector_db, relational_db=adapter)
+        repository.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+
+        results = await repository.search_materials_hybrid("цемент", limit=5)
+
+        session.execute.assert_awaited_once()
+        repository.get_embedding.assert_awaited_once_with("цемент")
+        vector_db.search.assert_not_called()
+        assert [r["id"] for r in results] == ["1", "2"]
+        assert {r["search_type"] for r in results} == {"hybrid"}
+        assert results[0]["combined_score"] == 0.63
+
+    @pytest.mark.unit
+    async def test_repository_falls_back_without_pgvector(self, repository_logging):
+        adapter, session = _adapter([], POSTGRESQL_PGVECTOR_SEARCH=False)
+        adapter.search_materials_hybrid = AsyncMock(return_value=[{"id": "3", "similarity_score": 0.8}])
+        repository = HybridMaterialsRepository(vector_db=MagicMock(search=AsyncMock(return_value=[])),
+                                               relational_db=adapter)
+        repository.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+
+        results = await repository.search_materials_hybrid("цемент", limit=5)
+
+        session.execute.assert_not_called()
+        assert [r["search_type"] for r in results] == ["sql"]
+
+    @pytest.mark.unit
+    async def test_repository_falls_back_on_pgvector_error(self, repository_logging):
+        adapter, session = _adapter([], POSTGRESQL_PGVECTOR_SEARCH=True)
+        session.execute.side_effect = RuntimeError('type "vector" does not exist')
+        adapter.search_materials_hybrid = AsyncMock(return_value=[{"id": "3", "similarity_score": 0.8}])
+        vector_db = MagicMock(search=AsyncMock(return_value=[]))
+        repository = HybridMaterialsRepository(vector_db=vector_db, relational_db=adapter)
+        repository.get_embedding = AsyncMock(return_value=[0.1, 0.2])
+
+        results = await repository.search_materials_hybrid("цемент", limit=5)
+
+        vector_db.search.assert_awaited()
+        assert [r["search_type"] for r in results] == ["sql"]
+
+    @pytest.mark.unit
+    def test_pgvector_search_is_opt_in(self):
+        assert PostgreSQLAdapter(SimpleNamespace()).pgvector_search is False
+
+
+class TestMigrations:
+    """Alembic revisions form a single chain."""
+
+    @pytest.mark.unit
+    def test_single_head(self):
+        revisions = {}
+        for path in MIGRATIONS.glob("*.py"):
+            source = path.read_text(encoding="utf-8")
+            revision = re.search(r"^revision(?::[^=]+)?\s*=\s*['\"](.+?)['\"]", source, re.M).group(1)
+            down = re.search(r"^down_revision(?::[^=]+)?\s*=\s*(None|['\"](.+?)['\"])", source, re.M).group(2)
+            revisions[revision] = down
+
+        assert set(revisions.values()) - {None} <= set(revisions)
+        heads = set(revisions) - set(revisions.values())
+        assert len(heads) == 1
+        assert revisions["006_pgvector_embeddings"] == "005_processing_results_table"
@@ -0,0 +1,78 @@
+"""
+Unit tests for CPU process pool offload
+Unit тесты для выноса CPU-нагрузки в пул процессов
+"""
+import asyncio
+import time
+
+import pytest
+
+from core.background import cpu_tasks
+from core.background.process_pool import CPUTaskExecutor
+from core.monitoring.loop_lag import LoopLagMonitor
+
+
+@pytest.fixture
+def executor():
+    executor = CPUTaskExecutor(max_workers=2, chunk_size=50)
+    yield executor
+    executor.shutdown()
+
+
+class TestCPUTaskExecutor:
+    """Tests for chunked execution in worker processes."""
+
+    @pytest.mark.unit
+    async def test_map_chunks_preserves_order(self, executor):
+        """Chunk results are concatenated in input order."""
+        texts = [f"цемент м{i}" for i in range(230)]
+
+        scores = await executor.map_chunks(cpu_tasks.score_texts, texts, "цемент м5", "levenshtein")
+
+        assert scores == cpu_tasks.score_texts(texts, "цемент м5", "levenshtein")
+        assert executor.get_stats()["chunks"] == 5
+
+    @pytest.mark.unit
+    def test_chunks_spread_across_workers(self, executor):
+        """Small inputs are still split so every process gets work."""
+        assert executor._chunk_size_for(60, None) == 30
+        assert executor._chunk_size_for(1000, None) == 50
+
+    @pytest.mark.unit
+    async def test_disabled_pool_runs_in_thread(self):
+        """CPU_POOL_WORKERS=0 runs tasks via asyncio.to_thread."""
+        executor = CPUTaskExecutor(max_workers=0)
+
+        assert await executor.run(cpu_tasks.levenshtein_distance, "kitten", "sitting") == 3
+        assert executor.get_stats()["thread_fallbacks"] == 1
+        assert executor.get_stats()["started"] is False
+
+    @pytest.mark.unit
+    async def test_price_file_loaded_in_pool(self, executor, tmp_path):
+        """Price file is read, validated and cleaned by one pool task."""
+        path = tmp_path / "prices.csv"
+        path.write_text("name,unit_price,calc_unit\nЦемент, 450 ,мешок\n,100,шт\nПесок,-1,т\n", encoding="utf-8")
+
+        df, is_raw, missing = await executor.run(
+            cpu_tasks.load_raw_price_file, str(path), ["name", "unit_price", "calc_unit"], {"count": 1}
+        )
+
+        assert is_raw and missing == []
+        assert df["name"].tolist() == ["Цемент"]
+        assert df["count"].tolist() == [1]
+
+
+class TestLoopLagMonitor:
+    """Tests for event loop lag measurement."""
+
+    @pytest.mark.unit
+    async def test_blocking_call_shows_as_lag(self):
+        """Synchronous work on the loop is reported as lag."""
+        monitor = LoopLagMonitor(interval=0.01, publish=False)
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+        assert monitor.get_stats()["max_ms"] >= 50
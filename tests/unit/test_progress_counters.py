@@ -0,0 +1,183 @@
+"""
+Unit tests for incremental batch progress counters
+Unit тесты для инкрементальных счетчиков прогресса (in-memory и Redis через fakeredis)
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import fakeredis
+import pytest
+
+from core.background.progress_counters import InMemoryProgressCounters, RedisProgressCounters
+
+
+@pytest.fixture(params=["memory", "redis"])
+def counters(request):
+    if request.param == "memory":
+        return InMemoryProgressCounters()
+    return RedisProgressCounters(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+def _store(records, statistics):
+    store = MagicMock()
+    store.get_processing_results = AsyncMock(return_value=records)
+    store.get_processing_statistics = AsyncMock(return_value=statistics)
+    return store
+
+
+class TestTransitions:
+    """Per-request and global counters follow status changes."""
+
+    @pytest.mark.unit
+    async def test_status_flow(self, counters):
+        """pending -> processing -> completed/failed moves one unit per change."""
+        await counters.init_request("r1", ["m1", "m2", "m3"])
+
+        await counters.transition("r1", "m1", "processing")
+        await counters.transition("r1", "m1", "completed")
+        await counters.transition("r1", "m2", "processing")
+
+        assert await counters.get_progress("r1") == {"total": 3, "completed": 1, "failed": 0, "pending": 2}
+        assert await counters.active_count() == 1
+
+        await counters.transition("r1", "m2", "failed")
+        await counters.transition("r1", "m3", "done")
+
+        assert await counters.get_counts("r1") == {"total": 3, "pending": 0, "processing": 0, "completed": 2, "failed": 1}
+        assert await counters.active_count() == 0
+
+    @pytest.mark.unit
+    async def test_repeated_and_untracked_updates(self, counters):
+        """Same status twice is counted once; unknown materials do not change counters."""
+        await counters.init_request("r1", ["m1"])
+        await counters.set_global({"batches": 1, "records": 1, "pending": 1})
+
+        await counters.transition("r1", "m1", "completed")
+        await counters.transition("r1", "m1", "completed")
+        assert await counters.transition("r1", "unknown", "completed") is None
+        assert await counters.transition("r2", "m1", "completed") is None
+
+        assert (await counters.get_counts("r1"))["completed"] == 1
+        assert (await counters.get_statistics())["status_counts"] == {
+            "pending": 0, "processing": 0, "completed": 1, "failed": 0
+        }
+        assert counters.stats["untracked_updates"] == 2
+
+    @pytest.mark.unit
+    async def test_statistics_need_seed(self, counters):
+        """Global statistics come from counters only after seeding from the store."""
+        await counters.init_request("r1", ["m1", "m2"])
+        assert await counters.get_statistics() is None
+
+        await counters.set_global({"batches": 5, "records": 40, "completed": 38, "pending": 2})
+        await counters.init_request("r2", ["m3"])
+        stats = await counters.get_statistics()
+
+        assert stats["total_batches"] == 6 and stats["total_records"] == 41
+        assert stats["status_counts"]["pending"] == 3
+        assert stats["active_batches"] == 2
+
+        await counters.invalidate_global()
+        assert await counters.get_statistics() is None
+
+
+class TestReconcile:
+    """Drift between counters and processing records is repaired."""
+
+    @pytest.mark.unit
+    async def test_request_and_global_drift_repaired(self, counters):
+        await counters.init_request("r1", ["m1", "m2"])
+        await counters.set_global({"batches": 1, "records": 2, "pending": 2})
+        # Запись обновлена в хранилище, а счетчик нет (обрыв между операциями)
+        store = _store(
+            [{"material_id": "m1", "status": "completed"}, {"material_id": "m2", "status": "processing"}],
+            {"total_batches": 1, "total_records": 2, "status_counts": {"completed": 1, "processing": 1}},
+        )
+
+        result = await counters.reconcile(store)
+
+        assert result == {"requests_checked": 1, "repaired": 1}
+        assert await counters.get_progress("r1") == {"total": 2, "completed": 1, "failed": 0, "pending": 1}
+        assert (await counters.get_statistics())["status_counts"]["completed"] == 1
+        # Статусы материалов тоже восстановлены: следующий переход учитывается верно
+        await counters.transition("r1", "m2", "completed")
+        assert await counters.get_progress("r1") == {"total": 2, "completed": 2, "failed": 0, "pending": 0}
+        assert await counters.active_count() == 0
+
+    @pytest.mark.unit
+    async def test_consistent_counters_untouched(self, counters):
+        await counters.init_request("r1", ["m1"])
+        store = _store(
+            [{"material_id": "m1", "status": "pending"}],
+            {"total_batches": 1, "total_records": 1, "status_counts": {"pending": 1}},
+        )
+
+        assert (await counters.reconcile(store))["repaired"] == 0
+        assert counters.stats["drift_repairs"] == 0
+
+
+    @pytest.mark.unit
+    async def test_repair_of_seeded_request_not_double_counted(self, counters):
+        """A request already in the seeded totals is not added to them again."""
+        await counters.set_global({"batches": 1, "records": 2, "completed": 1, "failed": 1})
+
+        await counters.repair_request("old", [
+            {"material_id": "m1", "status": "completed"}, {"material_id": "m2", "status": "failed"},
+        ])
+
+        assert await counters.get_progress("old") == {"total": 2, "completed": 1, "failed": 1, "pending": 0}
+        assert await counters.get_statistics() is None  # пересев из хранилища вместо двойного учета
+
+
+class TestServiceIntegration:
+    """BatchProcessingService answers progress from counters."""
+
+    @pytest.mark.unit
+    async def test_progress_without_store_scan(self):
+        from services.batch_processing_service import BatchProcessingService
+
+        counters = InMemoryProgressCounters()
+        await counters.init_request("r1", ["m1", "m2"])
+        await counters.transition("r1", "m1", "completed")
+        store = _store([], {})
+        store.get_processing_progress = AsyncMock()
+
+        with patch.object(BatchProcessingService, "__init__", lambda self: None), \
+                patch("services.batch_processing_service.get_progress_counters", return_value=counters), \
+                patch("services.batch_processing_service.get_fallback_manager", return_value=store):
+            service = BatchProcessingService()
+            service.logger = MagicMock()
+            progress = await service.get_processing_progress("r1")
+
+        assert progress == {"total": 2, "completed": 1, "failed": 0, "pending": 1}
+        store.get_processing_progress.assert_not_awaited()
+        store.get_processing_results.assert_not_awaited()
+
+    @pytest.mark.unit
+    async def test_unknown_request_counted_once(self):
+        """Requests created before counters existed are recounted once, then served from counters."""
+        from services.batch_processing_service import BatchProcessingService
+
+        counters = InMemoryProgressCounters()
+        store = _store([{"material_id": "m1", "status": "completed"}, {"material_id": "m2", "status": "failed"}], {})
+
+        with patch.object(BatchProcessingService, "__init__", lambda self: None), \
+                patch("services.batch_processing_service.get_progress_counters", return_value=counters), \
+                patch("services.batch_processing_service.get_fallback_manager", return_value=store):
+            service = BatchProcessingService()
+            service.logger = MagicMock()
+            first = await service.get_processing_progress("old")
+            second = await service.get_processing_progress("old")
+
+        assert first == second == {"total": 2, "completed": 1, "failed": 1, "pending": 0}
+        store.get_processing_results.assert_awaited_once()
+
+    @pytest.mark.unit
+    def test_auto_backend_uses_redis_when_configured(self):
+        from core.background.progress_counters import create_progress_counters
+
+        def settings(redis_url):
+            return MagicMock(PROGRESS_COUNTERS_BACKEND="auto", REDIS_URL=redis_url, REDIS_PASSWORD=None,
+                             REDIS_DB=0, PROGRESS_COUNTERS_PREFIX="progress", PROGRESS_COUNTERS_TTL=60)
+
+        assert isinstance(create_progress_counters(settings("redis://localhost:6379")), RedisProgressCounters)
+        assert isinstance(create_progress_counters(settings(None)), InMemoryProgressCounters)
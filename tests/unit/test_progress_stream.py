@@ -0,0 +1,229 @@
+"""
+Unit tests for push-based batch progress
+Unit тесты для push-прогресса batch обработки (SSE из счетчиков, NDJSON из ленты результатов)
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from core.background.progress import InMemoryResultFeed, RedisResultFeed
+from core.background.progress_counters import InMemoryProgressCounters, RedisProgressCounters
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def counters(request):
+    if request.param == "memory":
+        counters = InMemoryProgressCounters()
+    else:
+        counters = RedisProgressCounters(fakeredis.FakeAsyncRedis(decode_responses=True))
+    await counters.init_request("req", ["m1", "m2", "m3"])
+    await counters.transition("req", "m3", "completed")
+    return counters
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def feed(request):
+    if request.param == "memory":
+        feed = InMemoryResultFeed()
+    else:
+        feed = RedisResultFeed(fakeredis.FakeAsyncRedis(decode_responses=True))
+    await feed.start("req")
+    return feed
+
+
+class TestProgressSubscriptions:
+    """Counters push versioned snapshots to subscribers."""
+
+    @pytest.mark.unit
+    async def test_subscriber_gets_coalesced_snapshots_until_finish(self, counters):
+        """A slow subscriber sees the latest snapshot and the stream ends on finish."""
+        received = []
+
+        async def consume():
+            async for snapshot in counters.subscribe("req", heartbeat=1):
+                received.append(snapshot)
+                await asyncio.sleep(0.02)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        await counters.transition("req", "m1", "processing")
+        await counters.transition("req", "m1", "completed")
+        await counters.transition("req", "m2", "processing")
+        await asyncio.sleep(0.01)
+        await counters.finish("req")
+        await asyncio.wait_for(task, 1)
+
+        assert received[0]["completed"] == 1 and not received[0]["finished"]
+        assert received[-1]["finished"] and received[-1]["completed"] == 2 and received[-1]["processing"] == 1
+        assert len(received) < 5
+        assert [snapshot["version"] for snapshot in received] == sorted({snapshot["version"] for snapshot in received})
+
+    @pytest.mark.unit
+    async def test_unknown_request_and_heartbeat(self, counters):
+        """Unknown requests give an empty feed; no changes give keep-alive."""
+        assert [update async for update in counters.subscribe("missing")] == []
+
+        feed = counters.subscribe("req", heartbeat=0.01)
+        assert (await feed.__anext__())["total"] == 3
+        assert await feed.__anext__() is None
+        await feed.aclose()
+
+    @pytest.mark.unit
+    async def test_redis_feed_is_shared_between_processes(self):
+        """A subscriber of one process follows changes made by another via pub/sub."""
+        server = fakeredis.FakeServer()
+        worker = RedisProgressCounters(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        api = RedisProgressCounters(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        await worker.init_request("req", ["m1", "m2"])
+
+        async def consume():
+            return [snapshot async for snapshot in api.subscribe("req", heartbeat=1)]
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        await worker.transition("req", "m1", "completed")
+        await worker.transition("req", "m2", "failed")
+
+        received = await asyncio.wait_for(task, 1)
+        assert received[-1]["finished"] and (received[-1]["completed"], received[-1]["failed"]) == (1, 1)
+
+
+class TestResultFeed:
+    """Finished results of batch requests."""
+
+    @pytest.mark.unit
+    async def test_follow_streams_new_rows(self, feed):
+        """Results already available are replayed from offset, new ones follow."""
+        await feed.append("req", "m1", "completed", {"sku": "A"})
+        await feed.append("req", "m2", "processing")
+
+        async def collect():
+            return [row async for row in feed.follow("req", heartbeat=1)]
+
+        task = asyncio.create_task(collect())
+        await asyncio.sleep(0.01)
+        await feed.extend("req", [{"material_id": "m2", "status": "failed"}, {"material_id": "m3", "status": "pending"}])
+        await feed.finish("req")
+
+        rows = await asyncio.wait_for(task, 1)
+        assert [(row["material_id"], row["status"]) for row in rows] == [("m1", "completed"), ("m2", "failed")]
+        assert rows[0]["sku"] == "A"
+
+    @pytest.mark.unit
+    async def test_restart_keeps_rows_and_unknown_is_empty(self, feed):
+        """A retried job keeps earlier rows; unknown requests have no feed."""
+        await feed.append("req", "m1", "completed")
+        await feed.finish("req")
+        await feed.start("req")
+        await feed.append("req", "m2", "completed")
+        await feed.finish("req")
+
+        assert [row["material_id"] async for row in feed.follow("req", offset=1)] == ["m2"]
+        assert not await feed.exists("missing")
+        assert [row async for row in feed.follow("missing")] == []
+
+    @pytest.mark.unit
+    async def test_redis_feed_is_shared_between_processes(self):
+        """A stream opened right after submit in one process follows rows written by a worker in another."""
+        server = fakeredis.FakeServer()
+        api = RedisResultFeed(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        worker = RedisResultFeed(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        await api.start("req")
+
+        async def collect():
+            return [row async for row in api.follow("req", heartbeat=1)]
+
+        task = asyncio.create_task(collect())
+        await asyncio.sleep(0.01)
+        await worker.extend("req", [{"material_id": "m1", "status": "completed", "sku": "A"}])
+        await worker.append("req", "m2", "failed")
+        await worker.finish("req")
+
+        rows = await asyncio.wait_for(task, 1)
+        assert [(row["material_id"], row["status"]) for row in rows] == [("m1", "completed"), ("m2", "failed")]
+        assert rows[0]["sku"] == "A"
+
+
+class TestProgressRoutes:
+    """SSE and NDJSON endpoints."""
+
+    @pytest.fixture
+    def client(self, counters, feed, monkeypatch):
+        from api.routes import enhanced_processing
+        from services.batch_processing_service import get_batch_processing_service
+
+        monkeypatch.setattr(enhanced_processing, "get_progress_counters", lambda: counters)
+        monkeypatch.setattr(enhanced_processing, "get_result_feed", lambda: feed)
+        service = MagicMock()
+        service.get_processing_progress = AsyncMock(return_value={"total": 2, "completed": 2, "failed": 0, "pending": 0})
+        service.get_processing_results = AsyncMock(return_value=[
+            {"material_id": "x1", "status": "pending"},
+            {"material_id": "x2", "status": "completed", "sku": "S2"},
+            {"material_id": "x3", "status": "failed"},
+        ])
+
+        app = FastAPI()
+        app.include_router(enhanced_processing.router)
+        app.dependency_overrides[get_batch_processing_service] = lambda: service
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    @pytest.mark.unit
+    async def test_sse_pushes_progress_and_done(self, client, counters):
+        """Running request: progress events from counters, then done."""
+        async def finish_later():
+            await asyncio.sleep(0.05)
+            await counters.transition("req", "m1", "completed")
+            await counters.transition("req", "m2", "completed")
+
+        asyncio.create_task(finish_later())
+        async with client:
+            response = await client.get("/events/req")
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in response.text.split("\n\n") if block]
+        assert events[0].startswith("id: ") and "event: progress" in events[0]
+        done = json.loads(events[-1].split("data: ", 1)[1])
+        assert "event: done" in events[-1] and done["completed"] == 3
+
+    @pytest.mark.unit
+    async def test_sse_for_request_unknown_to_counters_reads_store(self, client):
+        """Requests created before the counters are served from one shared store read."""
+        async with client:
+            response = await client.get("/events/other")
+
+        assert "event: progress" in response.text and "event: done" in response.text
+
+    @pytest.mark.unit
+    async def test_ndjson_results(self, client, feed):
+        """Completed results are streamed one JSON object per line; offset counts finished rows."""
+        await feed.append("req", "m1", "completed", {"sku": "A"})
+        await feed.finish("req")
+
+        async with client:
+            running = await client.get("/results/req/stream")
+            stored = await client.get("/results/other/stream")
+            resumed = await client.get("/results/other/stream", params={"offset": 1})
+
+        assert [json.loads(line)["material_id"] for line in running.text.splitlines()] == ["m1"]
+        assert [json.loads(line)["material_id"] for line in stored.text.splitlines()] == ["x2", "x3"]
+        assert [json.loads(line)["material_id"] for line in resumed.text.splitlines()] == ["x3"]
+
+    @pytest.mark.unit
+    async def test_ndjson_stream_opened_before_results(self, client, feed):
+        """A stream opened right after submit waits for rows instead of reading the store."""
+        async def produce():
+            await asyncio.sleep(0.05)
+            await feed.append("req", "m1", "completed")
+            await feed.append("req", "m2", "failed")
+            await feed.finish("req")
+
+        asyncio.create_task(produce())
+        async with client:
+            response = await client.get("/results/req/stream")
+
+        assert [json.loads(line)["material_id"] for line in response.text.splitlines()] == ["m1", "m2"]
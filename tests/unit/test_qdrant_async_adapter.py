@@ -0,0 +1,103 @@
+"""
+Unit tests for AsyncQdrantVectorDatabase
+Unit тесты для асинхронного адаптера Qdrant (локальный in-memory режим)
+"""
+import uuid
+
+import pytest
+
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+
+VECTOR_SIZE = 8
+
+
+def _vector(seed: int):
+    return [float((seed + i) % 5 + 1) for i in range(VECTOR_SIZE)]
+
+
+def _points(count: int):
+    return [
+        {
+            "id": str(uuid.UUID(int=i + 1)),
+            "vector": _vector(i),
+            "payload": {"name": f"Материал {i}", "unit": "кг" if i % 2 else "шт"}
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+async def vector_db():
+    db = AsyncQdrantVectorDatabase({
+        "location": ":memory:",
+        "collection_name": "materials",
+        "vector_size": VECTOR_SIZE,
+        "upsert_chunk_size": 7,
+    })
+    await db.create_collection("materials", VECTOR_SIZE)
+    yield db
+    await db.close()
+
+
+class TestAsyncQdrantVectorDatabase:
+    """Tests for batched operations of the async adapter."""
+
+    @pytest.mark.unit
+    async def test_upsert_many_and_count(self, vector_db):
+        """Chunked parallel upsert stores every point."""
+        upserted = await vector_db.upsert_many("materials", _points(50))
+
+        assert upserted == 50
+        assert await vector_db.count("materials") == 50
+        assert await vector_db.count("materials", {"unit": "кг"}) == 25
+
+    @pytest.mark.unit
+    async def test_search_batch_preserves_query_order(self, vector_db):
+        """Batch search returns one result list per query vector."""
+        points = _points(20)
+        await vector_db.upsert_many("materials", points)
+
+        results = await vector_db.search_batch(
+            "materials", [points[3]["vector"], points[4]["vector"]], limit=3
+        )
+
+        assert len(results) == 2
+        assert all(len(batch) == 3 for batch in results)
+        assert results[0][0]["score"] == pytest.approx(1.0)
+        assert results[1][0]["score"] == pytest.approx(1.0)
+
+    @pytest.mark.unit
+    async def test_search_batch_applies_filter(self, vector_db):
+        """Flat filter dicts are applied to every query in the batch."""
+        await vector_db.upsert_many("materials", _points(20))
+
+        results = await vector_db.search_batch(
+            "materials", [_vector(1), _vector(2)], limit=5, filter_conditions={"unit": "шт"}
+        )
+
+        assert all(hit["payload"]["unit"] == "шт" for batch in results for hit in batch)
+
+    @pytest.mark.unit
+    async def test_retrieve_many_skips_missing(self, vector_db):
+        """Bulk retrieve returns found records without vectors by default."""
+        points = _points(5)
+        await vector_db.upsert_many("materials", points)
+
+        records = await vector_db.retrieve_many(
+            "materials", [points[0]["id"], points[1]["id"], str(uuid.uuid4())]
+        )
+
+        assert {record["id"] for record in records} == {points[0]["id"], points[1]["id"]}
+        assert all("vector" not in record for record in records)
+
+    @pytest.mark.unit
+    async def test_processing_records_use_async_client(self, vector_db):
+        """Inherited processing-record methods work on top of the async client."""
+        material_ids = await vector_db.create_processing_records(
+            "req-1", [{"material_id": "m-1", "name": "Цемент", "unit": "мешок"}]
+        )
+        await vector_db.update_processing_status("req-1", material_ids[0], "completed")
+
+        progress = await vector_db.get_processing_progress("req-1")
+
+        assert progress == {"total": 1, "completed": 1, "failed": 0, "pending": 0}
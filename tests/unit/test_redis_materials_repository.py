@@ -0,0 +1,114 @@
+"""
+Unit tests for RedisMaterialsRepository bulk operations
+Unit тесты для пакетных операций RedisMaterialsRepository (fakeredis)
+"""
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from core.database.adapters.redis_adapter import RedisDatabase
+from core.repositories.redis_materials import RedisMaterialsRepository
+from core.schemas.materials import MaterialCreate, MaterialUpdate
+
+
+def _materials(count: int):
+    return [
+        MaterialCreate(name=f"Материал {i}", use_category="Цемент", unit="мешок", description=f"Описание {i}")
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def cache_db():
+    db = RedisDatabase({"redis_url": "redis://localhost:6379"})
+    db.redis = fakeredis.FakeAsyncRedis()
+    return db
+
+
+@pytest.fixture
+def repository(cache_db):
+    return RedisMaterialsRepository(cache_db, default_ttl=600)
+
+
+class TestRedisMaterialsRepository:
+    """Tests for stable keys, MGET reads and pipelined batch writes."""
+
+    @pytest.mark.unit
+    def test_search_key_is_stable_across_processes(self, repository):
+        """Search keys do not depend on per-process hash randomization."""
+        code = (
+            "from core.repositories.redis_materials import RedisMaterialsRepository as R; "
+            "print(R(None)._search_key('semantic', 'цемент'))"
+        )
+        keys = {
+            subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True,
+                env={**os.environ, "PYTHONHASHSEED": seed}
+            ).stdout.strip().splitlines()[-1]
+            for seed in ("1", "2")
+        }
+
+        assert keys == {repository._search_key("semantic", "цемент")}
+
+    @pytest.mark.unit
+    async def test_create_batch_uses_pipelined_mset(self, repository, cache_db):
+        """Each batch is written with one MSET pipeline and keys get a TTL."""
+        with patch.object(cache_db, "mset", wraps=cache_db.mset) as mset, \
+                patch.object(cache_db, "set", wraps=cache_db.set) as single_set:
+            result = await repository.create_batch(_materials(25), batch_size=10)
+
+        assert result["created"] == 25
+        assert mset.await_count == 3
+        single_set.assert_not_awaited()
+
+        key = cache_db._build_key(repository._material_key(repository._build_material(_materials(1)[0]).id))
+        assert 0 < await cache_db.redis.ttl(key) <= 600
+
+    @pytest.mark.unit
+    async def test_cached_search_hit_is_one_round_trip(self, repository, cache_db):
+        """Cached IDs and materials are resolved by one server-side script call."""
+        await repository.create_batch(_materials(50))
+        material_ids = [repository._build_material(material).id for material in _materials(50)]
+        await repository.cache_search_results("цемент", "semantic", material_ids)
+        await repository.search_semantic("щебень")  # первый вызов загружает скрипт (SCRIPT LOAD)
+
+        with patch.object(cache_db.redis, "evalsha", wraps=cache_db.redis.evalsha) as evalsha, \
+                patch.object(cache_db, "get", wraps=cache_db.get) as get, \
+                patch.object(cache_db, "mget", wraps=cache_db.mget) as mget:
+            materials = await repository.search_semantic("цемент", limit=40)
+
+        assert [material.id for material in materials] == material_ids[:40]
+        assert evalsha.call_count == 1
+        get.assert_not_awaited()
+        mget.assert_not_awaited()
+
+    @pytest.mark.unit
+    async def test_cached_search_follows_updates_and_deletes(self, repository):
+        """Search keys hold IDs only: edited materials are fresh, deleted ones are dropped."""
+        await repository.create_batch(_materials(3))
+        ids = [repository._build_material(material).id for material in _materials(3)]
+        await repository.cache_search_results("цемент", "text", ids)
+        await repository.cache_search_results("песок", "text", [])
+
+        await repository.delete(ids[1])
+        await repository.update(ids[0], MaterialUpdate(description="Новое описание"))
+
+        materials = await repository.search_text("цемент")
+        assert [material.id for material in materials] == [ids[0], ids[2]]
+        assert materials[0].description == "Новое описание"
+        assert await repository._get_cached_search_results("text", "песок", 10) == []
+        assert await repository._get_cached_search_results("text", "щебень", 10) is None
+
+    @pytest.mark.unit
+    async def test_get_many_skips_missing(self, repository):
+        """Missing IDs are skipped and order is preserved."""
+        await repository.create_batch(_materials(3))
+        ids = [repository._build_material(material).id for material in _materials(3)]
+
+        materials = await repository.get_many([ids[2], "missing", ids[0]])
+
+        assert [material.id for material in materials] == [ids[2], ids[0]]
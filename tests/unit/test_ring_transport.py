@@ -0,0 +1,182 @@
+"""
+Unit tests for the ring buffer log transport
+Unit тесты для кольцевого буфера логов с отдельным потоком записи (переполнение, пакетная запись, порядок)
+"""
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from core.logging.optimized.async_logging import LoggingQueue, RingBufferHandler, RingBufferTransport
+from core.logging.specialized.http import SampledRequestLogger, TailSampler
+
+
+class _CountingStream(io.BytesIO):
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+class _GatedStream(_CountingStream):
+    """Blocks the writer thread until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data):
+        self.entered.set()
+        self.release.wait(5)
+        return super().write(data)
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+class TestRingBufferTransport:
+    """Bounded buffer drained by one writer thread."""
+
+    @pytest.mark.unit
+    def test_batches_written_in_order_with_one_write_each(self):
+        stream = _CountingStream()
+        transport = RingBufferTransport(stream, batch_size=100, flush_interval=10.0)
+
+        for i in range(250):
+            assert transport.emit((1700000000.0, "INFO", "app", f"line {i}", {"n": i}))
+        transport.stop()
+
+        lines = _lines(stream)
+        assert [line["n"] for line in lines] == list(range(250))
+        assert lines[0] == {"ts": 1700000000.0, "level": "INFO", "logger": "app", "message": "line 0", "n": 0}
+        assert stream.writes == 3
+        assert transport.get_stats()["written"] == 250
+
+    @pytest.mark.unit
+    def test_writer_thread_wakes_on_full_batch(self):
+        stream = _CountingStream()
+        transport = RingBufferTransport(stream, batch_size=10, flush_interval=10.0)
+        transport.start()
+        try:
+            for i in range(10):
+                transport.emit({"n": i})
+            for _ in range(100):
+                if transport.get_stats()["written"] == 10:
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            transport.stop()
+
+        assert transport.get_stats()["written"] == 10
+        assert stream.writes == 1
+
+    @pytest.mark.unit
+    def test_drop_policy_never_waits(self):
+        transport = RingBufferTransport(io.BytesIO(), capacity=5, overflow="drop")
+
+        results = [transport.emit(b"x\n") for _ in range(8)]
+
+        assert results == [True] * 5 + [False] * 3
+        assert transport.get_stats()["dropped"] == 3
+        assert transport.get_stats()["pending"] == 5
+
+    @pytest.mark.unit
+    def test_block_policy_waits_for_writer(self):
+        stream = _GatedStream()
+        transport = RingBufferTransport(stream, capacity=2, batch_size=2, flush_interval=0.01, overflow="block")
+        transport.start()
+        try:
+            transport.emit(b"a\n")
+            transport.emit(b"b\n")
+            assert stream.entered.wait(5)  # writer holds "a", "b"
+            transport.emit(b"c\n")
+            transport.emit(b"d\n")  # buffer full again
+
+            threading.Timer(0.05, stream.release.set).start()
+            assert transport.emit(b"e\n")
+        finally:
+            stream.release.set()
+            transport.stop()
+
+        assert stream.getvalue() == b"a\nb\nc\nd\ne\n"
+        assert transport.get_stats()["dropped"] == 0
+
+    @pytest.mark.unit
+    def test_block_policy_drops_after_timeout(self):
+        transport = RingBufferTransport(io.BytesIO(), capacity=1, overflow="block", block_timeout=0.01)
+
+        assert transport.emit(b"a\n")
+        assert not transport.emit(b"b\n")  # writer not running
+        assert transport.get_stats()["dropped"] == 1
+
+    @pytest.mark.unit
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            RingBufferTransport(io.BytesIO(), overflow="wait")
+
+    @pytest.mark.unit
+    def test_handler_formats_message_and_exception(self):
+        stream = io.BytesIO()
+        transport = RingBufferTransport(stream)
+        logger = logging.getLogger("test.ring")
+        logger.handlers = [RingBufferHandler(transport)]
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+
+        logger.info("материал %s", "цемент")
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            logger.exception("failed")
+        transport.stop()
+
+        first, second = _lines(stream)
+        assert first["message"] == "материал цемент"
+        assert first["logger"] == "test.ring"
+        assert second["level"] == "ERROR"
+        assert "RuntimeError: boom" in second["exception"]
+
+
+class TestSampledLoggerTransport:
+    """Kept request records are serialized by the writer thread."""
+
+    @pytest.mark.unit
+    async def test_records_written_by_transport(self):
+        stream = _CountingStream()
+        request_logger = SampledRequestLogger(
+            sampler=TailSampler(sample_rate=1.0),
+            transport=RingBufferTransport(stream, flush_interval=10.0),
+        )
+        await request_logger.start()
+        for i in range(50):
+            request_logger.log("GET", "/items", 200, 3.0, correlation_id=f"c{i}", response_body=b'{"ok": true}')
+        await request_logger.stop()
+
+        lines = _lines(stream)
+        assert [line["correlation_id"] for line in lines] == [f"c{i}" for i in range(50)]
+        assert lines[0]["response_body"] == '{"ok": true}'
+        assert stream.writes == 1
+        assert request_logger.get_stats()["transport"]["written"] == 50
+
+
+class TestLoggingQueue:
+    """The asyncio queue keeps FIFO order on a deque."""
+
+    @pytest.mark.unit
+    async def test_fifo_batches(self):
+        queue = LoggingQueue(max_size=10)
+        for i in range(12):
+            queue.put_nowait({"n": i})
+
+        batch = await queue.get_batch(4)
+
+        assert [item["n"] for item in batch] == [0, 1, 2, 3]
+        assert queue.get_nowait() == {"n": 4}
+        assert [item["n"] for item in queue.get_all()] == [5, 6, 7, 8, 9]
+        assert queue.size() == 0
+        assert queue.get_overflow_count() == 2
@@ -0,0 +1,127 @@
+"""
+Unit tests for the tail-sampled request logger
+Unit тесты для логгера запросов с tail-based выборкой (превью тел, готовые JSON строки, пакетная запись)
+"""
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from core.logging.optimized.async_logging import BatchProcessor
+from core.logging.specialized.http import sampled_request_logger
+from core.logging.specialized.http.sampled_request_logger import SampledRequestLogger, TailSampler, body_preview
+from core.middleware.pipeline import FusedMiddlewarePipeline
+
+
+class _CountingStream(io.BytesIO):
+    writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+def _never():
+    return 1.0
+
+
+class TestTailSampler:
+    """Errors and slow requests are always kept, the rest is sampled."""
+
+    @pytest.mark.unit
+    def test_decisions(self):
+        sampler = TailSampler(sample_rate=0.0, slow_threshold_ms=500, random_func=_never)
+
+        assert sampler.decide(500, 1.0) == "error"
+        assert sampler.decide(200, 1.0, RuntimeError("boom")) == "error"
+        assert sampler.decide(200, 750.0) == "slow"
+        assert sampler.decide(404, 1.0) is None
+        assert TailSampler(sample_rate=0.5, random_func=lambda: 0.2).decide(200, 1.0) == "sampled"
+        assert TailSampler(sample_rate=0.5, random_func=lambda: 0.7).decide(200, 1.0) is None
+
+
+class TestBodyPreview:
+    """Capped previews through a memoryview."""
+
+    @pytest.mark.unit
+    def test_preview_is_capped(self):
+        body = ("цемент " * 100).encode()
+
+        preview = body_preview(body, 12)
+
+        assert preview == "цемент" + "..."
+        assert body_preview(b"short", 256) == "short"
+        assert body_preview(b"", 256) is None
+        assert body_preview(body, 0) is None
+        assert body_preview(bytearray(b"abcdef"), 3) == "abc..."
+
+
+class TestSampledRequestLogger:
+    """Checks run before any formatting; kept records are pre-encoded."""
+
+    @pytest.mark.unit
+    def test_dropped_requests_are_not_formatted(self):
+        request_logger = SampledRequestLogger(sampler=TailSampler(sample_rate=0.0))
+
+        with patch.object(sampled_request_logger.json, "dumps") as dumps:
+            for _ in range(100):
+                request_logger.log("GET", "/items", 200, 5.0, request_body=b"x" * 10000)
+
+        dumps.assert_not_called()
+        assert request_logger.get_stats()["dropped"] == 100
+
+    @pytest.mark.unit
+    def test_level_checked_before_formatting(self):
+        logging.getLogger("request.quiet").setLevel(logging.ERROR)
+        request_logger = SampledRequestLogger("request.quiet", sampler=TailSampler(sample_rate=1.0))
+
+        with patch.object(sampled_request_logger.json, "dumps", wraps=json.dumps) as dumps:
+            assert request_logger.log("GET", "/items", 200, 5.0) is False
+            assert request_logger.log("GET", "/items", 503, 5.0) is True
+
+        assert dumps.call_count == 1
+
+    @pytest.mark.unit
+    async def test_batch_worker_writes_encoded_lines(self):
+        stream = _CountingStream()
+        request_logger = SampledRequestLogger(
+            sampler=TailSampler(sample_rate=1.0),
+            processor=BatchProcessor(encoded_stream=stream, flush_interval=10.0),
+        )
+        await request_logger.start()
+        for i in range(50):
+            request_logger.log("POST", "/items", 201, 3.0, correlation_id=f"c{i}", request_body=b'{"name": "bolt"}')
+        await request_logger.stop()
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 50
+        assert stream.writes <= 2
+        first = json.loads(lines[0])
+        assert first["correlation_id"] == "c0"
+        assert first["request_body"] == '{"name": "bolt"}'
+        assert first["sampled"] == "sampled"
+
+    @pytest.mark.unit
+    async def test_pipeline_passes_body_previews(self, caplog):
+        app = FastAPI()
+
+        @app.post("/echo")
+        async def echo(request: Request):
+            return {"received": (await request.json())["name"]}
+
+        pipeline = FusedMiddlewarePipeline(
+            app, body_cache={},
+            request_logger=SampledRequestLogger(sampler=TailSampler(sample_rate=1.0), preview_limit=16),
+        )
+        with caplog.at_level(logging.INFO, logger="request"):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=pipeline), base_url="http://test") as client:
+                await client.post("/echo", json={"name": "анкерный болт М12"})
+
+        record = json.loads(next(r.getMessage() for r in caplog.records if r.name == "request"))
+        assert record["request_body"].startswith('{"name":')
+        assert record["request_body"].endswith("...")
+        assert record["response_body"].startswith('{"received":')
@@ -0,0 +1,162 @@
+"""
+Unit tests for batched SKU search
+Unit тесты для пакетного поиска SKU с фильтром по единице измерения
+"""
+import uuid
+from unittest.mock import patch
+
+import pytest
+from qdrant_client import QdrantClient
+
+from core.database.adapters.qdrant_adapter import QdrantVectorDatabase
+from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+from core.schemas.pipeline_models import SKUSearchConfig, SKUSearchRequest
+from services.sku_search_service import SKUSearchService
+
+VECTOR_SIZE = 8
+
+
+def _vector(seed: int):
+    return [float((seed + i) % 5 + 1) for i in range(VECTOR_SIZE)]
+
+
+def _reference_points():
+    units = ["шт", "кг", "м3", "Шт"]
+    return [
+        {
+            "id": str(uuid.UUID(int=i + 1)),
+            "vector": _vector(i),
+            "payload": {"name": f"Материал {i}", "unit": units[i % len(units)], "sku": f"SKU-{i:03d}"}
+        }
+        for i in range(40)
+    ]
+
+
+class CountingVectorDB(AsyncQdrantVectorDatabase):
+    """In-memory adapter that records search_batch calls."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.search_batch_calls = []
+
+    async def search_batch(self, collection_name, query_vectors, limit=10, filter_conditions=None):
+        self.search_batch_calls.append((len(query_vectors), filter_conditions))
+        return await super().search_batch(collection_name, query_vectors, limit, filter_conditions)
+
+
+@pytest.fixture
+async def vector_db():
+    db = CountingVectorDB({"location": ":memory:", "vector_size": VECTOR_SIZE})
+    await db.create_collection("materials", VECTOR_SIZE)
+    await db.upsert_many("materials", _reference_points())
+    yield db
+    await db.close()
+
+
+@pytest.fixture
+def service(vector_db):
+    with patch("services.sku_search_service.get_combined_embedding_service"):
+        return SKUSearchService(
+            vector_db=vector_db,
+            config=SKUSearchConfig(batch_size=3, cache_enabled=False)
+        )
+
+
+def _request(seed: int, unit: str) -> SKUSearchRequest:
+    return SKUSearchRequest(
+        material_name=f"Материал {seed}",
+        normalized_unit=unit,
+        material_embedding=_vector(seed),
+        similarity_threshold=0.5,
+        max_candidates=5
+    )
+
+
+class TestSKUBatchSearch:
+    """Tests for SKUSearchService.find_skus_batch."""
+
+    @pytest.mark.unit
+    async def test_one_search_call_per_unit_chunk(self, service, vector_db):
+        """Requests are grouped by canonical unit and chunked by batch_size."""
+        requests = [_request(i, "штука" if i % 2 else "шт") for i in range(4)]
+        requests += [_request(1, "кг"), _request(5, "килограмм")]
+
+        responses = await service.find_skus_batch(requests)
+
+        assert len(responses) == len(requests)
+        assert [size for size, _ in vector_db.search_batch_calls] == [3, 1, 2]
+        assert service.get_statistics()["batch_search_queries"] == len(requests)
+
+    @pytest.mark.unit
+    async def test_unit_filter_is_pushed_down(self, service, vector_db):
+        """Only candidates with a matching unit spelling are returned."""
+        responses = await service.find_skus_batch([_request(0, "штук"), _request(1, "кг")])
+
+        piece_candidates = responses[0].all_candidates
+        assert piece_candidates
+        assert {candidate.unit for candidate in piece_candidates} <= {"шт", "Шт"}
+        assert responses[0].found_sku is not None
+        assert {candidate.unit for candidate in responses[1].all_candidates} == {"кг"}
+
+        _, unit_filter = vector_db.search_batch_calls[0]
+        unit_key_condition, legacy_condition = unit_filter["should"]
+        assert unit_key_condition["key"] == "unit_key"
+        assert "шт" in unit_key_condition["match"]["any"] and "штука" in unit_key_condition["match"]["any"]
+        assert "Шт" in legacy_condition["match"]["any"]
+
+    @pytest.mark.unit
+    async def test_unit_key_matches_unnormalized_units(self, service, vector_db):
+        """Units stored with other case or surrounding spaces match through 'unit_key'."""
+        await vector_db.upsert("materials", [{
+            "id": str(uuid.UUID(int=1000)),
+            "vector": _vector(2),
+            "payload": {"name": "Материал 2", "unit": " Л ", "unit_key": "л", "sku": "SKU-L"}
+        }])
+
+        responses = await service.find_skus_batch([_request(2, "литр")])
+
+        assert responses[0].found_sku == "SKU-L"
+
+    @pytest.mark.unit
+    async def test_batch_results_are_cached(self, vector_db):
+        """Repeated batch requests are answered from the search cache."""
+        with patch("services.sku_search_service.get_combined_embedding_service"):
+            service = SKUSearchService(vector_db=vector_db, config=SKUSearchConfig(batch_size=3))
+        requests = [_request(0, "шт"), _request(1, "кг")]
+
+        first = await service.find_skus_batch(requests)
+        second = await service.find_skus_batch(requests + [_request(2, "м3")])
+
+        assert len(vector_db.search_batch_calls) == 3
+        assert vector_db.search_batch_calls[-1][0] == 1
+        assert [r.found_sku for r in second[:2]] == [r.found_sku for r in first]
+
+    @pytest.mark.unit
+    async def test_missing_embedding_returns_error_response(self, service):
+        """Requests without embedding fail individually without breaking the batch."""
+        request = SKUSearchRequest(material_name="Цемент", normalized_unit="кг")
+
+        responses = await service.find_skus_batch([request, _request(1, "кг")])
+
+        assert responses[0].search_successful is False
+        assert responses[1].search_successful is True
+
+
+class TestSyncAdapterBatch:
+    """The sync Qdrant adapter sends batches natively."""
+
+    @pytest.mark.unit
+    async def test_search_batch_and_upsert_many(self):
+        with patch("core.database.adapters.qdrant_adapter.QdrantClient", lambda **kwargs: QdrantClient(location=":memory:")):
+            db = QdrantVectorDatabase({"url": "http://stand-in:6333", "collection_name": "materials"})
+        await db.create_collection("materials", VECTOR_SIZE)
+        with patch.object(db, "_upsert_points", wraps=db._upsert_points) as upsert_points:
+            assert await db.upsert_many("materials", _reference_points()) == 40
+        assert upsert_points.call_count == 1
+
+        with patch.object(db.client, "query_batch_points", wraps=db.client.query_batch_points) as query_batch:
+            results = await db.search_batch("materials", [_vector(0), _vector(1)], limit=3,
+                                            filter_conditions={"unit": "кг"})
+        assert query_batch.call_count == 1
+        assert [len(batch) for batch in results] == [3, 3]
+        assert all(r["payload"]["unit"] == "кг" for batch in results for r in batch)
@@ -0,0 +1,245 @@
+"""
+Unit tests for staged streaming pipeline
+Unit тесты для поэтапного потокового пайплайна обработки материалов
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.background.staged_pipeline import PipelineStage, StagedPipeline
+from core.schemas.pipeline_models import (
+    BatchProcessingRequest, MaterialProcessRequest, PipelineConfiguration, SKUSearchCandidate, SKUSearchResponse
+)
+
+
+def _double(batch):
+    async def handler(items):
+        batch.append(len(items))
+        return [item * 2 for item in items]
+    return handler
+
+
+class TestStagedPipeline:
+    """Generic stage runner behaviour."""
+
+    @pytest.mark.unit
+    async def test_micro_batches_and_all_items_delivered(self):
+        """Stage handlers receive micro-batches and every item reaches the output."""
+        batches = []
+        pipeline = StagedPipeline([
+            PipelineStage("double", _double([]), concurrency=3),
+            PipelineStage("batch", _double(batches), batch_size=10, batch_timeout=0.05),
+        ], queue_size=50)
+
+        outputs = await pipeline.run(range(45))
+
+        assert sorted(outputs) == [i * 4 for i in range(45)]
+        assert max(batches) == 10 and sum(batches) == 45
+        assert pipeline.get_stats()["batch"]["batches"] == len(batches)
+
+    @pytest.mark.unit
+    async def test_backpressure_limits_items_in_flight(self):
+        """A slow consumer stops upstream stages once the bounded queues are full."""
+        started = []
+
+        async def track(items):
+            started.extend(items)
+            return items
+
+        pipeline = StagedPipeline([PipelineStage("track", track)], queue_size=2)
+        stream = pipeline.stream(range(100))
+        await stream.__anext__()
+        await asyncio.sleep(0.05)
+
+        # queue to stage + stage in hand + output queue
+        assert len(started) <= 6
+        await stream.aclose()
+
+    @pytest.mark.unit
+    async def test_on_error_isolates_failed_batch(self):
+        """Failed batches are converted by on_error, other batches continue."""
+        async def flaky(items):
+            if 3 in items:
+                raise RuntimeError("boom")
+            return items
+
+        pipeline = StagedPipeline([
+            PipelineStage("flaky", flaky, batch_size=2, batch_timeout=0, on_error=lambda item, e: -item)
+        ])
+
+        outputs = await pipeline.run([1, 2, 3, 4])
+
+        assert -3 in outputs and 1 in outputs and len(outputs) == 4
+
+    @pytest.mark.unit
+    async def test_error_without_handler_stops_pipeline(self):
+        """Unhandled stage errors are raised from the stream."""
+        async def broken(items):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await StagedPipeline([PipelineStage("broken", broken)]).run([1])
+
+
+@pytest.fixture
+def pipeline():
+    from services.material_processing_pipeline import MaterialProcessingPipeline
+
+    with patch("services.material_processing_pipeline.EnhancedParserIntegrationService"), \
+            patch("services.material_processing_pipeline.EmbeddingComparisonService"), \
+            patch("services.material_processing_pipeline.get_sku_search_service"):
+        pipeline = MaterialProcessingPipeline(config=PipelineConfiguration(
+            embedding_batch_size=4, sku_search_batch_size=4, database_save_batch_size=10, batch_wait_time=0.05
+        ))
+
+    async def pre_sku(request, result, start_time):
+        await asyncio.sleep(0.001)
+        if request.name == "broken":
+            return pipeline._finalize_result(result, "failed", start_time)
+        result.rag_normalization.success = True
+        result.rag_normalization.normalized_unit = "шт"
+        return None
+
+    pipeline._run_pre_sku_stages = pre_sku
+
+    async def find_skus_batch(requests):
+        return [
+            SKUSearchResponse(
+                found_sku=f"SKU-{r.material_name}", search_successful=True, candidates_evaluated=1,
+                matching_candidates=1, search_method="vector", processing_time=0.0,
+                best_match=SKUSearchCandidate(
+                    material_id=r.material_name, sku=f"SKU-{r.material_name}", name=r.material_name, unit="шт",
+                    similarity_score=0.9, unit_match=True, color_match=True, overall_match=True
+                )
+            )
+            for r in requests
+        ]
+
+    pipeline.sku_search_service.find_skus_batch = AsyncMock(side_effect=find_skus_batch)
+    pipeline.sku_search_service.config.similarity_threshold = 0.8
+    pipeline.sku_search_service.config.max_candidates = 5
+    return pipeline
+
+
+class TestStagedMaterialProcessing:
+    """MaterialProcessingPipeline batch path through stages."""
+
+    @pytest.mark.unit
+    async def test_resources_called_once_per_micro_batch(self, pipeline):
+        """Embeddings, SKU search and saves are batched; results keep request order."""
+        materials = [MaterialProcessRequest(id=f"m{i}", name=f"mat{i}", unit="шт") for i in range(12)]
+        materials[5] = MaterialProcessRequest(id="m5", name="broken", unit="шт")
+
+        embedding_service = MagicMock()
+        embedding_service.generate_material_embeddings_for_sku = AsyncMock(
+            side_effect=lambda batch: [[0.1, 0.2] for _ in batch]
+        )
+        reference = MagicMock()
+        reference.return_value.save_material_references = AsyncMock(return_value=True)
+
+        with patch("services.combined_embedding_service.get_combined_embedding_service", return_value=embedding_service), \
+                patch("core.database.collections.materials_reference.MaterialsReferenceCollection", reference):
+            response = await pipeline.process_batch_materials(BatchProcessingRequest(materials=materials, max_workers=4))
+
+        assert [r.request_id for r in response.results] == [m.id for m in materials]
+        assert response.successful_processed == 11
+        assert response.results[0].sku == "SKU-mat0" and response.results[0].database_save.success
+
+        embedded = sum(len(call.args[0]) for call in embedding_service.generate_material_embeddings_for_sku.await_args_list)
+        assert embedded == 11
+        assert embedding_service.generate_material_embeddings_for_sku.await_count <= 6
+        assert pipeline.sku_search_service.find_skus_batch.await_count <= 6
+        assert reference.return_value.save_material_references.await_count < 11
+        assert pipeline.stage_statistics["parse"]["items"] == 12
+
+
+class TestBatchProcessingService:
+    """BatchProcessingService stores the pipeline results as they stream out."""
+
+    @pytest.mark.unit
+    async def test_bulk_processing_status_and_pipeline_sku(self, pipeline):
+        """Pending records are marked processing in one update; results are stored per micro-batch."""
+        from core.background.progress_counters import InMemoryProgressCounters
+        from services.batch_processing_service import BatchProcessingService, ProcessingJobConfig
+
+        records = [{"material_id": f"m{i}", "original_name": f"mat{i}", "status": "pending"} for i in range(3)]
+        store = MagicMock()
+        store.get_processing_results = AsyncMock(return_value=records)
+        store.update_processing_statuses = AsyncMock(return_value=True)
+        store.update_processing_status = AsyncMock(return_value=True)
+        store.update_processing_results = AsyncMock(return_value=True)
+        counters = InMemoryProgressCounters()
+        await counters.init_request("r1", [record["material_id"] for record in records])
+
+        embedding_service = MagicMock()
+        embedding_service.generate_material_embeddings_for_sku = AsyncMock(
+            side_effect=lambda batch: [[0.1, 0.2] for _ in batch]
+        )
+        reference = MagicMock()
+        reference.return_value.save_material_references = AsyncMock(return_value=True)
+
+        with patch.object(BatchProcessingService, "__init__", lambda self: None), \
+                patch("services.batch_processing_service.get_fallback_manager", return_value=store), \
+                patch("services.batch_processing_service.get_progress_counters", return_value=counters), \
+                patch("services.combined_embedding_service.get_combined_embedding_service", return_value=embedding_service), \
+                patch("core.database.collections.materials_reference.MaterialsReferenceCollection", reference):
+            service = BatchProcessingService()
+            service.logger = MagicMock()
+            service.config = ProcessingJobConfig()
+            service.pipeline = pipeline
+            await service._process_in_batches("r1")
+
+        store.update_processing_statuses.assert_awaited_once_with("r1", ["m0", "m1", "m2"], "processing")
+        store.update_processing_status.assert_not_awaited()
+        assert all(call.args[0] == "r1" for call in store.update_processing_results.await_args_list)
+        saved = {
+            update["material_id"]: update
+            for call in store.update_processing_results.await_args_list for update in call.args[1]
+        }
+        assert {material_id: fields["sku"] for material_id, fields in saved.items()} == {
+            f"m{i}": f"SKU-mat{i}" for i in range(3)
+        }
+        assert saved["m0"]["status"] == "completed"
+        assert saved["m0"]["normalized_unit"] == "шт" and saved["m0"]["similarity_score"] == 0.9
+        assert await counters.get_progress("r1") == {"total": 3, "completed": 3, "failed": 0, "pending": 0}
+
+    @pytest.mark.unit
+    async def test_qdrant_bulk_status_update(self):
+        """One set_payload call updates the selected records of the request only."""
+        from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+
+        db = AsyncQdrantVectorDatabase({"location": ":memory:"})
+        await db.create_processing_records("r1", [{"material_id": f"m{i}", "name": f"mat{i}"} for i in range(3)])
+        await db.create_processing_records("r2", [{"material_id": "m9", "name": "other"}])
+
+        assert await db.update_processing_statuses("r1", ["m0", "m2", "m9"], "processing")
+
+        statuses = {r["material_id"]: r["status"] for r in await db.get_processing_results("r1")}
+        assert statuses == {"m0": "processing", "m1": "pending", "m2": "processing"}
+        assert (await db.get_processing_results("r2"))[0]["status"] == "pending"
+        await db.close()
+
+    @pytest.mark.unit
+    async def test_qdrant_bulk_results_update(self):
+        """Per-material results are written in one batch request without scrolling the collection."""
+        from core.database.adapters.qdrant_async_adapter import AsyncQdrantVectorDatabase
+
+        db = AsyncQdrantVectorDatabase({"location": ":memory:"})
+        await db.create_processing_records("r1", [{"material_id": f"m{i}", "name": f"mat{i}"} for i in range(3)])
+        await db.create_processing_records("r2", [{"material_id": "m0", "name": "other"}])
+
+        with patch.object(db, "scroll_all", AsyncMock()) as scroll_all:
+            assert await db.update_processing_results("r1", [
+                {"material_id": "m0", "status": "completed", "error": None, "sku": "SKU-0", "similarity_score": 0.9},
+                {"material_id": "m2", "status": "failed", "error": "boom"},
+            ])
+        scroll_all.assert_not_awaited()
+
+        records = {r["material_id"]: r for r in await db.get_processing_results("r1")}
+        assert records["m0"]["status"] == "completed" and records["m0"]["sku"] == "SKU-0"
+        assert records["m0"]["processed_at"] and records["m0"]["original_name"] == "mat0"
+        assert records["m2"]["status"] == "failed" and records["m2"]["error"] == "boom"
+        assert records["m1"]["status"] == "pending"
+        assert (await db.get_processing_results("r2"))[0]["status"] == "pending"
+        await db.close()